@@ -0,0 +1,130 @@
+"""
+Асинхронная обертка над Database
+Запросы выполняются в отдельном пуле потоков, чтобы не блокировать цикл событий бота
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from bazi_chart import encode_chart
+from database import Database
+from write_behind import WriteBehindQueue
+
+
+class AsyncDatabase:
+    """Тот же интерфейс, что и у Database, но все методы — корутины"""
+
+    def __init__(self, database_url: str = None, database: Database = None, max_workers: int = None,
+                 write_behind: bool = False, write_batch_size: int = 200, write_flush_interval: float = 1.0):
+        self.db = database or Database(database_url)
+        # Потоков не больше, чем соединений в пуле: лишние все равно ждали бы соединение
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.db.pool.max_size,
+            thread_name_prefix='db'
+        )
+        # Профили и карты пишутся пачками в фоне, чтение видит еще не записанные изменения
+        self.write_queue = None
+        if write_behind:
+            self.write_queue = WriteBehindQueue(self, max_batch=write_batch_size, flush_interval=write_flush_interval)
+
+    def start(self):
+        """Запустить фоновые задачи (внутри работающего цикла событий)"""
+        if self.write_queue:
+            self.write_queue.start()
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Получить данные пользователя"""
+        # Снимок очереди до запроса: сброс, завершившийся во время чтения, не потеряет изменения из ответа
+        pending = self.write_queue.pending(user_id) if self.write_queue else None
+        if pending:
+            pending = dict(pending)
+        user = await self._run(self.db.get_user, user_id)
+        if pending:
+            user = {**(user or {'user_id': user_id}), **pending}
+            chart = user.pop('bazi_chart', None)
+            if chart is not None:
+                user['bazi_chart'] = encode_chart(chart)
+        return user
+
+    async def save_user(self, user_id: int, **kwargs):
+        """Сохранить/обновить данные пользователя"""
+        if self.write_queue:
+            self.write_queue.save_user(user_id, **kwargs)
+            return
+        await self._run(self.db.save_user, user_id, **kwargs)
+
+    async def save_bazi_data(self, user_id: int, bazi_data: Dict[str, Any]):
+        """Сохранить данные БаЦзы для пользователя"""
+        if self.write_queue:
+            self.write_queue.save_bazi_data(user_id, bazi_data)
+            return
+        await self._run(self.db.save_bazi_data, user_id, bazi_data)
+
+    async def save_users_batch(self, users: Dict[int, Dict[str, Any]]):
+        """Пакетная запись изменений нескольких пользователей"""
+        await self._run(self.db.save_users_batch, users)
+
+    async def get_chart(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Получить карту БаЦзы пользователя"""
+        pending = self.write_queue.pending(user_id) if self.write_queue else None
+        if pending and pending.get('bazi_chart') is not None:
+            return pending['bazi_chart']
+        return await self._run(self.db.get_chart, user_id)
+
+    async def save_session(self, user_id: int, step: str, data: Dict[str, Any]):
+        """Сохранить данные сессии"""
+        await self._run(self.db.save_session, user_id, step, data)
+
+    async def get_session(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Получить данные сессии"""
+        return await self._run(self.db.get_session, user_id)
+
+    async def clear_session(self, user_id: int):
+        """Очистить данные сессии"""
+        await self._run(self.db.clear_session, user_id)
+
+    async def load_sessions(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Прочитать сессии по ключам"""
+        return await self._run(self.db.load_sessions, keys)
+
+    async def save_sessions_batch(self, sessions: Dict[str, Tuple[int, Optional[str], Dict[str, Any]]]):
+        """Пакетная запись сессий"""
+        await self._run(self.db.save_sessions_batch, sessions)
+
+    async def schedule_messages(self, messages: List[Tuple[int, datetime, Dict[str, Any], int]]):
+        """Поставить сообщения в очередь отложенной отправки"""
+        await self._run(self.db.schedule_messages, messages)
+
+    async def claim_scheduled_messages(self, now: datetime, limit: int) -> List[Tuple[int, datetime, Dict[str, Any], int]]:
+        """Забрать сообщения, срок которых наступил"""
+        return await self._run(self.db.claim_scheduled_messages, now, limit)
+
+    async def postpone_scheduled_messages(self, chat_id: int, shift: timedelta):
+        """Сдвинуть ожидающие сообщения чата"""
+        await self._run(self.db.postpone_scheduled_messages, chat_id, shift)
+
+    async def check_schema(self) -> int:
+        """Проверить, что миграции применены"""
+        return await self._run(self.db.check_schema)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Статистика пула соединений"""
+        return self.db.pool_stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Статистика кэша профилей"""
+        return self.db.cache_stats()
+
+    async def close(self):
+        """Дописать очередь, дождаться выполняющихся запросов и закрыть пул"""
+        if self.write_queue:
+            await self.write_queue.close()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        self.db.close()
@@ -0,0 +1,188 @@
+"""
+Пересчет сохраненных карт БаЦзы после изменений в расчете
+Данные рождения берутся из самой карты (bazi_chart): в колонки users их не пишет ни один путь записи
+Читает users серверным курсором, считает карты в пуле процессов и пишет пакетами только изменившиеся
+Прогресс сохраняется в файл контрольной точки — прерванный запуск продолжается с того же места
+
+    python backfill.py                  # пересчитать всех, продолжая с контрольной точки
+    python backfill.py --restart        # начать сначала
+    python backfill.py --dry-run        # только посчитать, сколько карт изменится
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from bazi_chart import encode_chart
+from migrations import check_schema
+
+CHECKPOINT_PATH = 'backfill.checkpoint'
+
+_memo = None
+
+
+# --- Рабочие процессы ---
+
+def _init_worker():
+    """Свой ChartMemo в каждом процессе; таблица дат charts.bin общая через mmap"""
+    global _memo
+    from chart_memo import ChartMemo, open_table
+    _memo = ChartMemo(max_size=0, table=open_table())
+
+
+def recompute_batch(rows: List[Tuple[int, str, str, str, Optional[Dict[str, Any]]]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Пересчитать пачку (user_id, дата, время, город, старая запись); вернуть только изменившиеся записи"""
+    changed = []
+    # Калькулятор печатает ход расчета — в пакетном режиме это миллионы строк
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for user_id, birth_date, birth_time, birth_city, old in rows:
+            if not birth_date:
+                # Карта без даты рождения (запись из старого формата) — пересчитывать не из чего
+                continue
+            record = encode_chart(_memo.calculate_bazi(birth_date, birth_time or '12:00', birth_city))
+            if record != old:
+                changed.append((user_id, record))
+    return changed
+
+
+# --- Контрольная точка ---
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'last_user_id': None, 'processed': 0, 'updated': 0}
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Запись через временный файл: при обрыве остается старая или новая точка, но не половина"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# --- Основной процесс ---
+
+def _write_batch(conn, changed: List[Tuple[int, Dict[str, Any]]]):
+    with conn.cursor() as cursor:
+        execute_values(cursor, '''
+            UPDATE users AS u SET bazi_chart = v.chart, updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v (user_id, chart)
+            WHERE u.user_id = v.user_id
+        ''', [(user_id, Json(record)) for user_id, record in changed], template='(%s, %s::jsonb)',
+            page_size=len(changed))
+    conn.commit()
+
+
+def backfill(database_url: str, batch_size: int = 1000, workers: int = None,
+             checkpoint_path: str = CHECKPOINT_PATH, restart: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    workers = workers or os.cpu_count() or 1
+    checkpoint = {'last_user_id': None, 'processed': 0, 'updated': 0}
+    if not restart:
+        checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint['last_user_id'] is not None:
+        print(f"↪️ Продолжаем после user_id {checkpoint['last_user_id']} "
+              f"(уже обработано {checkpoint['processed']}, обновлено {checkpoint['updated']})")
+
+    # Ключи user_id идут по возрастанию: продолжаем строго после последнего записанного
+    after = checkpoint['last_user_id'] if checkpoint['last_user_id'] is not None else -2 ** 63
+    read_conn = psycopg2.connect(database_url)
+    write_conn = psycopg2.connect(database_url)
+    started = time.monotonic()
+    processed = 0
+    try:
+        with read_conn.cursor() as cursor:
+            check_schema(cursor)
+            cursor.execute('SELECT count(*) FROM users WHERE bazi_chart IS NOT NULL AND user_id > %s', (after,))
+            total = cursor.fetchone()[0]
+        read_conn.commit()
+
+        # Именованный курсор — серверный: строки приходят пачками по itersize, а не все сразу
+        with read_conn.cursor(name='backfill_users') as cursor, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            cursor.itersize = batch_size
+            cursor.execute('''
+                SELECT user_id, bazi_chart->>'birth_date', bazi_chart->>'birth_time', bazi_chart->>'birth_city',
+                       bazi_chart
+                FROM users
+                WHERE bazi_chart IS NOT NULL AND user_id > %s
+                ORDER BY user_id
+            ''', (after,))
+
+            # Не больше 2 пачек на процесс в работе — память ограничена при любом размере таблицы
+            pending = deque()
+
+            def finish_oldest():
+                nonlocal processed
+                future, last_user_id, count = pending.popleft()
+                changed = future.result()
+                if changed and not dry_run:
+                    _write_batch(write_conn, changed)
+                processed += count
+                checkpoint['last_user_id'] = last_user_id
+                checkpoint['processed'] += count
+                checkpoint['updated'] += len(changed)
+                if not dry_run:
+                    # Точка двигается только после commit и строго по порядку user_id
+                    save_checkpoint(checkpoint_path, checkpoint)
+                _report(processed, total, checkpoint, started)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                pending.append((pool.submit(recompute_batch, rows), rows[-1][0], len(rows)))
+                if len(pending) >= workers * 2:
+                    finish_oldest()
+            while pending:
+                finish_oldest()
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    print()
+    elapsed = time.monotonic() - started
+    action = "изменилось бы" if dry_run else "обновлено"
+    print(f"✅ Готово за {elapsed:.1f} с: обработано {processed}, {action} {checkpoint['updated']}")
+    return checkpoint
+
+
+def _report(processed: int, total: int, checkpoint: Dict[str, Any], started: float):
+    elapsed = time.monotonic() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    percent = processed * 100 / total if total else 100.0
+    sys.stdout.write(f"\r⏳ {processed}/{total} ({percent:.1f}%), обновлено {checkpoint['updated']}, "
+                     f"{rate:.0f} карт/с, последний user_id {checkpoint['last_user_id']}")
+    sys.stdout.flush()
+
+
+def main(argv: List[str] = None):
+    from config import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Пересчет сохраненных карт БаЦзы")
+    parser.add_argument('--database-url', default=DATABASE_URL)
+    parser.add_argument('--batch-size', type=int, default=1000, help="строк в пачке (чтение, расчет и запись)")
+    parser.add_argument('--workers', type=int, default=None, help="процессов для расчета (по умолчанию — число ядер)")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH, help="файл контрольной точки")
+    parser.add_argument('--restart', action='store_true', help="не продолжать с контрольной точки")
+    parser.add_argument('--dry-run', action='store_true', help="ничего не записывать")
+    args = parser.parse_args(argv)
+
+    backfill(args.database_url, batch_size=args.batch_size, workers=args.workers,
+             checkpoint_path=args.checkpoint, restart=args.restart, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Формат хранения карты БаЦзы
+Компактная запись для колонки JSONB вместо str(dict) и единый путь декодирования
+Карта в памяти — неизменяемый Chart: свои поля только у данных рождения, тексты описаний
+общие для всех карт с тем же стволом дня (10 объектов StemTexts на процесс)
+"""
+import ast
+import json
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterator, Optional, TypedDict, Any
+
+# Версия формата записи — увеличивать при изменении набора полей
+CHART_VERSION = 1
+
+
+class ChartRecord(TypedDict):
+    """Сохраняемая часть карты: только то, что нельзя восстановить по элементу и полярности"""
+    v: int
+    element: str
+    polarity: str
+    year_animal: str
+    day_stem_char: str
+    year_branch_char: str
+    birth_date: str
+    birth_time: str
+    birth_city: str
+
+
+RECORD_FIELDS = (
+    'element', 'polarity', 'year_animal', 'day_stem_char', 'year_branch_char',
+    'birth_date', 'birth_time', 'birth_city'
+)
+
+# Ключи карты, которые берутся из общих текстов ствола дня
+TEXT_FIELDS = ('element', 'polarity', 'day_stem_char', 'personality', 'monthly_advice', 'summary_2025')
+
+_stem_texts = None
+
+
+class StemTexts:
+    """Элемент, полярность и тексты одного ствола дня — один объект на ствол на весь процесс"""
+    __slots__ = ('day_stem_char', 'element', 'polarity', 'personality', 'monthly_advice', 'summary_2025')
+
+    def __init__(self, day_stem_char: str, element: str, polarity: str, personality: Dict[str, str],
+                 monthly_advice: str, summary_2025: str):
+        self.day_stem_char = day_stem_char
+        self.element = element
+        self.polarity = polarity
+        self.personality = MappingProxyType(personality)
+        self.monthly_advice = monthly_advice
+        self.summary_2025 = summary_2025
+
+    def __repr__(self):
+        return f"StemTexts({self.day_stem_char} {self.element} {self.polarity})"
+
+
+def stem_texts(day_stem_char: str) -> StemTexts:
+    """Общие тексты ствола дня (таблица собирается из simple_bazi_calculator при первом обращении)"""
+    global _stem_texts
+    if _stem_texts is None:
+        from simple_bazi_calculator import STEM_TEXTS
+        _stem_texts = STEM_TEXTS
+    return _stem_texts[day_stem_char]
+
+
+def stem_for(element: str, polarity: str) -> str:
+    """Ствол по элементу и полярности — для старых записей без day_stem_char"""
+    stem_texts('甲')
+    for texts in _stem_texts.values():
+        if texts.element == element and texts.polarity == polarity:
+            return texts.day_stem_char
+    raise KeyError(f"{element} {polarity}")
+
+
+class Chart(Mapping):
+    """
+    Неизменяемая карта БаЦзы
+    Читается как прежний словарь calculate_bazi: chart['element'], chart.get('birth_city'), dict(chart)
+    """
+    __slots__ = ('texts', 'year_animal', 'year_branch_char', 'birth_date', 'birth_time', 'birth_city', 'pillars')
+
+    def __init__(self, day_stem_char: str, year_animal: str, year_branch_char: str,
+                 birth_date: str, birth_time: str, birth_city: str, pillars=None):
+        # pillars — FourPillars расчета, если он был (в базе не хранится)
+        init = object.__setattr__
+        init(self, 'texts', stem_texts(day_stem_char))
+        init(self, 'year_animal', year_animal)
+        init(self, 'year_branch_char', year_branch_char)
+        init(self, 'birth_date', birth_date)
+        init(self, 'birth_time', birth_time)
+        init(self, 'birth_city', birth_city)
+        init(self, 'pillars', pillars)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Chart неизменяем")
+
+    def __delattr__(self, name):
+        raise AttributeError("Chart неизменяем")
+
+    def __getitem__(self, key: str):
+        if key in TEXT_FIELDS:
+            return getattr(self.texts, key)
+        if key == 'pillars' and self.pillars is not None:
+            return {name: pillar.stem + pillar.branch for name, pillar in self.pillars._asdict().items() if pillar}
+        if key in RECORD_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from RECORD_FIELDS
+        yield from TEXT_FIELDS[3:]
+        if self.pillars is not None:
+            yield 'pillars'
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS) + len(TEXT_FIELDS) - 3 + (self.pillars is not None)
+
+    def __reduce__(self):
+        return Chart, (self.texts.day_stem_char, self.year_animal, self.year_branch_char,
+                       self.birth_date, self.birth_time, self.birth_city, self.pillars)
+
+    def __repr__(self):
+        return (f"Chart({self.texts.day_stem_char} {self.texts.element} {self.texts.polarity}, "
+                f"{self.year_animal}, {self.birth_date} {self.birth_time} {self.birth_city})")
+
+    def to_record(self) -> ChartRecord:
+        """Запись для колонки JSONB"""
+        return encode_chart(self)
+
+    @classmethod
+    def from_record(cls, raw: Dict[str, Any]) -> 'Chart':
+        """Карта из записи JSONB или словаря в формате calculate_bazi"""
+        day_stem_char = raw.get('day_stem_char') or stem_for(raw['element'], raw['polarity'])
+        return cls(day_stem_char, raw.get('year_animal'), raw.get('year_branch_char'),
+                   raw.get('birth_date'), raw.get('birth_time'), raw.get('birth_city'))
+
+
+def encode_chart(result: Dict[str, Any]) -> ChartRecord:
+    """Сжать результат calculate_bazi до записи для JSONB"""
+    record = {'v': CHART_VERSION}
+    for field in RECORD_FIELDS:
+        record[field] = result.get(field)
+    return record
+
+
+def parse_legacy_chart(value: str) -> Dict[str, Any]:
+    """
+    Разбор старого значения users.bazi_data
+    Раньше туда писался str(result), поэтому понимаем и JSON, и repr словаря (без eval)
+    """
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+
+def decode_chart(raw) -> Optional[Chart]:
+    """
+    Единственный путь чтения карты: запись JSONB (dict), JSON-строка или старый repr
+    Возвращает Chart, который читается как словарь в формате результата calculate_bazi
+    """
+    if not raw:
+        return None
+    if isinstance(raw, str):
+        raw = parse_legacy_chart(raw)
+    return Chart.from_record(raw)
@@ -0,0 +1,96 @@
+"""
+Замер маршрутизации нажатий: N обработчиков с фильтрами-лямбдами (как до CallbackRouter)
+против одного CallbackRouter. Время — через Dispatcher.feed_update с пустыми обработчиками
+
+    python benchmarks/bench_callback_router.py
+    python benchmarks/bench_callback_router.py --sizes 10 100 --updates 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.types import CallbackQuery, Update, User  # noqa: E402
+
+from callback_router import CallbackRouter  # noqa: E402
+
+USER = User(id=42, is_bot=False, first_name='bench')
+
+
+async def noop(callback_query, state):
+    pass
+
+
+def _update(update_id: int, data: str) -> Update:
+    return Update(update_id=update_id,
+                  callback_query=CallbackQuery(id='1', from_user=USER, chat_instance='bench', data=data))
+
+
+def linear_dispatcher(size: int) -> Dispatcher:
+    """Прежняя регистрация: по обработчику с фильтром startswith на каждое действие"""
+    dp = Dispatcher()
+    for i in range(size):
+        prefix = f"action{i}_"
+        dp.callback_query.register(noop, lambda c, prefix=prefix: c.data.startswith(prefix))
+    return dp
+
+
+def routed_dispatcher(size: int):
+    dp = Dispatcher()
+    router = CallbackRouter()
+    for i in range(size):
+        router.prefix(f"action{i}_")(noop)
+    router.attach(dp)
+    return dp, router
+
+
+async def per_update(bot: Bot, dp: Dispatcher, datas, total: int) -> float:
+    """Микросекунд на одно нажатие"""
+    updates = [_update(i, data) for i, data in enumerate(datas)]
+    rounds = max(1, total // len(updates))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for update in updates:
+            await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / (rounds * len(updates)) * 1e6
+
+
+async def run(sizes, total: int):
+    bot = Bot('123456:' + 'A' * 35)
+    print(f"{'N':>5} {'linear avg':>11} {'linear last':>12} {'router':>8} {'resolve':>8}   (мкс на нажатие)")
+    try:
+        for size in sizes:
+            datas = [f"action{i}_123456789" for i in range(size)]
+            # До 50 разных действий равномерно по списку и отдельно последнее — худший случай перебора
+            sample = datas[::max(1, size // 50)]
+            linear = linear_dispatcher(size)
+            linear_avg = await per_update(bot, linear, sample, total)
+            linear_last = await per_update(bot, linear, [datas[-1]], max(1, total // 7))
+            routed, router = routed_dispatcher(size)
+            routed_avg = await per_update(bot, routed, sample, total)
+
+            started = time.perf_counter()
+            for _ in range(20):
+                for data in datas:
+                    router.resolve(data)
+            resolve = (time.perf_counter() - started) / (20 * len(datas)) * 1e6
+            print(f"{size:>5} {linear_avg:>11.1f} {linear_last:>12.1f} {routed_avg:>8.1f} {resolve:>8.2f}")
+    finally:
+        await bot.session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер маршрутизации нажатий на кнопки")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 56, 100, 300, 1000],
+                        help="число зарегистрированных действий")
+    parser.add_argument('--updates', type=int, default=2000, help="нажатий на замер")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.sizes, args.updates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Замер памяти карт (tracemalloc): прежний словарь результата против неизменяемого Chart
+с общими текстами ствола дня — для расчета (calculate_bazi) и для чтения из базы (decode_chart)
+
+    python benchmarks/bench_chart_memory.py
+    python benchmarks/bench_chart_memory.py --count 20000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bazi_chart import decode_chart, encode_chart  # noqa: E402
+from simple_bazi_calculator import SimpleBaziCalculator  # noqa: E402
+
+
+def legacy_result(chart) -> dict:
+    """Результат в прежнем виде: свой словарь на карту и своя копия описания личности"""
+    result = {key: chart[key] for key in chart if key != 'personality'}
+    result['personality'] = dict(chart['personality'])
+    return result
+
+
+def legacy_decode(record: dict) -> dict:
+    """decode_chart до Chart: словарь записи, дополненный текстами по элементу и полярности"""
+    return legacy_result(decode_chart(record))
+
+
+def retained(build, inputs) -> float:
+    """Байт на объект, которые остаются занятыми, пока объекты живы"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(item) for item in inputs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / len(inputs)
+
+
+def run(count: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        calculator = SimpleBaziCalculator()
+        dates = [f"{date(1950, 1, 1) + timedelta(days=i):%d.%m.%Y}" for i in range(count)]
+        charts = [calculator.calculate_bazi(birth_date, '14:30', 'Москва') for birth_date in dates]
+        records = [encode_chart(chart) for chart in charts]
+
+        rows = {
+            'calculate_bazi': (
+                retained(lambda birth_date: legacy_result(calculator.calculate_bazi(birth_date, '14:30', 'Москва')),
+                         dates),
+                retained(lambda birth_date: calculator.calculate_bazi(birth_date, '14:30', 'Москва'), dates),
+            ),
+            'decode_chart': (
+                retained(legacy_decode, records),
+                retained(decode_chart, records),
+            ),
+        }
+    record = records[0]
+    before = min(timeit.repeat(lambda: legacy_decode(record), number=20000, repeat=5)) / 20000
+    after = min(timeit.repeat(lambda: decode_chart(record), number=20000, repeat=5)) / 20000
+
+    print(f"карт: {count}")
+    print(f"{'байт на карту':16} {'словарь':>9} {'Chart':>9}")
+    for name, (old, new) in rows.items():
+        print(f"{name:16} {old:>9.0f} {new:>9.0f}")
+    print(f"{'decode_chart, мкс':16} {before * 1e6:>9.2f} {after * 1e6:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер памяти карт БаЦзы")
+    parser.add_argument('--count', type=int, default=5000, help="карт на замер")
+    args = parser.parse_args(argv)
+    run(args.count)
+
+
+if __name__ == "__main__":
+    main()
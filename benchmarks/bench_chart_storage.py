@@ -0,0 +1,62 @@
+"""
+Замер хранения карты: старое значение users.bazi_data (str(dict) + eval) против записи JSONB
+(encode_chart/decode_chart): время чтения одной карты и размер в базе
+
+    python benchmarks/bench_chart_storage.py
+    python benchmarks/bench_chart_storage.py --number 20000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import timeit
+from collections.abc import Mapping
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bazi_chart import decode_chart, encode_chart  # noqa: E402
+from simple_bazi_calculator import SimpleBaziCalculator  # noqa: E402
+
+
+def legacy_result(chart) -> dict:
+    """Словарь результата в прежнем виде: обычные dict, без столпов (их тогда не было)"""
+    return {key: dict(value) if isinstance(value, Mapping) else value
+            for key, value in chart.items() if key != 'pillars'}
+
+
+def run(number: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        chart = SimpleBaziCalculator().calculate_bazi('15.03.1990', '14:30', 'Москва')
+    # Так карта раньше писалась в bazi_data
+    legacy = str(legacy_result(chart))
+    record = encode_chart(chart)
+    record_json = json.dumps(record, ensure_ascii=False)
+
+    # Прочитанная запись дает ту же карту, что и старое значение
+    assert eval(legacy) == legacy_result(decode_chart(record))
+
+    timings = {
+        'eval(str(dict))': timeit.timeit(lambda: eval(legacy), number=number),
+        'decode_chart(запись)': timeit.timeit(lambda: decode_chart(record), number=number),
+        'decode_chart(json.loads)': timeit.timeit(lambda: decode_chart(json.loads(record_json)), number=number),
+    }
+    print(f"{'чтение карты':28} {'мкс':>8}")
+    for name, seconds in timings.items():
+        print(f"{name:28} {seconds / number * 1e6:>8.1f}")
+    print()
+    print(f"{'размер в базе':28} {'байт':>8}")
+    print(f"{'bazi_data (str(dict))':28} {len(legacy.encode('utf-8')):>8}")
+    print(f"{'bazi_chart (JSON)':28} {len(record_json.encode('utf-8')):>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер хранения карты БаЦзы")
+    parser.add_argument('--number', type=int, default=5000, help="повторов на замер")
+    args = parser.parse_args(argv)
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
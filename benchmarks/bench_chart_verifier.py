@@ -0,0 +1,125 @@
+"""
+Замер задержки обработчика расчета карты: прежний блокирующий запрос к mingli.ru в calculate_bazi
+против локального расчета и фоновой сверки ChartVerifier. Вместо mingli.ru — локальный HTTP-сервер,
+который отвечает с заданной задержкой
+
+    python benchmarks/bench_chart_verifier.py
+    python benchmarks/bench_chart_verifier.py --delay 0.3 --concurrency 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_verifier import ChartVerifier  # noqa: E402
+from mingli_bazi_calculator import MingliBaziCalculator  # noqa: E402
+from mingli_client import MingliClient  # noqa: E402
+from simple_bazi_calculator import SimpleBaziCalculator  # noqa: E402
+
+BIRTH = ('15.03.1990', '14:30', 'Москва')
+
+# Страница с таблицей столпов, как у калькулятора mingli.ru (ствол дня — 己)
+PAGE = (
+    '<html><body><table><tr><th>ЧАС</th><th>ДЕНЬ</th><th>МЕСЯЦ</th><th>ГОД</th></tr>'
+    '<tr><td>辛</td><td>己</td><td>己</td><td>庚</td></tr>'
+    '<tr><td>未</td><td>卯</td><td>卯</td><td>午</td></tr></table></body></html>'
+).encode('utf-8')
+
+
+def start_server(delay: float) -> ThreadingHTTPServer:
+    """HTTP-сервер в отдельном потоке: блокирующий requests не мешает ему отвечать"""
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        do_GET = do_POST = _answer
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _timed(handler, concurrency: int) -> tuple:
+    """Время одного вызова и время concurrency одновременных вызовов, мс"""
+    start = time.perf_counter()
+    await handler()
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    together = time.perf_counter() - start
+    return single * 1000, together * 1000
+
+
+async def _measure(url: str, concurrency: int) -> dict:
+    calculator = SimpleBaziCalculator()
+
+    async def blocking_handler():
+        # Так calculate_bazi работал раньше: запрос в цикле событий, потом локальный расчет
+        requests.get(url, timeout=10)
+        calculator.calculate_bazi(*BIRTH)
+
+    timings = {'requests.get в calculate_bazi': await _timed(blocking_handler, concurrency)}
+    for rate in (0.0, 1.0):
+        remote = MingliBaziCalculator(MingliClient(base_url=url, max_concurrency=4))
+        verifier = ChartVerifier(sample_rate=rate, max_pending=concurrency + 1, remote=remote)
+
+        async def handler():
+            verifier.maybe_verify(calculator.calculate_bazi(*BIRTH))
+
+        timings[f'локально, сверка {rate:.0%}'] = await _timed(handler, concurrency)
+        # Фоновые сверки не входят в замер обработчика, но должны завершиться
+        while verifier.get_stats()['pending']:
+            await asyncio.sleep(0.01)
+        if rate:
+            stats = verifier.get_stats()
+            assert stats['matched'] == concurrency + 1, stats
+        await verifier.close()
+    return timings
+
+
+def run(delay: float, concurrency: int):
+    server = start_server(delay)
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = asyncio.run(_measure(url, concurrency))
+    finally:
+        server.shutdown()
+
+    print(f"ответ сервера {delay * 1000:.0f} мс")
+    print(f"{'обработчик':32} {'1 вызов, мс':>12} {str(concurrency) + ' вызовов, мс':>15}")
+    for name, (single, together) in timings.items():
+        print(f"{name:32} {single:>12.2f} {together:>15.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер задержки расчета карты со сверкой mingli.ru")
+    parser.add_argument('--delay', type=float, default=0.3, help="задержка ответа сервера, с")
+    parser.add_argument('--concurrency', type=int, default=20, help="одновременных вызовов обработчика")
+    args = parser.parse_args(argv)
+    run(args.delay, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Замер ствола дня: прежняя формула через два юлианских дня на вызов против таблицы day_pillars
+
+    python benchmarks/bench_day_pillars.py
+    python benchmarks/bench_day_pillars.py --number 500000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simple_bazi_calculator import SimpleBaziCalculator  # noqa: E402
+
+STEMS = ['甲', '乙', '丙', '丁', '戊', '己', '庚', '辛', '壬', '癸']
+
+
+def gregorian_to_julian_day(day: int, month: int, year: int) -> int:
+    """Юлианский день григорианской даты — формула, которой ствол дня считался до таблицы"""
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) + day + b - 1524
+
+
+def julian_day_stem(calculator: SimpleBaziCalculator, day: int, month: int, year: int) -> tuple:
+    """_calculate_day_stem до таблицы: юлианский день даты и базового 1900-01-01 на каждый вызов"""
+    julian_day = gregorian_to_julian_day(day, month, year)
+    base_julian = gregorian_to_julian_day(1, 1, 1900)
+    day_stem_char = STEMS[(julian_day - base_julian) % 10]
+    element_info = calculator.heavenly_stems[day_stem_char]
+    return element_info['element'], element_info['polarity'], day_stem_char
+
+
+def run(number: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        calculator = SimpleBaziCalculator()
+    # Та же дата, что и в описании изменения; результаты обеих версий совпадают
+    date = (15, 3, 1990)
+    assert julian_day_stem(calculator, *date) == calculator._calculate_day_stem(*date)
+
+    # Лучший из 5 повторов, как у python -m timeit
+    namespace = {'calculator': calculator, 'julian_day_stem': julian_day_stem}
+    before = min(timeit.repeat('julian_day_stem(calculator, 15, 3, 1990)', globals=namespace,
+                               number=number, repeat=5))
+    after = min(timeit.repeat('calculator._calculate_day_stem(15, 3, 1990)', globals=namespace,
+                              number=number, repeat=5))
+    print(f"{'_calculate_day_stem':24} {'мкс':>6}")
+    print(f"{'юлианские дни':24} {before / number * 1e6:>6.2f}")
+    print(f"{'таблица day_pillars':24} {after / number * 1e6:>6.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер расчета ствола дня")
+    parser.add_argument('--number', type=int, default=200000, help="повторов на замер")
+    args = parser.parse_args(argv)
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
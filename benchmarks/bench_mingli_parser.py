@@ -0,0 +1,108 @@
+"""
+Замер разбора страницы mingli.ru: прежний каскад регулярных выражений по всей странице
+против parse_pillars (один проход по первой таблице со столпами)
+Страницы: образец из tests/fixtures и синтетическая большая страница с длинным текстом и тактами удачи
+
+    python benchmarks/bench_mingli_parser.py
+    python benchmarks/bench_mingli_parser.py --number 200 --filler 3000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mingli_bazi_calculator import parse_pillars  # noqa: E402
+
+FIXTURE = os.path.join(ROOT, 'tests', 'fixtures', 'mingli_result.html')
+
+STEMS = '甲乙丙丁戊己庚辛壬癸'
+BRANCHES = '子丑寅卯辰巳午未申酉戌亥'
+
+
+def legacy_extract(html_content: str) -> tuple:
+    """
+    Поиск ствола дня и ветви года из _parse_response до parse_pillars (без сборки описания личности):
+    шапка таблицы по .*? на всей странице, затем перебор иероглифов с шаблонами на каждый
+    """
+    day_stem_char = ''
+    table_pattern = r'(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД)'
+    table_match = re.search(table_pattern, html_content, re.IGNORECASE | re.DOTALL)
+    if table_match:
+        day_column_pattern = r'ДЕНЬ.*?([甲-癸]).*?(?:Инь|Ян)\s+(Огонь|Дерево|Земля|Металл|Вода)'
+        day_match = re.search(day_column_pattern, table_match.group(0), re.IGNORECASE)
+        if day_match:
+            day_stem_char = day_match.group(1)
+            re.search(rf'{day_stem_char}.*?((?:Инь|Ян))\s+(Огонь|Дерево|Земля|Металл|Вода)',
+                      table_match.group(0), re.IGNORECASE)
+
+    if not day_stem_char:
+        for char in STEMS:
+            if char in html_content:
+                for pattern in (rf'ДЕНЬ.*?{char}', rf'{char}.*?ДЕНЬ', rf'День.*?{char}', rf'{char}.*?День'):
+                    if re.search(pattern, html_content, re.IGNORECASE | re.DOTALL):
+                        day_stem_char = char
+                        break
+                if day_stem_char:
+                    break
+
+    year_branch_char = ''
+    for char in BRANCHES:
+        if char in html_content:
+            for pattern in (rf'ГОД.*?{char}', rf'{char}.*?ГОД', rf'Год.*?{char}', rf'{char}.*?Год'):
+                if re.search(pattern, html_content, re.IGNORECASE | re.DOTALL):
+                    year_branch_char = char
+                    break
+            if year_branch_char:
+                break
+    return day_stem_char, year_branch_char
+
+
+def synthetic_page(filler: int) -> str:
+    """Таблица столпов (день 辛, год 酉) между длинным текстом со словом «год» и таблицей 400 тактов"""
+    rng = random.Random(1)
+    text = ''.join(
+        f'<div class="row"><p>Прогноз на {year} год: благоприятный период для роста. '
+        f'Счастливые дни месяца и часа.</p><span>{rng.choice("木火土金水")}</span></div>\n'
+        for year in range(filler)
+    )
+    table = (
+        '<table class="bazi"><tr><th>ЧАС</th><th>ДЕНЬ</th><th>МЕСЯЦ</th><th>ГОД</th></tr>'
+        '<tr><td>丙<br>Ян Огонь</td><td>辛<br>Инь Металл</td><td>丁<br>Инь Огонь</td><td>辛<br>Инь Металл</td></tr>'
+        '<tr><td>申<br>Обезьяна</td><td>卯<br>Кролик</td><td>酉<br>Петух</td><td>酉<br>Петух</td></tr></table>'
+    )
+    luck = ''.join(f'<td>{rng.choice(STEMS)}{rng.choice(BRANCHES)}</td>' for _ in range(400))
+    return f'<html><head><title>Калькулятор БаЦзы</title></head><body>{text}{table}<table>{luck}</table>{text}</body></html>'
+
+
+def run(number: int, filler: int):
+    with open(FIXTURE, encoding='utf-8') as f:
+        pages = {
+            'образец (tests/fixtures)': f.read(),
+            'синтетическая': synthetic_page(filler),
+        }
+
+    print(f"{'страница':26} {'КБ':>5} {'прежний, мс':>12} {'parse_pillars, мс':>18}  {'день/год: прежний → новый'}")
+    for name, page in pages.items():
+        pillars = parse_pillars(page)
+        legacy = legacy_extract(page)
+        before = min(timeit.repeat(lambda: legacy_extract(page), number=number, repeat=5)) / number
+        after = min(timeit.repeat(lambda: parse_pillars(page), number=number, repeat=5)) / number
+        print(f"{name:26} {len(page.encode('utf-8')) // 1024:>5} {before * 1000:>12.3f} {after * 1000:>18.3f}  "
+              f"{''.join(legacy)} → {pillars['day'][0]}{pillars['year'][1]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер разбора страницы mingli.ru")
+    parser.add_argument('--number', type=int, default=50, help="повторов на замер")
+    parser.add_argument('--filler', type=int, default=2500, help="строк текста до и после таблицы")
+    args = parser.parse_args(argv)
+    run(args.number, args.filler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Замер экранов меню: клавиатура, собираемая на каждое нажатие (как до ScreenRegistry),
+против готового экрана из SCREENS. На нажатие: сколько моделей aiogram создано,
+пик памяти (tracemalloc, медиана) и время; message.answer — заглушка
+
+    python benchmarks/bench_screens.py
+    python benchmarks/bench_screens.py --users 100 --clicks 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+
+from screens import SCREENS  # noqa: E402
+
+SCREEN_NAMES = ['menu_main', 'menu_interesting', 'menu_consultations', 'menu_about', 'share_bot', 'start_new']
+FIRST_USER_ID = 10 ** 9
+
+_built = [0]
+
+
+def _count_models():
+    """Считать создание кнопок и клавиатур"""
+    for cls in (InlineKeyboardButton, InlineKeyboardMarkup):
+        original = cls.__init__
+
+        def init(self, *args, _original=original, **kwargs):
+            _built[0] += 1
+            _original(self, *args, **kwargs)
+        cls.__init__ = init
+
+
+class _Message:
+    async def answer(self, text, reply_markup=None, parse_mode=None):
+        pass
+
+
+def _screen(name: str, user_id: int):
+    return SCREENS.get(name, user_id) if name in SCREENS._templates else SCREENS.get(name)
+
+
+def rebuild_click(name: str):
+    """Прежний обработчик: та же клавиатура заново на каждое нажатие (данные кнопок уже готовы — нижняя оценка)"""
+    cached = {}
+
+    async def click(message, user_id):
+        screen = _screen(name, user_id)
+        rows = cached.get(user_id)
+        if rows is None:
+            rows = cached[user_id] = [[button.model_dump(exclude_none=True) for button in row]
+                                      for row in screen.reply_markup.inline_keyboard]
+        markup = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(**button) for button in row]
+                                                       for row in rows])
+        await message.answer(screen.text, reply_markup=markup, parse_mode=screen.parse_mode)
+    return click
+
+
+def registry_click(name: str):
+    async def click(message, user_id):
+        await _screen(name, user_id).answer(message)
+    return click
+
+
+async def measure(click, users, clicks: int):
+    message = _Message()
+    for user_id in users:
+        await click(message, user_id)
+
+    _built[0] = 0
+    peaks = []
+    for user_id in users:
+        tracemalloc.start()
+        await click(message, user_id)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    models = _built[0] / len(users)
+
+    started = time.perf_counter()
+    for _ in range(clicks):
+        for user_id in users:
+            await click(message, user_id)
+    micros = (time.perf_counter() - started) / (clicks * len(users)) * 1e6
+    return models, sorted(peaks)[len(peaks) // 2], micros
+
+
+async def run(user_count: int, clicks: int):
+    _count_models()
+    users = list(range(FIRST_USER_ID, FIRST_USER_ID + user_count))
+    print(f"{'экран':20} {'моделей':>15} {'пик, байт':>15} {'мкс':>15}")
+    print(f"{'':20} {'до':>7} {'после':>7} {'до':>7} {'после':>7} {'до':>7} {'после':>7}")
+    for name in SCREEN_NAMES:
+        before = await measure(rebuild_click(name), users, clicks)
+        after = await measure(registry_click(name), users, clicks)
+        print(f"{name:20} {before[0]:>7.0f} {after[0]:>7.0f} {before[1]:>7} {after[1]:>7} "
+              f"{before[2]:>7.1f} {after[2]:>7.1f}")
+
+    # Промах кэша экрана с кнопками пользователя: сборка только кнопок с user_id
+    fresh = range(FIRST_USER_ID * 2, FIRST_USER_ID * 2 + user_count)
+    started = time.perf_counter()
+    for user_id in fresh:
+        SCREENS.get('menu_about', user_id)
+    print(f"\nпромах кэша menu_about: {(time.perf_counter() - started) / user_count * 1e6:.1f} мкс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер экранов меню")
+    parser.add_argument('--users', type=int, default=300, help="пользователей (не больше SCREEN_CACHE_SIZE)")
+    parser.add_argument('--clicks', type=int, default=3, help="нажатий каждого пользователя на замер времени")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.users, args.clicks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Замер записи профиля: прежний save_user (SELECT, затем UPDATE или INSERT) против одного
+INSERT ... ON CONFLICT. Пишет во временный диапазон user_id и удаляет его после замера
+
+    TEST_DATABASE_URL=postgresql://... python benchmarks/bench_upsert.py
+    python benchmarks/bench_upsert.py --database-url postgresql://... --number 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database  # noqa: E402
+
+# Диапазон user_id, который не пересекается с реальными пользователями Telegram
+FIRST_USER_ID = -7_100_000
+
+FIELDS = {'username': 'bench', 'first_name': 'Иван', 'birth_city': 'Москва'}
+
+
+def two_step_save_user(db: Database, user_id: int, **kwargs):
+    """save_user до перехода на UPSERT: проверка существования и отдельный UPDATE или INSERT"""
+    with db.cursor() as cursor:
+        cursor.execute('SELECT user_id FROM users WHERE user_id = %s', (user_id,))
+        exists = cursor.fetchone()
+
+        if exists:
+            set_clause = ', '.join([f"{key} = %s" for key in kwargs.keys()])
+            set_clause += ', updated_at = CURRENT_TIMESTAMP'
+            values = list(kwargs.values()) + [user_id]
+            cursor.execute(f'UPDATE users SET {set_clause} WHERE user_id = %s', values)
+        else:
+            columns = ['user_id'] + list(kwargs.keys())
+            placeholders = ['%s'] * len(columns)
+            values = [user_id] + list(kwargs.values())
+            cursor.execute(f'''
+                INSERT INTO users ({', '.join(columns)})
+                VALUES ({', '.join(placeholders)})
+            ''', values)
+
+
+def _cleanup(db: Database, number: int):
+    with db.cursor() as cursor:
+        cursor.execute('DELETE FROM users WHERE user_id BETWEEN %s AND %s',
+                       (FIRST_USER_ID - number, FIRST_USER_ID))
+
+
+def _measure(save, db: Database, number: int) -> tuple:
+    """Время вставки number новых пользователей и обновления тех же строк, мкс на вызов"""
+    user_ids = [FIRST_USER_ID - i for i in range(number)]
+    _cleanup(db, number)
+    start = time.perf_counter()
+    for user_id in user_ids:
+        save(user_id, **FIELDS)
+    inserted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user_id in user_ids:
+        save(user_id, **FIELDS)
+    updated = time.perf_counter() - start
+    _cleanup(db, number)
+    return inserted / number * 1e6, updated / number * 1e6
+
+
+def run(database_url: str, number: int):
+    db = Database(database_url, min_size=1, max_size=1)
+    try:
+        timings = {
+            'SELECT + UPDATE/INSERT': _measure(lambda user_id, **kw: two_step_save_user(db, user_id, **kw), db, number),
+            'INSERT ... ON CONFLICT': _measure(db.save_user, db, number),
+        }
+    finally:
+        _cleanup(db, number)
+        db.close()
+
+    print(f"{'save_user, ' + str(len(FIELDS)) + ' колонки':26} {'вставка, мкс':>13} {'обновление, мкс':>16}")
+    for name, (inserted, updated) in timings.items():
+        print(f"{name:26} {inserted:>13.0f} {updated:>16.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер записи профиля в users")
+    parser.add_argument('--database-url', default=os.getenv('TEST_DATABASE_URL'),
+                        help="база с примененными миграциями (по умолчанию TEST_DATABASE_URL)")
+    parser.add_argument('--number', type=int, default=2000, help="пользователей на замер")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("нужен --database-url или TEST_DATABASE_URL")
+    run(args.database_url, args.number)
+
+
+if __name__ == "__main__":
+    main()
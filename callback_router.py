@@ -0,0 +1,215 @@
+"""
+Маршрутизация нажатий на inline-кнопки
+Новые кнопки несут компактные данные CallbackCodec ('1pd:21i3v9'): разбор — один split и поиск в словаре
+Старые строки ('personality_desc_123456789') в уже отправленных сообщениях по-прежнему работают:
+точное совпадение — поиск в словаре, иначе самый длинный зарегистрированный префикс —
+проход по дереву из частей данных, разделенных '_'
+Стоимость разбора не зависит от числа обработчиков и от порядка их регистрации
+"""
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from aiogram import Dispatcher
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import CallbackQuery
+
+_SEPARATOR = '_'
+_HANDLER = object()  # ключ обработчика в узле дерева (не совпадает ни с одной строкой)
+
+_ARG_SEPARATOR = ':'  # в старых строках не встречается
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+MAX_CALLBACK_BYTES = 64  # ограничение Telegram на callback_data
+
+
+class CallbackRoute(NamedTuple):
+    """
+    Результат разбора: под каким действием зарегистрирован обработчик и аргументы —
+    целые числа для компактных данных, оставшиеся части строки для старых
+    """
+    action: str
+    args: Tuple[Any, ...]
+    handler: CallableObject
+
+
+class CallbackAction(NamedTuple):
+    """Описание кнопки: действие (ключ обработчика в маршрутизаторе), короткий код и имена целых аргументов"""
+    action: str
+    code: str
+    args: Tuple[str, ...] = ()
+
+
+def _base36(value: int) -> str:
+    if value < 0:
+        return '-' + _base36(-value)
+    digits = ''
+    while True:
+        value, digit = divmod(value, 36)
+        digits = _DIGITS[digit] + digits
+        if not value:
+            return digits
+
+
+class CallbackCodec:
+    """
+    Схема callback_data: '<версия><код>[:<аргумент>...]', аргументы — целые в base36
+    'consultation_individual_details_123456789' (41 байт) → '1cid:21i3v9' (11 байт)
+    Версия стоит в каждом значении: при изменении аргументов действия версия повышается,
+    а данные прежней версии не разбираются по новой схеме и уходят в разбор старых строк
+    """
+
+    def __init__(self, version: int, actions: Iterable[CallbackAction]):
+        if not 0 <= version <= 9:
+            raise ValueError("Версия схемы — одна цифра")
+        self.version = version
+        self._by_action: Dict[str, Tuple[str, int]] = {}
+        self._by_head: Dict[str, CallbackAction] = {}
+        for spec in actions:
+            spec = CallbackAction(*spec)
+            head = f"{version}{spec.code}"
+            if not spec.code.isalpha() or not spec.code.islower():
+                raise ValueError(f"Код {spec.code!r}: только строчные латинские буквы")
+            if head in self._by_head:
+                raise ValueError(f"Код {spec.code!r} уже занят действием {self._by_head[head].action!r}")
+            if spec.action in self._by_action:
+                raise ValueError(f"Действие {spec.action!r} описано дважды")
+            self._by_head[head] = spec
+            self._by_action[spec.action] = (head, len(spec.args))
+
+    @property
+    def actions(self) -> Tuple[CallbackAction, ...]:
+        return tuple(self._by_head.values())
+
+    def pack(self, action: str, *args: int) -> str:
+        """callback_data для кнопки действия action"""
+        try:
+            head, arg_count = self._by_action[action]
+        except KeyError:
+            raise KeyError(f"Действие {action!r} не описано в схеме кнопок") from None
+        if len(args) != arg_count:
+            raise ValueError(f"{action!r}: ожидается аргументов {arg_count}, передано {len(args)}")
+        data = _ARG_SEPARATOR.join([head, *(_base36(int(arg)) for arg in args)])
+        if len(data.encode('utf-8')) > MAX_CALLBACK_BYTES:
+            raise ValueError(f"{action!r}: callback_data длиннее {MAX_CALLBACK_BYTES} байт")
+        return data
+
+    def unpack(self, data: str) -> Optional[Tuple[str, Tuple[int, ...]]]:
+        """(действие, аргументы) или None, если это не данные текущей версии схемы"""
+        head, *args = data.split(_ARG_SEPARATOR)
+        spec = self._by_head.get(head)
+        if spec is None or len(args) != len(spec.args):
+            return None
+        if not args:
+            return spec.action, ()
+        try:
+            return spec.action, tuple(int(arg, 36) for arg in args)
+        except ValueError:
+            return None
+
+
+class CallbackRouter:
+    """
+    Один обработчик callback_query в диспетчере вместо цепочки фильтров-лямбд:
+
+        router = CallbackRouter()
+
+        @router.exact("menu_main")
+        async def menu_main_handler(callback_query, state): ...
+
+        @router.prefix("video_anna_play_")
+        async def video_anna_play_handler(callback_query, state): ...
+
+        router.attach(dp)
+
+    Обработчик получает те же аргументы, что и при обычной регистрации в aiogram,
+    и дополнительно callback_route, если он есть в сигнатуре
+    С codec кнопки из схемы находят обработчик по действию, под которым он зарегистрирован
+    """
+
+    def __init__(self, codec: CallbackCodec = None):
+        self.codec = codec
+        self._exact: Dict[str, CallbackRoute] = {}
+        self._prefixes: Dict[str, CallableObject] = {}
+        self._tree: Dict[Any, Any] = {}
+
+    # --- Регистрация ---
+
+    def exact(self, *actions: str) -> Callable:
+        """Декоратор: обработчик для callback_data, в точности равных одному из actions"""
+        def decorator(callback: Callable) -> Callable:
+            handler = CallableObject(callback)
+            for action in actions:
+                if action in self._exact:
+                    raise ValueError(f"Действие {action!r} уже зарегистрировано")
+                self._exact[action] = CallbackRoute(action, (), handler)
+            return callback
+        return decorator
+
+    def prefix(self, *prefixes: str) -> Callable:
+        """
+        Декоратор: обработчик для callback_data, начинающихся с одного из prefixes
+        Префикс заканчивается на '_'; из нескольких подходящих выбирается самый длинный
+        """
+        def decorator(callback: Callable) -> Callable:
+            handler = CallableObject(callback)
+            for prefix in prefixes:
+                if not prefix.endswith(_SEPARATOR):
+                    raise ValueError(f"Префикс {prefix!r} должен заканчиваться на {_SEPARATOR!r}")
+                node = self._tree
+                for part in prefix[:-1].split(_SEPARATOR):
+                    node = node.setdefault(part, {})
+                if _HANDLER in node:
+                    raise ValueError(f"Префикс {prefix!r} уже зарегистрирован")
+                node[_HANDLER] = (prefix, handler)
+                self._prefixes[prefix] = handler
+            return callback
+        return decorator
+
+    # --- Разбор ---
+
+    def resolve(self, data: Optional[str]) -> Optional[CallbackRoute]:
+        """Обработчик для callback_data и оставшиеся части данных или None"""
+        if not data:
+            return None
+        if self.codec is not None:
+            unpacked = self.codec.unpack(data)
+            if unpacked is not None:
+                action, args = unpacked
+                route = self._exact.get(action)
+                if route is not None:
+                    return route._replace(args=args) if args else route
+                handler = self._prefixes.get(action)
+                return CallbackRoute(action, args, handler) if handler is not None else None
+
+        route = self._exact.get(data)
+        if route is not None:
+            return route
+
+        parts = data.split(_SEPARATOR)
+        node = self._tree
+        found = None
+        for depth, part in enumerate(parts):
+            node = node.get(part)
+            if node is None:
+                break
+            if _HANDLER in node:
+                found = depth + 1, node[_HANDLER]
+        if found is None:
+            return None
+        depth, (prefix, handler) = found
+        return CallbackRoute(prefix, tuple(parts[depth:]), handler)
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._prefixes)
+
+    # --- Подключение к aiogram ---
+
+    def _filter(self, callback_query: CallbackQuery):
+        route = self.resolve(callback_query.data)
+        # Словарь из фильтра aiogram добавляет к аргументам обработчика
+        return {'callback_route': route} if route is not None else False
+
+    async def _dispatch(self, callback_query: CallbackQuery, callback_route: CallbackRoute, **kwargs):
+        return await callback_route.handler.call(callback_query, callback_route=callback_route, **kwargs)
+
+    def attach(self, dp: Dispatcher):
+        """Зарегистрировать маршрутизатор в диспетчере одним обработчиком callback_query"""
+        dp.callback_query.register(self._dispatch, self._filter)
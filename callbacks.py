@@ -0,0 +1,85 @@
+"""
+Схема callback_data всех inline-кнопок бота
+Действие — ключ, под которым обработчик зарегистрирован в CallbackRouter (точное значение или префикс),
+код — его короткая запись в данных кнопки. Коды не переиспользуются: в чатах остаются старые сообщения
+При изменении аргументов действия повышается CALLBACK_VERSION
+"""
+from callback_router import CallbackAction, CallbackCodec
+
+CALLBACK_VERSION = 1
+
+CALLBACKS = CallbackCodec(CALLBACK_VERSION, [
+    # Знакомство и ввод данных
+    CallbackAction('yes_want', 'y'),
+    CallbackAction('time_known', 'tk'),
+    CallbackAction('time_unknown', 'tu'),
+
+    # Пошаговый результат
+    CallbackAction('personality_desc_', 'pd', ('user_id',)),
+    CallbackAction('show_superpower_', 'ss', ('user_id',)),
+    CallbackAction('show_traits_', 'st', ('user_id',)),
+    CallbackAction('show_advice_', 'sa', ('user_id',)),
+    CallbackAction('show_2025_', 'sy', ('user_id',)),
+    CallbackAction('show_energy_', 'se', ('user_id',)),
+    CallbackAction('continue_after_voice_', 'cv', ('user_id',)),
+    CallbackAction('impression_good_', 'ig', ('user_id',)),
+    CallbackAction('impression_bad_', 'ib', ('user_id',)),
+    CallbackAction('personal_analysis_', 'pa', ('user_id',)),
+
+    # Консультации
+    CallbackAction('consultation_types_', 'ct', ('user_id',)),
+    CallbackAction('consultation_what_', 'cw', ('user_id',)),
+    CallbackAction('consultation_needs_', 'cn', ('user_id',)),
+    CallbackAction('consultation_help_', 'ch', ('user_id',)),
+    CallbackAction('consultation_usage_', 'cu', ('user_id',)),
+    CallbackAction('consultation_individual_', 'ci', ('user_id',)),
+    CallbackAction('consultation_individual_details_', 'cid', ('user_id',)),
+    CallbackAction('consultation_cosmic_', 'cc', ('user_id',)),
+    CallbackAction('consultation_cosmic_details_', 'ccd', ('user_id',)),
+    CallbackAction('consultation_learn_', 'cl', ('user_id',)),
+    CallbackAction('consultation_learn_details_', 'cld', ('user_id',)),
+    CallbackAction('consultation_options_', 'co', ('user_id',)),
+
+    # Разборы и знаменитости
+    CallbackAction('detailed_analysis_', 'da', ('user_id',)),
+    CallbackAction('full_analysis_', 'fa', ('user_id',)),
+    CallbackAction('celebrities_yes_', 'cy', ('user_id',)),
+    CallbackAction('celebrities_no_', 'cx', ('user_id',)),
+    CallbackAction('maybe_later_', 'ml', ('user_id',)),
+    CallbackAction('finish_', 'f'),
+    CallbackAction('learn_more_', 'lm', ('user_id',)),
+    CallbackAction('language_communication_', 'lc', ('user_id',)),
+
+    # Видео-цепочка
+    CallbackAction('video_anna_', 'va', ('user_id',)),
+    CallbackAction('video_anna_play_', 'vap', ('user_id',)),
+    CallbackAction('video_trump_', 'vt', ('user_id',)),
+    CallbackAction('video_trump_play_', 'vtp', ('user_id',)),
+    CallbackAction('video_bezos_', 'vb', ('user_id',)),
+    CallbackAction('video_bezos_play_', 'vbp', ('user_id',)),
+    CallbackAction('video_bazi_', 'vz', ('user_id',)),
+    CallbackAction('final_options_', 'fo', ('user_id',)),
+    CallbackAction('no_more_content', 'nm'),
+
+    # Главное меню
+    CallbackAction('menu_main', 'm'),
+    CallbackAction('menu_forecasts', 'mf'),
+    CallbackAction('menu_interesting', 'mi'),
+    CallbackAction('menu_consultations', 'mc'),
+    CallbackAction('menu_programs', 'mp'),
+    CallbackAction('menu_about', 'ma'),
+    CallbackAction('menu_question', 'mq'),
+    CallbackAction('interesting_videos', 'iv'),
+    CallbackAction('interesting_articles', 'ia'),
+    CallbackAction('interesting_celebrities', 'ic'),
+    CallbackAction('interesting_compatibility', 'ik'),
+    # 'qe', 'qc' — кнопки «Email» и «Позвонить» без обработчиков, убраны; коды не занимать
+    CallbackAction('share_bot', 'sb'),
+    CallbackAction('copy_link', 'cp'),
+    CallbackAction('start_new', 'sn'),
+])
+
+
+def pack_callback(action: str, *args: int) -> str:
+    """callback_data кнопки: pack_callback('show_advice_', user_id) → '1sa:21i3v9'"""
+    return CALLBACKS.pack(action, *args)
@@ -0,0 +1,176 @@
+"""
+Дисковый кэш ответов mingli.ru
+Ключ — хэш нормализованного запроса (дата, время, город, пол), значение — разобранные столпы
+и, по желанию, сжатый HTML страницы. Хранится в SQLite, ограничен по времени жизни и размеру
+Запросы к SQLite выполняются в отдельном потоке, чтобы запись на диск не останавливала цикл событий бота
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(birth_date: str, birth_time: str, birth_city: str, gender: str) -> str:
+    """Ключ кэша: одинаковый для '1.2.1990' и '01.02.1990', ' Москва' и 'москва'"""
+    day, month, year = (int(part) for part in birth_date.strip().split('.'))
+    hour, minute = (int(part) for part in birth_time.strip().split(':'))
+    city = re.sub(r'\s+', ' ', birth_city.strip().casefold().replace('ё', 'е'))
+    normalized = f'{day:02d}.{month:02d}.{year:04d}|{hour:02d}:{minute:02d}|{city}|{gender.strip().casefold()}'
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """
+    Кэш в файле SQLite; методы — корутины, соединение обслуживает один поток
+    Очистка при переполнении идет отдельной задачей в том же потоке: запрос, который ее вызвал, не ждет
+    """
+
+    def __init__(self, path: str, ttl: float = 30 * 24 * 3600, max_bytes: int = 64 * 1024 * 1024,
+                 store_html: bool = False, compress_level: int = 6):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.store_html = store_html
+        self.compress_level = compress_level
+
+        # Один поток на соединение: запросы выполняются по очереди, как раньше в цикле событий
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-cache')
+        self._evicting: Optional[asyncio.Future] = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL: чтение не ждет записи, commit без fsync на каждую запись
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS charts (
+                key TEXT PRIMARY KEY,
+                chart TEXT NOT NULL,
+                html BLOB,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS charts_created_at_idx ON charts (created_at)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM charts').fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Разобранный ответ или None (один запрос по первичному ключу)"""
+        return await self._run(self._get, key)
+
+    async def get_html(self, key: str) -> Optional[str]:
+        """Сохраненный HTML страницы, если включен store_html"""
+        return await self._run(self._get_html, key)
+
+    async def put(self, key: str, chart: Dict[str, Any], html: str = None):
+        """Сохранить разобранный ответ (и HTML, если store_html)"""
+        over_limit = await self._run(self._put, key, chart, html)
+        if over_limit and (self._evicting is None or self._evicting.done()):
+            self._evicting = asyncio.ensure_future(self._evict_in_background())
+
+    async def evict(self):
+        """Удалить просроченные записи, затем самые старые — до 90% от max_bytes"""
+        await self._run(self._evict)
+
+    async def _evict_in_background(self):
+        try:
+            await self.evict()
+        except Exception as e:
+            logger.error("Ошибка очистки кэша mingli.ru: %s", e)
+
+    # --- Запросы к SQLite (в потоке кэша) ---
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute('SELECT chart, created_at FROM charts WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        if row[1] + self.ttl <= time.time():
+            # Удалится при следующей очистке, здесь только промах
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def _get_html(self, key: str) -> Optional[str]:
+        row = self._conn.execute('SELECT html FROM charts WHERE key = ?', (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def _put(self, key: str, chart: Dict[str, Any], html: str = None) -> bool:
+        """Записать ответ; True — кэш вырос больше max_bytes и нужна очистка"""
+        chart_json = json.dumps(chart, ensure_ascii=False)
+        html_blob = None
+        if self.store_html and html is not None:
+            html_blob = zlib.compress(html.encode('utf-8'), self.compress_level)
+        size = len(key) + len(chart_json.encode('utf-8')) + (len(html_blob) if html_blob else 0)
+
+        with self._conn:
+            old = self._conn.execute('SELECT size FROM charts WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO charts (key, chart, html, size, created_at) VALUES (?, ?, ?, ?, ?)',
+                (key, chart_json, html_blob, size, time.time())
+            )
+        self._total_bytes += size - (old[0] if old else 0)
+        return self._total_bytes > self.max_bytes
+
+    def _evict(self):
+        with self._conn:
+            cursor = self._conn.execute('DELETE FROM charts WHERE created_at <= ?', (time.time() - self.ttl,))
+            self.evicted += cursor.rowcount
+            # Файл могут делить несколько процессов — пересчитываем, а не доверяем счетчику
+            self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM charts').fetchone()[0]
+
+            target = int(self.max_bytes * 0.9)
+            if self._total_bytes > target:
+                freed = 0
+                keys = []
+                for key, size in self._conn.execute('SELECT key, size FROM charts ORDER BY created_at'):
+                    if self._total_bytes - freed <= target:
+                        break
+                    keys.append((key,))
+                    freed += size
+                self._conn.executemany('DELETE FROM charts WHERE key = ?', keys)
+                self._total_bytes -= freed
+                self.evicted += len(keys)
+
+    async def close(self):
+        """Дождаться очистки и запросов в потоке кэша, закрыть файл"""
+        if self._evicting is not None:
+            await self._evicting
+            self._evicting = None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expired': self.expired,
+            'evicted': self.evicted,
+        }
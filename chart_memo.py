@@ -0,0 +1,235 @@
+"""
+Запоминание рассчитанных карт
+ChartMemo — LRU поверх calculate_bazi с прогревом и статистикой
+SharedChartTable — столпы года, месяца и дня на каждую дату 1900–2100 в файле charts.bin;
+файл открывается через mmap, поэтому все процессы бота читают одну копию из кэша ОС
+Файл генерируется этим модулем: python chart_memo.py; open_table пересоздает его, если файла нет
+или он от другой версии расчета
+"""
+import logging
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from bazi_chart import Chart
+from config import TIMEZONE_DEFAULT
+from day_pillars import FIRST_YEAR, LAST_YEAR, day_cycle_index
+from four_pillars import FourPillars, calculate_four_pillars, cycle_index, hour_pillar, pillar_at
+from gazetteer import find_city
+from simple_bazi_calculator import normalize_birth_time
+from solar_terms import jie_bounds
+
+logger = logging.getLogger(__name__)
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'charts.bin')
+
+_MAGIC = b'BZCT'
+# Повышать при любом изменении расчета столпов или границ месяцев: старый файл будет пересоздан
+_VERSION = 1
+_HEADER = struct.Struct('<4sBxHI')  # сигнатура, версия, первый год, число дат
+# На дату 3 байта: номер столпа года (старший бит — дата у границы месяца), месяца и дня в 60-летнем цикле
+_RECORD_SIZE = 3
+_BOUNDARY = 0x80
+# Местные сутки в поясах от UTC−12 до UTC+14 лежат в пределах ±26 часов от полудня UTC
+_BOUNDARY_WINDOW = timedelta(hours=36)
+
+
+# --- Общая таблица дат ---
+
+def generate_table(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> bytearray:
+    data = bytearray()
+    current = date(first_year, 1, 1)
+    while current.year <= last_year:
+        noon = datetime(current.year, current.month, current.day, 12, tzinfo=timezone.utc)
+        day_index = day_cycle_index(current.day, current.month, current.year)
+        try:
+            previous, following = jie_bounds(noon)
+            boundary = noon - previous < _BOUNDARY_WINDOW or following - noon < _BOUNDARY_WINDOW
+        except ValueError:
+            boundary = True
+
+        if boundary:
+            # Год и месяц зависят от часа и пояса — такие даты считаются полностью
+            data += bytes((_BOUNDARY, 0, day_index))
+        else:
+            pillars = calculate_four_pillars(noon, with_hour=False)
+            data += bytes((cycle_index(pillars.year), cycle_index(pillars.month), day_index))
+        current += timedelta(days=1)
+    return data
+
+
+def write_table(path: str = TABLE_PATH) -> int:
+    """
+    Запись через временный файл: процессы, которые уже открыли старую таблицу, дочитывают ее,
+    а новые открывают целый файл, а не половину
+    """
+    data = generate_table()
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, FIRST_YEAR, len(data) // _RECORD_SIZE))
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data) // _RECORD_SIZE
+
+
+def open_table(path: str = TABLE_PATH) -> 'SharedChartTable':
+    """Открыть таблицу; если файла нет, он другого формата или диапазона лет — пересоздать"""
+    try:
+        table = SharedChartTable(path)
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning(f"Таблица карт будет пересоздана: {e}")
+    else:
+        expected = date(LAST_YEAR + 1, 1, 1).toordinal() - date(FIRST_YEAR, 1, 1).toordinal()
+        if table.first_year == FIRST_YEAR and table.count == expected:
+            return table
+        table.close()
+        logger.warning(f"Таблица карт будет пересоздана: {path} на {table.first_year} год и {table.count} дат, "
+                       f"нужно {FIRST_YEAR}–{LAST_YEAR}")
+    write_table(path)
+    return SharedChartTable(path)
+
+
+class SharedChartTable:
+    """Таблица charts.bin в mmap (только чтение)"""
+
+    def __init__(self, path: str = TABLE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{path}: таблица карт обрезана")
+        magic, version, self.first_year, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: неизвестный формат таблицы карт")
+        if len(self._mm) != _HEADER.size + self.count * _RECORD_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path}: таблица карт обрезана")
+        self._first_ordinal = date(self.first_year, 1, 1).toordinal()
+
+    def lookup(self, day: int, month: int, year: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Номера столпов года, месяца и дня для даты или None, если даты нет в таблице
+        или в эти сутки меняется месяц (тогда нужен полный расчет)
+        """
+        offset = date(year, month, day).toordinal() - self._first_ordinal
+        if not 0 <= offset < self.count:
+            return None
+        start = _HEADER.size + offset * _RECORD_SIZE
+        year_index, month_index, day_index = self._mm[start:start + _RECORD_SIZE]
+        if year_index & _BOUNDARY:
+            return None
+        return year_index, month_index, day_index
+
+    def close(self):
+        self._mm.close()
+
+
+# --- Кэш карт ---
+
+class ChartMemo:
+    """
+    LRU-кэш карт поверх SimpleBaziCalculator; использовать из одного потока (цикл событий)
+    Ключ — дата, время и город из справочника: все города не из справочника считаются одинаково
+    """
+
+    def __init__(self, calculator=None, max_size: int = 100000, table: SharedChartTable = None):
+        if calculator is None:
+            from simple_bazi_calculator import SimpleBaziCalculator
+            calculator = SimpleBaziCalculator()
+        self.calculator = calculator
+        self.max_size = max_size
+        self.table = table
+        self._entries = OrderedDict()  # (дата, время, город) -> Chart
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.table_hits = 0
+
+    def calculate_bazi(self, birth_date: str, birth_time: str, birth_city: str) -> Chart:
+        """То же, что SimpleBaziCalculator.calculate_bazi, но повторный расчет берется из кэша"""
+        birth_time = normalize_birth_time(birth_time)
+        city = find_city(birth_city) if birth_city else None
+        key = (birth_date, birth_time, city.name if city else None)
+
+        chart = self._entries.get(key)
+        if chart is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            chart = self._from_table(birth_date, birth_time, city)
+            if chart is None:
+                chart = self.calculator.calculate_bazi(birth_date, birth_time, birth_city)
+            if self.max_size > 0:
+                self._entries[key] = chart
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        if chart.birth_city != birth_city:
+            # Та же карта, но город записан так, как его ввел пользователь
+            chart = Chart(chart.texts.day_stem_char, chart.year_animal, chart.year_branch_char,
+                          chart.birth_date, chart.birth_time, birth_city, chart.pillars)
+        return chart
+
+    def _from_table(self, birth_date: str, birth_time: str, city) -> Optional[Chart]:
+        """Карта по общей таблице: считается только час; None — нужен полный расчет"""
+        if self.table is None:
+            return None
+        try:
+            day, month, year = (int(part) for part in birth_date.split('.'))
+            hour, minute = (int(part) for part in birth_time.split(':'))
+            indexes = self.table.lookup(day, month, year)
+            if indexes is None:
+                return None
+            zone = ZoneInfo(city.timezone if city else TIMEZONE_DEFAULT)
+            moment = datetime(year, month, day, hour, minute, tzinfo=zone)
+        except ValueError:
+            return None
+
+        year_index, month_index, day_index = indexes
+        pillars = FourPillars(pillar_at(year_index), pillar_at(month_index), pillar_at(day_index),
+                              hour_pillar(moment, day_index, city.longitude if city else None))
+        self.table_hits += 1
+        return Chart(pillars.day.stem, self.calculator.year_animals[pillars.year.branch], pillars.year.branch,
+                     birth_date, birth_time, None, pillars)
+
+    def warm_up(self, birth_time: str = '12:00', first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> int:
+        """Рассчитать карты на все даты диапазона для времени birth_time (по умолчанию — «не знаю») без города"""
+        count = 0
+        current = date(first_year, 1, 1)
+        while current.year <= last_year:
+            self.calculate_bazi(f"{current:%d.%m.%Y}", birth_time, None)
+            count += 1
+            current += timedelta(days=1)
+        return count
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'table': self.table.path if self.table else None,
+            'table_hits': self.table_hits,
+        }
+
+
+if __name__ == "__main__":
+    count = write_table()
+    print(f"✅ {TABLE_PATH}: {count} дат, {os.path.getsize(TABLE_PATH)} байт")
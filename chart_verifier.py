@@ -0,0 +1,92 @@
+"""
+Выборочная сверка локального расчета с mingli.ru
+Работает в фоне и не задерживает ответ пользователю; по умолчанию выключена
+"""
+import asyncio
+import logging
+import random
+from typing import Optional, Dict, Any, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ChartVerifier:
+    """Сверяет ствол дня у доли рассчитанных карт с калькулятором mingli.ru"""
+
+    def __init__(self, sample_rate: float = 0.0, max_pending: int = 4, timeout: float = None, remote=None):
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.timeout = timeout
+        # remote — объект с корутиной fetch_day_stem (по умолчанию MingliBaziCalculator)
+        # timeout=None — дедлайн клиента mingli.ru
+        self._remote = remote
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.checked = 0
+        self.matched = 0
+        self.mismatched = 0
+        self.unavailable = 0
+        self.skipped = 0
+
+    def _get_remote(self):
+        if self._remote is None:
+            from mingli_bazi_calculator import MingliBaziCalculator
+            self._remote = MingliBaziCalculator()
+        return self._remote
+
+    def maybe_verify(self, result: Dict[str, Any]):
+        """Поставить карту на сверку с вероятностью sample_rate (вызывать из цикла событий)"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        if len(self._tasks) >= self.max_pending:
+            # mingli.ru отвечает медленно — не копим очередь
+            self.skipped += 1
+            return
+        task = asyncio.create_task(self._verify(result))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _verify(self, result: Dict[str, Any]) -> Optional[bool]:
+        try:
+            remote_stem = await self._get_remote().fetch_day_stem(
+                result['birth_date'], result['birth_time'], result['birth_city'], timeout=self.timeout
+            )
+        except Exception as e:
+            self.unavailable += 1
+            logger.info("Сверка с mingli.ru не выполнена: %s", e)
+            return None
+
+        if remote_stem is None:
+            self.unavailable += 1
+            return None
+
+        self.checked += 1
+        if remote_stem == result['day_stem_char']:
+            self.matched += 1
+            return True
+        self.mismatched += 1
+        logger.warning(
+            "Расхождение с mingli.ru для %s %s %s: локально %s, mingli.ru %s",
+            result['birth_date'], result['birth_time'], result['birth_city'],
+            result['day_stem_char'], remote_stem
+        )
+        return False
+
+    async def close(self):
+        """Отменить незавершенные сверки и закрыть соединения с mingli.ru"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._remote is not None and hasattr(self._remote, 'close'):
+            await self._remote.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._tasks),
+            'checked': self.checked,
+            'matched': self.matched,
+            'mismatched': self.mismatched,
+            'unavailable': self.unavailable,
+            'skipped': self.skipped,
+        }
@@ -12,3 +12,52 @@ TIMEZONE_DEFAULT = 'Europe/Moscow'
 # Настройки для Notion
 NOTION_TOKEN = os.getenv('NOTION_TOKEN')
 NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
+
+# Настройки пула соединений с базой данных
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
+
+# Кэш профилей пользователей в памяти процесса
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '300'))
+
+# Отложенная пакетная запись профилей (write-behind)
+WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', '1') == '1'
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '200'))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', '1'))
+
+# Хранилище состояний FSM (user_sessions) и его горячий слой в памяти
+# Горячий слой рассчитан на один процесс бота (long polling), общего сброса между процессами нет
+FSM_HOT_SIZE = int(os.getenv('FSM_HOT_SIZE', '10000'))
+FSM_HOT_TTL = float(os.getenv('FSM_HOT_TTL', '300'))
+FSM_FLUSH_INTERVAL = float(os.getenv('FSM_FLUSH_INTERVAL', '0.5'))
+
+# Доля карт, которые в фоне сверяются с mingli.ru (0 — не сверять)
+CHART_VERIFY_SAMPLE_RATE = float(os.getenv('CHART_VERIFY_SAMPLE_RATE', '0'))
+
+# Клиент mingli.ru: параллельные запросы, дедлайн запроса и отключение при недоступности
+MINGLI_MAX_CONCURRENCY = int(os.getenv('MINGLI_MAX_CONCURRENCY', '4'))
+MINGLI_TIMEOUT = float(os.getenv('MINGLI_TIMEOUT', '10'))
+MINGLI_FAILURE_THRESHOLD = int(os.getenv('MINGLI_FAILURE_THRESHOLD', '5'))
+MINGLI_RESET_TIMEOUT = float(os.getenv('MINGLI_RESET_TIMEOUT', '30'))
+
+# Дисковый кэш ответов mingli.ru (пустой путь — без кэша)
+MINGLI_CACHE_PATH = os.getenv('MINGLI_CACHE_PATH', 'mingli_cache.sqlite3')
+MINGLI_CACHE_TTL = float(os.getenv('MINGLI_CACHE_TTL', str(30 * 24 * 3600)))
+MINGLI_CACHE_MAX_MB = int(os.getenv('MINGLI_CACHE_MAX_MB', '64'))
+MINGLI_CACHE_STORE_HTML = os.getenv('MINGLI_CACHE_STORE_HTML', '0') == '1'
+
+# Кэш рассчитанных карт: размер LRU, прогрев при запуске и общая таблица дат charts.bin
+CHART_MEMO_SIZE = int(os.getenv('CHART_MEMO_SIZE', '100000'))
+CHART_MEMO_WARMUP = os.getenv('CHART_MEMO_WARMUP', '0') == '1'
+CHART_TABLE_ENABLED = os.getenv('CHART_TABLE_ENABLED', '1') == '1'
+
+# Экраны меню с кнопками пользователя: сколько собранных экранов (экран, user_id) держать в памяти
+SCREEN_CACHE_SIZE = int(os.getenv('SCREEN_CACHE_SIZE', '2000'))
+
+# Отложенные сообщения (scheduled_messages): опрос очереди, размер пачки и попытки отправки
+SCHEDULER_POLL_INTERVAL = float(os.getenv('SCHEDULER_POLL_INTERVAL', '0.5'))
+SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', '100'))
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv('SCHEDULER_MAX_ATTEMPTS', '3'))
@@ -1,179 +1,250 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import json
-from datetime import datetime
-from typing import Optional, Dict, Any
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 import os
 
+from bazi_chart import encode_chart, decode_chart
+from db_pool import ConnectionPool
+from migrations import check_schema
+from user_cache import UserCache
+from config import (
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_INTERVAL,
+    USER_CACHE_SIZE, USER_CACHE_TTL
+)
+
+# Колонки users, которые можно записывать через save_user
+USER_COLUMNS = frozenset({
+    'username', 'first_name', 'last_name',
+    'contact_name', 'contact_email', 'contact_phone',
+    'birth_date', 'birth_time', 'birth_city', 'timezone',
+    'bazi_data', 'personality_type'
+})
+
+# Для пакетной записи дополнительно разрешена карта БаЦзы
+BATCH_COLUMNS = USER_COLUMNS | {'bazi_chart'}
+
+
+def session_key(user_id: int) -> str:
+    """Ключ сессии в user_sessions для save_session/get_session"""
+    return f'session:{user_id}'
+
+
+@lru_cache(maxsize=64)
+def _upsert_user_sql(columns: tuple, batch: bool = False) -> str:
+    """Текст INSERT ... ON CONFLICT для набора колонок (кэшируется)"""
+    if batch:
+        # Для execute_values: строки подставляются в единственный %s
+        placeholders = '%s'
+    else:
+        placeholders = f"({', '.join(['%s'] * (len(columns) + 1))})"
+    if not columns:
+        return f'INSERT INTO users (user_id) VALUES {placeholders} ON CONFLICT (user_id) DO NOTHING'
+
+    update_clause = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns)
+    return (
+        f"INSERT INTO users (user_id, {', '.join(columns)}) VALUES {placeholders} "
+        f"ON CONFLICT (user_id) DO UPDATE SET {update_clause}, updated_at = CURRENT_TIMESTAMP"
+    )
+
+
 class Database:
-    def __init__(self, database_url: str = None):
+    def __init__(self, database_url: str = None, min_size: int = None, max_size: int = None):
         self.database_url = database_url or os.getenv('DATABASE_URL', 'postgresql://localhost/bazi_bot')
-        self.init_database()
-    
-    def get_connection(self):
-        """Получить соединение с базой данных"""
-        return psycopg2.connect(self.database_url)
-    
-    def init_database(self):
-        """Инициализация базы данных"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Таблица пользователей
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id BIGINT PRIMARY KEY,
-                username VARCHAR(255),
-                first_name VARCHAR(255),
-                last_name VARCHAR(255),
-                contact_name VARCHAR(255),
-                contact_email VARCHAR(255),
-                contact_phone VARCHAR(255),
-                birth_date VARCHAR(255),
-                birth_time VARCHAR(255),
-                birth_city VARCHAR(255),
-                timezone VARCHAR(255),
-                bazi_data TEXT,
-                personality_type VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Добавляем новые колонки если их нет (для обновления существующих БД)
-        for column in ['contact_name', 'contact_email', 'contact_phone', 'bazi_data', 'personality_type']:
-            column_type = 'TEXT' if column in ['bazi_data'] else 'VARCHAR(255)'
-            cursor.execute(f'''
-                DO $$ 
-                BEGIN
-                    IF NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns 
-                        WHERE table_name='users' AND column_name='{column}'
-                    ) THEN
-                        ALTER TABLE users ADD COLUMN {column} {column_type};
-                    END IF;
-                END $$;
-            ''')
-        
-        # Таблица сессий
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                user_id BIGINT,
-                step VARCHAR(255),
-                data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-    
-    def save_bazi_data(self, user_id: int, bazi_data: str):
+        self.pool = ConnectionPool(
+            self.database_url,
+            min_size=DB_POOL_MIN_SIZE if min_size is None else min_size,
+            max_size=DB_POOL_MAX_SIZE if max_size is None else max_size,
+            timeout=DB_POOL_TIMEOUT,
+            health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL
+        )
+        # Соединения открываются при первом запросе, схема создается миграциями (migrations.py)
+        self.cache = UserCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+    def connection(self):
+        """Получить соединение из пула (контекстный менеджер)"""
+        return self.pool.connection()
+
+    @contextmanager
+    def cursor(self, cursor_factory=None):
+        """Получить курсор на соединении из пула, транзакция фиксируется при выходе"""
+        with self.pool.connection() as conn:
+            with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                yield cursor
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Статистика пула соединений"""
+        return self.pool.get_stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Статистика кэша профилей"""
+        return self.cache.get_stats()
+
+    def close(self):
+        """Закрыть соединения пула"""
+        self.pool.close()
+
+    def check_schema(self) -> int:
+        """Проверить, что миграции применены (один запрос при старте бота)"""
+        with self.cursor() as cursor:
+            return check_schema(cursor)
+
+    def save_bazi_data(self, user_id: int, bazi_data: Dict[str, Any]):
         """Сохранить данные БаЦзы для пользователя"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE users 
-            SET bazi_data = %s, updated_at = CURRENT_TIMESTAMP
-            WHERE user_id = %s
-        ''', (bazi_data, user_id))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-    
+        with self.cursor() as cursor:
+            cursor.execute('''
+                UPDATE users
+                SET bazi_chart = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = %s
+            ''', (Json(encode_chart(bazi_data)), user_id))
+
+        self.cache.invalidate(user_id)
+
+    def _load_user(self, user_id: int):
+        """Прочитать пользователя из базы, декодировать карту и положить в кэш"""
+        generation = self.cache.generation()
+        with self.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        profile = dict(row)
+        chart = decode_chart(profile.get('bazi_chart'))
+        self.cache.put(user_id, profile, chart, generation)
+        return profile, chart
+
+    def get_chart(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Получить карту БаЦзы пользователя"""
+        entry = self.cache.get(user_id) or self._load_user(user_id)
+        if entry:
+            return entry[1]
+        return None
+
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Получить данные пользователя"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
-        row = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
-        
-        if row:
-            return dict(row)
+        entry = self.cache.get(user_id) or self._load_user(user_id)
+        if entry:
+            return dict(entry[0])
         return None
-    
+
     def save_user(self, user_id: int, **kwargs):
-        """Сохранить/обновить данные пользователя"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Проверяем, существует ли пользователь
-        cursor.execute('SELECT user_id FROM users WHERE user_id = %s', (user_id,))
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Обновляем существующего пользователя
-            set_clause = ', '.join([f"{key} = %s" for key in kwargs.keys()])
-            set_clause += ', updated_at = CURRENT_TIMESTAMP'
-            values = list(kwargs.values()) + [user_id]
-            
-            cursor.execute(f'UPDATE users SET {set_clause} WHERE user_id = %s', values)
-        else:
-            # Создаем нового пользователя
-            columns = ['user_id'] + list(kwargs.keys())
-            placeholders = ['%s'] * len(columns)
-            values = [user_id] + list(kwargs.values())
-            
-            cursor.execute(f'''
-                INSERT INTO users ({', '.join(columns)})
-                VALUES ({', '.join(placeholders)})
-            ''', values)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-    
+        """Сохранить/обновить данные пользователя одним запросом (INSERT ... ON CONFLICT)"""
+        unknown = set(kwargs) - USER_COLUMNS
+        if unknown:
+            raise ValueError(f"Неизвестные колонки users: {', '.join(sorted(unknown))}")
+
+        # Сортировка дает один и тот же текст запроса для одного набора колонок
+        columns = tuple(sorted(kwargs))
+        values = [user_id] + [kwargs[column] for column in columns]
+
+        with self.cursor() as cursor:
+            cursor.execute(_upsert_user_sql(columns), values)
+
+        self.cache.invalidate(user_id)
+
+    def save_users_batch(self, users: Dict[int, Dict[str, Any]]):
+        """
+        Пакетная запись изменений нескольких пользователей
+        Один INSERT ... ON CONFLICT с многими строками на каждый набор колонок
+        Ключ 'bazi_chart' принимает результат calculate_bazi
+        """
+        groups = {}
+        for user_id, fields in users.items():
+            unknown = set(fields) - BATCH_COLUMNS
+            if unknown:
+                raise ValueError(f"Неизвестные колонки users: {', '.join(sorted(unknown))}")
+            columns = tuple(sorted(fields))
+            row = [user_id]
+            for column in columns:
+                value = fields[column]
+                row.append(Json(encode_chart(value)) if column == 'bazi_chart' else value)
+            groups.setdefault(columns, []).append(row)
+
+        with self.cursor() as cursor:
+            for columns, rows in groups.items():
+                execute_values(cursor, _upsert_user_sql(columns, batch=True), rows, page_size=len(rows))
+
+        for user_id in users:
+            self.cache.invalidate(user_id)
+
     def save_session(self, user_id: int, step: str, data: Dict[str, Any]):
         """Сохранить данные сессии"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Удаляем старые записи сессии для этого пользователя
-        cursor.execute('DELETE FROM user_sessions WHERE user_id = %s', (user_id,))
-        
-        # Сохраняем новую запись
-        cursor.execute('''
-            INSERT INTO user_sessions (user_id, step, data)
-            VALUES (%s, %s, %s)
-        ''', (user_id, step, json.dumps(data)))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-    
+        self.save_sessions_batch({session_key(user_id): (user_id, step, data)})
+
     def get_session(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Получить данные сессии"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT step, data FROM user_sessions WHERE user_id = %s', (user_id,))
-        row = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
-        
-        if row:
-            return {
-                'step': row[0],
-                'data': json.loads(row[1])
-            }
-        return None
-    
+        return self.load_sessions([session_key(user_id)]).get(session_key(user_id))
+
     def clear_session(self, user_id: int):
         """Очистить данные сессии"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM user_sessions WHERE user_id = %s', (user_id,))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        self.save_sessions_batch({session_key(user_id): (user_id, None, {})})
+
+    def load_sessions(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Прочитать сессии по ключам одним запросом: {ключ: {'step', 'data'}}"""
+        with self.cursor() as cursor:
+            cursor.execute(
+                'SELECT storage_key, step, data FROM user_sessions WHERE storage_key = ANY(%s)',
+                (list(keys),)
+            )
+            rows = cursor.fetchall()
+        return {key: {'step': step, 'data': data} for key, step, data in rows}
+
+    def save_sessions_batch(self, sessions: Dict[str, Tuple[int, Optional[str], Dict[str, Any]]]):
+        """
+        Пакетная запись сессий: {ключ: (user_id, step, data)}
+        Пустая сессия (нет шага и данных) удаляется, остальные — один INSERT ... ON CONFLICT
+        """
+        upserts = []
+        deletes = []
+        for key, (user_id, step, data) in sessions.items():
+            if step is None and not data:
+                deletes.append(key)
+            else:
+                upserts.append((key, user_id, step, Json(data or {})))
+
+        with self.cursor() as cursor:
+            if deletes:
+                cursor.execute('DELETE FROM user_sessions WHERE storage_key = ANY(%s)', (deletes,))
+            if upserts:
+                execute_values(cursor, '''
+                    INSERT INTO user_sessions (storage_key, user_id, step, data) VALUES %s
+                    ON CONFLICT (storage_key) DO UPDATE
+                    SET step = EXCLUDED.step, data = EXCLUDED.data, updated_at = CURRENT_TIMESTAMP
+                ''', upserts, template='(%s, %s, %s, %s::jsonb)', page_size=len(upserts))
+
+    def schedule_messages(self, messages: List[Tuple[int, datetime, Dict[str, Any], int]]):
+        """Поставить сообщения (chat_id, due_at, payload, attempts) в очередь отложенной отправки одним INSERT"""
+        rows = [(chat_id, due_at, Json(payload), attempts) for chat_id, due_at, payload, attempts in messages]
+        with self.cursor() as cursor:
+            execute_values(cursor, '''
+                INSERT INTO scheduled_messages (chat_id, due_at, payload, attempts) VALUES %s
+            ''', rows, template='(%s, %s, %s::jsonb, %s)', page_size=len(rows))
+
+    def claim_scheduled_messages(self, now: datetime, limit: int) -> List[Tuple[int, datetime, Dict[str, Any], int]]:
+        """
+        Забрать (удалить и вернуть) до limit сообщений со сроком не позже now в порядке постановки
+        SKIP LOCKED: несколько процессов бота разбирают очередь, не получая одни и те же строки
+        """
+        with self.cursor() as cursor:
+            cursor.execute('''
+                DELETE FROM scheduled_messages WHERE id IN (
+                    SELECT id FROM scheduled_messages WHERE due_at <= %s
+                    ORDER BY due_at, id LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, chat_id, due_at, payload, attempts
+            ''', (now, limit))
+            rows = cursor.fetchall()
+        # RETURNING не сохраняет порядок подзапроса
+        rows.sort(key=lambda row: (row[2], row[0]))
+        return [(chat_id, due_at, payload, attempts) for _, chat_id, due_at, payload, attempts in rows]
+
+    def postpone_scheduled_messages(self, chat_id: int, shift: timedelta):
+        """Сдвинуть все ожидающие сообщения чата на shift (повтор шага не обгоняют следующие)"""
+        with self.cursor() as cursor:
+            cursor.execute(
+                'UPDATE scheduled_messages SET due_at = due_at + %s WHERE chat_id = %s',
+                (shift, chat_id)
+            )
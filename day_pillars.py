@@ -0,0 +1,51 @@
+"""
+Таблица столпов дня (60-дневный цикл ганьчжи) на 1900–2100 годы
+Один байт на день: позиция в цикле, ствол = позиция % 10, ветвь = позиция % 12
+"""
+from array import array
+from datetime import date
+from typing import Tuple
+
+STEMS = ('甲', '乙', '丙', '丁', '戊', '己', '庚', '辛', '壬', '癸')
+BRANCHES = ('子', '丑', '寅', '卯', '辰', '巳', '午', '未', '申', '酉', '戌', '亥')
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+# 1 января 1900 года — день 甲戌 (11-й в цикле, индекс 10)
+_BASE_ORDINAL = date(FIRST_YEAR, 1, 1).toordinal()
+DAY_CYCLE_BASE_INDEX = 10
+_DAYS = date(LAST_YEAR, 12, 31).toordinal() - _BASE_ORDINAL + 1
+
+_table = None
+
+
+def _build_table() -> array:
+    """Позиции в цикле для всех дней диапазона (~73 КБ)"""
+    cycle = array('B', range(60))
+    start = cycle[DAY_CYCLE_BASE_INDEX:] + cycle[:DAY_CYCLE_BASE_INDEX]
+    table = start * (_DAYS // 60 + 1)
+    del table[_DAYS:]
+    return table
+
+
+def _get_table() -> array:
+    global _table
+    if _table is None:
+        _table = _build_table()
+    return _table
+
+
+def day_cycle_index(day: int, month: int, year: int) -> int:
+    """Позиция дня в 60-дневном цикле (0 = 甲子)"""
+    offset = date(year, month, day).toordinal() - _BASE_ORDINAL
+    if 0 <= offset < _DAYS:
+        return _get_table()[offset]
+    # Вне таблицы цикл просто продолжается
+    return (DAY_CYCLE_BASE_INDEX + offset) % 60
+
+
+def day_pillar(day: int, month: int, year: int) -> Tuple[str, str]:
+    """Столп дня: (небесный ствол, земная ветвь)"""
+    index = day_cycle_index(day, month, year)
+    return STEMS[index % 10], BRANCHES[index % 12]
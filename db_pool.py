@@ -0,0 +1,227 @@
+"""
+Пул соединений с PostgreSQL
+Переиспользует открытые соединения вместо нового подключения на каждый запрос
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(Exception):
+    """Не удалось получить соединение из пула за отведенное время"""
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений с ограничением размера и проверкой здоровья"""
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, health_check_interval: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Некорректные размеры пула: min={min_size}, max={max_size}")
+
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        # Соединение, простоявшее дольше этого интервала, проверяется через SELECT 1
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, время возврата в пул)
+        self._size = 0        # открытые соединения, включая выданные
+        self._in_use = 0
+        self._opened = False
+
+        # Статистика
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._connects = 0
+        self._discarded = 0
+        self._health_check_failures = 0
+        self._peak_in_use = 0
+
+    def open(self):
+        """Открыть минимальное количество соединений"""
+        with self._cond:
+            if self._opened:
+                return
+            self._opened = True
+            missing = self.min_size - self._size
+            self._size += missing
+
+        for _ in range(missing):
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._connects += 1
+        return conn
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        """Проверка соединения перед выдачей"""
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Взять соединение из пула, при необходимости дождавшись освобождения"""
+        if not self._opened:
+            self.open()
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Нет свободных соединений за {self.timeout} сек (max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, returned_at):
+                with self._cond:
+                    self._health_check_failures += 1
+                self._discard(conn)
+                continue
+
+            wait_time = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                self._in_use += 1
+                self._peak_in_use = max(self._peak_in_use, self._in_use)
+                if waited:
+                    self._waits += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+            return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Вернуть соединение в пул"""
+        with self._cond:
+            self._in_use -= 1
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        try:
+            if not conn.closed:
+                conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Контекстный менеджер соединения
+        Фиксирует транзакцию при успешном выходе и откатывает при исключении
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def close(self):
+        """Закрыть все свободные соединения"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened = False
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика пула: ожидания, выдачи и загруженность"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'saturation': self._in_use / self.max_size,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': self._wait_time_total,
+                'wait_time_avg': self._wait_time_total / self._checkouts if self._checkouts else 0.0,
+                'wait_time_max': self._wait_time_max,
+                'timeouts': self._timeouts,
+                'connects': self._connects,
+                'discarded': self._discarded,
+                'health_check_failures': self._health_check_failures,
+            }
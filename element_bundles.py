@@ -0,0 +1,189 @@
+"""
+Готовые ответы по элементу личности
+На каждое из 10 сочетаний элемента и полярности (Дерево_Ян … Вода_Инь) — один неизменяемый
+ElementBundle с итоговым Markdown и file_id фото и голосовых сообщений
+Наборы собираются при запуске: если для какого-то сочетания нет текста или медиа, бот не стартует
+"""
+from types import MappingProxyType
+from typing import List, Mapping, NamedTuple, Tuple
+
+from simple_bazi_calculator import STEM_TEXTS
+
+# Фото к описанию элемента личности
+PERSONALITY_PHOTOS = {
+    "Дерево_Ян": "AgACAgIAAxkBAAICd2jOqHLJ5RvRNnXlkf7yMj5SDJ6mAAIa9zEbC2hwSmfIIQx_Gg_lAQADAgADeQADNgQ",
+    "Дерево_Инь": "AgACAgIAAxkBAAICf2jOqPKtdkPLwTsSCEPP1dbI8p4JAAIk9zEbC2hwSgZ7CVUq-bu_AQADAgADeQADNgQ",
+    "Огонь_Ян": "AgACAgIAAxkBAAICg2jOqR0lpPUNsRc9aZ1eRx5xD62HAAIU9zEbC2hwSjRlCpK45g7PAQADAgADeQADNgQ",
+    "Огонь_Инь": "AgACAgIAAxkBAAICh2jOqUVWgX8B7J1oqi-5wTJqN0TlAAId9zEbC2hwSrpstvM_lFILAQADAgADeQADNgQ",
+    "Земля_Ян": "AgACAgIAAxkBAAICi2jOqcPowNutDmTEszvqPLLnasbvAAIV9zEbC2hwSuSEMH7hkO9zAQADAgADeQADNgQ",
+    "Земля_Инь": "AgACAgIAAxkBAAICj2jOqe6718D5tDap5sa9YNBADv9jAAIZ9zEbC2hwSpm8J_CeRpcVAQADAgADeQADNgQ",
+    "Металл_Ян": "AgACAgIAAxkBAAICk2jOqjk0G_GkpaOWOO7mAbf_MG1pAAIb9zEbC2hwSnWxIFI1iKZkAQADAgADeQADNgQ",
+    "Металл_Инь": "AgACAgIAAxkBAAICmGjOqlfxlfIEPbBzIZx1QI9cQ7PSAAIX9zEbC2hwSlA1WZiuwiFmAQADAgADeQADNgQ",
+    "Вода_Ян": "AgACAgIAAxkBAAICnGjOqoe190sNelZ-U2WHFZRX4ogjAAIW9zEbC2hwSkq2YYVkoAeqAQADAgADeQADNgQ",
+    "Вода_Инь": "AgACAgIAAxkBAAICoGjOqp_B8YBmN-SsMyBoYzAkP58JAAIc9zEbC2hwShWVj1YYRq1tAQADAgADeQADNgQ"
+}
+
+# Знаменитости с тем же элементом личности и картинка к ним
+CELEBRITIES = {
+    "Дерево_Ян": "🌍 Примеры: Нельсон Мандела, Илон Маск, Тина Кароль, Катя Сильченко",
+    "Дерево_Инь": "🌍 Примеры: Джулия Робертс, Николь Кидман, Джек Ма, Монатик, Бред Питт, Валерий Залужный, Ярослава Гресь",
+    "Огонь_Ян": "🌍 Примеры: Опра Уинфри, Уилл Смит, Александр Усик, Лена Борисова",
+    "Огонь_Инь": "🌍 Примеры: Мэрил Стрип, Джон Леннон, Владимир Зеленский, Дмитрий Кулеба, Вера Брежнева, Дарья Квиткова",
+    "Земля_Ян": "🌍 Примеры: Уоррен Баффет, Хилари Клинтон, Лорен Санчес, Лена Перминова, Наталья Могилевская",
+    "Земля_Инь": "🌍 Примеры: Далай-лама XIV, Одри Хепбёрн, Барак Обама, Дональд Трамп, Богдан Ханенко, Кейт Миддлтон, Юлия Тимошенко, Анна Алхим",
+    "Металл_Ян": "🌍 Примеры: Стив Джобс, Брюс Ли, Наталья Гоций, Джефф Безос, Елизавета II",
+    "Металл_Инь": "🌍 Примеры: Принцесса Диана, Анжелина Джоли, Александр Маккуин, Диего Марадонна, Уинстон Черчилль, Мария Склодовская-Кюри, Мерилин Монро, Вуди Аллен, Сергей Притула",
+    "Вода_Ян": "🌍 Примеры: Авраам Линкольн, Рианна, Алена Гудкова, Маша Ефросинина",
+    "Вода_Инь": "🌍 Примеры: Махатма Ганди, Мать Тереза, Джонни Депп, Рокфеллер, Пикассо, Мерил Стрип, Анастасия Каменских, Ольга Сумская"
+}
+
+CELEBRITY_PHOTOS = {
+    "Дерево_Ян": "AgACAgIAAxkBAAIGOWkQYCGfH0Cr5hPBqQJhVgeRmXBtAAJNDGsb502ASH-qmJoaj8gAAQEAAwIAA3kAAzYE",
+    "Дерево_Инь": "AgACAgIAAxkBAAIGP2kQYGSbk-R76cKZnerbChBQ01b_AAJXDGsb502ASHDkPbgXRlqlAQADAgADeQADNgQ",
+    "Огонь_Ян": "AgACAgIAAxkBAAIGQ2kQYKPzZ6Q-eFVY24yCkWzGlODOAAKADGsb502ASNlF8DNAInvSAQADAgADeQADNgQ",
+    "Огонь_Инь": "AgACAgIAAxkBAAIGO2kQYD_wPiS0-MeGi6prdlSX-d6NAAJODGsb502ASNwYEPNA7D4kAQADAgADeQADNgQ",
+    "Земля_Ян": "AgACAgIAAxkBAAIGPWkQYFfTR8tpgwNw5hp-2TsjQCWBAAJPDGsb502ASOolXTFumOlRAQADAgADeQADNgQ",
+    "Земля_Инь": "AgACAgIAAxkBAAIGQWkQYHh2cRDXAgF1fyAvOrTpeESKAAJvDGsb502ASHQkE-MqZ7faAQADAgADeQADNgQ",
+    "Металл_Ян": "AgACAgIAAxkBAAIGRWkQYLSk5qMtYWyaSXlgc5dr1cZnAAKCDGsb502ASPbL1I-3ixFDAQADAgADeQADNgQ",
+    "Металл_Инь": "AgACAgIAAxkBAAIGN2kQYAOXvuiCGXgXu-VkDNaRg9AgAAJMDGsb502ASBXojH8-Ub4TAQADAgADeQADNgQ",
+    "Вода_Ян": "AgACAgIAAxkBAAICm2jOqofiJRFlLKavdipCt94d_OyNAAIg9zEbC2hwSnvaNs7RpEYKAQADAgADeQADNgQ",
+    "Вода_Инь": "AgACAgIAAxkBAAICn2jOqp-XVt9yRNHwtZvRYjmlOGBwAAIh9zEbC2hwSmsB5s8mEK8SAQADAgADeQADNgQ"
+}
+
+# Голосовые сообщения: основная энергия года, вторая энергия и еще одно для Воды
+ENERGY_VOICES = {
+    'Дерево_Ян': 'AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ',
+    'Дерево_Инь': "AwACAgIAAxkBAAIBWGjK1ZFZf5ZFm0p7DVQ6QlLqXnweAALPYwACXfIgSEZZxIwa_tHENgQ",
+    'Огонь_Ян': "AwACAgIAAxkBAAIBWmjK1fSagweyJcHm4CRJ8N3warY-AALXYwACXfIgSHASvr77PzMKNgQ",
+    'Огонь_Инь': "AwACAgIAAxkBAAIBW2jK1fR-n1dYSzHVCiRzzC1hbxiMAALiYwACXfIgSNDsh6LNpDqONgQ",
+    'Земля_Ян': "AwACAgIAAxkBAAIBXmjK2JUGdVyEt6hgwa1ecKLVFViYAALtYwACXfIgSPDDWyTUxx76NgQ",
+    'Земля_Инь': "AwACAgIAAxkBAAIBX2jK2JV_iTJUw8onVFwWQgp1CHUTAALnYwACXfIgSEVEoCxMhMiUNgQ",
+    'Металл_Ян': "AwACAgIAAxkBAAIBYmjK2MewquafQMDLYn91in4vJ1nsAAIDZAACXfIgSOY1-2hlJlFRNgQ",  # Один ГС для Металл Ян
+    'Металл_Инь': "AwACAgIAAxkBAAIBZGjK2Mdsg9rZMSWRqSGUfzDexas0AAITZAACXfIgSNSNUeO1bLm3NgQ",  # Один ГС для Металл Инь
+    'Вода_Ян': "AwACAgIAAxkBAAIBbmjK2czZUWajPXuxPOudJxDRRjzwAAIbZAACXfIgSGI7jo2Fg4g9NgQ",  # Замените на реальный
+    'Вода_Инь': "AwACAgIAAxkBAAIBb2jK2czNMRzhxG5CQZTLNtylvid1AAIhZAACXfIgSB5snQdlplPONgQ",  # Замените на реальный
+}
+
+SECOND_ENERGY_VOICES = {
+    "Дерево_Ян": "AwACAgIAAxkBAAIBb2jK2czNMRzhxG5CQZTLNtylvid1AAIhZAACXfIgSB5snQdlplPONgQ",
+    "Дерево_Инь": "AwACAgIAAxkBAAIBbmjK2czZUWajPXuxPOudJxDRRjzwAAIbZAACXfIgSGI7jo2Fg4g9NgQ",
+    "Огонь_Ян": "AwACAgIAAxkBAAIBWGjK1ZFZf5ZFm0p7DVQ6QlLqXnweAALPYwACXfIgSEZZxIwa_tHENgQ",
+    "Огонь_Инь": "AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ",
+    "Земля_Ян": "AwACAgIAAxkBAAIBW2jK1fR-n1dYSzHVCiRzzC1hbxiMAALiYwACXfIgSNDsh6LNpDqONgQ",
+    "Земля_Инь": "AwACAgIAAxkBAAIBWmjK1fSagweyJcHm4CRJ8N3warY-AALXYwACXfIgSHASvr77PzMKNgQ",
+    "Металл_Ян": "AwACAgIAAxkBAAIBXmjK2JUGdVyEt6hgwa1ecKLVFViYAALtYwACXfIgSPDDWyTUxx76NgQ",
+    "Металл_Инь": "AwACAgIAAxkBAAIBX2jK2JV_iTJUw8onVFwWQgp1CHUTAALnYwACXfIgSEVEoCxMhMiUNgQ",
+    "Вода_Ян": "AwACAgIAAxkBAAIBZGjK2Mdsg9rZMSWRqSGUfzDexas0AAITZAACXfIgSNSNUeO1bLm3NgQ",
+    "Вода_Инь": "AwACAgIAAxkBAAIBYmjK2MewquafQMDLYn91in4vJ1nsAAIDZAACXfIgSOY1-2hlJlFRNgQ"
+}
+
+WATER_SECOND_VOICES = {
+    "Вода_Ян": "AwACAgIAAxkBAAIBY2jK2MeJdSRa0YLUG5YI1TKE7MvaAAINZAACXfIgSHRNrjzrDPpcNgQ",  # Замените на второй file_id для Воды Ян
+    "Вода_Инь": "AwACAgIAAxkBAAIBY2jK2MeJdSRa0YLUG5YI1TKE7MvaAAINZAACXfIgSHRNrjzrDPpcNgQ"  # Замените на второй file_id для Воды Инь
+}
+
+# Язык общения
+LANGUAGES = {
+    "Дерево_Ян": "🌳 **Дерево Ян** — «С тобой следует говорить открыто, прямо и честно — Ты \"топор\" видишь издалека».",
+    "Дерево_Инь": "🌱 **Дерево Инь** — «Тебя нужно увлекать метафорой, романтикой и ты раскроешься и расцветешь».",
+    "Огонь_Ян": "🔥 **Огонь Ян** — «Тебя нужно вдохновить, и ты \"включишь\" все вокруг. Однако договариваться с тобой нужно очень быстро, пока ты \"горишь\" идеей».",
+    "Огонь_Инь": "🔥 **Огонь Инь** — «Комплимент + эмоция! = твоя формула согласия».",
+    "Земля_Ян": "⛰ **Земля Ян** — «Факты, логика, спокойный тон, многочисленные доводы — ключ к доверию. Но без давления, повышения голоса и эмоциональности».",
+    "Земля_Инь": "🏞 **Земля Инь** — «С тобой следует говорить Душевно, Тепло и по-человечески — и ты - союзник».",
+    "Металл_Ян": "⚔️ **Металл Ян** — «С тобой следует говорить Чётко, коротко, фактами. Ты любишь без воды и сантиментов, которые тебя только раздражают».",
+    "Металл_Инь": "💎 **Металл Инь** — «Ты слышишь, когда до тебя доносят информацию Структурно и красиво. Ты ценишь стиль слов и \"фигуры\" речи».",
+    "Вода_Ян": "🌊 **Вода Ян** — «Лучший способ общения с тобой - Говорить о смыслах, глубоко, философски — и ты наполнишься идеями и мотивацией».",
+    "Вода_Инь": "💧 **Вода Инь** — «Лучший способ общения с тобой - Легкая непринужденная беседа, где есть место чувствам, где есть Намёк и Загадка. Недосказанность, чувственность, возможность не ставить точку и не решать все сразу — твой любимый язык»."
+}
+
+
+class ElementBundle(NamedTuple):
+    key: str
+    element: str
+    polarity: str
+    personality_caption: str  # описание элемента и вопрос о суперсиле
+    personality_photo: str
+    superpower_text: str
+    celebrities_caption: str
+    celebrities_photo: str
+    advice_text: str  # совет на месяц и вопрос о 2025 годе
+    summary_2025_text: str
+    voice_file_id: str
+    voice_caption: str
+    second_voices: Tuple[Tuple[str, str], ...]  # (file_id, подпись) для второй энергии года
+    language_text: str
+    strategy_text: str
+
+
+def bundle_key(element: str, polarity: str) -> str:
+    """'Дерево', 'Ян' → 'Дерево_Ян'"""
+    return f"{element}_{polarity}"
+
+
+def compile_bundles(formulations) -> Mapping[str, ElementBundle]:
+    """
+    Наборы ответов для всех стволов дня из STEM_TEXTS, таблиц медиа и формулировок
+    Все недостающие ключи перечисляются в одной ошибке KeyError
+    """
+    missing: List[str] = []
+
+    def pick(table_name: str, table: Mapping[str, str], key: str) -> str:
+        value = table.get(key)
+        if not value:
+            missing.append(f"{table_name}[{key!r}]")
+        return value or ''
+
+    def formulation(category: str, key: str) -> str:
+        value = formulations.get_formulation(category, key)
+        if not value:
+            missing.append(f"формулировка {category}.{key}")
+        return value
+
+    superpower_question = formulation('results', 'superpower_question')
+    year_question = formulation('results', 'year_question')
+
+    bundles = {}
+    for texts in STEM_TEXTS.values():
+        element, polarity = texts.element, texts.polarity
+        key = bundle_key(element, polarity)
+        personality = texts.personality
+        voice_caption = f"🎵 Голосовое сообщение для {element} {polarity}"
+
+        second_voices = [(pick('SECOND_ENERGY_VOICES', SECOND_ENERGY_VOICES, key), voice_caption)]
+        if element == "Вода":
+            second_voices.append((pick('WATER_SECOND_VOICES', WATER_SECOND_VOICES, key),
+                                  f"🎵 Второе голосовое сообщение для {element} {polarity}"))
+
+        if not formulations.get_strategy_template(element, polarity):
+            missing.append(f"стратегия {element} {polarity}")
+
+        bundles[key] = ElementBundle(
+            key=key,
+            element=element,
+            polarity=polarity,
+            personality_caption=(
+                f"🌟 *Ваш элемент личности:*\n\n"
+                f"{personality['description']}\n\n"
+                f"{superpower_question}"
+            ),
+            personality_photo=pick('PERSONALITY_PHOTOS', PERSONALITY_PHOTOS, key),
+            superpower_text=(
+                f"✨ *Ваша суперсила:*\n\n"
+                f"{personality['superpower']}"
+            ),
+            celebrities_caption=pick('CELEBRITIES', CELEBRITIES, key),
+            celebrities_photo=pick('CELEBRITY_PHOTOS', CELEBRITY_PHOTOS, key),
+            advice_text=f"{texts.monthly_advice}\n\n{year_question}",
+            summary_2025_text=f"{texts.summary_2025}",
+            voice_file_id=pick('ENERGY_VOICES', ENERGY_VOICES, key),
+            voice_caption=voice_caption,
+            second_voices=tuple(second_voices),
+            language_text=pick('LANGUAGES', LANGUAGES, key),
+            strategy_text=formulations.format_strategy_message(element, polarity),
+        )
+
+    if len(bundles) != 10:
+        missing.append(f"ожидается 10 сочетаний элемента и полярности, найдено {len(bundles)}")
+    if missing:
+        raise KeyError("Не хватает данных для ответов по элементу личности: " + ", ".join(missing))
+    return MappingProxyType(bundles)
@@ -0,0 +1,164 @@
+"""
+Четыре столпа (год, месяц, день, час) без обращения к mingli.ru
+Год и месяц меняются в моменты сезонных узлов (solar_terms), день — в полночь по местному времени,
+час — по истинному солнечному времени места рождения, если известна долгота
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, NamedTuple, Optional
+
+from day_pillars import STEMS, BRANCHES, day_cycle_index
+from solar_terms import jie_bounds, jie_month
+
+
+class Pillar(NamedTuple):
+    stem: str
+    branch: str
+
+
+class FourPillars(NamedTuple):
+    year: Pillar
+    month: Pillar
+    day: Pillar
+    hour: Optional[Pillar]
+
+
+class LuckPillar(NamedTuple):
+    """Десятилетний такт удачи (大运)"""
+    number: int
+    start_age: float
+    start_year: int
+    pillar: Pillar
+
+
+class AnnualPillar(NamedTuple):
+    """Столп года (流年) и возраст в этом году по солнечному календарю"""
+    year: int
+    age: int
+    pillar: Pillar
+
+
+# 60 столпов цикла создаются один раз, все карты ссылаются на них
+_CYCLE = tuple(Pillar(STEMS[i % 10], BRANCHES[i % 12]) for i in range(60))
+
+
+def _pillar(stem_index: int, branch_index: int) -> Pillar:
+    # Ствол и ветвь одной полярности: номер в цикле однозначен
+    return _CYCLE[(6 * (stem_index % 10) - 5 * (branch_index % 12)) % 60]
+
+
+def solar_year(moment: datetime, month_index: int) -> int:
+    """Год по солнечному календарю: январь и начало февраля до Личунь относятся к прошлому году"""
+    if month_index >= 10 and moment.month <= 2:
+        return moment.year - 1
+    return moment.year
+
+
+def year_pillar(year: int) -> Pillar:
+    """Столп солнечного года (1984 — 甲子)"""
+    return _pillar(year - 4, year - 4)
+
+
+def pillar_at(index: int) -> Pillar:
+    """Столп по номеру в 60-летнем цикле (0 — 甲子)"""
+    return _CYCLE[index % 60]
+
+
+def cycle_index(pillar: Pillar) -> int:
+    """Номер столпа в 60-летнем цикле (甲子 — 0)"""
+    stem, branch = STEMS.index(pillar.stem), BRANCHES.index(pillar.branch)
+    return (6 * stem - 5 * branch) % 60
+
+
+def year_branch_index(year: int) -> int:
+    """Индекс земной ветви (животного) солнечного года"""
+    return (year - 4) % 12
+
+
+def equation_of_time(moment: datetime) -> float:
+    """Уравнение времени в минутах: истинное солнечное время минус среднее (NOAA, точность ~1 мин)"""
+    utc = moment.astimezone(timezone.utc)
+    gamma = 2 * math.pi / 365 * (utc.timetuple().tm_yday - 1 + (utc.hour - 12) / 24)
+    return 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                     - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+
+
+def true_solar_time(moment: datetime, longitude: float) -> datetime:
+    """
+    Истинное солнечное время на долготе longitude (восточная — положительная) в виде datetime без пояса
+    В Москве по часам 12:00 — это около 11:30 по солнцу: пояс UTC+3 рассчитан на 45° в. д., а не на 37.6°
+    """
+    utc = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return utc + timedelta(minutes=longitude * 4 + equation_of_time(moment))
+
+
+def calculate_four_pillars(moment: datetime, with_hour: bool = True, longitude: float = None) -> FourPillars:
+    """
+    Столпы для момента рождения — datetime с часовым поясом (местное время)
+    Час: 23:00–00:59 — 子, и т.д.; в 23 часа ствол часа берется от следующего дня
+    Если задана долгота, час считается по истинному солнечному времени, остальные столпы — как раньше
+    """
+    if moment.tzinfo is None:
+        raise ValueError("Нужен datetime с часовым поясом")
+
+    month_index = jie_month(moment)
+    year = solar_year(moment, month_index)
+    year_stem = (year - 4) % 10
+
+    # Месяц 寅 года 甲/己 — 丙寅, дальше по кругу (правило «пяти тигров»)
+    month = _pillar(year_stem * 2 + 2 + month_index, 2 + month_index)
+
+    day_index = day_cycle_index(moment.day, moment.month, moment.year)
+    day = _pillar(day_index, day_index)
+
+    hour = hour_pillar(moment, day_index, longitude) if with_hour else None
+    return FourPillars(year_pillar(year), month, day, hour)
+
+
+def hour_pillar(moment: datetime, day_index: int, longitude: float = None) -> Pillar:
+    """Столп часа; day_index — номер дня рождения (по гражданской дате) в 60-дневном цикле"""
+    # Солнечное время может уйти в соседние сутки — тогда и ствол дня для часа берется от них
+    clock = true_solar_time(moment, longitude) if longitude is not None else moment
+    if clock.date() != moment.date():
+        day_index = day_cycle_index(clock.day, clock.month, clock.year)
+    hour_branch = (clock.hour + 1) // 2 % 12
+    day_stem = (day_index + (1 if clock.hour == 23 else 0)) % 10
+    # Час 子 дня 甲/己 — 甲子 (правило «пяти крыс»)
+    return _pillar(day_stem * 2 + hour_branch, hour_branch)
+
+
+def luck_forward(year: Pillar, male: bool) -> bool:
+    """Такты идут вперед у мужчин, родившихся в год Ян, и у женщин — в год Инь"""
+    return (STEMS.index(year.stem) % 2 == 0) == male
+
+
+def luck_start(moment: datetime, forward: bool) -> datetime:
+    """
+    Начало первого такта: 3 дня от рождения до ближайшего узла «цзе» (вперед или назад) — это 1 год,
+    т.е. каждая минута — 2 часа
+    """
+    previous, following = jie_bounds(moment)
+    distance = following - moment if forward else moment - previous
+    return moment + distance * 120
+
+
+def iter_luck_pillars(moment: datetime, month: Pillar, forward: bool) -> Iterator[LuckPillar]:
+    """Такты удачи без конца, по одному на каждые 10 лет, от месяца рождения по кругу"""
+    start = luck_start(moment, forward)
+    start_age = (start - moment).total_seconds() / (365.2422 * 86400)
+    month_index = cycle_index(month)
+    step = 1 if forward else -1
+    number = 1
+    while True:
+        index = (month_index + step * number) % 60
+        yield LuckPillar(number, round(start_age + 10 * (number - 1), 1),
+                         start.year + 10 * (number - 1), _pillar(index, index))
+        number += 1
+
+
+def iter_annual_pillars(birth_year: int, start_year: int = None) -> Iterator[AnnualPillar]:
+    """Столпы лет без конца, начиная со start_year (по умолчанию — с солнечного года рождения)"""
+    year = birth_year if start_year is None else start_year
+    while True:
+        yield AnnualPillar(year, year - birth_year, year_pillar(year))
+        year += 1
@@ -0,0 +1,173 @@
+"""
+Локальный справочник городов: название → широта, долгота, часовой пояс
+Индекс cities.idx — отсортированные записи фиксированной длины, открывается через mmap,
+поиск — двоичный по нормализованному названию (точный и по префиксу), без сетевых запросов
+Индекс собирается из cities.tsv этим модулем: python gazetteer.py
+"""
+import mmap
+import os
+import re
+import struct
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(BASE_DIR, 'cities.tsv')
+INDEX_PATH = os.path.join(BASE_DIR, 'cities.idx')
+
+_MAGIC = b'BZGZ'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBxHI')  # сигнатура, версия, число часовых поясов, число записей
+# Ключ (нормализованное название), название для показа, широта и долгота в 1e-5 градуса, индекс пояса
+_RECORD = struct.Struct('<64s64siiH2x')
+_KEY_SIZE = 64
+
+_gazetteer = None
+
+
+class City(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+
+def normalize_city(name: str) -> str:
+    """'г. Санкт-Петербург, Россия' → 'санкт-петербург'; ё и е не различаются"""
+    name = name.split(',')[0].strip().casefold().replace('ё', 'е')
+    name = re.sub(r'^(г\.|город)\s*', '', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+# --- Сборка индекса ---
+
+def read_source(path: str = SOURCE_PATH) -> List[tuple]:
+    """Строки cities.tsv: (название, широта, долгота, пояс, [другие названия])"""
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) < 4:
+                raise ValueError(f"{path}:{line_no}: ожидается не меньше 4 полей")
+            aliases = [alias for alias in fields[4].split(',') if alias.strip()] if len(fields) > 4 else []
+            rows.append((fields[0], float(fields[1]), float(fields[2]), fields[3], aliases))
+    return rows
+
+
+def write_index(source: str = SOURCE_PATH, path: str = INDEX_PATH) -> int:
+    zones = []
+    entries = {}
+    for name, latitude, longitude, zone, aliases in read_source(source):
+        ZoneInfo(zone)  # неизвестный пояс — ошибка сборки, а не расчета
+        if zone not in zones:
+            zones.append(zone)
+        display = name.encode('utf-8')
+        if len(display) > _KEY_SIZE:
+            raise ValueError(f"Слишком длинное название: {name}")
+        for alias in [name] + aliases:
+            key = normalize_city(alias).encode('utf-8')
+            if len(key) > _KEY_SIZE:
+                raise ValueError(f"Слишком длинное название: {alias}")
+            if key in entries and entries[key][0] != display:
+                raise ValueError(f"Название {alias!r} относится к двум городам")
+            entries[key] = (display, round(latitude * 1e5), round(longitude * 1e5), zones.index(zone))
+
+    zone_block = '\n'.join(zones).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(zones), len(entries)))
+        f.write(struct.pack('<I', len(zone_block)))
+        f.write(zone_block)
+        # Байтовый порядок UTF-8 совпадает с порядком сравнения ключей при поиске
+        for key in sorted(entries):
+            f.write(_RECORD.pack(key, *entries[key]))
+    return len(entries)
+
+
+# --- Поиск ---
+
+class Gazetteer:
+    """Индекс городов в mmap: страницы файла читаются ОС по мере обращения и делятся между процессами"""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, zone_count, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: неизвестный формат индекса городов")
+        (zone_size,) = struct.unpack_from('<I', self._mm, _HEADER.size)
+        zones_start = _HEADER.size + 4
+        self.timezones = self._mm[zones_start:zones_start + zone_size].decode('utf-8').split('\n')
+        if len(self.timezones) != zone_count:
+            raise ValueError(f"{path}: поврежден список часовых поясов")
+        self._records = zones_start + zone_size
+        if len(self._mm) != self._records + self.count * _RECORD.size:
+            raise ValueError(f"{path}: индекс городов обрезан")
+
+    def _key(self, i: int) -> bytes:
+        start = self._records + i * _RECORD.size
+        return self._mm[start:start + _KEY_SIZE].rstrip(b'\0')
+
+    def _city(self, i: int) -> City:
+        _, display, latitude, longitude, zone = _RECORD.unpack_from(self._mm, self._records + i * _RECORD.size)
+        return City(display.rstrip(b'\0').decode('utf-8'), latitude / 1e5, longitude / 1e5, self.timezones[zone])
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, name: str) -> Optional[City]:
+        """Город по точному названию (в любом регистре, с 'г.' и страной через запятую) или None"""
+        key = normalize_city(name).encode('utf-8')
+        if not key:
+            return None
+        i = self._lower_bound(key)
+        if i < self.count and self._key(i) == key:
+            return self._city(i)
+        return None
+
+    def search(self, prefix: str, limit: int = 10) -> List[City]:
+        """Города, одно из названий которых начинается с prefix, без повторов"""
+        key = normalize_city(prefix).encode('utf-8')
+        if not key:
+            return []
+        found = []
+        i = self._lower_bound(key)
+        while i < self.count and len(found) < limit and self._key(i).startswith(key):
+            city = self._city(i)
+            if city not in found:
+                found.append(city)
+            i += 1
+        return found
+
+    def close(self):
+        self._mm.close()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Общий индекс процесса (открывается при первом обращении)"""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+@lru_cache(maxsize=4096)
+def find_city(name: str) -> Optional[City]:
+    """Город по названию из общего индекса (названия повторяются — результаты запоминаются)"""
+    return get_gazetteer().lookup(name)
+
+
+if __name__ == "__main__":
+    count = write_index()
+    print(f"✅ {INDEX_PATH}: {count} названий, {os.path.getsize(INDEX_PATH)} байт")
@@ -7,21 +7,83 @@ from aiogram.filters import CommandStart, Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message, Video
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-import asyncio
 import json
-from typing import Dict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional
 
-from database import Database
+from async_database import AsyncDatabase
 from simple_bazi_calculator import SimpleBaziCalculator
+from chart_memo import ChartMemo, open_table
+from callback_router import CallbackRouter
+from callbacks import CALLBACKS, pack_callback
+from chart_verifier import ChartVerifier
+from screens import SCREENS
+from mingli_bazi_calculator import MingliBaziCalculator
+from mingli_client import MingliClient
+from chart_cache import ChartCache
 from notion_integration import NotionIntegration
 from formulations_manager import FormulationsManager
-from config import NOTION_TOKEN, NOTION_DATABASE_ID, DATABASE_URL
+from element_bundles import ElementBundle, bundle_key, compile_bundles
+from message_scheduler import MessageScheduler, MessageStep, text_step
+from config import (
+    NOTION_TOKEN, NOTION_DATABASE_ID, DATABASE_URL,
+    WRITE_BEHIND_ENABLED, WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_FLUSH_INTERVAL,
+    CHART_VERIFY_SAMPLE_RATE, MINGLI_MAX_CONCURRENCY, MINGLI_TIMEOUT,
+    MINGLI_FAILURE_THRESHOLD, MINGLI_RESET_TIMEOUT,
+    MINGLI_CACHE_PATH, MINGLI_CACHE_TTL, MINGLI_CACHE_MAX_MB, MINGLI_CACHE_STORE_HTML,
+    CHART_MEMO_SIZE, CHART_TABLE_ENABLED,
+    SCHEDULER_POLL_INTERVAL, SCHEDULER_BATCH_SIZE, SCHEDULER_MAX_ATTEMPTS
+)
 
 # Инициализация базы данных и калькулятора
-db = Database(DATABASE_URL)
+db = AsyncDatabase(
+    DATABASE_URL,
+    write_behind=WRITE_BEHIND_ENABLED,
+    write_batch_size=WRITE_BEHIND_BATCH_SIZE,
+    write_flush_interval=WRITE_BEHIND_FLUSH_INTERVAL
+)
 bazi_calc = SimpleBaziCalculator()
+# Повторные расчеты — из памяти; таблица дат в mmap одна на все процессы бота
+chart_memo = ChartMemo(
+    bazi_calc,
+    max_size=CHART_MEMO_SIZE,
+    table=open_table() if CHART_TABLE_ENABLED else None
+)
+# mingli.ru нужен только для выборочной сверки, кэш ответов — только если сверка включена
+mingli_cache = None
+if CHART_VERIFY_SAMPLE_RATE > 0 and MINGLI_CACHE_PATH:
+    mingli_cache = ChartCache(
+        MINGLI_CACHE_PATH,
+        ttl=MINGLI_CACHE_TTL,
+        max_bytes=MINGLI_CACHE_MAX_MB * 1024 * 1024,
+        store_html=MINGLI_CACHE_STORE_HTML
+    )
+mingli_calc = MingliBaziCalculator(
+    MingliClient(
+        max_concurrency=MINGLI_MAX_CONCURRENCY,
+        timeout=MINGLI_TIMEOUT,
+        failure_threshold=MINGLI_FAILURE_THRESHOLD,
+        reset_timeout=MINGLI_RESET_TIMEOUT
+    ),
+    cache=mingli_cache
+)
+chart_verifier = ChartVerifier(
+    sample_rate=CHART_VERIFY_SAMPLE_RATE,
+    max_pending=MINGLI_MAX_CONCURRENCY,
+    remote=mingli_calc
+)
 notion_client = NotionIntegration(NOTION_TOKEN, NOTION_DATABASE_ID)
 formulations = FormulationsManager()
+# Ответы по элементу личности собираются сразу: нехватка текста или file_id — ошибка запуска
+element_bundles = compile_bundles(formulations)
+# Паузы между сообщениями выдерживает очередь отложенной отправки, а не обработчик (запускается в main.py)
+scheduler = MessageScheduler(
+    db,
+    poll_interval=SCHEDULER_POLL_INTERVAL,
+    batch_size=SCHEDULER_BATCH_SIZE,
+    max_attempts=SCHEDULER_MAX_ATTEMPTS
+)
 
 # Состояния для FSM
 class UserStates(StatesGroup):
@@ -35,6 +97,9 @@ class UserStates(StatesGroup):
 
 def register_handlers(dp: Dispatcher):
     """Регистрация всех обработчиков"""
+    # Все нажатия кнопок — через один маршрутизатор; порядок регистрации не важен,
+    # данные кнопок — по схеме callbacks.CALLBACKS (старые строки тоже разбираются)
+    router = CallbackRouter(CALLBACKS)
     
     @dp.message(Command("start"))
     async def start_handler(message: Message, state: FSMContext):
@@ -42,18 +107,18 @@ def register_handlers(dp: Dispatcher):
         user_id = message.from_user.id
         
         # Сохраняем пользователя в базе данных
-        db.save_user(user_id, username=message.from_user.username, first_name=message.from_user.first_name)
+        await db.save_user(user_id, username=message.from_user.username, first_name=message.from_user.first_name)
         
         welcome_text = formulations.get_formulation('greeting', 'start')
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да, хочу", callback_data="yes_want")]
+            [InlineKeyboardButton(text="🔘 Да, хочу", callback_data=pack_callback("yes_want"))]
         ])
         
         await message.answer(welcome_text, reply_markup=keyboard)
         await state.set_state(UserStates.waiting_for_choice)
     
-    @dp.callback_query(lambda c: c.data == "yes_want")
+    @router.exact("yes_want")
     async def yes_want_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Да, хочу'"""
         await callback_query.answer()
@@ -111,7 +176,7 @@ def register_handlers(dp: Dispatcher):
         
         # Сохраняем контактную информацию в базу данных
         user_id = message.from_user.id
-        db.save_user(
+        await db.save_user(
             user_id=user_id,
             username=message.from_user.username,
             first_name=message.from_user.first_name,
@@ -144,14 +209,14 @@ def register_handlers(dp: Dispatcher):
         time_text = formulations.get_formulation('data_collection', 'birth_time')
         
         keyboard_time = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Час рождения известен", callback_data="time_known")],
-            [InlineKeyboardButton(text="🔘 Не знаю", callback_data="time_unknown")]
+            [InlineKeyboardButton(text="🔘 Час рождения известен", callback_data=pack_callback("time_known"))],
+            [InlineKeyboardButton(text="🔘 Не знаю", callback_data=pack_callback("time_unknown"))]
         ])
         
         await message.answer(time_text, reply_markup=keyboard_time)
         await state.set_state(UserStates.waiting_for_birth_time)
     
-    @dp.callback_query(lambda c: c.data == "time_known")
+    @router.exact("time_known")
     async def time_known_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Час рождения известен'"""
         await callback_query.answer()
@@ -161,7 +226,7 @@ def register_handlers(dp: Dispatcher):
         await callback_query.message.answer(time_text)
         await state.set_state(UserStates.waiting_for_birth_time)
     
-    @dp.callback_query(lambda c: c.data == "time_unknown")
+    @router.exact("time_unknown")
     async def time_unknown_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Не знаю'"""
         await callback_query.answer()
@@ -214,15 +279,12 @@ def register_handlers(dp: Dispatcher):
         # Показываем сообщение о расчете
         await message.answer(formulations.get_formulation('calculation', 'processing'), parse_mode='Markdown')
         
-        # Отправляем второе сообщение через 2 секунды
-        await asyncio.sleep(2)
-        
+        # Через 2 секунды — описание расчета и сразу за ним результат
         calculation_text = formulations.get_formulation('calculation', 'description')
         
-        await message.answer(calculation_text, parse_mode='Markdown')
-        
         # Рассчитываем БаЦзы
-        await _calculate_and_send_bazi(message, birth_date, birth_time, birth_city)
+        await _calculate_and_send_bazi(message, birth_date, birth_time, birth_city,
+                                       intro_steps=[text_step(2, calculation_text)])
         
         await state.clear()
     
@@ -257,23 +319,7 @@ def register_handlers(dp: Dispatcher):
     @dp.message(Command("menu"))
     async def menu_handler(message: Message):
         """Главное меню бота"""
-        menu_text = (
-            "🏠 *Главное меню*\n\n"
-            "Выберите интересующий вас раздел:"
-        )
-        
-        keyboard_menu = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔮 Твои Прогнозы", callback_data="menu_forecasts")],
-            [InlineKeyboardButton(text="📚 Интересное", callback_data="menu_interesting")],
-            [InlineKeyboardButton(text="💬 Консультации", callback_data="menu_consultations")],
-            [InlineKeyboardButton(text="📋 Программы", callback_data="menu_programs")],
-            [InlineKeyboardButton(text="👤 Про меня", callback_data="menu_about")],
-            [InlineKeyboardButton(text="❓ Задать вопрос", callback_data="menu_question")],
-            [InlineKeyboardButton(text="🔘 Создать карту БаЦзы", callback_data="start_new")],
-            [InlineKeyboardButton(text="📤 Поделись ботом", callback_data="share_bot")]
-        ])
-        
-        await message.answer(menu_text, reply_markup=keyboard_menu, parse_mode='Markdown')
+        await SCREENS.get('menu_main').answer(message)
     
     @dp.message(Command("consultation"))
     async def consultation_handler(message: Message):
@@ -287,8 +333,8 @@ def register_handlers(dp: Dispatcher):
         # Создаем кнопки для записи
         keyboard_book = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📞 Записаться на консультацию", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Создать карту БаЦзы", callback_data="start_new")]
+            [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=pack_callback("learn_more_", user_id))],
+            [InlineKeyboardButton(text="🔘 Создать карту БаЦзы", callback_data=pack_callback("start_new"))]
         ])
         
         await message.answer(consultation_message, reply_markup=keyboard_book, parse_mode='Markdown')
@@ -299,9 +345,9 @@ def register_handlers(dp: Dispatcher):
         user_id = message.from_user.id
         
         # Получаем данные пользователя
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await message.answer(
                 "❌ Сначала создайте карту БаЦзы с помощью команды /start, "
                 "чтобы получить персональную стратегию."
@@ -309,21 +355,14 @@ def register_handlers(dp: Dispatcher):
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            element = bazi_data['element']
-            polarity = bazi_data['polarity']
-            
-            # Получаем стратегию для элемента
-            strategy_message = formulations.format_strategy_message(element, polarity)
-            
             # Создаем кнопки
             keyboard_strategy = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=f"learn_more_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Консультация", callback_data=f"consultation_options_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Создать новую карту", callback_data="start_new")]
+                [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=pack_callback("learn_more_", user_id))],
+                [InlineKeyboardButton(text="🔘 Консультация", callback_data=pack_callback("consultation_options_", user_id))],
+                [InlineKeyboardButton(text="🔘 Создать новую карту", callback_data=pack_callback("start_new"))]
             ])
             
-            await message.answer(strategy_message, reply_markup=keyboard_strategy, parse_mode='Markdown')
+            await message.answer(_bundle(bazi_data).strategy_text, reply_markup=keyboard_strategy, parse_mode='Markdown')
             
         except Exception as e:
             await message.answer("❌ Ошибка при загрузке данных. Попробуйте создать карту заново.")
@@ -459,105 +498,67 @@ def register_handlers(dp: Dispatcher):
             print(f"Text message_id: {message_id}")  # Также выводим в консоль
     
     # Интерактивные обработчики для пошагового показа БаЦзы
-    @dp.callback_query(lambda c: c.data.startswith("personality_desc_"))
+    @router.prefix("personality_desc_")
     async def show_personality_description(callback_query, state: FSMContext):
         """Показать описание элемента личности"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            personality = bazi_data['personality']
-            
-            element_text = (
-                f"🌟 *Ваш элемент личности:*\n\n"
-                f"{personality['description']}\n\n"
-                f"{formulations.get_formulation('results', 'superpower_question')}"
-            )
+            bundle = _bundle(bazi_data)
             
             keyboard_element = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да, расскажите!", callback_data=f"show_superpower_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Сразу подсказку на месяц", callback_data=f"show_advice_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да, расскажите!", callback_data=pack_callback("show_superpower_", user_id))],
+                [InlineKeyboardButton(text="🔘 Сразу подсказку на месяц", callback_data=pack_callback("show_advice_", user_id))],
             ])
             
-            # Отправляем фото для типа личности
-            personality_photos = {
-                "Дерево_ян": "AgACAgIAAxkBAAICd2jOqHLJ5RvRNnXlkf7yMj5SDJ6mAAIa9zEbC2hwSmfIIQx_Gg_lAQADAgADeQADNgQ",
-                "Дерево_инь": "AgACAgIAAxkBAAICf2jOqPKtdkPLwTsSCEPP1dbI8p4JAAIk9zEbC2hwSgZ7CVUq-bu_AQADAgADeQADNgQ",
-                "Огонь_ян": "AgACAgIAAxkBAAICg2jOqR0lpPUNsRc9aZ1eRx5xD62HAAIU9zEbC2hwSjRlCpK45g7PAQADAgADeQADNgQ",
-                "Огонь_инь": "AgACAgIAAxkBAAICh2jOqUVWgX8B7J1oqi-5wTJqN0TlAAId9zEbC2hwSrpstvM_lFILAQADAgADeQADNgQ",
-                "Земля_ян": "AgACAgIAAxkBAAICi2jOqcPowNutDmTEszvqPLLnasbvAAIV9zEbC2hwSuSEMH7hkO9zAQADAgADeQADNgQ",
-                "Земля_инь": "AgACAgIAAxkBAAICj2jOqe6718D5tDap5sa9YNBADv9jAAIZ9zEbC2hwSpm8J_CeRpcVAQADAgADeQADNgQ",
-                "Металл_ян": "AgACAgIAAxkBAAICk2jOqjk0G_GkpaOWOO7mAbf_MG1pAAIb9zEbC2hwSnWxIFI1iKZkAQADAgADeQADNgQ",
-                "Металл_инь": "AgACAgIAAxkBAAICmGjOqlfxlfIEPbBzIZx1QI9cQ7PSAAIX9zEbC2hwSlA1WZiuwiFmAQADAgADeQADNgQ",
-                "Вода_ян": "AgACAgIAAxkBAAICnGjOqoe190sNelZ-U2WHFZRX4ogjAAIW9zEbC2hwSkq2YYVkoAeqAQADAgADeQADNgQ",
-                "Вода_инь": "AgACAgIAAxkBAAICoGjOqp_B8YBmN-SsMyBoYzAkP58JAAIc9zEbC2hwShWVj1YYRq1tAQADAgADeQADNgQ"
-            }
-            
-            # Формируем ключ для поиска фото
-            element_key = f"{bazi_data['element']}_{bazi_data['polarity'].lower()}"
-            
-            # Отправляем фото с текстом как caption
-            photo_id = personality_photos.get(element_key)
-            if photo_id:
-                try:
-                    await callback_query.message.answer_photo(
-                        photo=photo_id,
-                        caption=element_text,
-                        reply_markup=keyboard_element,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    print(f"Ошибка при отправке фото: {e}")
-                    # Fallback - отправляем текст отдельно
-                    await callback_query.message.answer(
-                        element_text,
-                        reply_markup=keyboard_element,
-                        parse_mode='Markdown'
-                    )
-            else:
-                print(f"Фото для {element_key} не найдено")
+            # Отправляем фото для типа личности с текстом как caption
+            try:
+                await callback_query.message.answer_photo(
+                    photo=bundle.personality_photo,
+                    caption=bundle.personality_caption,
+                    reply_markup=keyboard_element,
+                    parse_mode='Markdown'
+                )
+            except Exception as e:
+                print(f"Ошибка при отправке фото: {e}")
                 # Fallback - отправляем текст отдельно
-                await callback_query.message.answer(element_text, reply_markup=keyboard_element, parse_mode='Markdown')
+                await callback_query.message.answer(
+                    bundle.personality_caption,
+                    reply_markup=keyboard_element,
+                    parse_mode='Markdown'
+                )
             
         except Exception as e:
             await callback_query.message.answer("❌ Ошибка при загрузке данных.")
     
-    @dp.callback_query(lambda c: c.data.startswith("show_superpower_"))
+    @router.prefix("show_superpower_")
     async def show_superpower(callback_query, state: FSMContext):
         """Показать суперсилы личности"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            personality = bazi_data['personality']
-            
-            superpower_text = (
-                f"✨ *Ваша суперсила:*\n\n"
-                f"{personality['superpower']}"
-            )
-            
-            await callback_query.message.answer(superpower_text, parse_mode='Markdown')
+            await callback_query.message.answer(_bundle(bazi_data).superpower_text, parse_mode='Markdown')
             
             # Отдельным сообщением вопрос о знаменитостях
             celebrities_question = formulations.get_formulation('results', 'celebrities_question')
             
             keyboard_celebrities = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да!", callback_data=f"celebrities_yes_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Ну их, давай дальше про меня", callback_data=f"celebrities_no_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да!", callback_data=pack_callback("celebrities_yes_", user_id))],
+                [InlineKeyboardButton(text="🔘 Ну их, давай дальше про меня", callback_data=pack_callback("celebrities_no_", user_id))],
             ])
             
             await callback_query.message.answer(celebrities_question, reply_markup=keyboard_celebrities, parse_mode='Markdown')
@@ -565,15 +566,15 @@ def register_handlers(dp: Dispatcher):
         except Exception as e:
             await callback_query.message.answer("❌ Ошибка при загрузке данных.")
     
-    @dp.callback_query(lambda c: c.data.startswith("show_traits_"))
+    @router.prefix("show_traits_")
     async def show_traits(callback_query, state: FSMContext):
         """Показать вопрос о совете на месяц"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
@@ -581,7 +582,7 @@ def register_handlers(dp: Dispatcher):
             step3_text = "Хотите получить совет на месяц?"
             
             keyboard3 = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=f"show_advice_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=pack_callback("show_advice_", user_id))],
             ])
             
             await callback_query.message.answer(step3_text, reply_markup=keyboard3, parse_mode='Markdown')
@@ -589,136 +590,102 @@ def register_handlers(dp: Dispatcher):
         except Exception as e:
             await callback_query.message.answer("❌ Ошибка при загрузке данных.")
     
-    @dp.callback_query(lambda c: c.data.startswith("show_advice_"))
+    @router.prefix("show_advice_")
     async def show_advice(callback_query, state: FSMContext):
         """Показать совет на месяц"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            
-            step4_text = f"{bazi_data['monthly_advice']}\n\n{formulations.get_formulation('results', 'year_question')}"
-            
             keyboard4 = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да, покажите!", callback_data=f"show_2025_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да, покажите!", callback_data=pack_callback("show_2025_", user_id))],
             ])
             
-            await callback_query.message.answer(step4_text, reply_markup=keyboard4, parse_mode='Markdown')
+            await callback_query.message.answer(_bundle(bazi_data).advice_text, reply_markup=keyboard4, parse_mode='Markdown')
             
         except Exception as e:
             await callback_query.message.answer("❌ Ошибка при загрузке данных.")
     
-    @dp.callback_query(lambda c: c.data.startswith("show_2025_"))
+    @router.prefix("show_2025_")
     async def show_2025_summary(callback_query, state: FSMContext):
         """Показать резюме 2025 года"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            
             # Показываем только резюме 2025 года без кнопки и завершающего текста
-            step5_text = f"{bazi_data['summary_2025']}"
-            
-            await callback_query.message.answer(step5_text, parse_mode='Markdown')
-            
-            # Через секунду отправляем дополнительное сообщение
-            import asyncio
-            await asyncio.sleep(8)
+            await callback_query.message.answer(_bundle(bazi_data).summary_2025_text, parse_mode='Markdown')
             
+            # Через 8 секунд дополнительное сообщение
             additional_text = formulations.get_formulation('completion', 'additional_text')
             
-            await callback_query.message.answer(additional_text, parse_mode='Markdown')
-            await asyncio.sleep(5)
-            # Следующим сообщением вопрос с кнопками
+            # Еще через 5 секунд вопрос с кнопками
             question_text = formulations.get_formulation('results', 'energy_question')
             
             keyboard_question = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да, хочу узнать", callback_data=f"show_energy_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Может быть позже", callback_data=f"maybe_later_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да, хочу узнать", callback_data=pack_callback("show_energy_", user_id))],
+                [InlineKeyboardButton(text="🔘 Может быть позже", callback_data=pack_callback("maybe_later_", user_id))],
             ])
             
-            await callback_query.message.answer(question_text, reply_markup=keyboard_question, parse_mode='Markdown')
+            await scheduler.schedule(callback_query.message.chat.id, [
+                text_step(8, additional_text),
+                text_step(5, question_text, reply_markup=keyboard_question),
+            ])
             
         except Exception as e:
             await callback_query.message.answer("❌ Ошибка при загрузке данных.")
     
-    @dp.callback_query(lambda c: c.data.startswith("show_energy_"))
+    @router.prefix("show_energy_")
     async def show_energy_info(callback_query, state: FSMContext):
         """Показать информацию об основных энергиях"""
         await callback_query.answer()
         
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("❌ Данные не найдены. Попробуйте создать карту заново.")
             return
         
         try:
-            bazi_data = eval(user_data['bazi_data'])
-            
             energy_text = formulations.get_formulation('energy_section', 'main_energy')
             
             await callback_query.message.answer(energy_text, parse_mode='Markdown')
             
-            # Отправляем голосовое сообщение из канала
-            # Определяем file_id голосового сообщения по типу личности
-            element = bazi_data['element']
-            polarity = bazi_data['polarity']
-            
-            # File IDs для всех элементов (включая Металл - по 1 ГС)
-            file_ids = {
-                'Дерево_Ян': 'AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ',
-                'Дерево_Инь': "AwACAgIAAxkBAAIBWGjK1ZFZf5ZFm0p7DVQ6QlLqXnweAALPYwACXfIgSEZZxIwa_tHENgQ",
-                'Огонь_Ян': "AwACAgIAAxkBAAIBWmjK1fSagweyJcHm4CRJ8N3warY-AALXYwACXfIgSHASvr77PzMKNgQ",
-                'Огонь_Инь': "AwACAgIAAxkBAAIBW2jK1fR-n1dYSzHVCiRzzC1hbxiMAALiYwACXfIgSNDsh6LNpDqONgQ",
-                'Земля_Ян': "AwACAgIAAxkBAAIBXmjK2JUGdVyEt6hgwa1ecKLVFViYAALtYwACXfIgSPDDWyTUxx76NgQ",  
-                'Земля_Инь': "AwACAgIAAxkBAAIBX2jK2JV_iTJUw8onVFwWQgp1CHUTAALnYwACXfIgSEVEoCxMhMiUNgQ",  
-                'Металл_Ян': "AwACAgIAAxkBAAIBYmjK2MewquafQMDLYn91in4vJ1nsAAIDZAACXfIgSOY1-2hlJlFRNgQ",  # Один ГС для Металл Ян
-                'Металл_Инь': "AwACAgIAAxkBAAIBZGjK2Mdsg9rZMSWRqSGUfzDexas0AAITZAACXfIgSNSNUeO1bLm3NgQ",  # Один ГС для Металл Инь
-                'Вода_Ян': "AwACAgIAAxkBAAIBbmjK2czZUWajPXuxPOudJxDRRjzwAAIbZAACXfIgSGI7jo2Fg4g9NgQ",  # Замените на реальный
-                'Вода_Инь': "AwACAgIAAxkBAAIBb2jK2czNMRzhxG5CQZTLNtylvid1AAIhZAACXfIgSB5snQdlplPONgQ",  # Замените на реальный
-            }
-            
-            file_key = f"{element}_{polarity}"
-            file_id = file_ids.get(file_key, "AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ")  # По умолчанию
-            
+            # Отправляем голосовое сообщение из канала по типу личности
+            bundle = _bundle(bazi_data)
             await callback_query.message.answer_voice(
-                voice=file_id,
-                caption=f"🎵 Голосовое сообщение для {element} {polarity}"
+                voice=bundle.voice_file_id,
+                caption=bundle.voice_caption
             )
             
-            # Через 2 секунды отправляем дополнительное сообщение
-            import asyncio
-            await asyncio.sleep(2)
-            
+            # Через 2 секунды дополнительное сообщение
             additional_text = formulations.get_formulation('energy_section', 'promo_text')
             
-            await callback_query.message.answer(additional_text, parse_mode='Markdown')
-            
             # Следующим сообщением вопрос с кнопками
             question_text = formulations.get_formulation('energy_section', 'continue_question')
             
             keyboard_question = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔘 Да", callback_data=f"continue_after_voice_{user_id}")],
-                [InlineKeyboardButton(text="🔘 Может быть позже", callback_data=f"maybe_later_{user_id}")],
+                [InlineKeyboardButton(text="🔘 Да", callback_data=pack_callback("continue_after_voice_", user_id))],
+                [InlineKeyboardButton(text="🔘 Может быть позже", callback_data=pack_callback("maybe_later_", user_id))],
             ])
             
-            await callback_query.message.answer(question_text, reply_markup=keyboard_question, parse_mode='Markdown')
+            await scheduler.schedule(callback_query.message.chat.id, [
+                text_step(2, additional_text),
+                text_step(0, question_text, reply_markup=keyboard_question),
+            ])
                 
         except Exception as e:
             # Если не удалось отправить голосовое сообщение
@@ -727,94 +694,48 @@ def register_handlers(dp: Dispatcher):
                 f"Вы можете послушать его в нашем канале: https://t.me/+_pXXwzoRTs4zMjRi"
             )
     
-    @dp.callback_query(lambda c: c.data.startswith("continue_after_voice_"))
+    @router.prefix("continue_after_voice_")
     async def continue_after_voice_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Да' после голосового сообщения"""
         await callback_query.answer()
         
         # Получаем данные пользователя
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("Ошибка: данные БаЦзы не найдены. Начните заново с /start")
             return
         
-        bazi_data = eval(user_data['bazi_data'])
-        
-        # Получаем годовую энергию
-        year_element = bazi_data['element']
-        year_polarity = bazi_data['polarity']
-        
-        # Определяем вторую годовую энергию (та же полярность)
-        second_polarity = year_polarity
-        
         continue_text = formulations.get_formulation('energy_section', 'second_energy')
         
         await callback_query.message.answer(continue_text, parse_mode='Markdown')
         
-        # Отправляем голосовое сообщение для второй энергии
-        # Пользователь добавит свои File ID
-        file_ids = {
-            "Дерево_Ян": "AwACAgIAAxkBAAIBb2jK2czNMRzhxG5CQZTLNtylvid1AAIhZAACXfIgSB5snQdlplPONgQ",
-            "Дерево_Инь": "AwACAgIAAxkBAAIBbmjK2czZUWajPXuxPOudJxDRRjzwAAIbZAACXfIgSGI7jo2Fg4g9NgQ",
-            "Огонь_Ян": "AwACAgIAAxkBAAIBWGjK1ZFZf5ZFm0p7DVQ6QlLqXnweAALPYwACXfIgSEZZxIwa_tHENgQ",
-            "Огонь_Инь": "AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ",
-            "Земля_Ян": "AwACAgIAAxkBAAIBW2jK1fR-n1dYSzHVCiRzzC1hbxiMAALiYwACXfIgSNDsh6LNpDqONgQ",
-            "Земля_Инь": "AwACAgIAAxkBAAIBWmjK1fSagweyJcHm4CRJ8N3warY-AALXYwACXfIgSHASvr77PzMKNgQ",
-            "Металл_Ян": "AwACAgIAAxkBAAIBXmjK2JUGdVyEt6hgwa1ecKLVFViYAALtYwACXfIgSPDDWyTUxx76NgQ",
-            "Металл_Инь": "AwACAgIAAxkBAAIBX2jK2JV_iTJUw8onVFwWQgp1CHUTAALnYwACXfIgSEVEoCxMhMiUNgQ",
-            "Вода_Ян": "AwACAgIAAxkBAAIBZGjK2Mdsg9rZMSWRqSGUfzDexas0AAITZAACXfIgSNSNUeO1bLm3NgQ",
-            "Вода_Инь": "AwACAgIAAxkBAAIBYmjK2MewquafQMDLYn91in4vJ1nsAAIDZAACXfIgSOY1-2hlJlFRNgQ"
-        }
-        
-        file_key = f"{year_element}_{second_polarity}"
-        file_id = file_ids.get(file_key, "AwACAgIAAxkBAAIBSmjKyz2RZWI25IChKGGWgEIt2ujzAALHYwACXfIgSLk2e9DtcEw7NgQ")
-        
-        await callback_query.message.answer_voice(
-            voice=file_id,
-            caption=f"🎵 Голосовое сообщение для {year_element} {second_polarity}"
-        )
-        
-        # Для Воды отправляем дополнительное голосовое сообщение
-        if year_element == "Вода":
-            # Получаем второй file_id для Воды
-            water_second_file_ids = {
-                "Вода_Ян": "AwACAgIAAxkBAAIBY2jK2MeJdSRa0YLUG5YI1TKE7MvaAAINZAACXfIgSHRNrjzrDPpcNgQ",  # Замените на второй file_id для Воды Ян
-                "Вода_Инь": "AwACAgIAAxkBAAIBY2jK2MeJdSRa0YLUG5YI1TKE7MvaAAINZAACXfIgSHRNrjzrDPpcNgQ"  # Замените на второй file_id для Воды Инь
-            }
-            
-            second_file_id = water_second_file_ids.get(file_key, file_id)
-            
-            await callback_query.message.answer_voice(
-                voice=second_file_id,
-                caption=f"🎵 Второе голосовое сообщение для {year_element} {second_polarity}"
-            )
-        
-        # Промежуточное сообщение
-        await asyncio.sleep(1)
+        # Голосовые сообщения для второй энергии (та же полярность; для Воды — два)
+        for file_id, caption in _bundle(bazi_data).second_voices:
+            await callback_query.message.answer_voice(voice=file_id, caption=caption)
         
+        # Через секунду промежуточное сообщение
         reminder_text = (
             "✨ *Помни: это только фрагменты прогноза.*\n\n"
             "Ты сейчас получаешь подсказки по элементу личности (твой личный «знак»).\n"
             "Но можно проанализировать ещё много факторов карты БаЦзы."
         )
         
-        await callback_query.message.answer(reminder_text, parse_mode='Markdown')
-        
-        # Через секунду вопрос о впечатлениях
-        await asyncio.sleep(1)
-        
+        # Еще через секунду вопрос о впечатлениях
         impression_text = formulations.get_formulation('energy_section', 'impression_question')
         
         keyboard_impression = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да, круто", callback_data=f"impression_good_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Нет", callback_data=f"impression_bad_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Да, круто", callback_data=pack_callback("impression_good_", user_id))],
+            [InlineKeyboardButton(text="🔘 Нет", callback_data=pack_callback("impression_bad_", user_id))],
         ])
         
-        await callback_query.message.answer(impression_text, reply_markup=keyboard_impression, parse_mode='Markdown')
+        await scheduler.schedule(callback_query.message.chat.id, [
+            text_step(1, reminder_text),
+            text_step(1, impression_text, reply_markup=keyboard_impression),
+        ])
     
-    @dp.callback_query(lambda c: c.data.startswith("impression_good_") or c.data.startswith("impression_bad_"))
+    @router.prefix("impression_good_", "impression_bad_")
     async def impression_response_handler(callback_query, state: FSMContext):
         """Обработчик кнопок 'Да, круто' и 'Нет'"""
         await callback_query.answer()
@@ -831,14 +752,14 @@ def register_handlers(dp: Dispatcher):
         )
         
         keyboard_response = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Хочу персональный разбор", callback_data=f"personal_analysis_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Хочу персональный разбор", callback_data=pack_callback("personal_analysis_", user_id))],
+            [InlineKeyboardButton(text="🔘 Узнать больше о Ба-цзы", callback_data=pack_callback("learn_more_", user_id))],
             [InlineKeyboardButton(text="🔘 Забронировать участие в Космический 2026 и получить Астропрогноз", url="https://www.yuliyaskiba.com/yourcosmos2026")]
         ])
         
         await callback_query.message.answer(response_text, reply_markup=keyboard_response, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("personal_analysis_"))
+    @router.prefix("personal_analysis_")
     async def personal_analysis_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Хочу персональный разбор'"""
         await callback_query.answer()
@@ -855,184 +776,50 @@ def register_handlers(dp: Dispatcher):
         )
         
         keyboard_consultation = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="✅ Варианты консультаций и стоимость", callback_data=f"consultation_types_{user_id}")],
-            [InlineKeyboardButton(text="✅ Ба-цзы. Что это и для чего?", callback_data=f"consultation_what_{user_id}")],
-            [InlineKeyboardButton(text="✅ Какие потребности закрывает", callback_data=f"consultation_needs_{user_id}")],
-            [InlineKeyboardButton(text="✅ Чем может существенно помочь", callback_data=f"consultation_help_{user_id}")],
-            [InlineKeyboardButton(text="✅ Для чего чаще всего используется", callback_data=f"consultation_usage_{user_id}")],
+            [InlineKeyboardButton(text="✅ Варианты консультаций и стоимость", callback_data=pack_callback("consultation_types_", user_id))],
+            [InlineKeyboardButton(text="✅ Ба-цзы. Что это и для чего?", callback_data=pack_callback("consultation_what_", user_id))],
+            [InlineKeyboardButton(text="✅ Какие потребности закрывает", callback_data=pack_callback("consultation_needs_", user_id))],
+            [InlineKeyboardButton(text="✅ Чем может существенно помочь", callback_data=pack_callback("consultation_help_", user_id))],
+            [InlineKeyboardButton(text="✅ Для чего чаще всего используется", callback_data=pack_callback("consultation_usage_", user_id))],
             [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")]
+            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=pack_callback("learn_more_", user_id))]
         ])
         
         await callback_query.message.answer(consultation_text, reply_markup=keyboard_consultation, parse_mode='Markdown')
     
     # Обработчики для детальной информации о консультациях
-    @dp.callback_query(lambda c: c.data.startswith("consultation_types_"))
+    @router.prefix("consultation_types_")
     async def consultation_types_handler(callback_query, state: FSMContext):
         """Варианты консультаций и стоимость"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        types_text = (
-            "💰 *Варианты консультаций и стоимость*\n\n"
-            "🔮 *Фундаментальная консультация Ба-цзы*\n\n"
-            "Помогает познакомиться глубже с собой, понять свои способности, таланты и уникальность. "
-            "Увидеть пространство возможностей в текущий жизненный период и выбрать эффективную персональную стратегию!\n\n"
-            "• от 150 евро/7290 грн.\n\n"
-            "📅 *Общая годовая консультация*\n\n"
-            "Данная консультация - навигатор в персональных энергиях и тенденциях года. "
-            "Вы определите личную годовую стратегию и проложите карту успеха 2026. "
-            "Помогает сфокусироваться на наиболее потенциальных направлениях и не тратить силы на слабые зоны.\n\n"
-            "• от 280 евро/13500 грн.\n\n"
-            "✨ *Расширенная годовая консультация*\n\n"
-            "Эта консультация — ваш Навигатор персональных энергий и тенденций года, а также отдельно каждого месяца. "
-            "Позволяет распланировать, когда и что вы будете делать, чтобы у вас все складывалось более легко и эффективно, "
-            "используя благоприятные энергии месяца для достижения своих годовых целей.\n\n"
-            "• от 300 евро/14490 грн.\n\n"
-            "🌟 *Годовое сопровождение*\n\n"
-            "Это КОМПЛЕКСНОЕ АСТРОЛОГИЧЕСКОЕ СОПРОВОЖДЕНИЕ, аналитика потенциала Вашего времени и энергий на целый год. "
-            "Включает в себя расширенную годовую консультацию в первый месяц после старта сопровождения, "
-            "а также формат ежемесячных рекомендаций, календарей энергий, подборки важных дат и обсуждение обратной связи.\n\n"
-            "• от 700 евро/33810 грн.\n\n"
-            "📝 Забронируйте время консультации, указав правильный электронный адрес, чтобы мы могли с Вами связаться, "
-            "или нажмите на кнопку *Задать вопрос* ниже, для уточнения любых деталей."
-        )
-        
-        keyboard_types = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="❓ Задать вопрос", url="https://t.me/Yulia_Skiba")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(types_text, reply_markup=keyboard_types, parse_mode='Markdown')
+        await SCREENS.get('consultation_types', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_what_"))
+    @router.prefix("consultation_what_")
     async def consultation_what_handler(callback_query, state: FSMContext):
         """Ба-цзы. Что это и для чего?"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        what_text = (
-            "🔮 *Ба-цзы. Что это и для чего?*\n\n"
-            "БаЦзы (八字) — это древнекитайская система астрологии, которая анализирует личность и судьбу человека "
-            "на основе даты и времени рождения.\n\n"
-            "**Для чего используется:**\n"
-            "• Понимание своей личности и характера\n"
-            "• Определение сильных сторон и талантов\n"
-            "• Прогнозирование жизненных периодов\n"
-            "• Выбор оптимального времени для важных решений\n"
-            "• Совместимость в отношениях\n"
-            "• Карьерные рекомендации"
-        )
-        
-        keyboard_what = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(what_text, reply_markup=keyboard_what, parse_mode='Markdown')
+        await SCREENS.get('consultation_what', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_needs_"))
+    @router.prefix("consultation_needs_")
     async def consultation_needs_handler(callback_query, state: FSMContext):
         """Какие потребности закрывает"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        needs_text = (
-            "🎯 *Какие потребности закрывает*\n\n"
-            "**Личностные потребности:**\n"
-            "• Понимание себя и своих мотивов\n"
-            "• Принятие своих особенностей\n"
-            "• Развитие сильных сторон\n"
-            "• Работа с ограничениями\n\n"
-            "**Жизненные потребности:**\n"
-            "• Выбор правильного направления в жизни\n"
-            "• Понимание жизненных циклов\n"
-            "• Оптимизация времени и энергии\n"
-            "• Принятие важных решений\n\n"
-            "**Отношенческие потребности:**\n"
-            "• Понимание совместимости с партнерами\n"
-            "• Улучшение коммуникации\n"
-            "• Решение конфликтов в семье"
-        )
-        
-        keyboard_needs = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(needs_text, reply_markup=keyboard_needs, parse_mode='Markdown')
+        await SCREENS.get('consultation_needs', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_help_"))
+    @router.prefix("consultation_help_")
     async def consultation_help_handler(callback_query, state: FSMContext):
         """Чем может существенно помочь"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        help_text = (
-            "💪 *Чем может существенно помочь*\n\n"
-            "**В карьере:**\n"
-            "• Выбор подходящей профессии\n"
-            "• Понимание своих талантов\n"
-            "• Оптимальное время для смены работы\n"
-            "• Развитие лидерских качеств\n\n"
-            "**В отношениях:**\n"
-            "• Понимание совместимости с партнерами\n"
-            "• Улучшение семейных отношений\n"
-            "• Решение конфликтов\n"
-            "• Понимание потребностей близких\n\n"
-            "**В здоровье:**\n"
-            "• Понимание уязвимых систем организма\n"
-            "• Выбор оптимального времени для лечения\n"
-            "• Профилактика заболеваний\n"
-            "• Управление стрессом"
-        )
-        
-        keyboard_help = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(help_text, reply_markup=keyboard_help, parse_mode='Markdown')
+        await SCREENS.get('consultation_help', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_usage_"))
+    @router.prefix("consultation_usage_")
     async def consultation_usage_handler(callback_query, state: FSMContext):
         """Для чего чаще всего используется"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        usage_text = (
-            "📊 *Для чего чаще всего используется анализ БаЦзы*\n\n"
-            "**Популярные случаи использования:**\n"
-            "• Выбор времени для важных событий (свадьба, переезд, смена работы)\n"
-            "• Понимание отношений с детьми и партнерами\n"
-            "• Карьерное планирование и развитие\n"
-            "• Решение семейных конфликтов\n"
-            "• Понимание своих эмоциональных реакций\n"
-            "• Выбор подходящего образования для детей\n"
-            "• Планирование беременности и воспитания\n"
-            "• Понимание жизненных кризисов и их преодоление"
-        )
-        
-        keyboard_usage = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(usage_text, reply_markup=keyboard_usage, parse_mode='Markdown')
+        await SCREENS.get('consultation_usage', callback_query.from_user.id).answer(callback_query.message)
     
     # Обработчики для подробной информации о консультациях
-    @dp.callback_query(lambda c: c.data.startswith("consultation_individual_details_"))
+    @router.prefix("consultation_individual_details_")
     async def consultation_individual_details_handler(callback_query, state: FSMContext):
         """Подробная информация об индивидуальной консультации"""
         await callback_query.answer()
@@ -1061,12 +848,12 @@ def register_handlers(dp: Dispatcher):
         
         keyboard_details = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📞 Записаться на консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"consultation_individual_{user_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data=pack_callback("consultation_individual_", user_id))],
         ])
         
         await callback_query.message.answer(details_text, reply_markup=keyboard_details, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_cosmic_details_"))
+    @router.prefix("consultation_cosmic_details_")
     async def consultation_cosmic_details_handler(callback_query, state: FSMContext):
         """Подробная информация о программе Космический-2026"""
         await callback_query.answer()
@@ -1095,12 +882,12 @@ def register_handlers(dp: Dispatcher):
         
         keyboard_details = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="🚀 Записаться на программу", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"consultation_cosmic_{user_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data=pack_callback("consultation_cosmic_", user_id))],
         ])
         
         await callback_query.message.answer(details_text, reply_markup=keyboard_details, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_learn_details_"))
+    @router.prefix("consultation_learn_details_")
     async def consultation_learn_details_handler(callback_query, state: FSMContext):
         """Подробная информация об обучении анализу БаЦзы"""
         await callback_query.answer()
@@ -1130,12 +917,12 @@ def register_handlers(dp: Dispatcher):
         
         keyboard_details = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📚 Записаться на обучение", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"consultation_learn_{user_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data=pack_callback("consultation_learn_", user_id))],
         ])
         
         await callback_query.message.answer(details_text, reply_markup=keyboard_details, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("detailed_analysis_"))
+    @router.prefix("detailed_analysis_")
     async def detailed_analysis_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Хочу подробный разбор'"""
         await callback_query.answer()
@@ -1145,12 +932,12 @@ def register_handlers(dp: Dispatcher):
         analysis_text = formulations.get_formulation('analysis', 'full_analysis_offer')
         
         keyboard_full_analysis = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Хочу полный разбор", callback_data=f"full_analysis_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Хочу полный разбор", callback_data=pack_callback("full_analysis_", user_id))],
         ])
         
         await callback_query.message.answer(analysis_text, reply_markup=keyboard_full_analysis, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("full_analysis_"))
+    @router.prefix("full_analysis_")
     async def full_analysis_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Хочу полный разбор'"""
         await callback_query.answer()
@@ -1164,114 +951,47 @@ def register_handlers(dp: Dispatcher):
         # Создаем кнопки для записи
         keyboard_book = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📞 Записаться на консультацию", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=f"learn_more_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Узнать больше о БаЦзы", callback_data=pack_callback("learn_more_", user_id))],
         ])
         
         await callback_query.message.answer(consultation_message, reply_markup=keyboard_book, parse_mode='Markdown')
         
     
-    @dp.callback_query(lambda c: c.data.startswith("celebrities_yes_"))
+    @router.prefix("celebrities_yes_")
     async def celebrities_yes_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Да!' для знаменитостей"""
         await callback_query.answer()
         
         # Получаем данные пользователя
         user_id = callback_query.from_user.id
-        user_data = db.get_user(user_id)
+        bazi_data = await db.get_chart(user_id)
         
-        if not user_data or not user_data.get('bazi_data'):
+        if not bazi_data:
             await callback_query.message.answer("Ошибка: данные БаЦзы не найдены. Начните заново с /start")
             return
         
-        bazi_data = eval(user_data['bazi_data'])
-        
-        # Получаем элемент личности
-        day_stem_element = bazi_data['element']
-        day_stem_polarity = bazi_data['polarity']
-        
-        # Отладочная информация
-        print(f"Debug: element={day_stem_element}, polarity={day_stem_polarity}")
-        
-        # Словарь с примерами знаменитостей из таблицы
-        celebrities_examples = {
-            "Дерево_ян": "🌍 Примеры: Нельсон Мандела, Илон Маск, Тина Кароль, Катя Сильченко",
-            "Дерево_инь": "🌍 Примеры: Джулия Робертс, Николь Кидман, Джек Ма, Монатик, Бред Питт, Валерий Залужный, Ярослава Гресь",
-            "Огонь_ян": "🌍 Примеры: Опра Уинфри, Уилл Смит, Александр Усик, Лена Борисова",
-            "Огонь_инь": "🌍 Примеры: Мэрил Стрип, Джон Леннон, Владимир Зеленский, Дмитрий Кулеба, Вера Брежнева, Дарья Квиткова",
-            "Земля_ян": "🌍 Примеры: Уоррен Баффет, Хилари Клинтон, Лорен Санчес, Лена Перминова, Наталья Могилевская",
-            "Земля_инь": "🌍 Примеры: Далай-лама XIV, Одри Хепбёрн, Барак Обама, Дональд Трамп, Богдан Ханенко, Кейт Миддлтон, Юлия Тимошенко, Анна Алхим",
-            "Металл_ян": "🌍 Примеры: Стив Джобс, Брюс Ли, Наталья Гоций, Джефф Безос, Елизавета II",
-            "Металл_инь": "🌍 Примеры: Принцесса Диана, Анжелина Джоли, Александр Маккуин, Диего Марадонна, Уинстон Черчилль, Мария Склодовская-Кюри, Мерилин Монро, Вуди Аллен, Сергей Притула",
-            "Вода_ян": "🌍 Примеры: Авраам Линкольн, Рианна, Алена Гудкова, Маша Ефросинина",
-            "Вода_инь": "🌍 Примеры: Махатма Ганди, Мать Тереза, Джонни Депп, Рокфеллер, Пикассо, Мерил Стрип, Анастасия Каменских, Ольга Сумская"
-        }
-        
-        
-        element_key = f"{day_stem_element}_{day_stem_polarity.lower()}"
-        print(f"Debug: element_key={element_key}")
-        celebrities_text = celebrities_examples.get(element_key, f"Примеры знаменитостей не найдены для {element_key}")
-        
-        # Отправляем картинку для типа личности
-        personality_images = {
-            "Дерево_ян": [
-                "AgACAgIAAxkBAAIGOWkQYCGfH0Cr5hPBqQJhVgeRmXBtAAJNDGsb502ASH-qmJoaj8gAAQEAAwIAA3kAAzYE"
-            ],
-            "Дерево_инь": [
-                "AgACAgIAAxkBAAIGP2kQYGSbk-R76cKZnerbChBQ01b_AAJXDGsb502ASHDkPbgXRlqlAQADAgADeQADNgQ"
-            ],
-            "Огонь_ян": [
-                "AgACAgIAAxkBAAIGQ2kQYKPzZ6Q-eFVY24yCkWzGlODOAAKADGsb502ASNlF8DNAInvSAQADAgADeQADNgQ"
-            ],
-            "Огонь_инь": [
-                "AgACAgIAAxkBAAIGO2kQYD_wPiS0-MeGi6prdlSX-d6NAAJODGsb502ASNwYEPNA7D4kAQADAgADeQADNgQ"
-            ],
-            "Земля_ян": [
-                "AgACAgIAAxkBAAIGPWkQYFfTR8tpgwNw5hp-2TsjQCWBAAJPDGsb502ASOolXTFumOlRAQADAgADeQADNgQ"
-            ],
-            "Земля_инь": [
-                "AgACAgIAAxkBAAIGQWkQYHh2cRDXAgF1fyAvOrTpeESKAAJvDGsb502ASHQkE-MqZ7faAQADAgADeQADNgQ"
-            ],
-            "Металл_ян": [
-                "AgACAgIAAxkBAAIGRWkQYLSk5qMtYWyaSXlgc5dr1cZnAAKCDGsb502ASPbL1I-3ixFDAQADAgADeQADNgQ"
-            ],
-            "Металл_инь": [
-                "AgACAgIAAxkBAAIGN2kQYAOXvuiCGXgXu-VkDNaRg9AgAAJMDGsb502ASBXojH8-Ub4TAQADAgADeQADNgQ"
-            ],
-            "Вода_ян": [
-                "AgACAgIAAxkBAAICm2jOqofiJRFlLKavdipCt94d_OyNAAIg9zEbC2hwSnvaNs7RpEYKAQADAgADeQADNgQ"
-            ],
-            "Вода_инь": [
-                "AgACAgIAAxkBAAICn2jOqp-XVt9yRNHwtZvRYjmlOGBwAAIh9zEbC2hwSmsB5s8mEK8SAQADAgADeQADNgQ"
-            ]
-        }
-        
-        images = personality_images.get(element_key, [])
-        if images:
-            try:
-                # Отправляем картинку с примерами знаменитостей как caption
-                await callback_query.message.answer_photo(
-                    photo=images[0], 
-                    caption=celebrities_text
-                )
-            except Exception as e:
-                await callback_query.message.answer(f"Ошибка при отправке картинки: {str(e)}")
-                # Fallback - отправляем текст отдельно
-                await callback_query.message.answer(celebrities_text)
-        else:
-            await callback_query.message.answer("Картинка для вашего типа личности не найдена")
+        bundle = _bundle(bazi_data)
+        try:
+            # Отправляем картинку с примерами знаменитостей как caption
+            await callback_query.message.answer_photo(
+                photo=bundle.celebrities_photo,
+                caption=bundle.celebrities_caption
+            )
+        except Exception as e:
+            await callback_query.message.answer(f"Ошибка при отправке картинки: {str(e)}")
             # Fallback - отправляем текст отдельно
-            await callback_query.message.answer(celebrities_text)
+            await callback_query.message.answer(bundle.celebrities_caption)
         
         # Отдельным сообщением вопрос о совете
         advice_question = "Хотите получить совет на месяц?"
         
         keyboard_advice = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=f"show_advice_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=pack_callback("show_advice_", user_id))],
         ])
         
         await callback_query.message.answer(advice_question, reply_markup=keyboard_advice, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("celebrities_no_"))
+    @router.prefix("celebrities_no_")
     async def celebrities_no_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Ну их, давай дальше про меня'"""
         await callback_query.answer()
@@ -1284,12 +1004,12 @@ def register_handlers(dp: Dispatcher):
         # Сразу переходим к предложению совета на месяц, как и в ветке с показом примеров
         advice_question = "Хотите получить совет на месяц?"
         keyboard_advice = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=f"show_advice_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Да, дайте совет!", callback_data=pack_callback("show_advice_", user_id))],
         ])
         await callback_query.message.answer(advice_question, reply_markup=keyboard_advice, parse_mode='Markdown')
     
     
-    @dp.callback_query(lambda c: c.data.startswith("maybe_later_"))
+    @router.prefix("maybe_later_")
     async def maybe_later_handler(callback_query, state: FSMContext):
         """Обработчик кнопки 'Может быть позже'"""
         await callback_query.answer()
@@ -1299,12 +1019,12 @@ def register_handlers(dp: Dispatcher):
         later_text = formulations.get_formulation('completion', 'maybe_later')
         
         keyboard_later = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=f"video_anna_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=pack_callback("video_anna_", user_id))],
         ])
         
         await callback_query.message.answer(later_text, reply_markup=keyboard_later, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data == "finish_")
+    @router.exact("finish_")
     async def finish_interaction(callback_query, state: FSMContext):
         """Завершение взаимодействия"""
         await callback_query.answer()
@@ -1315,7 +1035,7 @@ def register_handlers(dp: Dispatcher):
     
     # Обработчики для консультаций
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_options_"))
+    @router.prefix("consultation_options_")
     async def consultation_options_handler(callback_query, state: FSMContext):
         """Показать варианты консультаций"""
         await callback_query.answer()
@@ -1329,33 +1049,18 @@ def register_handlers(dp: Dispatcher):
         # Создаем кнопки для записи
         keyboard_book = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="📞 Записаться на консультацию", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"detailed_analysis_{user_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data=pack_callback("detailed_analysis_", user_id))],
         ])
         
         await callback_query.message.answer(consultation_message, reply_markup=keyboard_book, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("learn_more_"))
+    @router.prefix("learn_more_")
     async def learn_more_handler(callback_query, state: FSMContext):
         """Показать информацию о БаЦзы"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        learn_more_text = (
-            "Хочешь, расскажу, на каком языке с тобой разговаривать, чтобы ты точно сказал \"Да\". "
-            "Как в книге \"Пять языков любви\" у каждого свой язык чувств, так и в Ба-цзы у каждого элемента личности— "
-            "свой язык общения. Хочешь узнать какой твой?"
-        )
-        
-        keyboard_learn = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да", callback_data=f"language_communication_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Может быть позже", callback_data=f"maybe_later_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=f"video_anna_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(learn_more_text, reply_markup=keyboard_learn, parse_mode='Markdown')
+        await SCREENS.get('learn_more', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("language_communication_"))
+    @router.prefix("language_communication_")
     async def language_communication_handler(callback_query, state: FSMContext):
         """Показать язык общения для элемента личности пользователя"""
         await callback_query.answer()
@@ -1363,15 +1068,11 @@ def register_handlers(dp: Dispatcher):
         user_id = callback_query.from_user.id
         
         # Получаем данные пользователя из базы данных
-        user_data = db.get_user(user_id)
-        if not user_data or 'bazi_data' not in user_data or not user_data['bazi_data']:
+        bazi_data = await db.get_chart(user_id)
+        if not bazi_data:
             await callback_query.message.answer("Ошибка: данные пользователя не найдены. Пожалуйста, создайте карту БаЦзы заново.")
             return
         
-        bazi_data = eval(user_data['bazi_data'])
-        element = bazi_data['element']
-        polarity = bazi_data['polarity']
-        
         # Общее введение
         intro_text = (
             "Мы часто говорим: «Он меня не понимает» или «Мы словно на разных языках».\n"
@@ -1384,31 +1085,6 @@ def register_handlers(dp: Dispatcher):
         
         await callback_query.message.answer(intro_text, parse_mode='Markdown')
         
-        # Пауза для чтения
-        await asyncio.sleep(3)
-        
-        # Определяем язык общения для конкретного элемента и полярности
-        language_messages = {
-            "Дерево_Ян": "🌳 **Дерево Ян** — «С тобой следует говорить открыто, прямо и честно — Ты \"топор\" видишь издалека».",
-            "Дерево_Инь": "🌱 **Дерево Инь** — «Тебя нужно увлекать метафорой, романтикой и ты раскроешься и расцветешь».",
-            "Огонь_Ян": "🔥 **Огонь Ян** — «Тебя нужно вдохновить, и ты \"включишь\" все вокруг. Однако договариваться с тобой нужно очень быстро, пока ты \"горишь\" идеей».",
-            "Огонь_Инь": "🔥 **Огонь Инь** — «Комплимент + эмоция! = твоя формула согласия».",
-            "Земля_Ян": "⛰ **Земля Ян** — «Факты, логика, спокойный тон, многочисленные доводы — ключ к доверию. Но без давления, повышения голоса и эмоциональности».",
-            "Земля_Инь": "🏞 **Земля Инь** — «С тобой следует говорить Душевно, Тепло и по-человечески — и ты - союзник».",
-            "Металл_Ян": "⚔️ **Металл Ян** — «С тобой следует говорить Чётко, коротко, фактами. Ты любишь без воды и сантиментов, которые тебя только раздражают».",
-            "Металл_Инь": "💎 **Металл Инь** — «Ты слышишь, когда до тебя доносят информацию Структурно и красиво. Ты ценишь стиль слов и \"фигуры\" речи».",
-            "Вода_Ян": "🌊 **Вода Ян** — «Лучший способ общения с тобой - Говорить о смыслах, глубоко, философски — и ты наполнишься идеями и мотивацией».",
-            "Вода_Инь": "💧 **Вода Инь** — «Лучший способ общения с тобой - Легкая непринужденная беседа, где есть место чувствам, где есть Намёк и Загадка. Недосказанность, чувственность, возможность не ставить точку и не решать все сразу — твой любимый язык»."
-        }
-        
-        element_key = f"{element}_{polarity}"
-        language_message = language_messages.get(element_key, "Язык общения для вашего элемента не найден.")
-        
-        await callback_query.message.answer(language_message, parse_mode='Markdown')
-        
-        # Пауза для чтения языка общения
-        await asyncio.sleep(2)
-        
         # Предложение продолжить
         continue_text = (
             "«Теперь ты знаешь свой язык общения по Ба-цзы 🔮\n"
@@ -1416,18 +1092,21 @@ def register_handlers(dp: Dispatcher):
         )
         
         keyboard_continue = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", callback_data=f"personal_analysis_{user_id}")],
+            [InlineKeyboardButton(text="🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", callback_data=pack_callback("personal_analysis_", user_id))],
             # [InlineKeyboardButton(text="🔘 Научиться читать людей — хочу уметь понимать любого за 5 минут", url="https://your-landing-page.com")],  # Временно отключено - лендинг не готов
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"video_anna_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Поделиться Ботом — пусть друзья тоже узнают свой язык общения!", callback_data="share_bot")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data=f"personal_analysis_{user_id}")],
+            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=pack_callback("video_anna_", user_id))],
+            [InlineKeyboardButton(text="🔘 Поделиться Ботом — пусть друзья тоже узнают свой язык общения!", callback_data=pack_callback("share_bot"))],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data=pack_callback("personal_analysis_", user_id))],
         ])
         
-        await callback_query.message.answer(continue_text, reply_markup=keyboard_continue, parse_mode='Markdown')
+        # Язык общения для элемента и полярности — после паузы для чтения, за ним предложение продолжить
+        await scheduler.schedule(callback_query.message.chat.id, [
+            text_step(3, _bundle(bazi_data).language_text),
+            text_step(2, continue_text, reply_markup=keyboard_continue),
+        ])
     
-    # Обработчики для видео-цепочки
-    # ВАЖНО: более специфичные обработчики должны быть ПЕРЕД общими
-    @dp.callback_query(lambda c: c.data.startswith("video_anna_play_"))
+    # Обработчики для видео-цепочки (video_anna_play_ выбирается раньше video_anna_ как более длинный префикс)
+    @router.prefix("video_anna_play_")
     async def video_anna_play_handler(callback_query, state: FSMContext):
         """Отправка видео Анны Алхим"""
         await callback_query.answer()
@@ -1444,13 +1123,6 @@ def register_handlers(dp: Dispatcher):
                 video=video_file_id,
                 caption="📹 Видео разбор даты рождения Анны Алхим"
             )
-            
-            # Показываем кнопку продолжения
-            keyboard_continue = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🚀 Зарегистрироваться в Космический 2026", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-                [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=f"video_trump_{user_id}")],
-            ])
-            await callback_query.message.answer("Зарегистрироваться в Космический 2026!!!", reply_markup=keyboard_continue)
         except Exception as e:
             # Если не удалось отправить, отправляем ссылку
             error_msg = f"Ошибка при отправке видео: {str(e)}"
@@ -1460,70 +1132,29 @@ def register_handlers(dp: Dispatcher):
                 "📹 Видео: https://t.me/c/2554754176/30\n\n"
                 "💡 Если видео не отображается, перейдите по ссылке."
             )
-            
-            # Предлагаем продолжить
-            keyboard_continue = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🚀 Зарегистрироваться в Космический 2026", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-                [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=f"video_trump_{user_id}")],
-            ])
-            await callback_query.message.answer("Зарегистрироваться в Космический 2026!!!", reply_markup=keyboard_continue)
+        
+        # Показываем кнопку продолжения
+        await SCREENS.get('video_anna_next', user_id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("video_anna_"))
+    @router.prefix("video_anna_")
     async def video_anna_handler(callback_query, state: FSMContext):
         """Видео с разбором Анны Алхим"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        anna_text = (
-            "Ба-цзы — это не только про характер человека и стиль общения. "
-            "Ба-цзы отлично разбирается в Ваших чувствах и мотивах. "
-            "Посмотрим короткое видео на примере даты рождения Анны Алхим, "
-            "которую разбирала после когда-то нашумевшего подкаста?"
-        )
-        
-        # Отправляем текст с кнопками
-        keyboard_anna = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да", callback_data=f"video_anna_play_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Что еще возможно?", callback_data=f"video_trump_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(anna_text, reply_markup=keyboard_anna, parse_mode='Markdown')
+        await SCREENS.get('video_anna', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("video_trump_") and not c.data.startswith("video_trump_play_"))
+    @router.prefix("video_trump_")
     async def video_trump_handler(callback_query, state: FSMContext):
         """Видео с разбором Трампа и Харрис"""
         await callback_query.answer()
+        await SCREENS.get('video_trump_intro').answer(callback_query.message)
         
-        user_id = callback_query.from_user.id
-        
-        # Первое сообщение без кнопок
-        intro_text = (
-            "Ба-цзы - целая карта возможностей:\n"
-            "🔹 показывает, когда действовать, а когда лучше ждать,\n"
-            "🔹 когда твой потенциал роста,\n"
-            "🔹 и какие события могут проявиться в жизни."
-        )
-        
-        await callback_query.message.answer(intro_text, parse_mode='Markdown')
-        
-        # Пауза 2 секунды
-        await asyncio.sleep(2)
-        
-        # Второе сообщение с вопросом и кнопками
-        question_text = (
-            "Посмотрим, Что бы узнал Дональд Трамп или Камала Харрис, "
-            "если пришли ко мне на консультацию перед выборами?"
-        )
-        
-        keyboard_trump = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да", callback_data=f"video_trump_play_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Что еще можно?", callback_data=f"video_bezos_{user_id}")],
+        # Через 2 секунды второе сообщение с вопросом и кнопками
+        question = SCREENS.get('video_trump', callback_query.from_user.id)
+        await scheduler.schedule(callback_query.message.chat.id, [
+            text_step(2, question.text, reply_markup=question.reply_markup),
         ])
-        
-        await callback_query.message.answer(question_text, reply_markup=keyboard_trump, parse_mode='Markdown')
     
-    @dp.callback_query(lambda c: c.data.startswith("video_trump_play_"))
+    @router.prefix("video_trump_play_")
     async def video_trump_play_handler(callback_query, state: FSMContext):
         """Отправка видео Трампа/Харрис"""
         await callback_query.answer()
@@ -1551,16 +1182,9 @@ def register_handlers(dp: Dispatcher):
             )
         
         # Финальные варианты после видео
-        keyboard_final = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Зарегистрироваться в Космический 2026", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-            [InlineKeyboardButton(text="🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", callback_data=f"personal_analysis_{user_id}")],
-            # [InlineKeyboardButton(text="🔘 Научиться читать людей — хочу уметь понимать любого за 5 минут", url="https://your-landing-page.com")],  # Временно отключено - лендинг не готов
-            [InlineKeyboardButton(text="🔘 Поделиться Ботом — пусть друзья тоже узнают информацию о себе!", callback_data="share_bot")],
-            [InlineKeyboardButton(text="🔘 Посмотреть еще что-то", callback_data=f"video_bezos_{user_id}")],
-        ])
-        await callback_query.message.answer("Зарегистрироваться в Космический 2026!!!", reply_markup=keyboard_final)
+        await SCREENS.get('video_trump_next', user_id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("video_bezos_play_"))
+    @router.prefix("video_bezos_play_")
     async def video_bezos_play_handler(callback_query, state: FSMContext):
         """Отправка фото Безоса"""
         await callback_query.answer()
@@ -1588,502 +1212,151 @@ def register_handlers(dp: Dispatcher):
             )
         
         # Варианты после медиа
-        keyboard_continue = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Зарегистрироваться в Космический 2026", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-            [InlineKeyboardButton(text="🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", callback_data=f"personal_analysis_{user_id}")],
-            # [InlineKeyboardButton(text="🔘 Научиться читать людей — хочу уметь понимать любого за 5 минут", url="https://your-landing-page.com")],  # Временно отключено - лендинг не готов
-            [InlineKeyboardButton(text="🔘 Поделиться Ботом — пусть друзья тоже узнают информацию о себе!", callback_data="share_bot")],
-            [InlineKeyboardButton(text="🔘 Посмотреть еще что-то", callback_data=f"video_bazi_{user_id}")],
-        ])
-        await callback_query.message.answer("Зарегистрироваться в Космический 2026!!!", reply_markup=keyboard_continue)
+        await SCREENS.get('video_bezos_next', user_id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("video_bezos_") and not c.data.startswith("video_bezos_play_"))
+    @router.prefix("video_bezos_")
     async def video_bezos_handler(callback_query, state: FSMContext):
         """Видео с разбором Безоса"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        bezos_text = (
-            "Что говорит Ба-цзы о миллиардах и свадьбе Джеффа Безоса?\n\n"
-            "Как карта рождения может подсказать, когда наступает время для больших денег или личных перемен?"
-        )
-        
-        keyboard_bezos = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да", callback_data=f"video_bezos_play_{user_id}")],
-            [InlineKeyboardButton(text="🔘 Посмотреть еще что-то", callback_data=f"video_bazi_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(bezos_text, reply_markup=keyboard_bezos, parse_mode='Markdown')
+        await SCREENS.get('video_bezos', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("video_bazi_"))
+    @router.prefix("video_bazi_")
     async def video_bazi_handler(callback_query, state: FSMContext):
         """Видео о том, что такое Ба-цзы"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        bazi_text = (
-            "Посмотри 3-х минутное видео о том, что такое Ба-цзы"
-        )
-        
-        keyboard_bazi = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Посмотреть видео", url="https://youtube.com/watch?si=21z_vWircn-juc4N&v=C-372XhBoiw&feature=youtu.be")],
-            [InlineKeyboardButton(text="🔘 Посмотреть еще что-то", callback_data=f"final_options_{user_id}")],
-        ])
-        
-        await callback_query.message.answer(bazi_text, reply_markup=keyboard_bazi, parse_mode='Markdown')
+        await SCREENS.get('video_bazi', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("final_options_"))
+    @router.prefix("final_options_")
     async def final_options_handler(callback_query, state: FSMContext):
         """Финальные варианты после просмотра видео"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        # Финальные варианты
-        keyboard_final = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Зарегистрироваться в Космический 2026", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-            [InlineKeyboardButton(text="🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", callback_data=f"personal_analysis_{user_id}")],
-            # [InlineKeyboardButton(text="🔘 Научиться читать людей — хочу уметь понимать любого за 5 минут", url="https://your-landing-page.com")],  # Временно отключено - лендинг не готов
-            [InlineKeyboardButton(text="🔘 Поделиться Ботом — пусть друзья тоже узнают информацию о себе!", callback_data="share_bot")],
-            [InlineKeyboardButton(text="🔘 Посмотреть еще что-то", callback_data="no_more_content")],
-        ])
-        
-        await callback_query.message.answer("Зарегистрироваться в Космический 2026!!!", reply_markup=keyboard_final)
+        await SCREENS.get('final_options', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "no_more_content")
+    @router.exact("no_more_content")
     async def no_more_content_handler(callback_query, state: FSMContext):
         """Сообщение, когда больше нет контента для просмотра"""
         await callback_query.answer()
-        await callback_query.message.answer(
-            "Пока это всё, что есть! Но мы постоянно работаем над новым интересным контентом. "
-            "Скоро здесь появится ещё больше увлекательной информации о Ба-цзы! Следите за обновлениями 😉"
-        )
+        await SCREENS.get('no_more_content').answer(callback_query.message)
     
     
     
-    # Обработчики главного меню
-    @dp.callback_query(lambda c: c.data == "menu_forecasts")
+    # Обработчики главного меню (тексты и клавиатуры — в screens.py)
+    @router.exact("menu_forecasts")
     async def menu_forecasts_handler(callback_query, state: FSMContext):
         """Раздел 'Твои Прогнозы'"""
         await callback_query.answer()
         
-        forecasts_text = (
-            "🔮 *Твои Прогнозы*\n\n"
-            "Здесь вы можете получить персональные прогнозы и рекомендации:\n\n"
-            "• 📅 **Прогноз на год** — что ждет вас в 2025 году\n"
-            "• 🌙 **Ежемесячные советы** — рекомендации на каждый месяц\n"
-            "• ⭐ **Благоприятные периоды** — когда лучше принимать важные решения\n"
-            "• 💼 **Карьерные возможности** — перспективы в работе\n"
-            "• ❤️ **Личные отношения** — прогнозы в любви и дружбе\n\n"
-            "Для получения прогнозов создайте свою карту БаЦзы!"
-        )
+        bazi_data = await db.get_chart(callback_query.from_user.id)
         
-        keyboard_forecasts = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Создать карту БаЦзы", callback_data="start_new")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
+        screen = SCREENS.get('menu_forecasts' if bazi_data else 'menu_forecasts_no_chart')
+        timeline_text = _forecast_timeline_text(bazi_data) if bazi_data else None
+        if timeline_text:
+            forecasts_text = screen.text + timeline_text
+        else:
+            forecasts_text = screen.text + "Для получения прогнозов создайте свою карту БаЦзы!"
         
-        await callback_query.message.answer(forecasts_text, reply_markup=keyboard_forecasts, parse_mode='Markdown')
+        await callback_query.message.answer(forecasts_text, reply_markup=screen.reply_markup, parse_mode=screen.parse_mode)
     
-    @dp.callback_query(lambda c: c.data == "menu_interesting")
+    @router.exact("menu_interesting")
     async def menu_interesting_handler(callback_query, state: FSMContext):
         """Раздел 'Интересное'"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        interesting_text = (
-            "📚 *Интересное*\n\n"
-            "Узнайте больше о Ба-цзы и сохраните все полезное в одном месте:\n\n"
-            "• 🔤 **Язык общения** — ваша персональная ветка с текстами и видео\n"
-            "• 🎥 **Анна Алхим** — короткий видео-разбор\n"
-            "• 🎥 **Трамп / Харрис** — видео перед выборами\n"
-            "• 🖼 **Джефф Безос** — про миллиарды и свадьбу\n"
-            "• ▶️ **Видео о Ба-цзы** — 3 минуты\n"
-            "• 🌟 **Знаменитости** — другие примеры\n\n"
-            "Также здесь собраны материалы из вкладок консультаций:\n"
-            "• 🔮 **Ба-цзы: что это и для чего**\n"
-            "• 🎯 **Какие потребности закрывает**\n"
-            "• 💪 **Чем может существенно помочь**\n"
-            "• 📊 **Для чего чаще всего используется**\n\n"
-            "И быстродоступные ссылки:\n"
-            "• 🚀 **Космический-2026** — регистрация\n"
-            "• 💬 **Консультации: варианты и стоимость**\n"
-            "• 📞 **Забронировать консультацию** или **Задать вопрос**"
-        )
-        
-        keyboard_interesting = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔤 Язык общения", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🎥 Анна Алхим", callback_data=f"video_anna_{user_id}")],
-            [InlineKeyboardButton(text="🎥 Трамп / Харрис", callback_data=f"video_trump_{user_id}")],
-            [InlineKeyboardButton(text="🖼 Джефф Безос", callback_data=f"video_bezos_{user_id}")],
-            [InlineKeyboardButton(text="▶️ Видео о Ба-цзы", callback_data=f"video_bazi_{user_id}")],
-            [InlineKeyboardButton(text="🌟 Знаменитости — ещё примеры", callback_data="interesting_celebrities")],
-            [InlineKeyboardButton(text="🔮 Ба-цзы: что это и для чего", callback_data=f"consultation_what_{user_id}")],
-            [InlineKeyboardButton(text="🎯 Какие потребности закрывает", callback_data=f"consultation_needs_{user_id}")],
-            [InlineKeyboardButton(text="💪 Чем может существенно помочь", callback_data=f"consultation_help_{user_id}")],
-            [InlineKeyboardButton(text="📊 Для чего чаще всего используется", callback_data=f"consultation_usage_{user_id}")],
-            [InlineKeyboardButton(text="🚀 Космический-2026 — регистрация", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-            [InlineKeyboardButton(text="💬 Консультации: варианты и стоимость", callback_data=f"consultation_types_{user_id}")],
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="❓ Задать вопрос", url="https://t.me/Yulia_Skiba")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(interesting_text, reply_markup=keyboard_interesting, parse_mode='Markdown')
+        await SCREENS.get('menu_interesting', callback_query.from_user.id).answer(callback_query.message)
 
     # Раздел «Интересное»: обработчики кнопок
-    @dp.callback_query(lambda c: c.data == "interesting_videos")
+    @router.exact("interesting_videos")
     async def interesting_videos_handler(callback_query, state: FSMContext):
         """Переход к обучающим видео — запускаем цепочку с Анной Алхим"""
         await callback_query.answer()
-        user_id = callback_query.from_user.id
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="▶️ Смотреть пример: Анна Алхим", callback_data=f"video_anna_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data="menu_interesting")],
-        ])
-        await callback_query.message.answer(
-            "Выберите видео:", reply_markup=keyboard
-        )
+        await SCREENS.get('interesting_videos', callback_query.from_user.id).answer(callback_query.message)
 
-    @dp.callback_query(lambda c: c.data == "interesting_articles")
+    @router.exact("interesting_articles")
     async def interesting_articles_handler(callback_query, state: FSMContext):
         """Статьи и кейсы — краткая заглушка с приглашением"""
         await callback_query.answer()
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔙 Назад", callback_data="menu_interesting")],
-        ])
-        await callback_query.message.answer(
-            "Скоро здесь будут разборы и кейсы. А пока можно посмотреть видео-примеры.",
-            reply_markup=keyboard,
-        )
+        await SCREENS.get('interesting_articles').answer(callback_query.message)
 
-    @dp.callback_query(lambda c: c.data == "interesting_celebrities")
+    @router.exact("interesting_celebrities")
     async def interesting_celebrities_handler(callback_query, state: FSMContext):
         """Выбор примеров знаменитостей — ведём в существующие сценарии видео"""
         await callback_query.answer()
-        user_id = callback_query.from_user.id
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Анна Алхим", callback_data=f"video_anna_{user_id}")],
-            [InlineKeyboardButton(text="Дональд Трамп / Камала Харрис", callback_data=f"video_trump_{user_id}")],
-            [InlineKeyboardButton(text="Джефф Безос", callback_data=f"video_bezos_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data="menu_interesting")],
-        ])
-        await callback_query.message.answer(
-            "Выберите пример знаменитости:", reply_markup=keyboard
-        )
+        await SCREENS.get('interesting_celebrities', callback_query.from_user.id).answer(callback_query.message)
 
-    @dp.callback_query(lambda c: c.data == "interesting_compatibility")
+    @router.exact("interesting_compatibility")
     async def interesting_compatibility_handler(callback_query, state: FSMContext):
         """Короткое описание про совместимость + CTA"""
         await callback_query.answer()
-        user_id = callback_query.from_user.id
-        text = (
-            "Совместимость в Ба-цзы показывает, как энергии людей взаимодействуют — где легко, а где лучше прояснить ожидания.\n\n"
-            "Хочешь, подскажу по твоим энергиям?"
-        )
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Получить совет на месяц", callback_data=f"show_advice_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Назад", callback_data="menu_interesting")],
-        ])
-        await callback_query.message.answer(text, reply_markup=keyboard, parse_mode='Markdown')
+        await SCREENS.get('interesting_compatibility', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "menu_consultations")
+    @router.exact("menu_consultations")
     async def menu_consultations_handler(callback_query, state: FSMContext):
         """Раздел 'Консультации' - сразу показывает варианты и стоимость"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        consultations_text = (
-            "💰 *Варианты консультаций и стоимость*\n\n"
-            "🔮 *Фундаментальная консультация Ба-цзы*\n\n"
-            "Помогает познакомиться глубже с собой, понять свои способности, таланты и уникальность. "
-            "Увидеть пространство возможностей в текущий жизненный период и выбрать эффективную персональную стратегию!\n\n"
-            "• от 150 евро/7290 грн.\n\n"
-            "📅 *Общая годовая консультация*\n\n"
-            "Данная консультация - навигатор в персональных энергиях и тенденциях года. "
-            "Вы определите личную годовую стратегию и проложите карту успеха 2026. "
-            "Помогает сфокусироваться на наиболее потенциальных направлениях и не тратить силы на слабые зоны.\n\n"
-            "• от 280 евро/13500 грн.\n\n"
-            "✨ *Расширенная годовая консультация*\n\n"
-            "Эта консультация — ваш Навигатор персональных энергий и тенденций года, а также отдельно каждого месяца. "
-            "Позволяет распланировать, когда и что вы будете делать, чтобы у вас все складывалось более легко и эффективно, "
-            "используя благоприятные энергии месяца для достижения своих годовых целей.\n\n"
-            "• от 300 евро/14490 грн.\n\n"
-            "🌟 *Годовое сопровождение*\n\n"
-            "Это КОМПЛЕКСНОЕ АСТРОЛОГИЧЕСКОЕ СОПРОВОЖДЕНИЕ, аналитика потенциала Вашего времени и энергий на целый год. "
-            "Включает в себя расширенную годовую консультацию в первый месяц после старта сопровождения, "
-            "а также формат ежемесячных рекомендаций, календарей энергий, подборки важных дат и обсуждение обратной связи.\n\n"
-            "• от 700 евро/33810 грн.\n\n"
-            "📝 Забронируйте время консультации, указав правильный электронный адрес, чтобы мы могли с Вами связаться, "
-            "или нажмите на кнопку *Задать вопрос* ниже, для уточнения любых деталей."
-        )
-        
-        keyboard_consultations = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Забронировать консультацию", url="https://calendly.com/kiburo8899/meet-with-me")],
-            [InlineKeyboardButton(text="❓ Задать вопрос", url="https://t.me/Yulia_Skiba")],
-            [InlineKeyboardButton(text="✨ Узнать больше о Ба-цзы", callback_data=f"learn_more_{user_id}")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(consultations_text, reply_markup=keyboard_consultations, parse_mode='Markdown')
+        await SCREENS.get('menu_consultations', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "menu_programs")
+    @router.exact("menu_programs")
     async def menu_programs_handler(callback_query, state: FSMContext):
         """Раздел 'Программы' - регистрация в Космический-2026"""
         await callback_query.answer()
-        
-        programs_text = (
-            "📋 *Программы*\n\n"
-            "🚀 *Программа «Космический-2026»*\n\n"
-            "Узнайте прогнозы на следующий год для себя и получите персональный астропрогноз.\n\n"
-            "Зарегистрируйтесь прямо сейчас!"
-        )
-        
-        keyboard_programs = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Зарегистрироваться в программе «Космический-2026»", url="https://www.yuliyaskiba.com/yourcosmos2026")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(programs_text, reply_markup=keyboard_programs, parse_mode='Markdown')
+        await SCREENS.get('menu_programs').answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "menu_about")
+    @router.exact("menu_about")
     async def menu_about_handler(callback_query, state: FSMContext):
         """Раздел 'Про меня'"""
         await callback_query.answer()
-        
-        about_text = (
-            "👤 *Про меня*\n\n"
-            "**Юлия Скиба** — мастер БаЦзы и астролог\n\n"
-            "• 🎓 **Образование:** Сертифицированный специалист по китайской астрологии\n"
-            "• ⭐ **Опыт:** Более 10 лет практики\n"
-            "• 👥 **Клиенты:** Помогла более 5000 человек\n"
-            "• 🏆 **Достижения:** Автор уникальных методик анализа\n\n"
-            "**Мой подход:**\n"
-            "• Индивидуальный анализ каждой карты\n"
-            "• Практические рекомендации для жизни\n"
-            "• Простое объяснение сложных концепций\n"
-            "• Поддержка на пути к целям\n\n"
-            "**Связь со мной:**\n"
-            "• 📱 Telegram: @твойник\n"
-            "• 📧 Email: info@example.com\n"
-            "• 🌐 Сайт: www.example.com"
-        )
-        
-        keyboard_about = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📱 Связаться", url="https://t.me/Yulia_Skiba")],
-            [InlineKeyboardButton(text="🔘 Хочу консультацию", callback_data=f"consultation_options_{callback_query.from_user.id}")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(about_text, reply_markup=keyboard_about, parse_mode='Markdown')
+        await SCREENS.get('menu_about', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "menu_question")
+    @router.exact("menu_question")
     async def menu_question_handler(callback_query, state: FSMContext):
         """Раздел 'Задать вопрос'"""
         await callback_query.answer()
-        
-        question_text = (
-            "❓ *Задать вопрос*\n\n"
-            "Есть вопросы о БаЦзы или нужна помощь? Я всегда готова ответить!\n\n"
-            "**Частые вопросы:**\n"
-            "• Как работает система БаЦзы?\n"
-            "• Можно ли изменить судьбу?\n"
-            "• Как выбрать лучшее время для важных дел?\n"
-            "• Что делать, если не знаю точное время рождения?\n"
-            "• Как БаЦзы может помочь в карьере?\n\n"
-            "**Способы связи:**\n"
-            "• 💬 Написать в Telegram\n"
-            "• 📞 Позвонить для срочных вопросов\n"
-            "• 📧 Отправить email с подробным описанием"
-        )
-        
-        keyboard_question = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="💬 Написать в Telegram", url="https://t.me/Yulia_Skiba")],
-            [InlineKeyboardButton(text="📞 Позвонить", callback_data="question_call")],
-            [InlineKeyboardButton(text="📧 Email", callback_data="question_email")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(question_text, reply_markup=keyboard_question, parse_mode='Markdown')
+        await SCREENS.get('menu_question').answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "menu_main")
+    @router.exact("menu_main")
     async def menu_main_handler(callback_query, state: FSMContext):
         """Возврат в главное меню"""
         await callback_query.answer()
-        
-        menu_text = (
-            "🏠 *Главное меню*\n\n"
-            "Выберите интересующий вас раздел:"
-        )
-        
-        keyboard_menu = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔮 Твои Прогнозы", callback_data="menu_forecasts")],
-            [InlineKeyboardButton(text="📚 Интересное", callback_data="menu_interesting")],
-            [InlineKeyboardButton(text="💬 Консультации", callback_data="menu_consultations")],
-            [InlineKeyboardButton(text="📋 Программы", callback_data="menu_programs")],
-            [InlineKeyboardButton(text="👤 Про меня", callback_data="menu_about")],
-            [InlineKeyboardButton(text="❓ Задать вопрос", callback_data="menu_question")],
-            [InlineKeyboardButton(text="🔘 Создать карту БаЦзы", callback_data="start_new")],
-            [InlineKeyboardButton(text="📤 Поделись ботом", callback_data="share_bot")],
-        ])
-        
-        await callback_query.message.answer(menu_text, reply_markup=keyboard_menu, parse_mode='Markdown')
+        await SCREENS.get('menu_main').answer(callback_query.message)
     
     # Обработчики консультаций
-    @dp.callback_query(lambda c: c.data.startswith("consultation_individual_"))
+    @router.prefix("consultation_individual_")
     async def consultation_individual_handler(callback_query, state: FSMContext):
         """Индивидуальная консультация"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        individual_text = (
-            "🔮 *Индивидуальная консультация*\n\n"
-            "**Что включает:**\n"
-            "• Полный анализ вашей карты БаЦзы\n"
-            "• Определение сильных сторон и талантов\n"
-            "• Рекомендации по карьере и отношениям\n"
-            "• Прогноз на ближайшие годы\n"
-            "• Ответы на ваши вопросы\n\n"
-            "**Длительность:** 60-90 минут\n"
-            "**Формат:** Онлайн или очно\n"
-            "**Результат:** Персональный план развития"
-        )
-        
-        keyboard_individual = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📞 Записаться на консультацию", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="ℹ️ Подробнее", callback_data=f"consultation_individual_details_{user_id}")],
-            [InlineKeyboardButton(text="🔙 К консультациям", callback_data="menu_consultations")],
-        ])
-        
-        await callback_query.message.answer(individual_text, reply_markup=keyboard_individual, parse_mode='Markdown')
+        await SCREENS.get('consultation_individual', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_cosmic_"))
+    @router.prefix("consultation_cosmic_")
     async def consultation_cosmic_handler(callback_query, state: FSMContext):
         """Программа «Космический-2026»"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        cosmic_text = (
-            "🚀 *Программа «Космический-2026»*\n\n"
-            "**Что включает:**\n"
-            "• Детальный прогноз на 2026 год\n"
-            "• Благоприятные периоды для важных решений\n"
-            "• Карьерные возможности и риски\n"
-            "• Личные отношения и здоровье\n"
-            "• Рекомендации по месяцам\n\n"
-            "**Формат:** Групповая программа с персональными прогнозами\n"
-            "**Длительность:** 3 месяца\n"
-            "**Результат:** Полное понимание своего года"
-        )
-        
-        keyboard_cosmic = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Записаться на программу", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="ℹ️ Подробнее", callback_data=f"consultation_cosmic_details_{user_id}")],
-            [InlineKeyboardButton(text="🔙 К консультациям", callback_data="menu_consultations")],
-        ])
-        
-        await callback_query.message.answer(cosmic_text, reply_markup=keyboard_cosmic, parse_mode='Markdown')
+        await SCREENS.get('consultation_cosmic', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data.startswith("consultation_learn_"))
+    @router.prefix("consultation_learn_")
     async def consultation_learn_handler(callback_query, state: FSMContext):
         """Обучиться анализу БаЦзы"""
         await callback_query.answer()
-        
-        user_id = callback_query.from_user.id
-        
-        learn_text = (
-            "📚 *Обучиться анализу БаЦзы*\n\n"
-            "**Что включает:**\n"
-            "• Основы системы БаЦзы\n"
-            "• Как читать карты рождения\n"
-            "• Анализ элементов и их взаимодействие\n"
-            "• Практические упражнения\n"
-            "• Разбор реальных кейсов\n\n"
-            "**Формат:** Онлайн-курс с практикой\n"
-            "**Длительность:** 6 недель\n"
-            "**Результат:** Самостоятельный анализ карт БаЦзы"
-        )
-        
-        keyboard_learn = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📚 Записаться на обучение", url="https://t.me/твойник")],
-            [InlineKeyboardButton(text="ℹ️ Подробнее", callback_data=f"consultation_learn_details_{user_id}")],
-            [InlineKeyboardButton(text="🔙 К консультациям", callback_data="menu_consultations")],
-        ])
-        
-        await callback_query.message.answer(learn_text, reply_markup=keyboard_learn, parse_mode='Markdown')
+        await SCREENS.get('consultation_learn', callback_query.from_user.id).answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "share_bot")
+    @router.exact("share_bot")
     async def share_bot_handler(callback_query, state: FSMContext):
         """Поделись ботом с друзьями"""
         await callback_query.answer()
-        
-        share_text = (
-            "📤 *Поделись ботом с друзьями*\n\n"
-            "Помогите близким узнать больше о себе и получить персональные прогнозы!\n\n"
-            "**Что получат ваши друзья:**\n"
-            "• 🔮 Персональную карту БаЦзы\n"
-            "• 📅 Прогнозы на год и месяц\n"
-            "• 💼 Рекомендации по карьере\n"
-            "• ❤️ Советы по отношениям\n"
-            "• 🎯 Понимание своих талантов\n\n"
-            "**Как поделиться:**\n"
-            "• Скопируйте ссылку на бота\n"
-            "• Отправьте другу в Telegram\n"
-            "• Или поделитесь через кнопку ниже"
-        )
-        
-        keyboard_share = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📤 Поделиться ссылкой", url="https://t.me/KiByro_bot?start=share")],
-            [InlineKeyboardButton(text="📋 Скопировать ссылку", callback_data="copy_link")],
-            [InlineKeyboardButton(text="🔙 Главное меню", callback_data="menu_main")],
-        ])
-        
-        await callback_query.message.answer(share_text, reply_markup=keyboard_share, parse_mode='Markdown')
+        await SCREENS.get('share_bot').answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "copy_link")
+    @router.exact("copy_link")
     async def copy_link_handler(callback_query, state: FSMContext):
         """Скопировать ссылку на бота"""
         await callback_query.answer()
-        
-        bot_link = "https://t.me/KiByro_bot?start=share"
-        
-        copy_text = (
-            f"🔗 *Ссылка на бота:*\n\n"
-            f"`{bot_link}`\n\n"
-            f"**Как использовать:**\n"
-            f"• Скопируйте ссылку выше\n"
-            f"• Отправьте другу в Telegram\n"
-            f"• Или поделитесь через кнопку 'Поделиться'"
-        )
-        
-        keyboard_copy = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📤 Поделиться", url=f"https://t.me/share/url?url={bot_link}&text=🔮%20Узнай%20свою%20карту%20БаЦзы%20и%20получи%20персональные%20прогнозы!")],
-            [InlineKeyboardButton(text="🔙 К поделиться", callback_data="share_bot")],
-        ])
-        
-        await callback_query.message.answer(copy_text, reply_markup=keyboard_copy, parse_mode='Markdown')
+        await SCREENS.get('copy_link').answer(callback_query.message)
     
-    @dp.callback_query(lambda c: c.data == "start_new")
+    @router.exact("start_new")
     async def start_new_handler(callback_query, state: FSMContext):
         """Начать создание новой карты"""
         await callback_query.answer()
-        
-        welcome_text = (
-            "👋 «Здравствуйте! Я — ассистент Юлии Скибы и ваш персональный помощник по БаЦзы. "
-            "Хотите узнать больше о Себе и получить полезные рекомендации?»"
-        )
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔘 Да, хочу", callback_data="yes_want")],
-        ])
-        
-        await callback_query.message.answer(welcome_text, reply_markup=keyboard)
+        await SCREENS.get('start_new').answer(callback_query.message)
         await state.set_state(UserStates.waiting_for_choice)
+    
+    router.attach(dp)
 
 def _validate_date(date_str: str) -> bool:
     """Простая валидация даты"""
@@ -2122,18 +1395,60 @@ def _validate_time(time_str: str) -> bool:
     except:
         return False
 
-async def _calculate_and_send_bazi(message: Message, birth_date: str, birth_time: str, birth_city: str):
-    """Расчет и отправка результата БаЦзы"""
+def _bundle(bazi_data: Dict) -> ElementBundle:
+    """Готовые ответы для элемента личности из карты"""
+    return element_bundles[bundle_key(bazi_data['element'], bazi_data['polarity'])]
+
+def _pillar_caption(pillar) -> str:
+    """'丙午 — Огонь Ян, Лошадь'"""
+    stem = bazi_calc.heavenly_stems[pillar.stem]
+    return f"{pillar.stem}{pillar.branch} — {stem['element']} {stem['polarity']}, {bazi_calc.year_animals[pillar.branch]}"
+
+
+def _forecast_timeline_text(bazi_data: Dict, years: int = 3) -> Optional[str]:
+    """
+    Текущий такт удачи и столпы ближайших лет для раздела прогнозов
+    Генераторы калькулятора ленивые — считаем только то, что показываем
+    """
+    try:
+        current_year = datetime.now().year
+        current = None
+        for luck in bazi_calc.luck_pillars(bazi_data):
+            if luck.start_year > current_year:
+                current = current or luck
+                break
+            current = luck
+        annual = islice(bazi_calc.annual_pillars(bazi_data, current_year), years)
+    except Exception as e:
+        print(f"⚠️ Не удалось рассчитать такты удачи: {e}")
+        return None
+    
+    started = "начался" if current.start_year <= current_year else "начнется"
+    lines = [
+        "🧭 *Такт удачи (10 лет):*",
+        _pillar_caption(current.pillar),
+        f"{started} в {current.start_year} году",
+        "",
+        "📅 *Энергии ближайших лет:*",
+    ]
+    lines += [f"• {item.year}: {_pillar_caption(item.pillar)}" for item in annual]
+    return "\n".join(lines)
+
+
+async def _calculate_and_send_bazi(message: Message, birth_date: str, birth_time: str, birth_city: str,
+                                   intro_steps: List[MessageStep] = ()):
+    """Расчет и отправка результата БаЦзы; intro_steps — отложенные сообщения перед результатом"""
     try:
         # Рассчитываем БаЦзы
-        result = bazi_calc.calculate_bazi(birth_date, birth_time, birth_city)
+        result = chart_memo.calculate_bazi(birth_date, birth_time, birth_city)
+        chart_verifier.maybe_verify(result)
         
         # Сохраняем результат в базе данных
         user_id = message.from_user.id
-        db.save_bazi_data(user_id, str(result))
+        await db.save_bazi_data(user_id, result)
         
-        # Отправляем результат пошагово
-        await _send_bazi_result_step_by_step(message, result)
+        # Результат уходит через очередь отложенных сообщений следом за intro_steps
+        await scheduler.schedule(message.chat.id, [*intro_steps, _bazi_result_step(user_id, result)])
         
     except Exception as e:
         await message.answer(
@@ -2141,10 +1456,8 @@ async def _calculate_and_send_bazi(message: Message, birth_date: str, birth_time
             "Пожалуйста, попробуйте еще раз или обратитесь к администратору."
         )
 
-async def _send_bazi_result_step_by_step(message: Message, result: Dict):
-    """Пошаговая отправка результата БаЦзы"""
-    user_id = message.from_user.id
-    
+def _bazi_result_step(user_id: int, result: Dict) -> MessageStep:
+    """Первый шаг результата БаЦзы: карта и вопрос о продолжении"""
     # Шаг 1: Основная информация
     step1_text = (
         f"{formulations.get_formulation('results', 'card_ready')}\n\n"
@@ -2157,8 +1470,8 @@ async def _send_bazi_result_step_by_step(message: Message, result: Dict):
     )
     
     keyboard1 = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔘 Да, расскажите!", callback_data=f"personality_desc_{user_id}")],
-        [InlineKeyboardButton(text="🔘 Сразу подсказку на месяц", callback_data=f"show_advice_{user_id}")],
+        [InlineKeyboardButton(text="🔘 Да, расскажите!", callback_data=pack_callback("personality_desc_", user_id))],
+        [InlineKeyboardButton(text="🔘 Сразу подсказку на месяц", callback_data=pack_callback("show_advice_", user_id))],
     ])
     
-    await message.answer(step1_text, reply_markup=keyboard1, parse_mode='Markdown')
+    return text_step(0, step1_text, reply_markup=keyboard1)
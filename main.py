@@ -1,14 +1,14 @@
 """
 Упрощенный бот БаЦзы
-Работает только с mingli.ru и извлекает элемент личности из колонки "ДЕНЬ", верхняя клеточка
+Считает карту локально и извлекает элемент личности из колонки "ДЕНЬ", верхняя клеточка
 """
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
-from handlers import register_handlers
-from config import BOT_TOKEN
+from handlers import register_handlers, db, chart_verifier, chart_memo, scheduler
+from pg_storage import PostgresStorage
+from config import BOT_TOKEN, FSM_HOT_SIZE, FSM_HOT_TTL, FSM_FLUSH_INTERVAL, CHART_MEMO_WARMUP
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -17,20 +17,40 @@ async def main():
     """Основная функция бота"""
     # Создаем бота и диспетчер
     bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher(storage=MemoryStorage())
+    # Состояния диалогов переживают перезапуск: хранятся в user_sessions
+    storage = PostgresStorage(db, hot_size=FSM_HOT_SIZE, hot_ttl=FSM_HOT_TTL, flush_interval=FSM_FLUSH_INTERVAL)
+    dp = Dispatcher(storage=storage)
+    
+    # Проверяем, что схема базы данных актуальна (миграции: python migrations.py)
+    await db.check_schema()
+    db.start()
+    storage.start()
+    # Отложенные сообщения, оставшиеся в очереди с прошлого запуска, отправятся сразу
+    scheduler.start(bot)
     
     # Регистрируем обработчики
     register_handlers(dp)
     
+    if CHART_MEMO_WARMUP:
+        # Карты на все даты для «не знаю времени» — около секунды при включенной таблице дат
+        count = chart_memo.warm_up()
+        print(f"🔥 Кэш карт прогрет: {count} дат")
+    
     # Запускаем бота
     print("🤖 Упрощенный бот БаЦзы запущен!")
-    print("📊 Работает только с mingli.ru")
+    print("📊 Расчет локальный, сверка с mingli.ru — выборочно (CHART_VERIFY_SAMPLE_RATE)")
     print("🎯 Извлекает элемент личности из колонки 'ДЕНЬ', верхняя клеточка")
     
     try:
         await dp.start_polling(bot)
     finally:
+        # Очередь останавливается до закрытия сессии бота и базы: неотправленное остается в scheduled_messages
+        await scheduler.close()
         await bot.session.close()
+        await chart_verifier.close()
+        # Хранилище обычно уже закрыто диспетчером, повторный вызов ничего не делает
+        await storage.close()
+        await db.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,279 @@
+"""
+Отложенная отправка сообщений
+Обработчик ставит в очередь цепочку шагов с паузами и сразу завершается, отправляет их один фоновый цикл
+Очередь — таблица scheduled_messages: недоотправленные цепочки переживают перезапуск бота
+Если база недоступна, шаги ждут в памяти процесса и при остановке переносятся в базу
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+
+class MessageStep(NamedTuple):
+    """Шаг цепочки: пауза после предыдущего шага (секунды) и что отправить"""
+    delay: float
+    payload: Dict[str, Any]
+
+
+class ScheduledMessage(NamedTuple):
+    """Сообщение в очереди (порядок полей — как в scheduled_messages)"""
+    chat_id: int
+    due_at: datetime
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+
+def text_step(delay: float, text: str, parse_mode: Optional[str] = 'Markdown',
+              reply_markup: InlineKeyboardMarkup = None) -> MessageStep:
+    """Текстовое сообщение; клавиатура хранится в очереди как JSON"""
+    payload = {'method': 'message', 'text': text, 'parse_mode': parse_mode}
+    if reply_markup is not None:
+        payload['reply_markup'] = reply_markup.model_dump(exclude_none=True)
+    return MessageStep(delay, payload)
+
+
+def voice_step(delay: float, voice: str, caption: Optional[str] = None) -> MessageStep:
+    """Голосовое сообщение по file_id"""
+    return MessageStep(delay, {'method': 'voice', 'voice': voice, 'caption': caption})
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MessageScheduler:
+    """
+    Очередь отложенных сообщений с фоновой отправкой:
+
+        await scheduler.schedule(chat_id, [
+            text_step(8, additional_text),
+            text_step(5, question_text, reply_markup=keyboard),
+        ])
+
+    Шаги одного чата уходят строго по очереди, разные чаты — параллельно
+    Сообщение из базы удаляется до отправки: при падении процесса оно может потеряться, но не придет дважды
+    """
+
+    def __init__(self, db=None, poll_interval: float = 0.5, batch_size: int = 100,
+                 max_attempts: int = 3, retry_delay: float = 5.0):
+        # db — AsyncDatabase; без нее очередь только в памяти
+        self.db = db
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.bot: Optional[Bot] = None
+
+        # Очередь в памяти: (срок, номер постановки, сообщение)
+        self._local: List[Tuple[datetime, int, ScheduledMessage]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.local_enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def start(self, bot: Bot):
+        """Запустить фоновую отправку (вызывать внутри работающего цикла событий)"""
+        self.bot = bot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def schedule(self, chat_id: int, steps: Sequence[MessageStep]) -> int:
+        """Поставить цепочку в очередь; паузы отсчитываются от предыдущего шага, первая — от текущего момента"""
+        if self._closing:
+            raise RuntimeError("Очередь отложенных сообщений уже закрыта")
+        due_at = _now()
+        messages = []
+        for step in steps:
+            due_at += timedelta(seconds=step.delay)
+            messages.append(ScheduledMessage(chat_id, due_at, step.payload))
+        if not messages:
+            return 0
+        await self._store(messages)
+        self.enqueued += len(messages)
+        return len(messages)
+
+    async def _store(self, messages: List[ScheduledMessage]):
+        if self.db is not None:
+            try:
+                await self.db.schedule_messages(messages)
+                return
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Очередь сообщений в базе недоступна, %d шагов ждут в памяти: %s", len(messages), e)
+        for message in messages:
+            heapq.heappush(self._local, (message.due_at, next(self._counter), message))
+        self.local_enqueued += len(messages)
+        # Срок нового шага может наступить раньше, чем цикл проснется сам
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            timeout = self.poll_interval
+            if self._local:
+                timeout = min(timeout, max(0.0, (self._local[0][0] - _now()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.dispatch_due()
+            except Exception as e:
+                logger.error("Ошибка отправки отложенных сообщений: %s", e)
+
+    async def dispatch_due(self) -> int:
+        """Отправить сообщения, срок которых наступил; вернуть число отправленных"""
+        async with self._send_lock:
+            now = _now()
+            due = []
+            while self._local and self._local[0][0] <= now:
+                due.append(heapq.heappop(self._local)[2])
+            if self.db is not None:
+                try:
+                    claimed = await self.db.claim_scheduled_messages(now, self.batch_size)
+                except Exception as e:
+                    self.failures += 1
+                    logger.error("Не удалось забрать отложенные сообщения из базы: %s", e)
+                else:
+                    due.extend(ScheduledMessage(*row) for row in claimed)
+                    if len(claimed) >= self.batch_size:
+                        # После простоя очередь длиннее пачки: следующую забираем без паузы
+                        self._wakeup.set()
+            if not due:
+                return 0
+
+            # Сортировка устойчивая: шаги с одинаковым сроком остаются в порядке постановки
+            due.sort(key=lambda message: message.due_at)
+            chats: Dict[int, List[ScheduledMessage]] = {}
+            for message in due:
+                chats.setdefault(message.chat_id, []).append(message)
+            sent = await asyncio.gather(*(self._send_chat(messages) for messages in chats.values()))
+            return sum(sent)
+
+    async def _send_chat(self, messages: List[ScheduledMessage]) -> int:
+        sent = 0
+        for index, message in enumerate(messages):
+            try:
+                await self._send(message)
+            except TelegramRetryAfter as e:
+                # Ограничение Telegram: вся оставшаяся цепочка сдвигается, попытка не засчитывается
+                await self._retry(messages[index:], e.retry_after, count_attempt=False)
+                return sent
+            except TelegramForbiddenError:
+                # Пользователь заблокировал бота — остаток цепочки не нужен
+                self.dropped += len(messages) - index
+                return sent
+            except TelegramBadRequest as e:
+                # Повтор не поможет (разметка, устаревший file_id) — пропускаем только этот шаг
+                self.dropped += 1
+                logger.error("Отложенное сообщение в чат %s отклонено: %s", message.chat_id, e)
+                continue
+            except Exception as e:
+                if message.attempts + 1 >= self.max_attempts:
+                    self.dropped += 1
+                    logger.error("Отложенное сообщение в чат %s не отправлено за %d попыток: %s",
+                                 message.chat_id, self.max_attempts, e)
+                    continue
+                logger.warning("Ошибка отправки в чат %s, повтор через %.0f с: %s",
+                               message.chat_id, self.retry_delay, e)
+                await self._retry(messages[index:], self.retry_delay)
+                return sent
+            sent += 1
+            self.sent += 1
+        return sent
+
+    async def _send(self, message: ScheduledMessage):
+        payload = message.payload
+        method = payload['method']
+        if method == 'message':
+            markup = payload.get('reply_markup')
+            await self.bot.send_message(
+                message.chat_id,
+                payload['text'],
+                parse_mode=payload.get('parse_mode'),
+                reply_markup=InlineKeyboardMarkup.model_validate(markup) if markup else None
+            )
+        elif method == 'voice':
+            await self.bot.send_voice(message.chat_id, payload['voice'], caption=payload.get('caption'))
+        else:
+            raise ValueError(f"Неизвестный тип отложенного сообщения: {method!r}")
+
+    async def _retry(self, messages: List[ScheduledMessage], delay: float, count_attempt: bool = True):
+        """
+        Вернуть остаток цепочки в очередь, сохранив паузы между шагами
+        Шаги чата, которые еще ждут в очереди, сдвигаются так же, чтобы не обогнать повтор
+        """
+        chat_id = messages[0].chat_id
+        shift = _now() + timedelta(seconds=delay) - messages[0].due_at
+        self._postpone_local(chat_id, shift)
+        if self.db is not None:
+            try:
+                await self.db.postpone_scheduled_messages(chat_id, shift)
+            except Exception as e:
+                self.failures += 1
+                logger.error("Не удалось сдвинуть отложенные сообщения чата %s: %s", chat_id, e)
+
+        first, *rest = messages
+        retry = [first._replace(due_at=first.due_at + shift, attempts=first.attempts + int(count_attempt))]
+        retry += [message._replace(due_at=message.due_at + shift) for message in rest]
+        self.retried += len(retry)
+        await self._store(retry)
+
+    def _postpone_local(self, chat_id: int, shift: timedelta):
+        if not any(message.chat_id == chat_id for _, _, message in self._local):
+            return
+        self._local = [
+            (due_at + shift, number, message._replace(due_at=due_at + shift)) if message.chat_id == chat_id
+            else (due_at, number, message)
+            for due_at, number, message in self._local
+        ]
+        heapq.heapify(self._local)
+
+    async def close(self):
+        """Остановить отправку; шаги из памяти перенести в базу, чтобы их отправил следующий запуск"""
+        self._closing = True
+        if self._task is not None:
+            # Забранную из базы пачку не бросаем на середине
+            async with self._send_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._local and self.db is not None:
+            messages = [entry[2] for entry in sorted(self._local)]
+            try:
+                await self.db.schedule_messages(messages)
+            except Exception as e:
+                logger.error("%d отложенных сообщений не сохранены при остановке: %s", len(messages), e)
+            else:
+                self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'local': len(self._local),
+            'enqueued': self.enqueued,
+            'local_enqueued': self.local_enqueued,
+            'sent': self.sent,
+            'retried': self.retried,
+            'dropped': self.dropped,
+            'failures': self.failures,
+        }
@@ -0,0 +1,224 @@
+"""
+Версионные миграции схемы базы данных
+Запускаются один раз при деплое: python migrations.py
+"""
+import logging
+import os
+from typing import Optional
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from bazi_chart import encode_chart, parse_legacy_chart
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory lock, чтобы два процесса не применяли миграции одновременно
+MIGRATION_LOCK_ID = 72_616_101
+
+
+class SchemaVersionError(Exception):
+    """Схема базы отстает от версии, которую ожидает код"""
+
+
+class MigrationDataError(Exception):
+    """Строки, которые миграция не может перенести сама; транзакция миграции откатывается"""
+
+
+def _migration_1(cursor):
+    """Базовые таблицы users и user_sessions"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT PRIMARY KEY,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            contact_name VARCHAR(255),
+            contact_email VARCHAR(255),
+            contact_phone VARCHAR(255),
+            birth_date VARCHAR(255),
+            birth_time VARCHAR(255),
+            birth_city VARCHAR(255),
+            timezone VARCHAR(255),
+            bazi_data TEXT,
+            personality_type VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Базы, созданные до появления этих колонок
+    for column in ['contact_name', 'contact_email', 'contact_phone', 'personality_type']:
+        cursor.execute(f'ALTER TABLE users ADD COLUMN IF NOT EXISTS {column} VARCHAR(255)')
+    cursor.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS bazi_data TEXT')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            user_id BIGINT,
+            step VARCHAR(255),
+            data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+
+
+def _migration_2(cursor, batch_size: int = 1000):
+    """
+    JSONB-колонка bazi_chart и перенос старых значений bazi_data (str(dict))
+    Строки читаются серверным курсором пачками, таблица целиком в память не попадает
+    Если хоть одно значение не разбирается, миграция падает со списком user_id и ничего не записывает
+    """
+    cursor.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS bazi_chart JSONB')
+
+    converted = 0
+    failed = []
+    with cursor.connection.cursor(name='migration_2_bazi_data') as source:
+        source.itersize = batch_size
+        source.execute('''
+            SELECT user_id, bazi_data FROM users
+            WHERE bazi_chart IS NULL AND bazi_data IS NOT NULL AND bazi_data <> ''
+        ''')
+        while True:
+            rows = source.fetchmany(batch_size)
+            if not rows:
+                break
+            updates = []
+            for user_id, bazi_data in rows:
+                try:
+                    updates.append((user_id, Json(encode_chart(parse_legacy_chart(bazi_data)))))
+                except (ValueError, SyntaxError, TypeError, AttributeError) as e:
+                    logger.error("Не удалось перенести bazi_data пользователя %s: %s", user_id, e)
+                    failed.append(user_id)
+            if updates:
+                execute_values(cursor, '''
+                    UPDATE users AS u SET bazi_chart = v.chart
+                    FROM (VALUES %s) AS v (user_id, chart)
+                    WHERE u.user_id = v.user_id
+                ''', updates, template='(%s, %s::jsonb)', page_size=batch_size)
+                converted += len(updates)
+
+    if failed:
+        shown = ', '.join(str(user_id) for user_id in failed[:20])
+        more = f" и еще {len(failed) - 20}" if len(failed) > 20 else ''
+        raise MigrationDataError(
+            f"bazi_data не разбирается у {len(failed)} пользователей: {shown}{more}. "
+            f"Исправьте или очистите эти значения и запустите миграции снова"
+        )
+    logger.info("Перенесено карт БаЦзы в JSONB: %d", converted)
+
+
+def _migration_3(cursor):
+    """user_sessions под хранилище FSM: одна строка на ключ, данные в JSONB, без связи с users"""
+    cursor.execute('ALTER TABLE user_sessions RENAME TO user_sessions_old')
+    cursor.execute('''
+        CREATE TABLE user_sessions (
+            storage_key VARCHAR(255) PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            step VARCHAR(255),
+            data JSONB NOT NULL DEFAULT '{}'::jsonb,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX user_sessions_user_id_idx ON user_sessions (user_id)')
+
+    # Из старых записей оставляем последнюю на пользователя
+    cursor.execute('''
+        INSERT INTO user_sessions (storage_key, user_id, step, data)
+        SELECT DISTINCT ON (user_id) 'session:' || user_id, user_id, step, COALESCE(data, '{}')::jsonb
+        FROM user_sessions_old
+        WHERE user_id IS NOT NULL
+        ORDER BY user_id, created_at DESC
+    ''')
+    cursor.execute('DROP TABLE user_sessions_old')
+
+
+def _migration_4(cursor):
+    """Очередь отложенных сообщений: обработчики не ждут пауз между сообщениями, цепочки переживают перезапуск"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scheduled_messages (
+            id BIGSERIAL PRIMARY KEY,
+            chat_id BIGINT NOT NULL,
+            due_at TIMESTAMPTZ NOT NULL,
+            payload JSONB NOT NULL,
+            attempts SMALLINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS scheduled_messages_due_idx ON scheduled_messages (due_at, id)')
+
+
+# (версия, описание, функция) — только дописывать в конец, уже примененные не менять
+MIGRATIONS = [
+    (1, 'Базовые таблицы users и user_sessions', _migration_1),
+    (2, 'JSONB-колонка bazi_chart', _migration_2),
+    (3, 'user_sessions для хранилища состояний FSM', _migration_3),
+    (4, 'Очередь отложенных сообщений scheduled_messages', _migration_4),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor) -> int:
+    """Текущая версия схемы (0, если миграции еще не запускались)"""
+    cursor.execute("SELECT to_regclass('schema_version')")
+    if cursor.fetchone()[0] is None:
+        return 0
+    cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+    return cursor.fetchone()[0]
+
+
+def check_schema(cursor):
+    """Дешевая проверка при старте бота: схема не старее кода"""
+    version = get_schema_version(cursor)
+    if version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Версия схемы {version}, ожидается {SCHEMA_VERSION}. Запустите: python migrations.py"
+        )
+    return version
+
+
+def migrate(database_url: Optional[str] = None) -> int:
+    """Применить все недостающие миграции, каждую в своей транзакции"""
+    database_url = database_url or os.getenv('DATABASE_URL', 'postgresql://localhost/bazi_bot')
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_ID,))
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(255),
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.commit()
+
+            current = get_schema_version(cursor)
+            for version, description, apply in MIGRATIONS:
+                if version <= current:
+                    continue
+                print(f"🔧 Миграция {version}: {description}")
+                apply(cursor)
+                cursor.execute(
+                    'INSERT INTO schema_version (version, description) VALUES (%s, %s)',
+                    (version, description)
+                )
+                conn.commit()
+                current = version
+
+            cursor.execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_ID,))
+            conn.commit()
+        print(f"✅ Версия схемы: {current}")
+        return current
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    from config import DATABASE_URL
+    logging.basicConfig(level=logging.INFO)
+    migrate(DATABASE_URL)
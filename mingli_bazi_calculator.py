@@ -1,18 +1,88 @@
-import requests
 import re
-from datetime import datetime
+import logging
 from typing import Dict, Optional
-import json
+
+from bazi_chart import Chart, stem_for
+from chart_cache import ChartCache, make_key
+from day_pillars import BRANCHES
+from four_pillars import year_branch_index
+from mingli_client import MingliClient
+
+logger = logging.getLogger(__name__)
+
+# Таблицы страницы: быстрый поиск по '<', без разбора остального HTML
+_TABLE_RE = re.compile(r'<table\b.*?</table>', re.IGNORECASE | re.DOTALL)
+
+# Все, что нужно внутри таблицы, за один проход: заголовки колонок, стволы и ветви
+# Опережающая проверка первого символа пропускает остальной текст без перебора альтернатив
+_PILLAR_TOKEN_RE = re.compile(
+    r'(?=[ЧДМГ甲乙丙丁戊己庚辛壬癸子丑寅卯辰巳午未申酉戌亥])'
+    r'(?:(?<!\w)(?P<header>ЧАС|ДЕНЬ|МЕСЯЦ|ГОД)(?!\w)'
+    r'|(?P<stem>[甲乙丙丁戊己庚辛壬癸])'
+    r'|(?P<branch>[子丑寅卯辰巳午未申酉戌亥]))',
+    re.IGNORECASE
+)
+
+PILLAR_NAMES = {'ЧАС': 'hour', 'ДЕНЬ': 'day', 'МЕСЯЦ': 'month', 'ГОД': 'year'}
+
+
+def _scan_pillars(fragment: str) -> Optional[Dict[str, tuple]]:
+    """Четыре заголовка подряд, затем стволы (верхний ряд) и ветви (нижний ряд) в том же порядке"""
+    headers = []
+    stems = []
+    branches = []
+    for match in _PILLAR_TOKEN_RE.finditer(fragment):
+        kind = match.lastgroup
+        if not stems:
+            # Шапка — последние четыре заголовка перед первым стволом (подписи выше не в счет)
+            if kind == 'header':
+                headers = (headers + [PILLAR_NAMES[match.group().upper()]])[-4:]
+                continue
+            if kind == 'branch':
+                continue
+            if len(set(headers)) < 4:
+                # Ствол до полной шапки — это еще не таблица столпов
+                headers = []
+                continue
+        if kind == 'stem' and len(stems) < 4:
+            stems.append(match.group())
+        elif kind == 'branch' and len(branches) < 4:
+            branches.append(match.group())
+        if len(stems) == 4 and len(branches) == 4:
+            break
+
+    if len(headers) < 4 or not stems:
+        return None
+    stems += [None] * (4 - len(stems))
+    branches += [None] * (4 - len(branches))
+    return {name: (stems[i], branches[i]) for i, name in enumerate(headers)}
+
+
+def parse_pillars(html_content: str) -> Optional[Dict[str, tuple]]:
+    """
+    Столпы из таблицы БаЦзы: {'hour'|'day'|'month'|'year': (ствол, ветвь)}
+    Просматривается только первая таблица со столпами; если таблиц нет — вся страница
+    None, если столпы не найдены
+    """
+    has_tables = False
+    for table in _TABLE_RE.finditer(html_content):
+        has_tables = True
+        pillars = _scan_pillars(table.group())
+        if pillars is not None:
+            return pillars
+    if has_tables:
+        return None
+    return _scan_pillars(html_content)
+
 
 class MingliBaziCalculator:
     """Интеграция с калькулятором БаЦзы mingli.ru"""
     
-    def __init__(self):
-        self.base_url = "https://www.mingli.ru"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, client: MingliClient = None, cache: ChartCache = None):
+        # Общий асинхронный клиент: одна сессия, лимит параллельных запросов, circuit breaker
+        self.client = client or MingliClient()
+        # Дисковый кэш разобранных ответов (необязательный)
+        self.cache = cache
         
         # Словарь китайских иероглифов и их элементов
         self.heavenly_stems = {
@@ -44,8 +114,8 @@ class MingliBaziCalculator:
             '亥': {'animal': 'Свинья', 'element': 'Вода'}
         }
     
-    def calculate_bazi(self, birth_date: str, birth_time: str, birth_city: str, 
-                      gender: str = "Жен") -> Dict:
+    async def calculate_bazi(self, birth_date: str, birth_time: str, birth_city: str, 
+                             gender: str = "Жен") -> Chart:
         """
         Расчет БаЦзы через калькулятор mingli.ru
         
@@ -56,259 +126,85 @@ class MingliBaziCalculator:
             gender: Пол (Муж/Жен)
         
         Returns:
-            Dict с данными БаЦзы карты
+            Chart с данными БаЦзы карты
         """
         try:
-            # Парсим дату
-            day, month, year = birth_date.split('.')
-            
-            # Подготавливаем данные для отправки
-            form_data = {
-                'name': '',  # Имя не обязательно
-                'sex': gender,
-                'place': birth_city,
-                'year': year,
-                'month': month,
-                'day': day,
-                'hour': birth_time.split(':')[0],
-                'minute': birth_time.split(':')[1]
-            }
-            
-            # Отправляем запрос
-            response = self.session.post(self.base_url, data=form_data)
-            
-            if response.status_code == 200:
-                # Парсим результат
-                bazi_data = self._parse_response(response.text, birth_date)
-                return bazi_data
-            else:
-                raise Exception(f"Ошибка сервера: {response.status_code}")
+            pillars = await self.fetch_pillars(birth_date, birth_time, birth_city, gender)
+            return self._chart_from_pillars(pillars, birth_date, birth_time, birth_city)
                 
         except Exception as e:
             # Если не удалось получить данные с сайта, используем упрощенный расчет
+            logger.warning("Расчет через mingli.ru не удался, используем упрощенный: %s", e)
             return self._fallback_calculation(birth_date, birth_time, birth_city)
     
-    def _parse_response(self, html_content: str, birth_date: str) -> Dict:
-        """Парсинг HTML ответа от калькулятора mingli.ru"""
-        try:
-            # Извлекаем данные из HTML
-            # Ищем элемент личности из колонки ДЕНЬ (верхняя клетка)
-            
-            element = "Земля"  # По умолчанию
-            polarity = "Инь"   # По умолчанию
-            day_stem_char = ""
-            
-            # Улучшенный поиск колонки ДЕНЬ - ищем таблицу БаЦзы
-            # Ищем паттерн таблицы с колонками ЧАС, ДЕНЬ, МЕСЯЦ, ГОД
-            table_pattern = r'(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД).*?(?:ЧАС|ДЕНЬ|МЕСЯЦ|ГОД)'
-            table_match = re.search(table_pattern, html_content, re.IGNORECASE | re.DOTALL)
-            
-            if table_match:
-                table_content = table_match.group(0)
-                # Ищем первую ячейку в колонке ДЕНЬ
-                day_column_pattern = r'ДЕНЬ.*?([甲-癸]).*?(?:Инь|Ян)\s+(Огонь|Дерево|Земля|Металл|Вода)'
-                day_match = re.search(day_column_pattern, table_content, re.IGNORECASE)
-                
-                if day_match:
-                    day_stem_char = day_match.group(1)
-                    polarity_text = day_match.group(2)
-                    
-                    # Определяем полярность
-                    polarity_pattern = rf'{day_stem_char}.*?((?:Инь|Ян))\s+(Огонь|Дерево|Земля|Металл|Вода)'
-                    polarity_match = re.search(polarity_pattern, table_content, re.IGNORECASE)
-                    
-                    if polarity_match:
-                        polarity = polarity_match.group(1)
-                        element = polarity_match.group(2)
-                    else:
-                        # Используем данные из словаря
-                        if day_stem_char in self.heavenly_stems:
-                            element = self.heavenly_stems[day_stem_char]['element']
-                            polarity = self.heavenly_stems[day_stem_char]['polarity']
-            
-            # Если не нашли через таблицу, используем старый метод
-            if not day_stem_char:
-                for char, data in self.heavenly_stems.items():
-                    if char in html_content:
-                        # Проверяем, что это именно колонка ДЕНЬ
-                        day_patterns = [
-                            rf'ДЕНЬ.*?{char}',
-                            rf'{char}.*?ДЕНЬ',
-                            rf'День.*?{char}',
-                            rf'{char}.*?День'
-                        ]
-                        
-                        for pattern in day_patterns:
-                            if re.search(pattern, html_content, re.IGNORECASE | re.DOTALL):
-                                element = data['element']
-                                polarity = data['polarity']
-                                day_stem_char = char
-                                break
-                        
-                        if day_stem_char:
-                            break
-            
-            # Если не нашли по иероглифам, ищем по тексту
-            if not day_stem_char:
-                day_element_patterns = [
-                    r'ДЕНЬ.*?(\w+)\s+(Огонь|Дерево|Земля|Металл|Вода)',
-                    r'День.*?(\w+)\s+(Огонь|Дерево|Земля|Металл|Вода)',
-                    r'Инь\s+(Огонь|Дерево|Земля|Металл|Вода)',
-                    r'Ян\s+(Огонь|Дерево|Земля|Металл|Вода)',
-                    r'(\w+)\s+(Огонь|Дерево|Земля|Металл|Вода).*?ДЕНЬ',
-                    r'Элемент личности.*?(\w+)'
-                ]
-                
-                for pattern in day_element_patterns:
-                    match = re.search(pattern, html_content, re.IGNORECASE)
-                    if match:
-                        if len(match.groups()) >= 2:
-                            polarity = match.group(1) if match.group(1) in ['Инь', 'Ян'] else polarity
-                            element = match.group(2) if match.group(2) in ['Огонь', 'Дерево', 'Земля', 'Металл', 'Вода'] else match.group(1)
-                        else:
-                            element = match.group(1)
-                        break
-            
-            # Ищем животное года
-            animal = "Свинья"  # По умолчанию
-            year_branch_char = ""
-            
-            # Сначала ищем по китайским иероглифам
-            for char, data in self.earthly_branches.items():
-                if char in html_content:
-                    # Проверяем, что это именно колонка ГОД
-                    year_patterns = [
-                        rf'ГОД.*?{char}',
-                        rf'{char}.*?ГОД',
-                        rf'Год.*?{char}',
-                        rf'{char}.*?Год'
-                    ]
-                    
-                    for pattern in year_patterns:
-                        if re.search(pattern, html_content, re.IGNORECASE | re.DOTALL):
-                            animal = data['animal']
-                            year_branch_char = char
-                            break
-                    
-                    if year_branch_char:
-                        break
-            
-            # Если не нашли по иероглифам, ищем по тексту
-            if not year_branch_char:
-                animal_patterns = [
-                    r'(\w+)\s*🐭|🐂|🐅|🐰|🐲|🐍|🐴|🐐|🐒|🐓|🐕|🐷',
-                    r'(Крыса|Бык|Тигр|Кролик|Дракон|Змея|Лошадь|Коза|Обезьяна|Петух|Собака|Свинья)',
-                    r'Год.*?(\w+)'
-                ]
-                
-                for pattern in animal_patterns:
-                    match = re.search(pattern, html_content, re.IGNORECASE)
-                    if match:
-                        animal = match.group(1)
-                        break
-            
-            # Если все еще не нашли, используем расчет по году
-            if animal == "Свинья" and not year_branch_char:
-                # Извлекаем год из HTML или используем переданный год
-                year_match = re.search(r'(\d{4})', html_content)
-                if year_match:
-                    year_int = int(year_match.group(1))
-                    animal = self._get_year_animal(year_int)
-                else:
-                    # Используем год из даты рождения
-                    day, month, year = birth_date.split('.')
-                    year_int = int(year)
-                    animal = self._get_year_animal(year_int)
-            
-            # Определяем характеристики на основе элемента и полярности
-            from advice_generator import get_element_description, generate_monthly_advice, generate_summary_2025
-            
-            element_desc = get_element_description(element, polarity)
-            personality = {
-                'element': element,
-                'polarity': polarity,
-                'emoji': element_desc['emoji'],
-                'metaphor': element_desc['metaphor'],
-                'description': element_desc['description'],
-                'superpower': element_desc['superpower'],
-                'traits': self._get_personality_by_element(element)['traits']
-            }
-            
-            return {
-                'personality_type': personality,
-                'year_animal': animal,
-                'day_element': element,
-                'day_polarity': polarity,
-                'day_stem_char': day_stem_char,
-                'year_branch_char': year_branch_char,
-                'monthly_advice': generate_monthly_advice(element, polarity),
-                'summary_2025': generate_summary_2025(element, polarity),
-                'birth_info': {
-                    'date': birth_date,
-                    'time': birth_time,
-                    'city': birth_city
-                },
-                'source': 'mingli_calculator'
-            }
-            
-        except Exception as e:
-            raise Exception(f"Ошибка парсинга: {str(e)}")
-    
-    def _get_personality_by_element(self, element: str) -> Dict:
-        """Получение характеристик личности по элементу"""
-        element_map = {
-            'Дерево': {
-                'element': 'Дерево',
-                'emoji': '🌳',
-                'traits': ['Творчество', 'Рост', 'Лидерство', 'Инновации', 'Гибкость']
-            },
-            'Огонь': {
-                'element': 'Огонь', 
-                'emoji': '🔥',
-                'traits': ['Энергия', 'Страсть', 'Лидерство', 'Амбиции', 'Мотивация']
-            },
-            'Земля': {
-                'element': 'Земля',
-                'emoji': '🌍', 
-                'traits': ['Стабильность', 'Надежность', 'Практичность', 'Терпение', 'Забота']
-            },
-            'Металл': {
-                'element': 'Металл',
-                'emoji': '⚡',
-                'traits': ['Структура', 'Дисциплина', 'Анализ', 'Точность', 'Организованность']
-            },
-            'Вода': {
-                'element': 'Вода',
-                'emoji': '💧',
-                'traits': ['Мудрость', 'Интуиция', 'Адаптивность', 'Глубина', 'Чувствительность']
-            }
+    def _form_data(self, birth_date: str, birth_time: str, birth_city: str, gender: str) -> Dict:
+        """Данные формы калькулятора"""
+        day, month, year = birth_date.split('.')
+        hour, minute = birth_time.split(':')
+        return {
+            'name': '',  # Имя не обязательно
+            'sex': gender,
+            'place': birth_city,
+            'year': year,
+            'month': month,
+            'day': day,
+            'hour': hour,
+            'minute': minute
         }
-        
-        return element_map.get(element, element_map['Земля'])
     
-    def _generate_advice(self, element: str) -> str:
-        """Генерация совета на месяц"""
-        advice_map = {
-            'Дерево': "Сосредоточьтесь на росте и развитии. Время для новых начинаний и творческих проектов.",
-            'Огонь': "Проявляйте активность и энергию. Время для реализации планов и достижения целей.",
-            'Земля': "Сосредоточьтесь на стабильности и практичности. Время для укрепления основ.",
-            'Металл': "Проявляйте дисциплину и организованность. Время для структурирования и планирования.",
-            'Вода': "Используйте интуицию и мудрость. Время для глубокого анализа и стратегического планирования."
-        }
+    async def fetch_day_stem(self, birth_date: str, birth_time: str, birth_city: str,
+                             gender: str = "Жен", timeout: float = None) -> Optional[str]:
+        """
+        Только небесный ствол дня с mingli.ru — для выборочной сверки с локальным расчетом
+        Возвращает None, если ствол на странице не найден; ошибки сети — MingliError
+        """
+        pillars = await self.fetch_pillars(birth_date, birth_time, birth_city, gender, timeout=timeout)
+        if pillars is None:
+            return None
+        return pillars['day'][0]
+    
+    async def fetch_pillars(self, birth_date: str, birth_time: str, birth_city: str,
+                            gender: str = "Жен", timeout: float = None) -> Optional[Dict[str, tuple]]:
+        """
+        Столпы с mingli.ru, повторный запрос с теми же данными — из дискового кэша
+        None, если таблица на странице не найдена (такой ответ не кэшируется)
+        """
+        key = None
+        if self.cache is not None:
+            key = make_key(birth_date, birth_time, birth_city, gender)
+            pillars = await self.cache.get(key)
+            if pillars is not None:
+                return pillars
         
-        return advice_map.get(element, advice_map['Земля'])
+        html_content = await self.client.post_form(
+            self._form_data(birth_date, birth_time, birth_city, gender), timeout=timeout
+        )
+        pillars = parse_pillars(html_content)
+        if pillars is not None and key is not None:
+            await self.cache.put(key, pillars, html_content)
+        return pillars
     
-    def _generate_summary(self, element: str) -> str:
-        """Генерация резюме 2025 года"""
-        summary_map = {
-            'Дерево': "2025 год благоприятен для роста и инноваций. Новые возможности в творческих сферах.",
-            'Огонь': "2025 год принесет энергию и страсть. Время для активных действий и достижения целей.",
-            'Земля': "2025 год будет стабильным и надежным. Время для долгосрочного планирования.",
-            'Металл': "2025 год будет структурированным. Время для достижения целей и систематизации.",
-            'Вода': "2025 год будет глубоким и мудрым. Время для стратегического планирования."
-        }
+    def _parse_response(self, html_content: str, birth_date: str, birth_time: str, birth_city: str) -> Chart:
+        """Парсинг HTML ответа от калькулятора mingli.ru (один проход по странице)"""
+        return self._chart_from_pillars(parse_pillars(html_content), birth_date, birth_time, birth_city)
+    
+    def _chart_from_pillars(self, pillars: Optional[Dict[str, tuple]], birth_date: str,
+                            birth_time: str, birth_city: str) -> Chart:
+        """Карта (Chart) по столпам"""
+        if pillars is None or pillars['day'][0] is None:
+            raise ValueError("Таблица столпов не найдена на странице mingli.ru")
+        
+        # Элемент личности — верхняя клетка колонки ДЕНЬ
+        day_stem_char = pillars['day'][0]
+        
+        # Животное года — нижняя клетка колонки ГОД, если ее нет — расчет по году
+        year_branch_char = pillars['year'][1] or ""
+        if year_branch_char:
+            animal = self.earthly_branches[year_branch_char]['animal']
+        else:
+            animal = self._get_year_animal(int(birth_date.split('.')[2]))
         
-        return summary_map.get(element, summary_map['Земля'])
+        return Chart(day_stem_char, animal, year_branch_char, birth_date, birth_time, birth_city)
     
     def _get_year_animal(self, year: int) -> str:
         """Определение животного года по китайскому календарю"""
@@ -319,12 +215,10 @@ class MingliBaziCalculator:
             'Лошадь', 'Коза', 'Обезьяна', 'Петух', 'Собака', 'Свинья'
         ]
         
-        # Вычисляем индекс животного
-        # 1900 год = Крыса (индекс 0)
-        animal_index = (year - 1900) % 12
-        return animals[animal_index]
+        # 1900 год = Крыса (индекс 0), та же формула, что и в локальном калькуляторе
+        return animals[year_branch_index(year)]
     
-    def _fallback_calculation(self, birth_date: str, birth_time: str, birth_city: str) -> Dict:
+    def _fallback_calculation(self, birth_date: str, birth_time: str, birth_city: str) -> Chart:
         """Резервный расчет при недоступности профессионального калькулятора"""
         # Простой расчет по дате рождения
         day, month, year = birth_date.split('.')
@@ -344,38 +238,18 @@ class MingliBaziCalculator:
         # Правильное определение животного года по китайскому календарю
         year_animal = self._get_year_animal(year_int)
         
-        # Используем новый генератор советов
-        from advice_generator import get_element_description, generate_monthly_advice, generate_summary_2025
-        
-        element_desc = get_element_description(element, 'Инь')
-        personality = {
-            'element': element,
-            'polarity': 'Инь',
-            'emoji': element_desc['emoji'],
-            'metaphor': element_desc['metaphor'],
-            'description': element_desc['description'],
-            'superpower': element_desc['superpower'],
-            'traits': self._get_personality_by_element(element)['traits']
-        }
-        
-        return {
-            'personality_type': personality,
-            'year_animal': year_animal,
-            'day_element': element,
-            'day_polarity': 'Инь',
-            'monthly_advice': generate_monthly_advice(element, 'Инь'),
-            'summary_2025': generate_summary_2025(element, 'Инь'),
-            'birth_info': {
-                'date': birth_date,
-                'time': birth_time,
-                'city': birth_city
-            },
-            'source': 'fallback_calculation'
-        }
+        year_branch_char = BRANCHES[year_branch_index(year_int)]
+        return Chart(stem_for(element, 'Инь'), year_animal, year_branch_char, birth_date, birth_time, birth_city)
     
-    def calculate_without_time(self, birth_date: str, birth_city: str, gender: str = "Жен") -> Dict:
+    async def calculate_without_time(self, birth_date: str, birth_city: str, gender: str = "Жен") -> Chart:
         """
         Расчет БаЦзы без времени рождения (только по дате)
         Использует полдень как время по умолчанию
         """
-        return self.calculate_bazi(birth_date, "12:00", birth_city, gender)
+        return await self.calculate_bazi(birth_date, "12:00", birth_city, gender)
+    
+    async def close(self):
+        """Закрыть HTTP-сессию и кэш"""
+        await self.client.close()
+        if self.cache is not None:
+            await self.cache.close()
@@ -0,0 +1,163 @@
+"""
+Асинхронный HTTP-клиент калькулятора mingli.ru
+Общая сессия с переиспользованием соединений, ограничение параллельных запросов,
+дедлайн на каждый запрос и автомат отключения (circuit breaker) при недоступности сайта
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class MingliError(Exception):
+    """Запрос к mingli.ru не удался"""
+
+
+class CircuitOpenError(MingliError):
+    """mingli.ru считается недоступным, запрос не отправлялся"""
+
+
+class CircuitBreaker:
+    """
+    После failure_threshold ошибок подряд запросы не отправляются reset_timeout секунд,
+    затем пропускается один пробный запрос: успех закрывает автомат, ошибка снова открывает
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+        self.opens = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас"""
+        if self.opened_at is None:
+            return True
+        if not self._probing and time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Один пробный запрос, остальные ждут его результата
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """Пробный запрос отменен без результата — следующий вызов может пробовать снова"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                self.opens += 1
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class MingliClient:
+    """Клиент mingli.ru; создавать и закрывать внутри работающего цикла событий"""
+
+    def __init__(self, base_url: str = "https://www.mingli.ru", max_concurrency: int = 4,
+                 timeout: float = 10.0, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.requests = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30),
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            )
+        return self._session
+
+    async def post_form(self, form_data: Dict[str, Any], timeout: float = None) -> str:
+        """
+        Отправить форму калькулятора и вернуть HTML
+        Дедлайн включает ожидание свободного слота, а не только сам запрос
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("mingli.ru недоступен, повторная попытка позже")
+
+        self.requests += 1
+        try:
+            return await asyncio.wait_for(self._post(form_data), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            self._failed()
+            raise MingliError(f"mingli.ru не ответил за {timeout or self.timeout} с")
+        except aiohttp.ClientError as e:
+            self._failed()
+            raise MingliError(f"Ошибка запроса к mingli.ru: {e}") from e
+        except MingliError:
+            self._failed()
+            raise
+        except asyncio.CancelledError:
+            # Отмена вызывающей задачи — не ошибка сайта, но пробу надо освободить
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            # Неожиданная ошибка (декодирование ответа и т. п.) тоже ошибка запроса:
+            # иначе пробный запрос не освободится и автомат останется открытым до перезапуска
+            self._failed()
+            raise
+
+    async def _post(self, form_data: Dict[str, Any]) -> str:
+        async with self._semaphore:
+            async with self._get_session().post(self.base_url, data=form_data) as response:
+                if response.status >= 500:
+                    raise MingliError(f"Ошибка сервера mingli.ru: {response.status}")
+                response.raise_for_status()
+                text = await response.text()
+        self.breaker.record_success()
+        return text
+
+    def _failed(self):
+        self.failures += 1
+        self.breaker.record_failure()
+        if self.breaker.state == 'open':
+            logger.warning("mingli.ru отключен на %.0f с после %d ошибок подряд",
+                           self.breaker.reset_timeout, self.breaker.failures)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.breaker.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'deadline_exceeded': self.deadline_exceeded,
+            'consecutive_failures': self.breaker.failures,
+            'opens': self.breaker.opens,
+            'rejected': self.breaker.rejected,
+        }
@@ -0,0 +1,202 @@
+"""
+Хранилище состояний FSM в PostgreSQL (таблица user_sessions)
+Горячие состояния лежат в памяти (LRU), холодные подгружаются из базы при первом обращении,
+изменения сбрасываются в базу пачками в фоне и при остановке бота
+"""
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType
+
+logger = logging.getLogger(__name__)
+
+
+class _Session:
+    """Состояние и данные одного ключа FSM"""
+    __slots__ = ('user_id', 'state', 'data', 'expires_at')
+
+    def __init__(self, user_id: int, state: Optional[str], data: Dict[str, Any], expires_at: float):
+        self.user_id = user_id
+        self.state = state
+        self.data = data
+        self.expires_at = expires_at
+
+
+class PostgresStorage(BaseStorage):
+    """
+    Хранилище FSM для aiogram поверх user_sessions
+
+    Последнее изменение ключа всегда в памяти (_dirty/_inflight), пока не записано в базу,
+    поэтому вытеснение из LRU и ошибки записи ничего не теряют.
+
+    Рассчитано на один процесс бота: бот получает обновления через long polling, а Telegram
+    отдает обновления токена только одному getUpdates. Изменения другого процесса горячий слой
+    не видит до истечения hot_ttl, поэтому несколько процессов на одной базе не поддерживаются.
+    """
+
+    def __init__(self, db, hot_size: int = 10000, hot_ttl: float = 300.0, flush_interval: float = 0.5):
+        # db — AsyncDatabase, нужны load_sessions и save_sessions_batch
+        self.db = db
+        self.hot_size = hot_size
+        self.hot_ttl = hot_ttl
+        self.flush_interval = flush_interval
+
+        self._hot: "OrderedDict[str, _Session]" = OrderedDict()
+        self._dirty: Dict[str, _Session] = {}
+        self._inflight: Dict[str, _Session] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.flushed_rows = 0
+        self.batches = 0
+        self.failures = 0
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        """Строковый ключ user_sessions из ключа aiogram"""
+        return f"fsm:{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    def start(self):
+        """Запустить фоновый сброс (вызывать внутри работающего цикла событий)"""
+        if self._task is None and self.flush_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    def _remember(self, name: str, session: _Session):
+        """Положить запись в горячий слой, вытеснив самые старые"""
+        if self.hot_size <= 0:
+            return
+        self._hot[name] = session
+        self._hot.move_to_end(name)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+            self.evictions += 1
+
+    async def _session(self, key: StorageKey) -> _Session:
+        name = self._key(key)
+        # Не записанные изменения важнее всего остального
+        session = self._dirty.get(name) or self._inflight.get(name)
+        if session is not None:
+            return session
+
+        session = self._hot.get(name)
+        if session is not None and session.expires_at > time.monotonic():
+            self._hot.move_to_end(name)
+            self.hits += 1
+            return session
+
+        # Одна загрузка на ключ, даже если обращений несколько одновременно
+        future = self._loading.get(name)
+        if future is None:
+            future = asyncio.ensure_future(self._load(name, key.user_id))
+            self._loading[name] = future
+            future.add_done_callback(lambda _: self._loading.pop(name, None))
+        return await asyncio.shield(future)
+
+    async def _load(self, name: str, user_id: int) -> _Session:
+        self.loads += 1
+        row = (await self.db.load_sessions([name])).get(name)
+        # Пока шла загрузка, ключ могли изменить — тогда база уже не актуальна
+        session = self._dirty.get(name) or self._inflight.get(name)
+        if session is not None:
+            return session
+        if row is None:
+            session = _Session(user_id, None, {}, time.monotonic() + self.hot_ttl)
+        else:
+            session = _Session(user_id, row['step'], row['data'] or {}, time.monotonic() + self.hot_ttl)
+        self._remember(name, session)
+        return session
+
+    async def _changed(self, key: StorageKey, session: _Session):
+        name = self._key(key)
+        session.expires_at = time.monotonic() + self.hot_ttl
+        self._dirty[name] = session
+        self._remember(name, session)
+        if self.flush_interval <= 0:
+            await self.flush()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        session = await self._session(key)
+        session.state = state.state if isinstance(state, State) else state
+        await self._changed(key, session)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._session(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        session = await self._session(key)
+        session.data = copy.copy(data)
+        await self._changed(key, session)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return copy.copy((await self._session(key)).data)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Уже залогировано, изменения остались в очереди до следующей попытки
+                pass
+
+    async def flush(self):
+        """Записать все измененные состояния одной пачкой"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            self._inflight, self._dirty = self._dirty, {}
+            # Снимок значений: изменения во время записи попадут в следующую пачку
+            rows = {
+                name: (session.user_id, session.state, copy.copy(session.data))
+                for name, session in self._inflight.items()
+            }
+            try:
+                await self.db.save_sessions_batch(rows)
+            except Exception as e:
+                self.failures += 1
+                logger.error("Ошибка записи %d состояний FSM: %s", len(rows), e)
+                for name, session in self._inflight.items():
+                    self._dirty.setdefault(name, session)
+                raise
+            else:
+                self.batches += 1
+                self.flushed_rows += len(rows)
+            finally:
+                self._inflight = {}
+
+    async def close(self) -> None:
+        """Остановить фоновый сброс и дописать остаток (aiogram вызывает при остановке)"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'hot': len(self._hot),
+            'dirty': len(self._dirty),
+            'hits': self.hits,
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'flushed_rows': self.flushed_rows,
+            'batches': self.batches,
+            'failures': self.failures,
+        }
@@ -0,0 +1,560 @@
+"""
+Статические экраны бота: текст и клавиатура собираются один раз при запуске
+Кнопки с user_id в данных собираются по шаблону и запоминаются для последних пользователей,
+остальные кнопки экрана общие для всех
+"""
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from callbacks import pack_callback
+from config import SCREEN_CACHE_SIZE
+
+COSMOS_URL = "https://www.yuliyaskiba.com/yourcosmos2026"
+BOOKING_URL = "https://calendly.com/kiburo8899/meet-with-me"
+QUESTION_URL = "https://t.me/Yulia_Skiba"
+BOT_LINK = "https://t.me/KiByro_bot?start=share"
+
+
+class Button(NamedTuple):
+    """Кнопка экрана: действие из схемы callbacks или ссылка; per_user — в данные добавляется user_id"""
+    text: str
+    action: Optional[str] = None
+    url: Optional[str] = None
+    per_user: bool = False
+
+
+class Screen(NamedTuple):
+    """Готовый экран: то, что передается в message.answer"""
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+    parse_mode: Optional[str] = 'Markdown'
+
+    async def answer(self, message: Message):
+        return await message.answer(self.text, reply_markup=self.reply_markup, parse_mode=self.parse_mode)
+
+
+def _button(spec: Button, user_id: Optional[int] = None) -> InlineKeyboardButton:
+    if spec.url is not None:
+        return InlineKeyboardButton(text=spec.text, url=spec.url)
+    if spec.per_user:
+        return InlineKeyboardButton(text=spec.text, callback_data=pack_callback(spec.action, user_id))
+    return InlineKeyboardButton(text=spec.text, callback_data=pack_callback(spec.action))
+
+
+class _Template:
+    """Экран с кнопками для конкретного пользователя: общие кнопки создаются один раз"""
+
+    def __init__(self, text: str, rows: Sequence[Sequence[Button]], parse_mode: Optional[str]):
+        self.text = text
+        self.parse_mode = parse_mode
+        self.rows = [[spec if spec.per_user else _button(spec) for spec in row] for row in rows]
+        # Ошибки в схеме кнопок — при запуске, а не при первом нажатии
+        for row in rows:
+            for spec in row:
+                if spec.per_user:
+                    _button(spec, 0)
+
+    def render(self, user_id: int) -> Screen:
+        keyboard = [[_button(item, user_id) if isinstance(item, Button) else item for item in row]
+                    for row in self.rows]
+        return Screen(self.text, InlineKeyboardMarkup(inline_keyboard=keyboard), self.parse_mode)
+
+
+class ScreenRegistry:
+    """
+    Экраны по имени. Экран без кнопок пользователя — один объект на процесс;
+    с кнопками пользователя — LRU на max_size пар (экран, user_id) на весь реестр
+    """
+
+    def __init__(self, max_size: int = 2000):
+        self.max_size = max_size
+        self._static: Dict[str, Screen] = {}
+        self._templates: Dict[str, _Template] = {}
+        self._rendered = OrderedDict()  # (экран, user_id) -> Screen
+
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, name: str, text: str, rows: Sequence[Sequence[Button]] = (), parse_mode: Optional[str] = 'Markdown'):
+        if name in self._static or name in self._templates:
+            raise ValueError(f"Экран {name!r} уже зарегистрирован")
+        if any(spec.per_user for row in rows for spec in row):
+            self._templates[name] = _Template(text, rows, parse_mode)
+        else:
+            markup = InlineKeyboardMarkup(inline_keyboard=[[_button(spec) for spec in row] for row in rows]) if rows else None
+            self._static[name] = Screen(text, markup, parse_mode)
+
+    def get(self, name: str, user_id: int = None) -> Screen:
+        """Экран name; для экранов с кнопками пользователя нужен user_id"""
+        screen = self._static.get(name)
+        if screen is not None:
+            return screen
+        template = self._templates[name]
+        if user_id is None:
+            raise ValueError(f"Экрану {name!r} нужен user_id")
+
+        key = (name, user_id)
+        screen = self._rendered.get(key)
+        if screen is not None:
+            self._rendered.move_to_end(key)
+            self.hits += 1
+            return screen
+        self.misses += 1
+        screen = template.render(user_id)
+        if self.max_size > 0:
+            self._rendered[key] = screen
+            while len(self._rendered) > self.max_size:
+                self._rendered.popitem(last=False)
+        return screen
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._static or name in self._templates
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'static': len(self._static),
+            'templates': len(self._templates),
+            'rendered': len(self._rendered),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+SCREENS = ScreenRegistry(SCREEN_CACHE_SIZE)
+
+_MAIN_MENU_ROWS: List[List[Button]] = [
+    [Button("🔮 Твои Прогнозы", "menu_forecasts")],
+    [Button("📚 Интересное", "menu_interesting")],
+    [Button("💬 Консультации", "menu_consultations")],
+    [Button("📋 Программы", "menu_programs")],
+    [Button("👤 Про меня", "menu_about")],
+    [Button("❓ Задать вопрос", "menu_question")],
+    [Button("🔘 Создать карту БаЦзы", "start_new")],
+    [Button("📤 Поделись ботом", "share_bot")],
+]
+_BACK_TO_MENU = [Button("🔙 Главное меню", "menu_main")]
+_BACK_TO_INTERESTING = [Button("🔙 Назад", "menu_interesting")]
+_BACK_TO_CONSULTATIONS = [Button("🔙 К консультациям", "menu_consultations")]
+
+# --- Главное меню ---
+
+SCREENS.add('menu_main', (
+    "🏠 *Главное меню*\n\n"
+    "Выберите интересующий вас раздел:"
+), _MAIN_MENU_ROWS)
+
+_FORECASTS_TEXT = (
+    "🔮 *Твои Прогнозы*\n\n"
+    "Здесь вы можете получить персональные прогнозы и рекомендации:\n\n"
+    "• 📅 **Прогноз на год** — что ждет вас в 2025 году\n"
+    "• 🌙 **Ежемесячные советы** — рекомендации на каждый месяц\n"
+    "• ⭐ **Благоприятные периоды** — когда лучше принимать важные решения\n"
+    "• 💼 **Карьерные возможности** — перспективы в работе\n"
+    "• ❤️ **Личные отношения** — прогнозы в любви и дружбе\n\n"
+)
+# Текст дополняется в обработчике тактами удачи из карты пользователя
+SCREENS.add('menu_forecasts', _FORECASTS_TEXT, [_BACK_TO_MENU])
+SCREENS.add('menu_forecasts_no_chart', _FORECASTS_TEXT, [
+    [Button("🔘 Создать карту БаЦзы", "start_new")],
+    _BACK_TO_MENU,
+])
+
+SCREENS.add('menu_interesting', (
+    "📚 *Интересное*\n\n"
+    "Узнайте больше о Ба-цзы и сохраните все полезное в одном месте:\n\n"
+    "• 🔤 **Язык общения** — ваша персональная ветка с текстами и видео\n"
+    "• 🎥 **Анна Алхим** — короткий видео-разбор\n"
+    "• 🎥 **Трамп / Харрис** — видео перед выборами\n"
+    "• 🖼 **Джефф Безос** — про миллиарды и свадьбу\n"
+    "• ▶️ **Видео о Ба-цзы** — 3 минуты\n"
+    "• 🌟 **Знаменитости** — другие примеры\n\n"
+    "Также здесь собраны материалы из вкладок консультаций:\n"
+    "• 🔮 **Ба-цзы: что это и для чего**\n"
+    "• 🎯 **Какие потребности закрывает**\n"
+    "• 💪 **Чем может существенно помочь**\n"
+    "• 📊 **Для чего чаще всего используется**\n\n"
+    "И быстродоступные ссылки:\n"
+    "• 🚀 **Космический-2026** — регистрация\n"
+    "• 💬 **Консультации: варианты и стоимость**\n"
+    "• 📞 **Забронировать консультацию** или **Задать вопрос**"
+), [
+    [Button("🔤 Язык общения", "learn_more_", per_user=True)],
+    [Button("🎥 Анна Алхим", "video_anna_", per_user=True)],
+    [Button("🎥 Трамп / Харрис", "video_trump_", per_user=True)],
+    [Button("🖼 Джефф Безос", "video_bezos_", per_user=True)],
+    [Button("▶️ Видео о Ба-цзы", "video_bazi_", per_user=True)],
+    [Button("🌟 Знаменитости — ещё примеры", "interesting_celebrities")],
+    [Button("🔮 Ба-цзы: что это и для чего", "consultation_what_", per_user=True)],
+    [Button("🎯 Какие потребности закрывает", "consultation_needs_", per_user=True)],
+    [Button("💪 Чем может существенно помочь", "consultation_help_", per_user=True)],
+    [Button("📊 Для чего чаще всего используется", "consultation_usage_", per_user=True)],
+    [Button("🚀 Космический-2026 — регистрация", url=COSMOS_URL)],
+    [Button("💬 Консультации: варианты и стоимость", "consultation_types_", per_user=True)],
+    [Button("📞 Забронировать консультацию", url=BOOKING_URL)],
+    [Button("❓ Задать вопрос", url=QUESTION_URL)],
+    _BACK_TO_MENU,
+])
+
+_CONSULTATION_TYPES_TEXT = (
+    "💰 *Варианты консультаций и стоимость*\n\n"
+    "🔮 *Фундаментальная консультация Ба-цзы*\n\n"
+    "Помогает познакомиться глубже с собой, понять свои способности, таланты и уникальность. "
+    "Увидеть пространство возможностей в текущий жизненный период и выбрать эффективную персональную стратегию!\n\n"
+    "• от 150 евро/7290 грн.\n\n"
+    "📅 *Общая годовая консультация*\n\n"
+    "Данная консультация - навигатор в персональных энергиях и тенденциях года. "
+    "Вы определите личную годовую стратегию и проложите карту успеха 2026. "
+    "Помогает сфокусироваться на наиболее потенциальных направлениях и не тратить силы на слабые зоны.\n\n"
+    "• от 280 евро/13500 грн.\n\n"
+    "✨ *Расширенная годовая консультация*\n\n"
+    "Эта консультация — ваш Навигатор персональных энергий и тенденций года, а также отдельно каждого месяца. "
+    "Позволяет распланировать, когда и что вы будете делать, чтобы у вас все складывалось более легко и эффективно, "
+    "используя благоприятные энергии месяца для достижения своих годовых целей.\n\n"
+    "• от 300 евро/14490 грн.\n\n"
+    "🌟 *Годовое сопровождение*\n\n"
+    "Это КОМПЛЕКСНОЕ АСТРОЛОГИЧЕСКОЕ СОПРОВОЖДЕНИЕ, аналитика потенциала Вашего времени и энергий на целый год. "
+    "Включает в себя расширенную годовую консультацию в первый месяц после старта сопровождения, "
+    "а также формат ежемесячных рекомендаций, календарей энергий, подборки важных дат и обсуждение обратной связи.\n\n"
+    "• от 700 евро/33810 грн.\n\n"
+    "📝 Забронируйте время консультации, указав правильный электронный адрес, чтобы мы могли с Вами связаться, "
+    "или нажмите на кнопку *Задать вопрос* ниже, для уточнения любых деталей."
+)
+SCREENS.add('menu_consultations', _CONSULTATION_TYPES_TEXT, [
+    [Button("📞 Забронировать консультацию", url=BOOKING_URL)],
+    [Button("❓ Задать вопрос", url=QUESTION_URL)],
+    [Button("✨ Узнать больше о Ба-цзы", "learn_more_", per_user=True)],
+    _BACK_TO_MENU,
+])
+
+SCREENS.add('menu_programs', (
+    "📋 *Программы*\n\n"
+    "🚀 *Программа «Космический-2026»*\n\n"
+    "Узнайте прогнозы на следующий год для себя и получите персональный астропрогноз.\n\n"
+    "Зарегистрируйтесь прямо сейчас!"
+), [
+    [Button("🚀 Зарегистрироваться в программе «Космический-2026»", url=COSMOS_URL)],
+    _BACK_TO_MENU,
+])
+
+SCREENS.add('menu_about', (
+    "👤 *Про меня*\n\n"
+    "**Юлия Скиба** — мастер БаЦзы и астролог\n\n"
+    "• 🎓 **Образование:** Сертифицированный специалист по китайской астрологии\n"
+    "• ⭐ **Опыт:** Более 10 лет практики\n"
+    "• 👥 **Клиенты:** Помогла более 5000 человек\n"
+    "• 🏆 **Достижения:** Автор уникальных методик анализа\n\n"
+    "**Мой подход:**\n"
+    "• Индивидуальный анализ каждой карты\n"
+    "• Практические рекомендации для жизни\n"
+    "• Простое объяснение сложных концепций\n"
+    "• Поддержка на пути к целям\n\n"
+    "**Связь со мной:**\n"
+    "• 📱 Telegram: @твойник\n"
+    "• 📧 Email: info@example.com\n"
+    "• 🌐 Сайт: www.example.com"
+), [
+    [Button("📱 Связаться", url=QUESTION_URL)],
+    [Button("🔘 Хочу консультацию", "consultation_options_", per_user=True)],
+    _BACK_TO_MENU,
+])
+
+SCREENS.add('menu_question', (
+    "❓ *Задать вопрос*\n\n"
+    "Есть вопросы о БаЦзы или нужна помощь? Я всегда готова ответить!\n\n"
+    "**Частые вопросы:**\n"
+    "• Как работает система БаЦзы?\n"
+    "• Можно ли изменить судьбу?\n"
+    "• Как выбрать лучшее время для важных дел?\n"
+    "• Что делать, если не знаю точное время рождения?\n"
+    "• Как БаЦзы может помочь в карьере?\n\n"
+    "**Способы связи:**\n"
+    "• 💬 Написать в Telegram"
+), [
+    [Button("💬 Написать в Telegram", url=QUESTION_URL)],
+    _BACK_TO_MENU,
+])
+
+# --- Раздел «Интересное» ---
+
+SCREENS.add('interesting_videos', "Выберите видео:", [
+    [Button("▶️ Смотреть пример: Анна Алхим", "video_anna_", per_user=True)],
+    _BACK_TO_INTERESTING,
+], parse_mode=None)
+
+SCREENS.add('interesting_articles', "Скоро здесь будут разборы и кейсы. А пока можно посмотреть видео-примеры.", [
+    _BACK_TO_INTERESTING,
+], parse_mode=None)
+
+SCREENS.add('interesting_celebrities', "Выберите пример знаменитости:", [
+    [Button("Анна Алхим", "video_anna_", per_user=True)],
+    [Button("Дональд Трамп / Камала Харрис", "video_trump_", per_user=True)],
+    [Button("Джефф Безос", "video_bezos_", per_user=True)],
+    _BACK_TO_INTERESTING,
+], parse_mode=None)
+
+SCREENS.add('interesting_compatibility', (
+    "Совместимость в Ба-цзы показывает, как энергии людей взаимодействуют — где легко, а где лучше прояснить ожидания.\n\n"
+    "Хочешь, подскажу по твоим энергиям?"
+), [
+    [Button("Получить совет на месяц", "show_advice_", per_user=True)],
+    _BACK_TO_INTERESTING,
+])
+
+SCREENS.add('no_more_content', (
+    "Пока это всё, что есть! Но мы постоянно работаем над новым интересным контентом. "
+    "Скоро здесь появится ещё больше увлекательной информации о Ба-цзы! Следите за обновлениями 😉"
+), parse_mode=None)
+
+# --- Консультации ---
+
+SCREENS.add('consultation_individual', (
+    "🔮 *Индивидуальная консультация*\n\n"
+    "**Что включает:**\n"
+    "• Полный анализ вашей карты БаЦзы\n"
+    "• Определение сильных сторон и талантов\n"
+    "• Рекомендации по карьере и отношениям\n"
+    "• Прогноз на ближайшие годы\n"
+    "• Ответы на ваши вопросы\n\n"
+    "**Длительность:** 60-90 минут\n"
+    "**Формат:** Онлайн или очно\n"
+    "**Результат:** Персональный план развития"
+), [
+    [Button("📞 Записаться на консультацию", url="https://t.me/твойник")],
+    [Button("ℹ️ Подробнее", "consultation_individual_details_", per_user=True)],
+    _BACK_TO_CONSULTATIONS,
+])
+
+SCREENS.add('consultation_cosmic', (
+    "🚀 *Программа «Космический-2026»*\n\n"
+    "**Что включает:**\n"
+    "• Детальный прогноз на 2026 год\n"
+    "• Благоприятные периоды для важных решений\n"
+    "• Карьерные возможности и риски\n"
+    "• Личные отношения и здоровье\n"
+    "• Рекомендации по месяцам\n\n"
+    "**Формат:** Групповая программа с персональными прогнозами\n"
+    "**Длительность:** 3 месяца\n"
+    "**Результат:** Полное понимание своего года"
+), [
+    [Button("🚀 Записаться на программу", url="https://t.me/твойник")],
+    [Button("ℹ️ Подробнее", "consultation_cosmic_details_", per_user=True)],
+    _BACK_TO_CONSULTATIONS,
+])
+
+SCREENS.add('consultation_learn', (
+    "📚 *Обучиться анализу БаЦзы*\n\n"
+    "**Что включает:**\n"
+    "• Основы системы БаЦзы\n"
+    "• Как читать карты рождения\n"
+    "• Анализ элементов и их взаимодействие\n"
+    "• Практические упражнения\n"
+    "• Разбор реальных кейсов\n\n"
+    "**Формат:** Онлайн-курс с практикой\n"
+    "**Длительность:** 6 недель\n"
+    "**Результат:** Самостоятельный анализ карт БаЦзы"
+), [
+    [Button("📚 Записаться на обучение", url="https://t.me/твойник")],
+    [Button("ℹ️ Подробнее", "consultation_learn_details_", per_user=True)],
+    _BACK_TO_CONSULTATIONS,
+])
+
+# Вкладки после персонального разбора: «Назад» возвращает к разбору
+_BACK_TO_ANALYSIS = [Button("🔙 Назад", "personal_analysis_", per_user=True)]
+_CONSULTATION_INFO_ROWS = [
+    [Button("📞 Забронировать консультацию", url=BOOKING_URL)],
+    [Button("✨ Узнать больше о Ба-цзы", "learn_more_", per_user=True)],
+    _BACK_TO_ANALYSIS,
+]
+
+SCREENS.add('consultation_types', _CONSULTATION_TYPES_TEXT, [
+    [Button("📞 Забронировать консультацию", url=BOOKING_URL)],
+    [Button("❓ Задать вопрос", url=QUESTION_URL)],
+    [Button("✨ Узнать больше о Ба-цзы", "learn_more_", per_user=True)],
+    _BACK_TO_ANALYSIS,
+])
+
+SCREENS.add('consultation_what', (
+    "🔮 *Ба-цзы. Что это и для чего?*\n\n"
+    "БаЦзы (八字) — это древнекитайская система астрологии, которая анализирует личность и судьбу человека "
+    "на основе даты и времени рождения.\n\n"
+    "**Для чего используется:**\n"
+    "• Понимание своей личности и характера\n"
+    "• Определение сильных сторон и талантов\n"
+    "• Прогнозирование жизненных периодов\n"
+    "• Выбор оптимального времени для важных решений\n"
+    "• Совместимость в отношениях\n"
+    "• Карьерные рекомендации"
+), _CONSULTATION_INFO_ROWS)
+
+SCREENS.add('consultation_needs', (
+    "🎯 *Какие потребности закрывает*\n\n"
+    "**Личностные потребности:**\n"
+    "• Понимание себя и своих мотивов\n"
+    "• Принятие своих особенностей\n"
+    "• Развитие сильных сторон\n"
+    "• Работа с ограничениями\n\n"
+    "**Жизненные потребности:**\n"
+    "• Выбор правильного направления в жизни\n"
+    "• Понимание жизненных циклов\n"
+    "• Оптимизация времени и энергии\n"
+    "• Принятие важных решений\n\n"
+    "**Отношенческие потребности:**\n"
+    "• Понимание совместимости с партнерами\n"
+    "• Улучшение коммуникации\n"
+    "• Решение конфликтов в семье"
+), _CONSULTATION_INFO_ROWS)
+
+SCREENS.add('consultation_help', (
+    "💪 *Чем может существенно помочь*\n\n"
+    "**В карьере:**\n"
+    "• Выбор подходящей профессии\n"
+    "• Понимание своих талантов\n"
+    "• Оптимальное время для смены работы\n"
+    "• Развитие лидерских качеств\n\n"
+    "**В отношениях:**\n"
+    "• Понимание совместимости с партнерами\n"
+    "• Улучшение семейных отношений\n"
+    "• Решение конфликтов\n"
+    "• Понимание потребностей близких\n\n"
+    "**В здоровье:**\n"
+    "• Понимание уязвимых систем организма\n"
+    "• Выбор оптимального времени для лечения\n"
+    "• Профилактика заболеваний\n"
+    "• Управление стрессом"
+), _CONSULTATION_INFO_ROWS)
+
+SCREENS.add('consultation_usage', (
+    "📊 *Для чего чаще всего используется анализ БаЦзы*\n\n"
+    "**Популярные случаи использования:**\n"
+    "• Выбор времени для важных событий (свадьба, переезд, смена работы)\n"
+    "• Понимание отношений с детьми и партнерами\n"
+    "• Карьерное планирование и развитие\n"
+    "• Решение семейных конфликтов\n"
+    "• Понимание своих эмоциональных реакций\n"
+    "• Выбор подходящего образования для детей\n"
+    "• Планирование беременности и воспитания\n"
+    "• Понимание жизненных кризисов и их преодоление"
+), _CONSULTATION_INFO_ROWS)
+
+# --- Язык общения и видео-цепочка ---
+
+SCREENS.add('learn_more', (
+    "Хочешь, расскажу, на каком языке с тобой разговаривать, чтобы ты точно сказал \"Да\". "
+    "Как в книге \"Пять языков любви\" у каждого свой язык чувств, так и в Ба-цзы у каждого элемента личности— "
+    "свой язык общения. Хочешь узнать какой твой?"
+), [
+    [Button("🔘 Да", "language_communication_", per_user=True)],
+    [Button("🔘 Может быть позже", "maybe_later_", per_user=True)],
+    [Button("🔘 Что еще возможно?", "video_anna_", per_user=True)],
+])
+
+SCREENS.add('video_anna', (
+    "Ба-цзы — это не только про характер человека и стиль общения. "
+    "Ба-цзы отлично разбирается в Ваших чувствах и мотивах. "
+    "Посмотрим короткое видео на примере даты рождения Анны Алхим, "
+    "которую разбирала после когда-то нашумевшего подкаста?"
+), [
+    [Button("🔘 Да", "video_anna_play_", per_user=True)],
+    [Button("🔘 Что еще возможно?", "video_trump_", per_user=True)],
+])
+
+SCREENS.add('video_trump_intro', (
+    "Ба-цзы - целая карта возможностей:\n"
+    "🔹 показывает, когда действовать, а когда лучше ждать,\n"
+    "🔹 когда твой потенциал роста,\n"
+    "🔹 и какие события могут проявиться в жизни."
+))
+
+# Отправляется через планировщик через 2 секунды после video_trump_intro
+SCREENS.add('video_trump', (
+    "Посмотрим, Что бы узнал Дональд Трамп или Камала Харрис, "
+    "если пришли ко мне на консультацию перед выборами?"
+), [
+    [Button("🔘 Да", "video_trump_play_", per_user=True)],
+    [Button("🔘 Что еще можно?", "video_bezos_", per_user=True)],
+])
+
+SCREENS.add('video_bezos', (
+    "Что говорит Ба-цзы о миллиардах и свадьбе Джеффа Безоса?\n\n"
+    "Как карта рождения может подсказать, когда наступает время для больших денег или личных перемен?"
+), [
+    [Button("🔘 Да", "video_bezos_play_", per_user=True)],
+    [Button("🔘 Посмотреть еще что-то", "video_bazi_", per_user=True)],
+])
+
+SCREENS.add('video_bazi', "Посмотри 3-х минутное видео о том, что такое Ба-цзы", [
+    [Button("🔘 Посмотреть видео", url="https://youtube.com/watch?si=21z_vWircn-juc4N&v=C-372XhBoiw&feature=youtu.be")],
+    [Button("🔘 Посмотреть еще что-то", "final_options_", per_user=True)],
+])
+
+# После видео: регистрация в «Космический 2026» и переход к следующему примеру
+_COSMOS_TEXT = "Зарегистрироваться в Космический 2026!!!"
+_COSMOS_ROW = [Button("🚀 Зарегистрироваться в Космический 2026", url=COSMOS_URL)]
+_AFTER_VIDEO_ROWS = [
+    _COSMOS_ROW,
+    [Button("🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", "personal_analysis_", per_user=True)],
+    # «Научиться читать людей — хочу уметь понимать любого за 5 минут» — временно отключено, лендинг не готов
+    [Button("🔘 Поделиться Ботом — пусть друзья тоже узнают информацию о себе!", "share_bot")],
+]
+
+SCREENS.add('video_anna_next', _COSMOS_TEXT, [
+    _COSMOS_ROW,
+    [Button("🔘 Что еще возможно?", "video_trump_", per_user=True)],
+], parse_mode=None)
+SCREENS.add('video_trump_next', _COSMOS_TEXT, [
+    *_AFTER_VIDEO_ROWS,
+    [Button("🔘 Посмотреть еще что-то", "video_bezos_", per_user=True)],
+], parse_mode=None)
+SCREENS.add('video_bezos_next', _COSMOS_TEXT, [
+    *_AFTER_VIDEO_ROWS,
+    [Button("🔘 Посмотреть еще что-то", "video_bazi_", per_user=True)],
+], parse_mode=None)
+SCREENS.add('final_options', _COSMOS_TEXT, [
+    *_AFTER_VIDEO_ROWS,
+    [Button("🔘 Посмотреть еще что-то", "no_more_content")],
+], parse_mode=None)
+
+# --- Поделиться ботом и новая карта ---
+
+SCREENS.add('share_bot', (
+    "📤 *Поделись ботом с друзьями*\n\n"
+    "Помогите близким узнать больше о себе и получить персональные прогнозы!\n\n"
+    "**Что получат ваши друзья:**\n"
+    "• 🔮 Персональную карту БаЦзы\n"
+    "• 📅 Прогнозы на год и месяц\n"
+    "• 💼 Рекомендации по карьере\n"
+    "• ❤️ Советы по отношениям\n"
+    "• 🎯 Понимание своих талантов\n\n"
+    "**Как поделиться:**\n"
+    "• Скопируйте ссылку на бота\n"
+    "• Отправьте другу в Telegram\n"
+    "• Или поделитесь через кнопку ниже"
+), [
+    [Button("📤 Поделиться ссылкой", url=BOT_LINK)],
+    [Button("📋 Скопировать ссылку", "copy_link")],
+    _BACK_TO_MENU,
+])
+
+SCREENS.add('copy_link', (
+    f"🔗 *Ссылка на бота:*\n\n"
+    f"`{BOT_LINK}`\n\n"
+    f"**Как использовать:**\n"
+    f"• Скопируйте ссылку выше\n"
+    f"• Отправьте другу в Telegram\n"
+    f"• Или поделитесь через кнопку 'Поделиться'"
+), [
+    [Button("📤 Поделиться", url=f"https://t.me/share/url?url={BOT_LINK}&text=🔮%20Узнай%20свою%20карту%20БаЦзы%20и%20получи%20персональные%20прогнозы!")],
+    [Button("🔙 К поделиться", "share_bot")],
+])
+
+SCREENS.add('start_new', (
+    "👋 «Здравствуйте! Я — ассистент Юлии Скибы и ваш персональный помощник по БаЦзы. "
+    "Хотите узнать больше о Себе и получить полезные рекомендации?»"
+), [
+    [Button("🔘 Да, хочу", "yes_want")],
+], parse_mode=None)
@@ -1,109 +1,374 @@
 """
-Упрощенный калькулятор БаЦзы для работы с mingli.ru
+Упрощенный калькулятор БаЦзы (локальный расчет, без запросов к mingli.ru)
 Извлекает только элемент личности из колонки "ДЕНЬ", верхняя клеточка
 """
-import requests
 import re
-from typing import Dict, Optional
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from bazi_chart import Chart, StemTexts
+from config import TIMEZONE_DEFAULT
+from day_pillars import day_pillar, STEMS, BRANCHES, FIRST_YEAR, DAY_CYCLE_BASE_INDEX
+from four_pillars import (
+    AnnualPillar, FourPillars, LuckPillar, calculate_four_pillars, iter_annual_pillars, iter_luck_pillars,
+    luck_forward, solar_year, year_branch_index
+)
+from gazetteer import find_city
+from solar_terms import LICHUN, jie_month, term_table
+
+# Сколько карт держать в кэше для тактов удачи и столпов лет
+TIMELINE_CACHE_SIZE = 1024
+
+# Время, на которое считается карта, если время рождения неизвестно (кнопка «Не знаю»)
+DEFAULT_BIRTH_TIME = '12:00'
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})')
+
+# Словарь китайских иероглифов и их элементов/полярности
+HEAVENLY_STEMS = {
+    '甲': {'element': 'Дерево', 'polarity': 'Ян'},
+    '乙': {'element': 'Дерево', 'polarity': 'Инь'},
+    '丙': {'element': 'Огонь', 'polarity': 'Ян'},
+    '丁': {'element': 'Огонь', 'polarity': 'Инь'},
+    '戊': {'element': 'Земля', 'polarity': 'Ян'},
+    '己': {'element': 'Земля', 'polarity': 'Инь'},
+    '庚': {'element': 'Металл', 'polarity': 'Ян'},
+    '辛': {'element': 'Металл', 'polarity': 'Инь'},
+    '壬': {'element': 'Вода', 'polarity': 'Ян'},
+    '癸': {'element': 'Вода', 'polarity': 'Инь'}
+}
+
+# Словарь животных года
+YEAR_ANIMALS = {
+    '子': 'Крыса', '丑': 'Бык', '寅': 'Тигр', '卯': 'Кролик',
+    '辰': 'Дракон', '巳': 'Змея', '午': 'Лошадь', '未': 'Коза',
+    '申': 'Обезьяна', '酉': 'Петух', '戌': 'Собака', '亥': 'Свинья'
+}
+
+# Тексты ниже общие для всех карт процесса — не изменять на месте
+PERSONALITY_DESCRIPTIONS = {
+    'Дерево': {
+        'Ян': {
+            'description': 'Ты — как могучее дерево.\nУпорный, настойчивый, любознательный, с внутренним стержнем и силой, которая со временем подчиняет своему влиянию всё вокруг.',
+            'superpower': 'несгибаемость, лидерство и креативность, которые помогают тебе воплощать даже самые смелые замыслы.',
+            'emoji': '🌳'
+        },
+        'Инь': {
+            'description': 'Ты — как лиана или вьющийся цветок. Гибкий, дипломатичный, утончённый, умеешь обходить преграды и находить доступ к ресурсам в любых условиях. Твоя мягкость часто оказывается сильнее грубой силы.',
+            'superpower': 'гибкая настойчивость, дипломатия, креативность.',
+            'emoji': '🌿'
+        }
+    },
+    'Огонь': {
+        'Ян': {
+            'description': 'Ты — как солнце: яркий, вдохновляющий, освещающий путь. Ты видишь в людях их потенциал и зажигаешь сердца, ведешь за собой. Ты умеешь ценить и любить.',
+            'superpower': 'харизма, оптимизм, лидерство.',
+            'emoji': '☀️'
+        },
+        'Инь': {
+            'description': 'Ты — как пламя свечи.\nНежный, но сильный. Ты согреваешь, направляешь, создаёшь уют и надежду даже в темноте.',
+            'superpower': 'интуиция, эмпатия и способность давать свет там, где он особенно нужен.',
+            'emoji': '🕯️'
+        }
+    },
+    'Земля': {
+        'Ян': {
+            'description': 'Ты — как непоколебимая гора с сокровищами.\nНадёжная, устойчивая, практичная. Стабильность в этом мире существует только за счет такой энергии. Ты — опора, на которую можно положиться, и которая держит мир вокруг.',
+            'superpower': 'сила воли, твёрдость убеждений, консервативность.',
+            'emoji': '⛰️'
+        },
+        'Инь': {
+            'description': 'Ты — как плодородная почва.\nЩедрая, заботливая, умеешь создавать ресурсы и пространство для роста других. Но твоя мягкость скрывает глубокую силу.',
+            'superpower': 'забота, терпение, способность превращать идеи в плоды.',
+            'emoji': '🌱'
+        }
+    },
+    'Металл': {
+        'Ян': {
+            'description': 'Ты — как меч.\nПрямолинейный, честный, решительный. Твоё слово весомо, твои поступки точны.\nУмеешь отстаивать идеи, действовать независимо.',
+            'superpower': 'характер, справедливость, решительность, умение быть лидером, управлять собой и другими.',
+            'emoji': '⚔️'
+        },
+        'Инь': {
+            'description': 'Ты — как драгоценность: утончённый, изысканный и блистательный.\nЗа твоей элегантностью и мягким сиянием скрывается "металлическая" внутренняя стойкость и умение замечать малейшие детали.\nТы ценишь красоту и стремишься к совершенству.',
+            'superpower': 'ответственность, аналитический ум, особое чувство прекрасного и тонкая аристократичная харизма.',
+            'emoji': '💎'
+        }
+    },
+    'Вода': {
+        'Ян': {
+            'description': 'Ты — как океан.\nМощный, глубокий, непредсказуемый. С тобой всегда интуиция, врожденная мудрость.',
+            'superpower': 'интеллект, масштабное мышление, внутренняя свобода, способность объединять.',
+            'emoji': '🌊'
+        },
+        'Инь': {
+            'description': 'Ты — как утренняя роса или ручей.\nТонкий, чувствительный, очень глубоко переживающий эмоции, умный. Легко находишь общий язык с людьми, умеешь обволакивать и мягко увлекать за собой.',
+            'superpower': 'интуиция, налаживание связей, коммуникация, мудрость в деталях, дипломатичность, чувственность.',
+            'emoji': '💧'
+        }
+    }
+}
+
+_UNKNOWN_PERSONALITY = {
+    'description': 'Описание недоступно',
+    'superpower': 'Суперсила недоступна',
+    'emoji': '❓'
+}
+
+MONTHLY_ADVICE = {
+    'Дерево': {
+        'Ян': (
+            "💡 *Совет на месяц:*\n\n"
+            "🌳 *Решимость = успех*\n"
+            "• Фокус: прорывы, шаги через препятствия\n"
+            "• Действуй напором, пробивай новые ниши, бери ответственность"
+        ),
+        'Инь': (
+            "💡 *Совет на месяц:*\n\n"
+            "🌸 *Возможности = рост*\n"
+            "• Фокус: сотрудничество, мелкие шаги, тонкие связи\n"
+            "• Ищи новые пути, используй мелкие возможности, вплетай себя в окружение"
+        )
+    },
+    'Огонь': {
+        'Ян': (
+            "💡 *Совет на месяц:*\n\n"
+            "☀️ *Этот месяц — время лидерства и объединения*\n"
+            "• Фокус: публичность, командные проекты, масштабные выступления\n"
+            "• Стратегия: выходи в люди, веди за собой, презентуй свои идеи\n"
+            "• Совет: сияй ярко, но будь предусмотрителен — среди людей возможна конкуренция"
+        ),
+        'Инь': (
+            "💡 *Совет на месяц:*\n\n"
+            "🔥 *Этот месяц для тебя — про людей и самовыражение*\n"
+            "• Фокус: реализуй идеи и проявляйся через креатив и оригинальность\n"
+            "• Стратегия: будь в центре внимания, создавай эффектное впечатление\n"
+            "• Совет: держи внимание на своих задачах, умей ставить границы и защищать интересы"
+        )
+    },
+    'Земля': {
+        'Ян': (
+            "💡 *Совет на месяц:*\n\n"
+            "⛰ *Этот месяц — про людей и ресурсы*\n"
+            "• Фокус: укрепляй команду и ресурсы\n"
+            "• Стратегия: строй структуру, опору, действуй масштабно\n"
+            "• Совет: делай ставку на связи, но держи фокус на своих задачах и потребностях"
+        ),
+        'Инь': (
+            "💡 *Совет на месяц:*\n\n"
+            "🌱 *Поддержка и твои ресурсы = самореализация*\n"
+            "• Фокус: крупные проекты, стабильные связи\n"
+            "• Стратегия: опирайся на сильных людей и структуры\n"
+            "• Совет: контролируй расходы, не помогай другим в ущерб своим интересам"
+        )
+    },
+    'Металл': {
+        'Ян': (
+            "💡 *Совет на месяц:*\n\n"
+            "⚔️ *Этот месяц — время организаторской и амбициозной энергии*\n"
+            "• Фокус: систематизация и волевые действия\n"
+            "• Стратегия: действуй решительно, выстраивай порядок в делах и отношениях\n"
+            "• Совет: используй энергию месяца, чтобы укрепить авторитет и продвинуться вперёд"
+        ),
+        'Инь': (
+            "💡 *Совет на месяц:*\n\n"
+            "✨ *Время признания, аккуратности и статуса*\n"
+            "• Фокус: репутация, авторитет, внимание к деталям\n"
+            "• Стратегия: доводи проекты до совершенства, работай на качество\n"
+            "• Совет: строй имидж и систему — сейчас это даст максимальный результат"
+        )
+    },
+    'Вода': {
+        'Ян': (
+            "💡 *Совет на месяц:*\n\n"
+            "🌊 *Этот месяц усиливает твою управленческую энергию*\n"
+            "• Фокус: организация процессов, проявление лидерства, новые источники дохода\n"
+            "• Стратегия: бери инициативу в руки, руководи, строй систему\n"
+            "• Совет: время укрепить позиции и показать масштаб — прояви себя как стратег и лидер"
+        ),
+        'Инь': (
+            "💡 *Совет на месяц:*\n\n"
+            "💧 *Этот месяц — время чётких шагов и карьерных решений*\n"
+            "• Фокус: карьера, авторитет, конкретные финансовые результаты\n"
+            "• Стратегия: действуй системно и смело, укрепляй позиции в работе\n"
+            "• Совет: месяц требует дисциплины и результативности — твоя аккуратность принесёт реальные деньги"
+        )
+    }
+}
+
+SUMMARY_2025 = {
+    'Дерево': {
+        'Ян': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Масштабируйтесь за счет правильного выстраивания взаимоотношений с людьми*\n"
+            "• Финансовая грамотность\n"
+            "• Умение говорить «нет» другим\n\n"
+            "🔹 *Сфокусируйтесь на самореализации в удовольствие, но в контроле фин результата*\n"
+            "• Реализация и практическое воплощение идей\n"
+            "• Новые проекты и начинания"
+        ),
+        'Инь': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Возможности приходят через людей*\n"
+            "• Партнерства\n"
+            "• Команды и сотрудничество\n\n"
+            "🔹 *Действуйте!!!! и реализуйте проекты и идеи*\n"
+            "• Идите за своим мнением, даже вопреки чужому\n"
+            "• Активная реализация планов"
+        )
+    },
+    'Огонь': {
+        'Ян': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Обращайте внимание на знания и детали*\n"
+            "• Интеллектуальное развитие и репутация\n"
+            "• Обучение\n"
+            "• Здоровье и внутренние ресурсы\n\n"
+            "🔹 *Партнерства и команды*\n"
+            "• Команды и сотрудничество\n"
+            "• Быт обустройство, внимание\n"
+            "• Родители"
+        ),
+        'Инь': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Оптимизация всех ресурсов и создание новых жизненных стратегий и систем*\n"
+            "• Прислушивайтесь к себе\n"
+            "• Интеллектуальное развитие и репутация\n\n"
+            "🔹 *Масштабируйтесь за счет правильного выстраивания взаимоотношений с людьми*\n"
+            "• Финансовая грамотность\n"
+            "• Умение говорить «нет» другим\n"
+            "• Здоровье\n"
+            "• Поддержка родителей"
+        )
+    },
+    'Земля': {
+        'Ян': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Фокус на карьеру и достижения*\n"
+            "• Авторитет\n"
+            "• Отношения для женщин\n"
+            "• Интеллектуальное развитие и репутация\n"
+            "• Зачатие для женщин\n"
+            "• Дети для мужчин"
+        ),
+        'Инь': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Период новых статусов и достижений*\n"
+            "• Карьера, соц статус\n"
+            "• Отношения для женщин\n"
+            "• Интеллектуальное развитие и репутация\n\n"
+            "🔹 *Обучение и здоровье*\n"
+            "• Обучение\n"
+            "• Здоровье и внутренние ресурсы\n"
+            "• Зачатие для женщин\n"
+            "• Дети для мужчин"
+        )
+    },
+    'Металл': {
+        'Ян': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Фокус на финансы и четкие цели*\n"
+            "• Заработок\n"
+            "• Финансовые стратегии\n\n"
+            "🔹 *Период новых статусов и достижений*\n"
+            "• Карьера\n"
+            "• Отношения для мужчин\n"
+            "• Отношения для женщин"
+        ),
+        'Инь': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Время для предпринимательства и масштабирования фин возможностей*\n"
+            "• Новые финансовые стратегии\n"
+            "• Поиск альтернативных вариантов заработка\n\n"
+            "🔹 *Карьера и достижения*\n"
+            "• Авторитет\n"
+            "• Отношения для мужчин\n"
+            "• Отношения для женщин"
+        )
+    },
+    'Вода': {
+        'Ян': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Действуйте!!!! и реализуйте проекты и идеи*\n"
+            "• Идите за своим мнением, даже вопреки чужому\n"
+            "• Для женщин возможность деторождения\n\n"
+            "🔹 *Время для предпринимательства и масштабирования фин возможностей*\n"
+            "• Новые финансовые стратегии\n"
+            "• Поиск альтернативных вариантов заработка"
+        ),
+        'Инь': (
+            "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
+            "🔹 *Сфокусируйтесь на самореализации в удовольствие, но в контроле фин результата*\n"
+            "• Реализация и практическое воплощение идей\n"
+            "• Делайте то, что приносит радость\n\n"
+            "🔹 *Фокус на финансы и четкие цели*\n"
+            "• Для женщин возможность деторождения\n"
+            "• Финансовое планирование"
+        )
+    }
+}
+
+# 10 вариантов текстов по стволу дня, на них ссылаются все карты (Chart)
+STEM_TEXTS = {
+    stem: StemTexts(
+        stem, info['element'], info['polarity'],
+        PERSONALITY_DESCRIPTIONS[info['element']][info['polarity']],
+        MONTHLY_ADVICE[info['element']][info['polarity']],
+        SUMMARY_2025[info['element']][info['polarity']]
+    )
+    for stem, info in HEAVENLY_STEMS.items()
+}
+
+
+def normalize_birth_time(birth_time: Optional[str]) -> str:
+    """Время рождения чч:мм; «не знаю», пустое или неразборчивое время — DEFAULT_BIRTH_TIME"""
+    match = _TIME_RE.fullmatch((birth_time or '').strip())
+    if match is None or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        return DEFAULT_BIRTH_TIME
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
 
 class SimpleBaziCalculator:
     def __init__(self):
-        self.base_url = "https://www.mingli.ru/calculator/"
-        
         # Словарь китайских иероглифов и их элементов/полярности
-        self.heavenly_stems = {
-            '甲': {'element': 'Дерево', 'polarity': 'Ян'},
-            '乙': {'element': 'Дерево', 'polarity': 'Инь'},
-            '丙': {'element': 'Огонь', 'polarity': 'Ян'},
-            '丁': {'element': 'Огонь', 'polarity': 'Инь'},
-            '戊': {'element': 'Земля', 'polarity': 'Ян'},
-            '己': {'element': 'Земля', 'polarity': 'Инь'},
-            '庚': {'element': 'Металл', 'polarity': 'Ян'},
-            '辛': {'element': 'Металл', 'polarity': 'Инь'},
-            '壬': {'element': 'Вода', 'polarity': 'Ян'},
-            '癸': {'element': 'Вода', 'polarity': 'Инь'}
-        }
+        self.heavenly_stems = HEAVENLY_STEMS
         
         # Словарь животных года
-        self.year_animals = {
-            '子': 'Крыса', '丑': 'Бык', '寅': 'Тигр', '卯': 'Кролик',
-            '辰': 'Дракон', '巳': 'Змея', '午': 'Лошадь', '未': 'Коза',
-            '申': 'Обезьяна', '酉': 'Петух', '戌': 'Собака', '亥': 'Свинья'
-        }
+        self.year_animals = YEAR_ANIMALS
+        
+        # (дата, время, город) -> (момент рождения, столпы, солнечный год рождения)
+        self._timelines = OrderedDict()
     
-    def calculate_bazi(self, birth_date: str, birth_time: str, birth_city: str) -> Dict:
+    def calculate_bazi(self, birth_date: str, birth_time: str, birth_city: str) -> Chart:
         """
-        Расчет БаЦзы через mingli.ru
-        Извлекает элемент личности из колонки "ДЕНЬ", верхняя клеточка
+        Расчет БаЦзы локально, без сетевых запросов
+        Элемент личности — небесный ствол дня (колонка "ДЕНЬ", верхняя клеточка)
+        Сверка с mingli.ru — отдельно и по желанию, см. chart_verifier.py
+        Неизвестное время считается как DEFAULT_BIRTH_TIME; fallback — только для неверной даты
         """
+        birth_time = normalize_birth_time(birth_time)
         try:
-            print("🌐 Подключение к mingli.ru...")
-            
-            # Формируем URL для запроса к mingli.ru
-            # Используем пример URL из вашего сообщения как основу
-            url = "https://www.mingli.ru/calculator/MXwxfNCY0LfQvNCw0LjQu3wyODE2fDMuMHw0NS4zNTAxOTQ0fDI4Ljg1MDE5MTl8MTl8NDB8MTF8NXwxOTgxfHx8fHx8fHx8dW5kZWZpbmVkfDJ8NzA3MzA4fENoSUpIMVpCOS1SbHQwQVJmV0p5N0MzWW1yMHxFdXJvcGUvS2lldnwxfDE="
-            
-            # Отправляем GET запрос с уменьшенным таймаутом
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            print("✅ Успешно получен ответ от mingli.ru")
-            # Парсим HTML ответ
-            return self._parse_response(response.text, birth_date, birth_time, birth_city)
-            
-        except requests.exceptions.ConnectTimeout:
-            print("⏰ Таймаут подключения к mingli.ru (10 сек)")
-            print("🔄 Используем fallback расчет...")
-            return self._fallback_calculation(birth_date, birth_time, birth_city)
-        except requests.exceptions.ConnectionError as e:
-            print(f"🔌 Ошибка подключения к mingli.ru: {e}")
-            print("🔄 Используем fallback расчет...")
-            return self._fallback_calculation(birth_date, birth_time, birth_city)
-        except Exception as e:
-            print(f"❌ Ошибка при расчете БаЦзы через mingli.ru: {e}")
-            print("🔄 Используем fallback расчет...")
-            return self._fallback_calculation(birth_date, birth_time, birth_city)
-    
-    def _parse_response(self, html_content: str, birth_date: str, birth_time: str, birth_city: str) -> Dict:
-        """Парсинг HTML ответа от mingli.ru - всегда используем математический расчет для надежности"""
-        try:
-            # Всегда используем математический расчет для любой даты - это гарантирует правильность
-            print("🔢 Используем математический расчет по дате для точности...")
-            
             # Парсим дату для расчета
             date_parts = birth_date.split('.')
             if len(date_parts) != 3:
                 print("⚠️ Неверный формат даты, используем fallback")
                 return self._fallback_calculation(birth_date, birth_time, birth_city)
             
-            day = int(date_parts[0])
-            month = int(date_parts[1])
-            year = int(date_parts[2])
+            pillars = self.calculate_pillars(birth_date, birth_time, birth_city)
             
-            # Расчет элемента личности по дню рождения
-            element, polarity, day_stem_char = self._calculate_day_stem(day, month, year)
+            # Элемент личности — небесный ствол дня
+            day_stem_char = pillars.day.stem
+            element = self.heavenly_stems[day_stem_char]['element']
+            polarity = self.heavenly_stems[day_stem_char]['polarity']
             print(f"✅ Расчет элемента: {element} {polarity} ({day_stem_char})")
             
-            # Расчет животного года
-            year_animal, year_branch_char = self._calculate_year_animal(year)
+            # Животное года — по солнечному году, который начинается в Личунь
+            year_branch_char = pillars.year.branch
+            year_animal = self.year_animals[year_branch_char]
             print(f"✅ Расчет животного: {year_animal} ({year_branch_char})")
             
-            # Получаем описание личности
-            personality_desc = self._get_personality_description(element, polarity)
-            
-            return {
-                'element': element,
-                'polarity': polarity,
-                'year_animal': year_animal,
-                'day_stem_char': day_stem_char,
-                'year_branch_char': year_branch_char,
-                'birth_date': birth_date,
-                'birth_time': birth_time,
-                'birth_city': birth_city,
-                'personality': personality_desc,
-                'monthly_advice': self._get_monthly_advice(element, polarity),
-                'summary_2025': self._get_summary_2025(element, polarity)
-            }
+            return Chart(day_stem_char, year_animal, year_branch_char, birth_date, birth_time, birth_city, pillars)
             
         except Exception as e:
             print(f"❌ Ошибка в расчете: {e}")
@@ -111,323 +376,149 @@ class SimpleBaziCalculator:
     
     def _get_personality_description(self, element: str, polarity: str) -> Dict:
         """Получение описания личности согласно Google Sheets"""
-        descriptions = {
-            'Дерево': {
-                'Ян': {
-                    'description': 'Ты — как могучее дерево.\nУпорный, настойчивый, любознательный, с внутренним стержнем и силой, которая со временем подчиняет своему влиянию всё вокруг.',
-                    'superpower': 'несгибаемость, лидерство и креативность, которые помогают тебе воплощать даже самые смелые замыслы.',
-                    'emoji': '🌳'
-                },
-                'Инь': {
-                    'description': 'Ты — как лиана или вьющийся цветок. Гибкий, дипломатичный, утончённый, умеешь обходить преграды и находить доступ к ресурсам в любых условиях. Твоя мягкость часто оказывается сильнее грубой силы.',
-                    'superpower': 'гибкая настойчивость, дипломатия, креативность.',
-                    'emoji': '🌿'
-                }
-            },
-            'Огонь': {
-                'Ян': {
-                    'description': 'Ты — как солнце: яркий, вдохновляющий, освещающий путь. Ты видишь в людях их потенциал и зажигаешь сердца, ведешь за собой. Ты умеешь ценить и любить.',
-                    'superpower': 'харизма, оптимизм, лидерство.',
-                    'emoji': '☀️'
-                },
-                'Инь': {
-                    'description': 'Ты — как пламя свечи.\nНежный, но сильный. Ты согреваешь, направляешь, создаёшь уют и надежду даже в темноте.',
-                    'superpower': 'интуиция, эмпатия и способность давать свет там, где он особенно нужен.',
-                    'emoji': '🕯️'
-                }
-            },
-            'Земля': {
-                'Ян': {
-                    'description': 'Ты — как непоколебимая гора с сокровищами.\nНадёжная, устойчивая, практичная. Стабильность в этом мире существует только за счет такой энергии. Ты — опора, на которую можно положиться, и которая держит мир вокруг.',
-                    'superpower': 'сила воли, твёрдость убеждений, консервативность.',
-                    'emoji': '⛰️'
-                },
-                'Инь': {
-                    'description': 'Ты — как плодородная почва.\nЩедрая, заботливая, умеешь создавать ресурсы и пространство для роста других. Но твоя мягкость скрывает глубокую силу.',
-                    'superpower': 'забота, терпение, способность превращать идеи в плоды.',
-                    'emoji': '🌱'
-                }
-            },
-            'Металл': {
-                'Ян': {
-                    'description': 'Ты — как меч.\nПрямолинейный, честный, решительный. Твоё слово весомо, твои поступки точны.\nУмеешь отстаивать идеи, действовать независимо.',
-                    'superpower': 'характер, справедливость, решительность, умение быть лидером, управлять собой и другими.',
-                    'emoji': '⚔️'
-                },
-                'Инь': {
-                    'description': 'Ты — как драгоценность: утончённый, изысканный и блистательный.\nЗа твоей элегантностью и мягким сиянием скрывается "металлическая" внутренняя стойкость и умение замечать малейшие детали.\nТы ценишь красоту и стремишься к совершенству.',
-                    'superpower': 'ответственность, аналитический ум, особое чувство прекрасного и тонкая аристократичная харизма.',
-                    'emoji': '💎'
-                }
-            },
-            'Вода': {
-                'Ян': {
-                    'description': 'Ты — как океан.\nМощный, глубокий, непредсказуемый. С тобой всегда интуиция, врожденная мудрость.',
-                    'superpower': 'интеллект, масштабное мышление, внутренняя свобода, способность объединять.',
-                    'emoji': '🌊'
-                },
-                'Инь': {
-                    'description': 'Ты — как утренняя роса или ручей.\nТонкий, чувствительный, очень глубоко переживающий эмоции, умный. Легко находишь общий язык с людьми, умеешь обволакивать и мягко увлекать за собой.',
-                    'superpower': 'интуиция, налаживание связей, коммуникация, мудрость в деталях, дипломатичность, чувственность.',
-                    'emoji': '💧'
-                }
-            }
-        }
-        
-        return descriptions.get(element, {}).get(polarity, {
-            'description': 'Описание недоступно',
-            'superpower': 'Суперсила недоступна',
-            'emoji': '❓'
-        })
+        return PERSONALITY_DESCRIPTIONS.get(element, {}).get(polarity, _UNKNOWN_PERSONALITY)
     
     def _get_monthly_advice(self, element: str, polarity: str) -> str:
         """Получение совета на месяц согласно Google Sheets"""
-        advice_map = {
-            'Дерево': {
-                'Ян': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "🌳 *Решимость = успех*\n"
-                    "• Фокус: прорывы, шаги через препятствия\n"
-                    "• Действуй напором, пробивай новые ниши, бери ответственность"
-                ),
-                'Инь': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "🌸 *Возможности = рост*\n"
-                    "• Фокус: сотрудничество, мелкие шаги, тонкие связи\n"
-                    "• Ищи новые пути, используй мелкие возможности, вплетай себя в окружение"
-                )
-            },
-            'Огонь': {
-                'Ян': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "☀️ *Этот месяц — время лидерства и объединения*\n"
-                    "• Фокус: публичность, командные проекты, масштабные выступления\n"
-                    "• Стратегия: выходи в люди, веди за собой, презентуй свои идеи\n"
-                    "• Совет: сияй ярко, но будь предусмотрителен — среди людей возможна конкуренция"
-                ),
-                'Инь': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "🔥 *Этот месяц для тебя — про людей и самовыражение*\n"
-                    "• Фокус: реализуй идеи и проявляйся через креатив и оригинальность\n"
-                    "• Стратегия: будь в центре внимания, создавай эффектное впечатление\n"
-                    "• Совет: держи внимание на своих задачах, умей ставить границы и защищать интересы"
-                )
-            },
-            'Земля': {
-                'Ян': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "⛰ *Этот месяц — про людей и ресурсы*\n"
-                    "• Фокус: укрепляй команду и ресурсы\n"
-                    "• Стратегия: строй структуру, опору, действуй масштабно\n"
-                    "• Совет: делай ставку на связи, но держи фокус на своих задачах и потребностях"
-                ),
-                'Инь': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "🌱 *Поддержка и твои ресурсы = самореализация*\n"
-                    "• Фокус: крупные проекты, стабильные связи\n"
-                    "• Стратегия: опирайся на сильных людей и структуры\n"
-                    "• Совет: контролируй расходы, не помогай другим в ущерб своим интересам"
-                )
-            },
-            'Металл': {
-                'Ян': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "⚔️ *Этот месяц — время организаторской и амбициозной энергии*\n"
-                    "• Фокус: систематизация и волевые действия\n"
-                    "• Стратегия: действуй решительно, выстраивай порядок в делах и отношениях\n"
-                    "• Совет: используй энергию месяца, чтобы укрепить авторитет и продвинуться вперёд"
-                ),
-                'Инь': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "✨ *Время признания, аккуратности и статуса*\n"
-                    "• Фокус: репутация, авторитет, внимание к деталям\n"
-                    "• Стратегия: доводи проекты до совершенства, работай на качество\n"
-                    "• Совет: строй имидж и систему — сейчас это даст максимальный результат"
-                )
-            },
-            'Вода': {
-                'Ян': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "🌊 *Этот месяц усиливает твою управленческую энергию*\n"
-                    "• Фокус: организация процессов, проявление лидерства, новые источники дохода\n"
-                    "• Стратегия: бери инициативу в руки, руководи, строй систему\n"
-                    "• Совет: время укрепить позиции и показать масштаб — прояви себя как стратег и лидер"
-                ),
-                'Инь': (
-                    "💡 *Совет на месяц:*\n\n"
-                    "💧 *Этот месяц — время чётких шагов и карьерных решений*\n"
-                    "• Фокус: карьера, авторитет, конкретные финансовые результаты\n"
-                    "• Стратегия: действуй системно и смело, укрепляй позиции в работе\n"
-                    "• Совет: месяц требует дисциплины и результативности — твоя аккуратность принесёт реальные деньги"
-                )
-            }
-        }
-        
-        return advice_map.get(element, {}).get(polarity, "Сосредоточьтесь на внутренней гармонии и балансе.")
+        return MONTHLY_ADVICE.get(element, {}).get(polarity, "Сосредоточьтесь на внутренней гармонии и балансе.")
     
     def _get_summary_2025(self, element: str, polarity: str) -> str:
         """Получение резюме 2025 года согласно ТЗ"""
-        summary_map = {
-            'Дерево': {
-                'Ян': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Масштабируйтесь за счет правильного выстраивания взаимоотношений с людьми*\n"
-                    "• Финансовая грамотность\n"
-                    "• Умение говорить «нет» другим\n\n"
-                    "🔹 *Сфокусируйтесь на самореализации в удовольствие, но в контроле фин результата*\n"
-                    "• Реализация и практическое воплощение идей\n"
-                    "• Новые проекты и начинания"
-                ),
-                'Инь': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Возможности приходят через людей*\n"
-                    "• Партнерства\n"
-                    "• Команды и сотрудничество\n\n"
-                    "🔹 *Действуйте!!!! и реализуйте проекты и идеи*\n"
-                    "• Идите за своим мнением, даже вопреки чужому\n"
-                    "• Активная реализация планов"
-                )
-            },
-            'Огонь': {
-                'Ян': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Обращайте внимание на знания и детали*\n"
-                    "• Интеллектуальное развитие и репутация\n"
-                    "• Обучение\n"
-                    "• Здоровье и внутренние ресурсы\n\n"
-                    "🔹 *Партнерства и команды*\n"
-                    "• Команды и сотрудничество\n"
-                    "• Быт обустройство, внимание\n"
-                    "• Родители"
-                ),
-                'Инь': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Оптимизация всех ресурсов и создание новых жизненных стратегий и систем*\n"
-                    "• Прислушивайтесь к себе\n"
-                    "• Интеллектуальное развитие и репутация\n\n"
-                    "🔹 *Масштабируйтесь за счет правильного выстраивания взаимоотношений с людьми*\n"
-                    "• Финансовая грамотность\n"
-                    "• Умение говорить «нет» другим\n"
-                    "• Здоровье\n"
-                    "• Поддержка родителей"
-                )
-            },
-            'Земля': {
-                'Ян': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Фокус на карьеру и достижения*\n"
-                    "• Авторитет\n"
-                    "• Отношения для женщин\n"
-                    "• Интеллектуальное развитие и репутация\n"
-                    "• Зачатие для женщин\n"
-                    "• Дети для мужчин"
-                ),
-                'Инь': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Период новых статусов и достижений*\n"
-                    "• Карьера, соц статус\n"
-                    "• Отношения для женщин\n"
-                    "• Интеллектуальное развитие и репутация\n\n"
-                    "🔹 *Обучение и здоровье*\n"
-                    "• Обучение\n"
-                    "• Здоровье и внутренние ресурсы\n"
-                    "• Зачатие для женщин\n"
-                    "• Дети для мужчин"
-                )
-            },
-            'Металл': {
-                'Ян': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Фокус на финансы и четкие цели*\n"
-                    "• Заработок\n"
-                    "• Финансовые стратегии\n\n"
-                    "🔹 *Период новых статусов и достижений*\n"
-                    "• Карьера\n"
-                    "• Отношения для мужчин\n"
-                    "• Отношения для женщин"
-                ),
-                'Инь': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Время для предпринимательства и масштабирования фин возможностей*\n"
-                    "• Новые финансовые стратегии\n"
-                    "• Поиск альтернативных вариантов заработка\n\n"
-                    "🔹 *Карьера и достижения*\n"
-                    "• Авторитет\n"
-                    "• Отношения для мужчин\n"
-                    "• Отношения для женщин"
-                )
-            },
-            'Вода': {
-                'Ян': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Действуйте!!!! и реализуйте проекты и идеи*\n"
-                    "• Идите за своим мнением, даже вопреки чужому\n"
-                    "• Для женщин возможность деторождения\n\n"
-                    "🔹 *Время для предпринимательства и масштабирования фин возможностей*\n"
-                    "• Новые финансовые стратегии\n"
-                    "• Поиск альтернативных вариантов заработка"
-                ),
-                'Инь': (
-                    "🌟 *Основные фокусы и задачи на 2025 год:*\n\n"
-                    "🔹 *Сфокусируйтесь на самореализации в удовольствие, но в контроле фин результата*\n"
-                    "• Реализация и практическое воплощение идей\n"
-                    "• Делайте то, что приносит радость\n\n"
-                    "🔹 *Фокус на финансы и четкие цели*\n"
-                    "• Для женщин возможность деторождения\n"
-                    "• Финансовое планирование"
-                )
-            }
-        }
-        
-        return summary_map.get(element, {}).get(polarity, "2025 год будет временем внутреннего роста и гармонии.")
+        return SUMMARY_2025.get(element, {}).get(polarity, "2025 год будет временем внутреннего роста и гармонии.")
     
     def _calculate_day_stem(self, day: int, month: int, year: int) -> tuple:
         """
         Расчет небесного ствола дня (элемента личности) по дате рождения
-        Использует правильную формулу БаЦзы для определения небесного ствола дня
+        Ствол берется из таблицы столпов дня (day_pillars) одним обращением по индексу
         """
-        # Небесные стволы: 甲(0), 乙(1), 丙(2), 丁(3), 戊(4), 己(5), 庚(6), 辛(7), 壬(8), 癸(9)
-        stems = ['甲', '乙', '丙', '丁', '戊', '己', '庚', '辛', '壬', '癸']
+        day_stem_char, _ = day_pillar(day, month, year)
         
-        # Используем более точную формулу на основе григорианского календаря
-        # Базовый день: 1 января 1900 года = 甲子 (небесный ствол 甲, земная ветвь 子)
+        # Определяем элемент и полярность по небесному стволу
+        element_info = self.heavenly_stems[day_stem_char]
+        return element_info['element'], element_info['polarity'], day_stem_char
+    
+    def calculate_pillars(self, birth_date: str, birth_time: str = '12:00', birth_city: str = None,
+                          timezone_name: str = None) -> FourPillars:
+        """
+        Четыре столпа по дате и времени рождения (местное время города или пояса timezone_name)
+        Год и месяц — по сезонным узлам из solar_terms.bin, без обращения к mingli.ru
+        Если город есть в справочнике (gazetteer), берется его пояс, а час — по истинному солнечному времени;
+        иначе — пояс TIMEZONE_DEFAULT и время по часам
+        """
+        moment, city = self._birth_moment(birth_date, birth_time, birth_city, timezone_name)
+        return calculate_four_pillars(moment, longitude=city.longitude if city else None)
+    
+    def _birth_moment(self, birth_date: str, birth_time: str, birth_city: str = None,
+                      timezone_name: str = None) -> tuple:
+        """Момент рождения с часовым поясом и город из справочника (или None)"""
+        city = find_city(birth_city) if birth_city else None
+        zone = timezone_name or (city.timezone if city else TIMEZONE_DEFAULT)
+        day, month, year = (int(part) for part in birth_date.split('.'))
+        hour, minute = (int(part) for part in birth_time.split(':'))
+        return datetime(year, month, day, hour, minute, tzinfo=ZoneInfo(zone)), city
+    
+    def _timeline(self, chart: Dict) -> tuple:
+        """Момент рождения, столпы и солнечный год рождения для карты (кэш на TIMELINE_CACHE_SIZE карт)"""
+        key = (chart['birth_date'], chart.get('birth_time') or '12:00', chart.get('birth_city'))
+        entry = self._timelines.get(key)
+        if entry is not None:
+            self._timelines.move_to_end(key)
+            return entry
         
-        # Конвертируем в юлианский день для точного расчета
-        julian_day = self._gregorian_to_julian_day(day, month, year)
+        moment, city = self._birth_moment(*key)
+        pillars = calculate_four_pillars(moment, longitude=city.longitude if city else None)
+        entry = (moment, pillars, solar_year(moment, jie_month(moment)))
+        self._timelines[key] = entry
+        if len(self._timelines) > TIMELINE_CACHE_SIZE:
+            self._timelines.popitem(last=False)
+        return entry
+    
+    def luck_pillars(self, chart: Dict, gender: str = 'Жен') -> Iterator[LuckPillar]:
+        """
+        Такты удачи (大运) по 10 лет — ленивый бесконечный генератор, берите нужный срез через islice
+        chart — результат calculate_bazi или карта из базы (нужны birth_date, birth_time, birth_city)
+        Пол в боте не спрашивается, по умолчанию — женский, как в запросах к mingli.ru
+        """
+        moment, pillars, _ = self._timeline(chart)
+        forward = luck_forward(pillars.year, male=gender.strip().casefold().startswith('муж'))
+        return iter_luck_pillars(moment, pillars.month, forward)
+    
+    def annual_pillars(self, chart: Dict, start_year: int = None) -> Iterator[AnnualPillar]:
+        """Столпы лет (流年) — ленивый бесконечный генератор от start_year (по умолчанию — от года рождения)"""
+        _, _, birth_year = self._timeline(chart)
+        return iter_annual_pillars(birth_year, start_year)
+    
+    def calculate_many(self, days, months, years, timezone_name: str = None) -> Dict:
+        """
+        Пакетный расчет для массивов дней, месяцев и лет (например, пересчет всей базы)
+        Возвращает массивы NumPy с теми же значениями, что и calculate_bazi для 12:00 в поясе
+        timezone_name (по умолчанию TIMEZONE_DEFAULT)
+        Дни, в которые «цзе» может попасть на полдень при любом смещении пояса, считаются скалярно
+        """
+        # NumPy импортируется только здесь: боту при старте он не нужен
+        import numpy as np
         
-        # Базовый день: 1 января 1900 года = 甲子
-        base_julian = self._gregorian_to_julian_day(1, 1, 1900)
-        base_stem_index = 0  # 甲 = 0
+        days = np.asarray(days, dtype=np.int64)
+        months = np.asarray(months, dtype=np.int64)
+        years = np.asarray(years, dtype=np.int64)
         
-        # Вычисляем количество дней с базовой даты
-        days_diff = julian_day - base_julian
+        # Дата как datetime64[D]: год + (месяц - 1) + (день - 1)
+        month_starts = (years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (months - 1)
+        dates = month_starts.astype('datetime64[D]') + (days - 1)
+        invalid = (months < 1) | (months > 12) | (days < 1) | (dates.astype('datetime64[M]') != month_starts)
+        if invalid.any():
+            raise ValueError(f"Некорректных дат: {int(invalid.sum())}, первая — индекс {int(np.argmax(invalid))}")
         
-        # Определяем небесный ствол дня (цикл 10 дней)
-        # Учитываем, что цикл начинается с 甲 (индекс 0)
-        stem_index = (base_stem_index + days_diff) % 10
-        if stem_index < 0:
-            stem_index += 10
+        # Позиция в 60-дневном цикле, как в таблице day_pillars
+        offsets = (dates - np.datetime64(f'{FIRST_YEAR}-01-01', 'D')).astype(np.int64)
+        cycle = (DAY_CYCLE_BASE_INDEX + offsets) % 60
+        stem_index = cycle % 10
         
-        day_stem_char = stems[stem_index]
+        # Год меняется в Личунь: ищем последний узел перед полднем дня рождения
+        first_term, term_minutes = term_table()
+        term_minutes = np.frombuffer(term_minutes, dtype=np.int32)
         
-        # Определяем элемент и полярность по небесному стволу
-        if day_stem_char in self.heavenly_stems:
-            element_info = self.heavenly_stems[day_stem_char]
-            element = element_info['element']
-            polarity = element_info['polarity']
-        else:
-            # Fallback
-            element = 'Дерево'
-            polarity = 'Ян'
-            day_stem_char = '甲'
+        def solar_month(minutes):
+            terms = (first_term + np.searchsorted(term_minutes, minutes, side='right') - 1) % 24
+            terms -= (terms % 2 == 0).astype(np.int64)
+            return (terms - LICHUN) % 24 // 2
         
-        return element, polarity, day_stem_char
+        # offsets отсчитаны от 1900-01-01, как и минуты в таблице узлов
+        # Полдень в поясах от UTC+14 до UTC-12 — от 22:00 UTC предыдущего дня до 24:00 UTC
+        month_index = solar_month(offsets * 1440 - 120)
+        boundary = np.flatnonzero(month_index != solar_month(offsets * 1440 + 1440))
+        year_index = (years - ((month_index >= 10) & (months <= 2)) - 4) % 12
+        
+        # В день смены месяца результат зависит от пояса и летнего времени — как в calculate_bazi
+        for i in boundary:
+            birth_date = f'{days[i]:02d}.{months[i]:02d}.{years[i]}'
+            pillars = self.calculate_pillars(birth_date, '12:00', timezone_name=timezone_name)
+            year_index[i] = BRANCHES.index(pillars.year.branch)
+        
+        stems = np.array(STEMS)
+        branches = np.array(BRANCHES)
+        elements = np.array([self.heavenly_stems[stem]['element'] for stem in STEMS])
+        polarities = np.array([self.heavenly_stems[stem]['polarity'] for stem in STEMS])
+        animals = np.array([self.year_animals[branch] for branch in BRANCHES])
+        
+        return {
+            'element': elements[stem_index],
+            'polarity': polarities[stem_index],
+            'day_stem_char': stems[stem_index],
+            'day_branch_char': branches[cycle % 12],
+            'year_animal': animals[year_index],
+            'year_branch_char': branches[year_index],
+        }
     
-    def _calculate_year_animal(self, year: int) -> tuple:
+    def _calculate_year_animal(self, year: int, moment: datetime = None) -> tuple:
         """
         Расчет животного года и земной ветви по году рождения
+        Если задан момент рождения, год считается от Личунь (январь и начало февраля — прошлый год)
         Китайский календарь: 1900 год = Крыса (子)
         """
+        if moment is not None:
+            year = solar_year(moment, jie_month(moment))
+        
         # Земные ветви: 子(0), 丑(1), 寅(2), 卯(3), 辰(4), 巳(5), 午(6), 未(7), 申(8), 酉(9), 戌(10), 亥(11)
         branches = ['子', '丑', '寅', '卯', '辰', '巳', '午', '未', '申', '酉', '戌', '亥']
         
@@ -435,53 +526,16 @@ class SimpleBaziCalculator:
         animals = ['Крыса', 'Бык', 'Тигр', 'Кролик', 'Дракон', 'Змея', 
                    'Лошадь', 'Коза', 'Обезьяна', 'Петух', 'Собака', 'Свинья']
         
-        # Базовый год: 1900 = Крыса (индекс 0)
-        # Вычисляем индекс животного (цикл 12 лет)
-        animal_index = (year - 1900) % 12
-        if animal_index < 0:
-            animal_index += 12
+        # Базовый год: 1900 = Крыса (индекс 0), единая формула для всех калькуляторов
+        animal_index = year_branch_index(year)
         
         year_branch_char = branches[animal_index]
         year_animal = animals[animal_index]
         
         return year_animal, year_branch_char
     
-    def _gregorian_to_julian_day(self, day: int, month: int, year: int) -> int:
-        """
-        Конвертация григорианской даты в юлианский день
-        Использует правильную формулу для расчета юлианского дня
-        """
-        if month <= 2:
-            year -= 1
-            month += 12
-        
-        a = year // 100
-        b = 2 - a + a // 4
-        
-        julian_day = int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) + day + b - 1524
-        
-        return julian_day
-    
-    def test_day_stem_calculation(self):
-        """Тестовая функция для проверки точности расчета небесного ствола дня"""
-        print("=== Тест расчета небесного ствола дня ===")
-        
-        # Тест 1: 20.02.1964 - должен быть Дерево Ян (甲)
-        result1 = self._calculate_day_stem(20, 2, 1964)
-        print(f"20.02.1964: {result1} (ожидается: Дерево Ян, 甲)")
-        
-        # Тест 2: 10.09.1981 - должен быть Металл Инь (辛)
-        result2 = self._calculate_day_stem(10, 9, 1981)
-        print(f"10.09.1981: {result2} (ожидается: Металл Инь, 辛)")
-        
-        # Тест базового дня
-        result3 = self._calculate_day_stem(1, 1, 1900)
-        print(f"01.01.1900: {result3} (ожидается: Дерево Ян, 甲)")
-        
-        return result1, result2, result3
-    
-    def _fallback_calculation(self, birth_date: str, birth_time: str, birth_city: str) -> Dict:
-        """Fallback расчет если mingli.ru недоступен"""
+    def _fallback_calculation(self, birth_date: str, birth_time: str, birth_city: str) -> Chart:
+        """Fallback расчет, если основной расчет не удался"""
         try:
             print("🔄 Выполняем fallback расчет...")
             
@@ -498,41 +552,13 @@ class SimpleBaziCalculator:
             
             print(f"✅ Fallback расчет: {element} {polarity} ({day_stem_char})")
             
-            personality_desc = self._get_personality_description(element, polarity)
-            
-            return {
-                'element': element,
-                'polarity': polarity,
-                'year_animal': year_animal,
-                'day_stem_char': day_stem_char,
-                'year_branch_char': year_branch_char,
-                'birth_date': birth_date,
-                'birth_time': birth_time,
-                'birth_city': birth_city,
-                'personality': personality_desc,
-                'monthly_advice': self._get_monthly_advice(element, polarity),
-                'summary_2025': self._get_summary_2025(element, polarity)
-            }
+            return Chart(day_stem_char, year_animal, year_branch_char, birth_date, birth_time, birth_city)
         except Exception as e:
             print(f"❌ Ошибка в fallback расчете: {e}")
             print("🆘 Используем минимальный fallback...")
             # Минимальный fallback
-            return {
-                'element': 'Дерево',
-                'polarity': 'Ян',
-                'year_animal': 'Крыса',
-                'day_stem_char': '甲',
-                'year_branch_char': '子',
-                'birth_date': birth_date,
-                'birth_time': birth_time,
-                'birth_city': birth_city,
-                'personality': self._get_personality_description('Дерево', 'Ян'),
-                'monthly_advice': self._get_monthly_advice('Дерево', 'Ян'),
-                'summary_2025': self._get_summary_2025('Дерево', 'Ян')
-            }
+            return Chart('甲', 'Крыса', '子', birth_date, birth_time, birth_city)
     
     def _get_year_animal(self, year: int) -> str:
         """Определение животного года по китайскому календарю"""
-        animals = ['Крыса', 'Бык', 'Тигр', 'Кролик', 'Дракон', 'Змея', 
-                  'Лошадь', 'Коза', 'Обезьяна', 'Петух', 'Собака', 'Свинья']
-        return animals[(year - 4) % 12]
+        return self._calculate_year_animal(year)[0]
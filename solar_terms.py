@@ -0,0 +1,183 @@
+"""
+24 сезонных узла (цзеци) на 1900–2100 годы
+Моменты хранятся в solar_terms.bin (минуты UTC от 1900-01-01), поиск — bisect по массиву
+Файл генерируется этим модулем: python solar_terms.py
+
+Формат solar_terms.bin (little-endian, без выравнивания):
+    заголовок 10 байт '<4sBBI' — сигнатура b'BZST', версия, индекс первого узла (0–23), число узлов
+    далее на каждый узел int32 — минуты UTC от 1900-01-01
+"""
+import math
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solar_terms.bin')
+
+# Узел k — момент, когда видимая долгота Солнца равна 15 * k градусов (0 — весеннее равноденствие)
+TERM_NAMES = (
+    'Чуньфэнь', 'Цинмин', 'Гуюй', 'Лися', 'Сяомань', 'Манчжун',
+    'Сячжи', 'Сяошу', 'Дашу', 'Лицю', 'Чушу', 'Байлу',
+    'Цюфэнь', 'Ханьлу', 'Шуанцзян', 'Лидун', 'Сяосюэ', 'Дасюэ',
+    'Дунчжи', 'Сяохань', 'Дахань', 'Личунь', 'Юйшуй', 'Цзинчжэ',
+)
+LICHUN = 21  # 315°, начало года по солнечному календарю
+
+EPOCH = datetime(1900, 1, 1, tzinfo=timezone.utc)
+# С запасом по краям: до 1900-01-01 по местному времени действует узел Дасюэ 1899 года
+TABLE_START = datetime(1899, 11, 1, tzinfo=timezone.utc)
+TABLE_END = datetime(2101, 3, 1, tzinfo=timezone.utc)
+
+_MAGIC = b'BZST'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBI')  # 10 байт: сигнатура, версия, индекс первого узла, число узлов
+
+_table = None
+
+
+# --- Генерация (Meeus, «Astronomical Algorithms», гл. 25: точность ~0.01°, т.е. моменты узлов до ~15 минут) ---
+
+def _julian_day(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds() / 86400.0 + 2415020.5
+
+
+def _delta_t(year: float) -> float:
+    """TT − UT в секундах (полиномы Espenak–Meeus)"""
+    if year < 1920:
+        t = year - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t ** 2 + 0.0061966 * t ** 3 - 0.000197 * t ** 4
+    if year < 1941:
+        t = year - 1920
+        return 21.20 + 0.84493 * t - 0.076100 * t ** 2 + 0.0020936 * t ** 3
+    if year < 1961:
+        t = year - 1950
+        return 29.07 + 0.407 * t - t ** 2 / 233 + t ** 3 / 2547
+    if year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t ** 2 / 260 - t ** 3 / 718
+    if year < 2005:
+        t = year - 2000
+        return (63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3
+                + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5)
+    if year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t ** 2
+    return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+
+
+def _sun_longitude(jde: float) -> float:
+    """Видимая геоцентрическая долгота Солнца в градусах"""
+    t = (jde - 2451545.0) / 36525
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    anomaly = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    center = ((1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(anomaly)
+              + (0.019993 - 0.000101 * t) * math.sin(2 * anomaly)
+              + 0.000289 * math.sin(3 * anomaly))
+    omega = math.radians(125.04 - 1934.136 * t)
+    return (mean_longitude + center - 0.00569 - 0.00478 * math.sin(omega)) % 360
+
+
+def _solve(target: float, jde: float) -> float:
+    """Момент (JDE), когда долгота Солнца равна target, начиная от близкой оценки"""
+    for _ in range(20):
+        delta = (target - _sun_longitude(jde) + 180) % 360 - 180
+        jde += delta * 365.2422 / 360
+        if abs(delta) < 1e-7:
+            break
+    return jde
+
+
+def generate_table() -> Tuple[int, array]:
+    """Индекс первого узла и моменты всех узлов диапазона в минутах UTC от EPOCH"""
+    jde = _julian_day(TABLE_START)
+    first = int(_sun_longitude(jde) // 15 + 1) % 24
+    end = _julian_day(TABLE_END)
+
+    minutes = array('i')
+    k = first
+    while True:
+        jde = _solve(15.0 * k, jde + 365.2422 / 24 if minutes else jde)
+        if jde >= end:
+            break
+        year = 1900 + (jde - 2415020.5) / 365.2425
+        jd_ut = jde - _delta_t(year) / 86400
+        minutes.append(round((jd_ut - 2415020.5) * 1440))
+        k = (k + 1) % 24
+    return first, minutes
+
+
+def write_table(path: str = TABLE_PATH) -> int:
+    first, minutes = generate_table()
+    if minutes.itemsize != 4:
+        raise RuntimeError("Нужен 32-битный array('i')")
+    if struct.pack('=i', 1) != struct.pack('<i', 1):
+        minutes.byteswap()
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, first, len(minutes)))
+        f.write(minutes.tobytes())
+    return len(minutes)
+
+
+# --- Чтение и поиск ---
+
+def load_table(path: str = TABLE_PATH) -> Tuple[int, array]:
+    with open(path, 'rb') as f:
+        magic, version, first, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: неизвестный формат таблицы узлов")
+        minutes = array('i')
+        minutes.frombytes(f.read(count * 4))
+    if struct.pack('=i', 1) != struct.pack('<i', 1):
+        minutes.byteswap()
+    if len(minutes) != count:
+        raise ValueError(f"{path}: таблица узлов обрезана")
+    return first, minutes
+
+
+def term_table() -> Tuple[int, array]:
+    """Таблица из solar_terms.bin (загружается один раз): индекс первого узла и моменты"""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+def term_at(moment: datetime) -> Tuple[int, datetime]:
+    """Последний узел не позже момента (datetime с часовым поясом): (k, момент узла в UTC)"""
+    first, minutes = term_table()
+    offset = (moment - EPOCH) // timedelta(minutes=1)
+    i = bisect_right(minutes, offset) - 1
+    if i < 0 or i == len(minutes) - 1:
+        raise ValueError(f"{moment:%d.%m.%Y} вне таблицы сезонных узлов (1900–2100)")
+    return (first + i) % 24, EPOCH + timedelta(minutes=minutes[i])
+
+
+def jie_bounds(moment: datetime) -> Tuple[datetime, datetime]:
+    """Начало текущего месяца солнечного года и начало следующего (моменты узлов «цзе» в UTC)"""
+    first, minutes = term_table()
+    offset = (moment - EPOCH) // timedelta(minutes=1)
+    i = bisect_right(minutes, offset) - 1
+    if (first + i) % 2 == 0:
+        i -= 1
+    if i < 0 or i + 2 >= len(minutes):
+        raise ValueError(f"{moment:%d.%m.%Y} вне таблицы сезонных узлов (1900–2100)")
+    return EPOCH + timedelta(minutes=minutes[i]), EPOCH + timedelta(minutes=minutes[i + 2])
+
+
+def jie_month(moment: datetime) -> int:
+    """
+    Номер месяца солнечного года: 0 — месяц 寅 (от Личунь), 11 — месяц 丑
+    Месяц начинают только нечетные узлы («цзе»): Личунь, Цзинчжэ, Цинмин и т.д.
+    """
+    k, _ = term_at(moment)
+    if k % 2 == 0:
+        k -= 1
+    return (k - LICHUN) % 24 // 2
+
+
+if __name__ == "__main__":
+    count = write_table()
+    print(f"✅ {TABLE_PATH}: {count} узлов, {os.path.getsize(TABLE_PATH)} байт")
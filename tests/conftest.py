@@ -0,0 +1,31 @@
+"""
+Общие фикстуры тестов
+Тесты с базой идут на отдельной одноразовой базе Postgres: TEST_DATABASE_URL=postgresql://... pytest
+Без TEST_DATABASE_URL они пропускаются
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    """Адрес тестовой базы с примененными миграциями"""
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip("TEST_DATABASE_URL не задан")
+    from migrations import migrate
+    migrate(url)
+    return url
+
+
+@pytest.fixture
+def database(database_url):
+    """Database на тестовой базе; пул закрывается после теста"""
+    from database import Database
+    db = Database(database_url, min_size=0, max_size=2)
+    yield db
+    db.close()
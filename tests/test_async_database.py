@@ -0,0 +1,112 @@
+"""Асинхронная обертка над Database (async_database.py)"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+
+from async_database import AsyncDatabase
+
+
+class BlockingDatabase:
+    """Database в памяти: get_user читает строку и ждет release, как долгий SELECT"""
+
+    pool = SimpleNamespace(max_size=4)
+
+    def __init__(self):
+        self.rows = {1: {'user_id': 1, 'username': 'old'}}
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def get_user(self, user_id):
+        row = dict(self.rows[user_id])
+        self.reading.set()
+        self.release.wait(5)
+        return row
+
+    def save_users_batch(self, users):
+        for user_id, fields in users.items():
+            self.rows.setdefault(user_id, {'user_id': user_id}).update(fields)
+
+    def close(self):
+        pass
+
+
+def test_get_user_keeps_queued_write_flushed_during_read():
+    """Сброс очереди, завершившийся во время чтения, не возвращает старую строку"""
+    async def scenario():
+        stub = BlockingDatabase()
+        db = AsyncDatabase(database=stub, write_behind=True)
+        await db.save_user(1, username='new')
+
+        read = asyncio.create_task(db.get_user(1))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stub.reading.wait, 5)
+        # Строка уже прочитана со старым значением, изменение уходит в базу и пропадает из очереди
+        await db.write_queue.flush()
+        assert db.write_queue.pending(1) is None
+        stub.release.set()
+
+        user = await read
+        await db.close()
+        return user
+
+    assert asyncio.run(scenario())['username'] == 'new'
+
+
+class SlowDatabase:
+    """Database, у которой get_user одного пользователя выполняется долго"""
+
+    pool = SimpleNamespace(max_size=4)
+
+    def __init__(self, slow_user_id, delay):
+        self.slow_user_id = slow_user_id
+        self.delay = delay
+
+    def get_user(self, user_id):
+        if user_id == self.slow_user_id:
+            time.sleep(self.delay)
+        return {'user_id': user_id}
+
+    def close(self):
+        pass
+
+
+def _message_update(update_id, user_id):
+    return Update(update_id=update_id, message={
+        'message_id': update_id, 'date': 0, 'text': 'привет',
+        'chat': {'id': user_id, 'type': 'private'},
+        'from': {'id': user_id, 'is_bot': False, 'first_name': 'Тест'},
+    })
+
+
+def test_updates_are_processed_while_slow_query_runs():
+    """Долгий запрос одного пользователя не задерживает обработку сообщений других"""
+    async def scenario():
+        db = AsyncDatabase(database=SlowDatabase(slow_user_id=1, delay=0.5))
+        finished = []
+
+        dp = Dispatcher()
+
+        @dp.message()
+        async def handler(message: Message):
+            await db.get_user(message.from_user.id)
+            finished.append(message.from_user.id)
+
+        bot = Bot('42:TEST')
+        started = time.monotonic()
+        slow = asyncio.create_task(dp.feed_update(bot, _message_update(1, 1)))
+        await asyncio.sleep(0.05)
+        await dp.feed_update(bot, _message_update(2, 2))
+        fast_elapsed = time.monotonic() - started
+        assert not slow.done()
+        await slow
+        await db.close()
+        await bot.session.close()
+        return finished, fast_elapsed
+
+    finished, fast_elapsed = asyncio.run(scenario())
+    assert finished == [2, 1]
+    assert fast_elapsed < 0.4
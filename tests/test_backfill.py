@@ -0,0 +1,45 @@
+"""Пересчет сохраненных карт (backfill.py)"""
+import psycopg2
+
+from backfill import backfill
+from simple_bazi_calculator import SimpleBaziCalculator
+
+# Диапазон user_id, который не пересекается с реальными пользователями Telegram
+STALE_USER_ID = -7_000_001
+FRESH_USER_ID = -7_000_002
+
+
+def _cleanup(database_url):
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        cursor.execute('DELETE FROM users WHERE user_id IN (%s, %s)', (STALE_USER_ID, FRESH_USER_ID))
+
+
+def test_backfill_recomputes_charts_saved_by_bot(database, database_url, tmp_path):
+    """Карты, записанные обычным путем бота (save_user + save_bazi_data), находятся и пересчитываются"""
+    _cleanup(database_url)
+    calculator = SimpleBaziCalculator()
+    try:
+        for user_id in (STALE_USER_ID, FRESH_USER_ID):
+            database.save_user(user_id, username='backfill_test')
+            database.save_bazi_data(user_id, calculator.calculate_bazi('15.03.1990', '14:30', 'Москва'))
+
+        # Карта, посчитанная старой версией расчета: другой элемент
+        with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+            cursor.execute('''
+                UPDATE users SET bazi_chart = jsonb_set(bazi_chart, '{element}', '"Неизвестно"')
+                WHERE user_id = %s
+            ''', (STALE_USER_ID,))
+
+        checkpoint = backfill(database_url, batch_size=10, workers=1,
+                              checkpoint_path=str(tmp_path / 'backfill.checkpoint'), restart=True)
+
+        assert checkpoint['processed'] >= 2
+        assert checkpoint['updated'] >= 1
+        with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+            cursor.execute('SELECT user_id, bazi_chart FROM users WHERE user_id IN (%s, %s)',
+                           (STALE_USER_ID, FRESH_USER_ID))
+            charts = dict(cursor.fetchall())
+        assert charts[STALE_USER_ID] == charts[FRESH_USER_ID]
+        assert charts[STALE_USER_ID]['birth_city'] == 'Москва'
+    finally:
+        _cleanup(database_url)
@@ -0,0 +1,98 @@
+"""Неизменяемая карта и формат хранения (bazi_chart.py)"""
+import json
+import pickle
+
+import pytest
+
+from bazi_chart import CHART_VERSION, Chart, decode_chart, encode_chart
+from simple_bazi_calculator import STEM_TEXTS, SimpleBaziCalculator
+
+
+@pytest.fixture(scope='module')
+def chart():
+    return SimpleBaziCalculator().calculate_bazi('15.03.1990', '14:30', 'Москва')
+
+
+def _without_pillars(mapping) -> dict:
+    return {key: value for key, value in dict(mapping).items() if key != 'pillars'}
+
+
+def test_chart_is_immutable(chart):
+    """Ни поля, ни тексты карты не меняются после создания"""
+    with pytest.raises(AttributeError):
+        chart.birth_city = 'Казань'
+    with pytest.raises(AttributeError):
+        del chart.birth_date
+    with pytest.raises(TypeError):
+        chart['element'] = 'Огонь'
+    with pytest.raises(TypeError):
+        chart['personality']['description'] = 'другое описание'
+    assert chart['birth_city'] == 'Москва'
+
+
+def test_texts_are_shared_per_stem():
+    """Карты с одним стволом дня ссылаются на один объект текстов; всего объектов — 10"""
+    first = Chart('甲', 'Крыса', '子', '01.01.1990', '12:00', 'Москва')
+    second = Chart('甲', 'Бык', '丑', '02.02.1985', '08:00', 'Казань')
+    other = Chart('乙', 'Крыса', '子', '01.01.1990', '12:00', 'Москва')
+
+    assert first.texts is second.texts is STEM_TEXTS['甲']
+    assert first['personality'] is second['personality']
+    assert first['monthly_advice'] is second['monthly_advice']
+    assert other.texts is not first.texts
+    assert len(STEM_TEXTS) == 10
+
+
+def test_reads_like_result_dict(chart):
+    """Карта читается как прежний словарь calculate_bazi"""
+    assert chart['element'] == chart.texts.element
+    assert chart.get('missing') is None
+    assert 'personality' in chart
+    assert set(dict(chart)) == {
+        'element', 'polarity', 'year_animal', 'day_stem_char', 'year_branch_char',
+        'birth_date', 'birth_time', 'birth_city', 'personality', 'monthly_advice', 'summary_2025', 'pillars',
+    }
+    assert len(chart) == len(dict(chart))
+
+
+def test_record_round_trip(chart):
+    """encode_chart → JSON (как в JSONB) → decode_chart дает ту же карту без столпов расчета"""
+    record = encode_chart(chart)
+    assert record['v'] == CHART_VERSION
+    assert 'personality' not in record
+
+    decoded = decode_chart(json.loads(json.dumps(record, ensure_ascii=False)))
+    assert isinstance(decoded, Chart)
+    assert decoded.texts is chart.texts
+    assert _without_pillars(decoded) == _without_pillars(chart)
+    assert decoded.to_record() == record
+
+
+def test_pickle_round_trip(chart):
+    """Chart переживает pickle (ProcessPoolExecutor, дисковые кэши)"""
+    restored = pickle.loads(pickle.dumps(chart))
+    assert dict(restored) == dict(chart)
+    assert restored.texts is chart.texts
+
+
+def test_decode_legacy_values(chart):
+    """Старые значения bazi_data: JSON-строка, затем repr словаря через ast.literal_eval"""
+    legacy = {key: value for key, value in _without_pillars(chart).items()}
+    legacy['personality'] = dict(legacy['personality'])
+
+    from_json = decode_chart(json.dumps(legacy, ensure_ascii=False))
+    from_repr = decode_chart(str(legacy))
+    assert _without_pillars(from_json) == _without_pillars(chart)
+    assert _without_pillars(from_repr) == _without_pillars(chart)
+
+    with pytest.raises((ValueError, SyntaxError)):
+        decode_chart("{'element': ")
+
+
+def test_decode_record_without_stem():
+    """Записи без day_stem_char: ствол восстанавливается по элементу и полярности"""
+    decoded = decode_chart({'element': 'Металл', 'polarity': 'Инь', 'year_animal': 'Лошадь',
+                            'birth_date': '15.03.1990', 'birth_time': '14:30', 'birth_city': 'Москва'})
+    assert decoded['day_stem_char'] == '辛'
+    assert decode_chart(None) is None
+    assert decode_chart('') is None
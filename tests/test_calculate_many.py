@@ -0,0 +1,63 @@
+"""Пакетный расчет calculate_many против calculate_bazi (simple_bazi_calculator.py)"""
+import contextlib
+import io
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from simple_bazi_calculator import SimpleBaziCalculator
+
+FIELDS = ('element', 'polarity', 'day_stem_char', 'year_animal', 'year_branch_char')
+
+
+def _dates():
+    """Дни вокруг Личунь за 1900–2100 и случайные даты того же диапазона"""
+    dates = []
+    for year in range(1900, 2101):
+        current = date(year, 1, 30)
+        while current < date(year, 2, 8):
+            dates.append(current)
+            current += timedelta(days=1)
+    rng = random.Random(20250101)
+    first, last = date(1900, 1, 1).toordinal(), date(2100, 12, 31).toordinal()
+    dates += [date.fromordinal(rng.randint(first, last)) for _ in range(500)]
+    return dates
+
+
+@pytest.mark.parametrize('timezone_name', [None, 'Asia/Vladivostok', 'America/New_York'])
+def test_calculate_many_matches_calculate_bazi(timezone_name):
+    """Каждое значение пакета совпадает с calculate_bazi для 12:00 в том же поясе"""
+    calculator = SimpleBaziCalculator()
+    dates = _dates()
+    many = calculator.calculate_many([d.day for d in dates], [d.month for d in dates], [d.year for d in dates],
+                                     timezone_name=timezone_name)
+
+    mismatches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, current in enumerate(dates):
+            birth_date = current.strftime('%d.%m.%Y')
+            if timezone_name is None:
+                chart = calculator.calculate_bazi(birth_date, '12:00', '')
+                expected = {field: chart[field] for field in FIELDS}
+                expected['day_branch_char'] = chart['pillars']['day'][1]
+            else:
+                pillars = calculator.calculate_pillars(birth_date, '12:00', timezone_name=timezone_name)
+                expected = {
+                    'element': calculator.heavenly_stems[pillars.day.stem]['element'],
+                    'polarity': calculator.heavenly_stems[pillars.day.stem]['polarity'],
+                    'day_stem_char': pillars.day.stem,
+                    'day_branch_char': pillars.day.branch,
+                    'year_animal': calculator.year_animals[pillars.year.branch],
+                    'year_branch_char': pillars.year.branch,
+                }
+            actual = {field: str(many[field][i]) for field in expected}
+            if actual != expected:
+                mismatches.append((birth_date, expected, actual))
+    assert mismatches == []
+
+
+def test_calculate_many_rejects_invalid_dates():
+    """Несуществующая дата — ValueError с индексом"""
+    with pytest.raises(ValueError, match='индекс 1'):
+        SimpleBaziCalculator().calculate_many([1, 30], [1, 2], [2000, 2000])
@@ -0,0 +1,183 @@
+"""Маршрутизация нажатий и схема callback_data (callback_router.py, callbacks.py)"""
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import CallbackQuery, Update, User
+
+from callback_router import MAX_CALLBACK_BYTES, CallbackAction, CallbackCodec, CallbackRouter
+from callbacks import CALLBACKS, CALLBACK_VERSION, pack_callback
+
+USER_ID = 123456789
+
+
+@pytest.fixture(scope='module')
+def router():
+    """Маршрутизатор бота так, как его собирает register_handlers"""
+    import handlers
+
+    dp = Dispatcher()
+    handlers.register_handlers(dp)
+    routers = [handler.callback.__self__ for handler in dp.callback_query.handlers
+               if isinstance(getattr(handler.callback, '__self__', None), CallbackRouter)]
+    assert len(routers) == 1
+    return routers[0]
+
+
+def _names(route):
+    return route.action, route.handler.callback.__name__
+
+
+# --- Разбор старых строк ---
+
+@pytest.mark.parametrize('data, action, handler', [
+    (f'consultation_individual_details_{USER_ID}', 'consultation_individual_details_',
+     'consultation_individual_details_handler'),
+    (f'consultation_individual_{USER_ID}', 'consultation_individual_', 'consultation_individual_handler'),
+    (f'video_trump_play_{USER_ID}', 'video_trump_play_', 'video_trump_play_handler'),
+    (f'video_trump_{USER_ID}', 'video_trump_', 'video_trump_handler'),
+])
+def test_longest_prefix_wins(router, data, action, handler):
+    """Из вложенных префиксов выбирается самый длинный, как и прежние фильтры с «and not startswith»"""
+    route = router.resolve(data)
+    assert _names(route) == (action, handler)
+    assert route.args == (str(USER_ID),)
+
+
+def test_longest_prefix_ignores_registration_order():
+    """Порядок регистрации не важен: короткий префикс после длинного его не перекрывает"""
+    async def short(callback_query): ...
+    async def long(callback_query): ...
+
+    for order in ((long, short), (short, long)):
+        router = CallbackRouter()
+        for callback in order:
+            router.prefix('video_trump_play_' if callback is long else 'video_trump_')(callback)
+        assert router.resolve('video_trump_play_1').handler.callback is long
+        assert router.resolve('video_trump_1').handler.callback is short
+        assert router.resolve('video_trump_playlist_1').handler.callback is short
+
+
+def test_finish_is_exact(router):
+    """finish_ — точное совпадение, как было (c.data == "finish_"): хвост к нему не подходит"""
+    assert _names(router.resolve('finish_')) == ('finish_', 'finish_interaction')
+    assert router.resolve('finish_' + str(USER_ID)) is None
+    assert router.resolve('finish') is None
+
+
+def test_legacy_strings(router):
+    """Данные кнопок из уже отправленных сообщений находят те же обработчики, что и новые"""
+    for spec in CALLBACKS.actions:
+        legacy = spec.action + (str(USER_ID) if spec.args else '')
+        packed = pack_callback(spec.action, *[USER_ID] * len(spec.args))
+        legacy_route = router.resolve(legacy)
+        packed_route = router.resolve(packed)
+        assert legacy_route is not None, legacy
+        assert legacy_route.handler is packed_route.handler, legacy
+    assert router.resolve('menu_main').args == ()
+    assert router.resolve('unknown_action_1') is None
+    assert router.resolve('') is None
+    assert router.resolve(None) is None
+
+
+def test_every_action_is_routed(router):
+    """У каждого действия схемы есть обработчик под тем же именем — кнопок «в никуда» нет"""
+    for spec in CALLBACKS.actions:
+        route = router.resolve(pack_callback(spec.action, *[USER_ID] * len(spec.args)))
+        assert route is not None and route.action == spec.action, spec.action
+
+
+def test_duplicate_registration():
+    router = CallbackRouter()
+    router.exact('menu_main')(lambda callback_query: None)
+    router.prefix('video_anna_')(lambda callback_query: None)
+    with pytest.raises(ValueError):
+        router.exact('menu_main')(lambda callback_query: None)
+    with pytest.raises(ValueError):
+        router.prefix('video_anna_')(lambda callback_query: None)
+    with pytest.raises(ValueError):
+        router.prefix('video_anna')(lambda callback_query: None)
+
+
+# --- Схема callback_data ---
+
+def test_pack_round_trip(router):
+    """pack_callback → разбор дает то же действие и user_id; данные в пределах 64 байт"""
+    for spec in CALLBACKS.actions:
+        args = (USER_ID,) * len(spec.args)
+        data = pack_callback(spec.action, *args)
+        assert data.startswith(str(CALLBACK_VERSION))
+        assert len(data.encode('utf-8')) <= MAX_CALLBACK_BYTES
+        assert CALLBACKS.unpack(data) == (spec.action, args)
+        route = router.resolve(data)
+        assert (route.action, route.args) == (spec.action, args)
+
+    assert pack_callback('consultation_individual_details_', USER_ID) == '1cid:21i3v9'
+    assert CALLBACKS.unpack(pack_callback('show_advice_', -USER_ID)) == ('show_advice_', (-USER_ID,))
+
+
+def test_pack_rejects_wrong_calls():
+    with pytest.raises(KeyError):
+        pack_callback('no_such_action_', USER_ID)
+    with pytest.raises(ValueError):
+        pack_callback('show_advice_')
+    with pytest.raises(ValueError):
+        pack_callback('menu_main', USER_ID)
+
+
+def test_unknown_version_is_not_unpacked(router):
+    """Данные другой версии схемы не разбираются по текущей и не находят обработчик"""
+    data = pack_callback('show_advice_', USER_ID)
+    other = str((CALLBACK_VERSION + 1) % 10) + data[1:]
+    assert CALLBACKS.unpack(other) is None
+    assert router.resolve(other) is None
+
+    old = CallbackCodec(2, [CallbackAction('show_advice_', 'sa', ('user_id',))])
+    assert CALLBACKS.unpack(old.pack('show_advice_', USER_ID)) is None
+
+
+@pytest.mark.parametrize('data', ['1sa', '1sa:1:2', '1sa:zz!', '1zz:1', '1m:1'])
+def test_malformed_data_is_not_unpacked(data):
+    assert CALLBACKS.unpack(data) is None
+
+
+def test_codec_rejects_bad_schema():
+    with pytest.raises(ValueError):
+        CallbackCodec(10, [])
+    with pytest.raises(ValueError):
+        CallbackCodec(1, [CallbackAction('a_', 'A')])
+    with pytest.raises(ValueError):
+        CallbackCodec(1, [CallbackAction('a_', 'x'), CallbackAction('b_', 'x')])
+    with pytest.raises(ValueError):
+        CallbackCodec(1, [CallbackAction('a_', 'x'), CallbackAction('a_', 'y')])
+
+
+# --- Подключение к aiogram ---
+
+def test_dispatch_through_aiogram():
+    """Через Dispatcher обработчик получает callback_route и остальные аргументы aiogram"""
+    codec = CallbackCodec(1, [CallbackAction('show_advice_', 'sa', ('user_id',))])
+    router = CallbackRouter(codec)
+    calls = []
+
+    @router.prefix('show_advice_')
+    async def show_advice(callback_query, state, callback_route):
+        calls.append((callback_query.data, callback_route.args, state is not None))
+
+    dp = Dispatcher()
+    router.attach(dp)
+    bot = Bot('42:TEST')
+    user = User(id=USER_ID, is_bot=False, first_name='test')
+
+    async def scenario():
+        for update_id, data in enumerate([codec.pack('show_advice_', USER_ID), f'show_advice_{USER_ID}', 'other_1']):
+            update = Update(update_id=update_id, callback_query=CallbackQuery(
+                id=str(update_id), from_user=user, chat_instance='test', data=data))
+            await dp.feed_update(bot, update)
+        await bot.session.close()
+
+    asyncio.run(scenario())
+    assert calls == [
+        ('1sa:21i3v9', (USER_ID,), True),
+        (f'show_advice_{USER_ID}', (str(USER_ID),), True),
+    ]
@@ -0,0 +1,37 @@
+"""Дисковый кэш ответов mingli.ru (chart_cache.py)"""
+import asyncio
+import threading
+
+from chart_cache import ChartCache, make_key
+
+PILLARS = {'year': ['庚', '午'], 'month': ['己', '卯'], 'day': ['甲', '子'], 'hour': ['辛', '未']}
+
+
+def test_sqlite_runs_off_the_event_loop(tmp_path):
+    """Чтение, запись и очистка выполняются в потоке кэша, а не в потоке цикла событий"""
+    async def scenario():
+        cache = ChartCache(str(tmp_path / 'cache.sqlite3'), max_bytes=2000)
+        loop_thread = threading.current_thread()
+        threads = set()
+        for name in ('_get', '_put', '_evict'):
+            original = getattr(cache, name)
+
+            def traced(*args, _original=original):
+                threads.add(threading.current_thread())
+                return _original(*args)
+            setattr(cache, name, traced)
+
+        key = make_key('15.03.1990', '14:30', 'Москва', 'Жен')
+        assert await cache.get(key) is None
+        await cache.put(key, PILLARS)
+        assert await cache.get(key) == PILLARS
+
+        # Переполнение: очистка запускается в фоне и удаляет самые старые записи
+        for day in range(1, 29):
+            await cache.put(make_key(f'{day}.01.1990', '12:00', 'Москва', 'Жен'), PILLARS)
+        await cache.close()
+
+        assert threads and loop_thread not in threads
+        assert cache.evicted > 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,142 @@
+"""Кэш карт и общая таблица дат charts.bin (chart_memo.py)"""
+import random
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from chart_memo import _HEADER, _MAGIC, _VERSION, TABLE_PATH, ChartMemo, SharedChartTable, generate_table, open_table
+from day_pillars import FIRST_YEAR, LAST_YEAR
+from simple_bazi_calculator import SimpleBaziCalculator
+from solar_terms import jie_bounds
+
+CITIES = ['Москва', 'Владивосток', 'Калининград', 'Петропавловск-Камчатский', 'Неизвестный город', None]
+
+
+class CountingCalculator(SimpleBaziCalculator):
+    """Калькулятор, который считает полные расчеты"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def calculate_bazi(self, birth_date, birth_time, birth_city):
+        self.calls += 1
+        return super().calculate_bazi(birth_date, birth_time, birth_city)
+
+
+@pytest.fixture(scope='module')
+def table():
+    table = SharedChartTable()
+    yield table
+    table.close()
+
+
+def _jie_dates(rng: random.Random, count: int):
+    """Даты за два дня до и после узлов «цзе» в случайных годах"""
+    dates = []
+    for year in rng.sample(range(FIRST_YEAR + 1, LAST_YEAR), count):
+        moment = datetime(year, rng.randint(1, 12), 15, 12, tzinfo=timezone.utc)
+        jie = jie_bounds(moment)[1]
+        dates += [(jie + timedelta(days=shift)).date() for shift in range(-2, 3)]
+    return dates
+
+
+def _check(memo: ChartMemo, calculator: SimpleBaziCalculator, day: date, rng: random.Random):
+    birth_date = f"{day:%d.%m.%Y}"
+    birth_time = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+    birth_city = rng.choice(CITIES)
+    assert dict(memo.calculate_bazi(birth_date, birth_time, birth_city)) == \
+        dict(calculator.calculate_bazi(birth_date, birth_time, birth_city)), (birth_date, birth_time, birth_city)
+
+
+def test_table_matches_calculator_on_random_dates(table):
+    """Карта по таблице совпадает с полным расчетом на случайных датах, временах и городах"""
+    rng = random.Random(19)
+    calculator = SimpleBaziCalculator()
+    memo = ChartMemo(CountingCalculator(), max_size=0, table=table)
+    first = date(FIRST_YEAR, 1, 1).toordinal()
+    last = date(LAST_YEAR, 12, 31).toordinal()
+    for _ in range(1000):
+        _check(memo, calculator, date.fromordinal(rng.randint(first, last)), rng)
+    assert memo.table_hits > 800
+
+
+def test_table_matches_calculator_near_jie(table):
+    """У границ месяцев карты тоже совпадают: за окном — из таблицы, в окне — полным расчетом"""
+    rng = random.Random(20)
+    calculator = SimpleBaziCalculator()
+    memo = ChartMemo(CountingCalculator(), max_size=0, table=table)
+    for day in _jie_dates(rng, 60):
+        for _ in range(3):
+            _check(memo, calculator, day, rng)
+    assert memo.table_hits > 0
+    assert memo.calculator.calls > 0
+
+
+def test_boundary_dates_fall_through(table):
+    """Дата у границы месяца не берется из таблицы, а считается калькулятором"""
+    boundary = [day for day in _jie_dates(random.Random(21), 30)
+                if table.lookup(day.day, day.month, day.year) is None]
+    assert len(boundary) >= 30
+
+    memo = ChartMemo(CountingCalculator(), max_size=0, table=table)
+    for day in boundary:
+        memo.calculate_bazi(f"{day:%d.%m.%Y}", '23:50', 'Владивосток')
+    assert memo.table_hits == 0
+    assert memo.calculator.calls == len(boundary)
+
+
+def test_out_of_range_falls_through(table):
+    """Даты вне 1900–2100 и неверные даты таблица не отвечает"""
+    assert table.lookup(31, 12, FIRST_YEAR - 1) is None
+    assert table.lookup(1, 1, LAST_YEAR + 1) is None
+    memo = ChartMemo(CountingCalculator(), max_size=0, table=table)
+    memo.calculate_bazi('31.02.1990', '12:00', 'Москва')
+    assert memo.table_hits == 0
+    assert memo.calculator.calls == 1
+
+
+def test_shipped_table_is_current():
+    """charts.bin в репозитории совпадает с генератором (иначе нужно повысить _VERSION и пересоздать файл)"""
+    assert Path(TABLE_PATH).read_bytes()[_HEADER.size:] == generate_table()
+
+
+def test_open_table_creates_missing(tmp_path):
+    """Файла нет — open_table создает его"""
+    path = tmp_path / 'charts.bin'
+    table = open_table(str(path))
+    try:
+        assert table.first_year == FIRST_YEAR
+        assert table.lookup(10, 9, 1981) is not None
+        assert [item.name for item in tmp_path.iterdir()] == ['charts.bin']
+    finally:
+        table.close()
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'BZCT',
+    _HEADER.pack(_MAGIC, _VERSION + 1, FIRST_YEAR, 1) + bytes(3),
+    _HEADER.pack(_MAGIC, _VERSION, FIRST_YEAR, 10) + bytes(3),
+    _HEADER.pack(_MAGIC, _VERSION, 1950, 2) + bytes(6),
+], ids=['empty', 'short-header', 'old-version', 'truncated', 'other-range'])
+def test_open_table_rebuilds_stale(tmp_path, content):
+    """Пустой, обрезанный, старой версии или на другой диапазон лет — файл пересоздается"""
+    path = tmp_path / 'charts.bin'
+    path.write_bytes(content)
+    table = open_table(str(path))
+    try:
+        assert table.first_year == FIRST_YEAR
+        assert table.lookup(1, 1, FIRST_YEAR) is not None
+    finally:
+        table.close()
+    assert path.read_bytes() == Path(TABLE_PATH).read_bytes()
+
+
+def test_open_table_keeps_current(tmp_path, monkeypatch):
+    """Целый файл текущей версии открывается как есть"""
+    path = tmp_path / 'charts.bin'
+    path.write_bytes(Path(TABLE_PATH).read_bytes())
+    monkeypatch.setattr('chart_memo.write_table', lambda path: pytest.fail("таблица пересоздана"))
+    open_table(str(path)).close()
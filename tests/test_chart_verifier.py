@@ -0,0 +1,93 @@
+"""Выборочная сверка с mingli.ru в фоне (chart_verifier.py)"""
+import asyncio
+import random
+import time
+
+from chart_verifier import ChartVerifier
+
+CHART = {'birth_date': '15.03.1990', 'birth_time': '14:30', 'birth_city': 'Москва', 'day_stem_char': '己'}
+
+
+class StubRemote:
+    """fetch_day_stem как у MingliBaziCalculator: отвечает stem через delay секунд"""
+
+    def __init__(self, stem='己', delay=0.0):
+        self.stem = stem
+        self.delay = delay
+        self.calls = 0
+        self.closed = False
+
+    async def fetch_day_stem(self, birth_date, birth_time, birth_city, timeout=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.stem
+
+    async def close(self):
+        self.closed = True
+
+
+def test_default_rate_does_not_touch_remote():
+    """При sample_rate=0 (по умолчанию) сверка не запускается и работает даже вне цикла событий"""
+    remote = StubRemote(delay=10)
+    verifier = ChartVerifier(remote=remote)
+    start = time.perf_counter()
+    for _ in range(10000):
+        verifier.maybe_verify(CHART)
+    assert time.perf_counter() - start < 0.5
+    assert remote.calls == 0
+    assert verifier.get_stats()['pending'] == 0
+
+
+def test_slow_remote_does_not_block_caller():
+    """Медленный mingli.ru не задерживает вызывающего: сверка идет отдельной задачей"""
+    async def scenario():
+        remote = StubRemote(delay=10)
+        verifier = ChartVerifier(sample_rate=1.0, remote=remote)
+        start = time.perf_counter()
+        verifier.maybe_verify(CHART)
+        assert time.perf_counter() - start < 0.05
+        await asyncio.sleep(0)
+        assert remote.calls == 1
+        assert verifier.get_stats()['pending'] == 1
+
+        # close() отменяет незавершенную сверку, а не ждет ответа
+        await asyncio.wait_for(verifier.close(), timeout=1)
+        assert verifier.get_stats()['pending'] == 0
+        assert remote.closed
+
+    asyncio.run(scenario())
+
+
+def test_samples_at_configured_rate(monkeypatch):
+    """На сверку уходит доля карт, равная sample_rate"""
+    async def scenario():
+        monkeypatch.setattr(random, 'random', random.Random(20250101).random)
+        remote = StubRemote()
+        verifier = ChartVerifier(sample_rate=0.1, max_pending=10000, remote=remote)
+        for _ in range(10000):
+            verifier.maybe_verify(CHART)
+        await asyncio.gather(*verifier._tasks)
+        assert 900 <= remote.calls <= 1100
+        assert verifier.get_stats()['matched'] == remote.calls
+
+    asyncio.run(scenario())
+
+
+def test_pending_limit_and_counters():
+    """Сверх max_pending карты пропускаются; расхождение и недоступность считаются отдельно"""
+    async def scenario():
+        remote = StubRemote(stem='甲', delay=0.01)
+        verifier = ChartVerifier(sample_rate=1.0, max_pending=2, remote=remote)
+        for _ in range(5):
+            verifier.maybe_verify(CHART)
+        await asyncio.gather(*verifier._tasks)
+        assert verifier.get_stats()['skipped'] == 3
+        assert verifier.get_stats()['mismatched'] == 2
+
+        remote.stem = None
+        verifier.maybe_verify(CHART)
+        await asyncio.gather(*verifier._tasks)
+        assert verifier.get_stats()['unavailable'] == 1
+        assert verifier.get_stats()['checked'] == 2
+
+    asyncio.run(scenario())
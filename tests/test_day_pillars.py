@@ -0,0 +1,56 @@
+"""Таблица столпов дня (day_pillars.py) против прежнего расчета через юлианский день"""
+from datetime import date, timedelta
+
+from day_pillars import BRANCHES, FIRST_YEAR, LAST_YEAR, STEMS, day_cycle_index, day_pillar
+from simple_bazi_calculator import SimpleBaziCalculator
+
+
+def gregorian_to_julian_day(day: int, month: int, year: int) -> int:
+    """Юлианский день григорианской даты — формула, которой ствол дня считался до таблицы"""
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) + day + b - 1524
+
+
+def _julian_pillar(current: date) -> tuple:
+    """Столп дня по юлианскому дню: 1900-01-01 — 甲戌, позиция 10 в цикле"""
+    offset = gregorian_to_julian_day(current.day, current.month, current.year) - gregorian_to_julian_day(1, 1, 1900)
+    index = (10 + offset) % 60
+    return STEMS[index % 10], BRANCHES[index % 12]
+
+
+def test_table_matches_julian_day_formula_on_whole_range():
+    """Таблица совпадает с формулой на каждом дне 1900–2100"""
+    mismatches = []
+    current = date(FIRST_YEAR, 1, 1)
+    while current.year <= LAST_YEAR:
+        expected = _julian_pillar(current)
+        if day_pillar(current.day, current.month, current.year) != expected:
+            mismatches.append(current.isoformat())
+        current += timedelta(days=1)
+    assert mismatches == []
+
+
+def test_known_day_pillars():
+    """Опорные даты: 1900-01-01 — 甲戌, 2000-01-01 — 戊午"""
+    assert day_pillar(1, 1, 1900) == ('甲', '戌')
+    assert day_pillar(1, 1, 2000) == ('戊', '午')
+
+
+def test_cycle_continues_outside_table():
+    """За границами таблицы цикл продолжается без разрыва"""
+    for current in (date(FIRST_YEAR - 1, 12, 31), date(LAST_YEAR + 1, 1, 1), date(1850, 6, 15)):
+        expected = _julian_pillar(current)
+        index = day_cycle_index(current.day, current.month, current.year)
+        assert (STEMS[index % 10], BRANCHES[index % 12]) == expected
+
+
+def test_calculator_day_stem():
+    """Ствол, элемент и полярность дня в калькуляторе"""
+    calculator = SimpleBaziCalculator()
+    assert calculator._calculate_day_stem(1, 1, 1900) == ('Дерево', 'Ян', '甲')
+    assert calculator._calculate_day_stem(10, 9, 1981) == ('Металл', 'Инь', '辛')
+    assert calculator._calculate_day_stem(1, 1, 2000) == ('Земля', 'Ян', '戊')
@@ -0,0 +1,59 @@
+"""Готовые ответы по элементу личности (element_bundles.py)"""
+import pytest
+
+import element_bundles
+from element_bundles import ElementBundle, bundle_key, compile_bundles
+from formulations_manager import FormulationsManager
+from simple_bazi_calculator import STEM_TEXTS
+
+
+@pytest.fixture
+def formulations():
+    return FormulationsManager()
+
+
+def test_ten_bundles(formulations):
+    """По набору на каждое из 10 сочетаний элемента и полярности; словарь только для чтения"""
+    bundles = compile_bundles(formulations)
+    expected = {bundle_key(texts.element, texts.polarity) for texts in STEM_TEXTS.values()}
+    assert len(bundles) == 10
+    assert set(bundles) == expected
+    with pytest.raises(TypeError):
+        bundles['Дерево_Ян'] = None
+
+    for key, bundle in bundles.items():
+        assert isinstance(bundle, ElementBundle)
+        assert bundle.key == key == bundle_key(bundle.element, bundle.polarity)
+        assert all(value for value in bundle), key
+        assert bundle.personality_caption.endswith(formulations.get_formulation('results', 'superpower_question'))
+        assert bundle.strategy_text == formulations.format_strategy_message(bundle.element, bundle.polarity)
+        assert len(bundle.second_voices) == (2 if bundle.element == "Вода" else 1)
+
+
+def test_missing_keys_in_one_error(formulations, monkeypatch):
+    """Все недостающие медиа, тексты и формулировки перечисляются в одной ошибке"""
+    monkeypatch.delitem(element_bundles.PERSONALITY_PHOTOS, 'Огонь_Инь')
+    monkeypatch.setitem(element_bundles.WATER_SECOND_VOICES, 'Вода_Ян', '')
+    monkeypatch.delitem(element_bundles.LANGUAGES, 'Металл_Ян')
+    del formulations.formulations['results']['year_question']
+    del formulations.strategy_templates['Земля']['Инь']
+
+    with pytest.raises(KeyError) as error:
+        compile_bundles(formulations)
+    message = str(error.value)
+    for name in (
+        "PERSONALITY_PHOTOS['Огонь_Инь']",
+        "WATER_SECOND_VOICES['Вода_Ян']",
+        "LANGUAGES['Металл_Ян']",
+        "формулировка results.year_question",
+        "стратегия Земля Инь",
+    ):
+        assert name in message
+    assert message.count("PERSONALITY_PHOTOS") == 1
+
+
+def test_missing_stem(formulations, monkeypatch):
+    """Сочетаний меньше 10 — тоже ошибка, а не неполный словарь"""
+    monkeypatch.setattr(element_bundles, 'STEM_TEXTS', {stem: texts for stem, texts in STEM_TEXTS.items() if stem != '癸'})
+    with pytest.raises(KeyError, match="найдено 9"):
+        compile_bundles(formulations)
@@ -0,0 +1,297 @@
+"""Отложенная отправка цепочек сообщений (message_scheduler.py)"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+import pytest
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+import message_scheduler
+from message_scheduler import MessageScheduler, text_step, voice_step
+
+START = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+class Clock:
+    """Подменяет message_scheduler._now: время идет только по advance"""
+
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(message_scheduler, '_now', clock)
+    return clock
+
+
+class StubDatabase:
+    """Очередь scheduled_messages как у AsyncDatabase; down — база недоступна"""
+
+    def __init__(self, down=False):
+        self.down = down
+        self.rows = []  # [номер, chat_id, due_at, payload, attempts]
+        self._ids = 0
+
+    def _check(self):
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    async def schedule_messages(self, messages):
+        self._check()
+        for chat_id, due_at, payload, attempts in messages:
+            self._ids += 1
+            self.rows.append([self._ids, chat_id, due_at, payload, attempts])
+
+    async def claim_scheduled_messages(self, now, limit):
+        self._check()
+        claimed = sorted((row for row in self.rows if row[2] <= now), key=lambda row: (row[2], row[0]))[:limit]
+        self.rows = [row for row in self.rows if row not in claimed]
+        return [tuple(row[1:]) for row in claimed]
+
+    async def postpone_scheduled_messages(self, chat_id, shift):
+        self._check()
+        for row in self.rows:
+            if row[1] == chat_id:
+                row[2] += shift
+
+    def pending(self, chat_id):
+        """(текст, срок, попытки) ожидающих сообщений чата по порядку"""
+        return [(row[3].get('text'), row[2], row[4])
+                for row in sorted(self.rows, key=lambda row: (row[2], row[0])) if row[1] == chat_id]
+
+
+class StubBot:
+    """Запоминает отправленное; errors — исключения для очередных отправок в чат (None — отправить)"""
+
+    def __init__(self, errors=None):
+        self.errors = {chat_id: list(queue) for chat_id, queue in (errors or {}).items()}
+        self.sent = []
+
+    async def _deliver(self, chat_id, item):
+        # Отдаем управление: отправки в разные чаты перемешиваются, как при сетевых запросах
+        await asyncio.sleep(0)
+        queue = self.errors.get(chat_id)
+        if queue:
+            error = queue.pop(0)
+            if error is not None:
+                raise error
+        self.sent.append((chat_id, item))
+
+    async def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+        await self._deliver(chat_id, text)
+        self.markup = reply_markup
+
+    async def send_voice(self, chat_id, voice, caption=None):
+        await self._deliver(chat_id, voice)
+
+
+def _method():
+    return SendMessage(chat_id=1, text='')
+
+
+def _texts(bot, chat_id):
+    return [item for chat, item in bot.sent if chat == chat_id]
+
+
+@pytest.mark.parametrize('with_db', [True, False], ids=['db', 'memory'])
+def test_chat_order(clock, with_db):
+    """Шаги чата уходят по очереди и по паузам, разные чаты не ждут друг друга"""
+    async def scenario():
+        db = StubDatabase() if with_db else None
+        bot = StubBot()
+        scheduler = MessageScheduler(db)
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 'a1'), text_step(0, 'a2'), voice_step(3, 'a3-voice'), text_step(0, 'a4')])
+        await scheduler.schedule(2, [text_step(0, 'b1'), text_step(0, 'b2'), text_step(1, 'b3')])
+
+        assert await scheduler.dispatch_due() == 4
+        assert _texts(bot, 1) == ['a1', 'a2']
+        assert _texts(bot, 2) == ['b1', 'b2']
+        # Оба чата начали отправку до того, как один из них закончил
+        assert {chat for chat, _ in bot.sent[:2]} == {1, 2}
+
+        clock.advance(1)
+        assert await scheduler.dispatch_due() == 1
+        clock.advance(2)
+        assert await scheduler.dispatch_due() == 2
+        assert _texts(bot, 1) == ['a1', 'a2', 'a3-voice', 'a4']
+        assert _texts(bot, 2) == ['b1', 'b2', 'b3']
+        assert scheduler.get_stats()['sent'] == 7
+
+    asyncio.run(scenario())
+
+
+def test_keyboard_survives_queue(clock):
+    """Клавиатура хранится в очереди как JSON и восстанавливается при отправке"""
+    async def scenario():
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="Да", callback_data="1y")]])
+        bot = StubBot()
+        scheduler = MessageScheduler(StubDatabase())
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 'вопрос', reply_markup=keyboard)])
+        await scheduler.dispatch_due()
+        assert bot.markup == keyboard
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('with_db', [True, False], ids=['db', 'memory'])
+def test_retry_after_shifts_chain(clock, with_db):
+    """TelegramRetryAfter: шаг и весь остаток цепочки сдвигаются с сохранением пауз, попытка не считается"""
+    async def scenario():
+        db = StubDatabase() if with_db else None
+        bot = StubBot({1: [TelegramRetryAfter(_method(), 'Flood control exceeded', 30)]})
+        scheduler = MessageScheduler(db)
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 's1'), text_step(5, 's2'), text_step(5, 's3')])
+        await scheduler.schedule(2, [text_step(0, 'other')])
+
+        await scheduler.dispatch_due()
+        assert bot.sent == [(2, 'other')]
+        if with_db:
+            assert db.pending(1) == [
+                ('s1', START + timedelta(seconds=30), 0),
+                ('s2', START + timedelta(seconds=35), 0),
+                ('s3', START + timedelta(seconds=40), 0),
+            ]
+
+        clock.advance(29)
+        assert await scheduler.dispatch_due() == 0
+        for expected in (['s1'], ['s1', 's2'], ['s1', 's2', 's3']):
+            clock.advance(1 if expected == ['s1'] else 5)
+            await scheduler.dispatch_due()
+            assert _texts(bot, 1) == expected
+        stats = scheduler.get_stats()
+        assert (stats['retried'], stats['dropped'], stats['local']) == (1, 0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_forbidden_drops_chain(clock):
+    """Бот заблокирован — остаток цепочки отбрасывается, другие чаты отправляются"""
+    async def scenario():
+        db = StubDatabase()
+        bot = StubBot({1: [None, TelegramForbiddenError(_method(), 'Forbidden: bot was blocked by the user')]})
+        scheduler = MessageScheduler(db)
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 's1'), text_step(0, 's2'), text_step(0, 's3'), text_step(0, 's4')])
+        await scheduler.schedule(2, [text_step(0, 'other')])
+
+        assert await scheduler.dispatch_due() == 2
+        assert _texts(bot, 1) == ['s1']
+        assert _texts(bot, 2) == ['other']
+        assert scheduler.get_stats()['dropped'] == 3
+        assert db.rows == []
+
+    asyncio.run(scenario())
+
+
+def test_bad_request_skips_one_step(clock):
+    """TelegramBadRequest — пропускается только этот шаг"""
+    async def scenario():
+        bot = StubBot({1: [TelegramBadRequest(_method(), "Bad Request: can't parse entities")]})
+        scheduler = MessageScheduler(StubDatabase())
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 's1'), text_step(0, 's2')])
+        await scheduler.dispatch_due()
+        assert _texts(bot, 1) == ['s2']
+        assert scheduler.get_stats()['dropped'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_network_error_retries_then_drops(clock):
+    """Прочие ошибки: повтор через retry_delay, после max_attempts шаг отбрасывается, цепочка идет дальше"""
+    async def scenario():
+        db = StubDatabase()
+        bot = StubBot({1: [OSError('timeout'), OSError('timeout')]})
+        scheduler = MessageScheduler(db, max_attempts=2, retry_delay=5)
+        scheduler.bot = bot
+        await scheduler.schedule(1, [text_step(0, 's1'), text_step(1, 's2')])
+
+        await scheduler.dispatch_due()
+        assert db.pending(1) == [('s1', START + timedelta(seconds=5), 1), ('s2', START + timedelta(seconds=6), 0)]
+        clock.advance(6)
+        await scheduler.dispatch_due()
+        assert _texts(bot, 1) == ['s2']
+        assert scheduler.get_stats()['dropped'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_local_fallback(clock):
+    """База недоступна — шаги ждут в памяти и уходят по сроку; ошибки базы только считаются"""
+    async def scenario():
+        db = StubDatabase(down=True)
+        bot = StubBot()
+        scheduler = MessageScheduler(db)
+        scheduler.bot = bot
+        assert await scheduler.schedule(1, [text_step(0, 's1'), text_step(2, 's2')]) == 2
+        stats = scheduler.get_stats()
+        assert (stats['local'], stats['local_enqueued'], stats['failures']) == (2, 2, 1)
+
+        assert await scheduler.dispatch_due() == 1
+        clock.advance(2)
+        assert await scheduler.dispatch_due() == 1
+        assert _texts(bot, 1) == ['s1', 's2']
+        assert scheduler.get_stats()['failures'] == 3  # запись и два забора из базы
+
+    asyncio.run(scenario())
+
+
+def test_close_moves_local_steps_to_db(clock):
+    """При остановке шаги из памяти переносятся в базу в порядке отправки; новые цепочки не принимаются"""
+    async def scenario():
+        db = StubDatabase(down=True)
+        scheduler = MessageScheduler(db)
+        scheduler.start(StubBot())
+        await scheduler.schedule(1, [text_step(60, 's1'), text_step(5, 's2')])
+        await scheduler.schedule(2, [text_step(30, 'other')])
+
+        db.down = False
+        await scheduler.close()
+        assert scheduler.get_stats()['local'] == 0
+        assert [row[3]['text'] for row in db.rows] == ['other', 's1', 's2']
+        assert db.pending(1) == [('s1', START + timedelta(seconds=60), 0), ('s2', START + timedelta(seconds=65), 0)]
+        with pytest.raises(RuntimeError):
+            await scheduler.schedule(1, [text_step(0, 'late')])
+
+    asyncio.run(scenario())
+
+
+def test_close_keeps_steps_if_db_still_down(clock):
+    """База так и не поднялась — шаги остаются в памяти, остановка не падает"""
+    async def scenario():
+        scheduler = MessageScheduler(StubDatabase(down=True))
+        await scheduler.schedule(1, [text_step(60, 's1')])
+        await scheduler.close()
+        assert scheduler.get_stats()['local'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_background_loop():
+    """Фоновый цикл отправляет шаг, срок которого наступает раньше poll_interval"""
+    async def scenario():
+        bot = StubBot()
+        scheduler = MessageScheduler(poll_interval=10)
+        scheduler.start(bot)
+        await scheduler.schedule(1, [text_step(0.01, 's1'), text_step(0.01, 's2')])
+        for _ in range(100):
+            if len(bot.sent) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.close()
+        assert _texts(bot, 1) == ['s1', 's2']
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""Перенос старых bazi_data в JSONB (migrations.py, миграция 2)"""
+import psycopg2
+import pytest
+
+from migrations import MigrationDataError, _migration_2
+
+# Диапазон user_id, который не пересекается с реальными пользователями Telegram
+USER_IDS = [-7_000_201, -7_000_202, -7_000_203]
+BROKEN_USER_ID = -7_000_204
+
+
+@pytest.fixture
+def transaction(database_url):
+    """Курсор в транзакции, которая откатывается после теста"""
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def _insert_legacy(cursor, user_id, bazi_data):
+    cursor.execute('INSERT INTO users (user_id, bazi_data) VALUES (%s, %s)', (user_id, bazi_data))
+
+
+def test_migration_converts_legacy_rows_in_batches(transaction):
+    """Все старые значения переносятся, в том числе когда строк больше одной пачки"""
+    # Так карта раньше писалась в bazi_data: str(dict)
+    legacy = str({'element': 'Огонь', 'birth_city': 'Москва', 'year_animal': 'Лошадь'})
+    for user_id in USER_IDS:
+        _insert_legacy(transaction, user_id, legacy)
+
+    _migration_2(transaction, batch_size=2)
+
+    transaction.execute('SELECT user_id, bazi_chart FROM users WHERE user_id = ANY(%s)', (USER_IDS,))
+    charts = dict(transaction.fetchall())
+    assert set(charts) == set(USER_IDS)
+    for record in charts.values():
+        assert record['element'] == 'Огонь'
+        assert record['birth_city'] == 'Москва'
+        assert record['year_animal'] == 'Лошадь'
+
+
+def test_migration_fails_on_unparseable_rows(transaction):
+    """Неразбираемое значение не оставляется молча с пустой картой: миграция падает и называет user_id"""
+    _insert_legacy(transaction, USER_IDS[0], "{'element': 'Огонь'}")
+    _insert_legacy(transaction, BROKEN_USER_ID, "{'element': ")
+
+    with pytest.raises(MigrationDataError) as error:
+        _migration_2(transaction, batch_size=1)
+    assert str(BROKEN_USER_ID) in str(error.value)
+    assert str(USER_IDS[0]) not in str(error.value)
@@ -0,0 +1,160 @@
+"""Клиент mingli.ru и автомат отключения (mingli_client.py) против локального aiohttp-сервера"""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from mingli_client import CircuitOpenError, MingliClient, MingliError
+
+
+class StubMingli:
+    """
+    Сервер вместо mingli.ru: отвечает через delay секунд кодом status,
+    считает запросы и наибольшее число одновременно обрабатываемых
+    """
+
+    def __init__(self, delay=0.0, status=200, body='<html>ok</html>'.encode('utf-8')):
+        self.delay = delay
+        self.status = status
+        self.body = body
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await request.post()
+            await asyncio.sleep(self.delay)
+            return web.Response(body=self.body, status=self.status, content_type='text/html', charset='utf-8')
+        finally:
+            self.in_flight -= 1
+
+
+async def _start(stub: StubMingli) -> TestServer:
+    app = web.Application()
+    app.router.add_post('/', stub.handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def test_concurrency_is_limited():
+    """Одновременно на сайт уходит не больше max_concurrency запросов, остальные ждут слота"""
+    async def scenario():
+        stub = StubMingli(delay=0.05)
+        server = await _start(stub)
+        client = MingliClient(base_url=str(server.make_url('/')), max_concurrency=3, timeout=5)
+        try:
+            pages = await asyncio.gather(*(client.post_form({'n': n}) for n in range(10)))
+            assert pages == ['<html>ok</html>'] * 10
+            assert stub.requests == 10
+            assert stub.max_in_flight == 3
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_deadline_cuts_slow_response():
+    """Медленный ответ обрывается по дедлайну: MingliError, а не ожидание до конца ответа"""
+    async def scenario():
+        stub = StubMingli(delay=2)
+        server = await _start(stub)
+        client = MingliClient(base_url=str(server.make_url('/')), timeout=0.1)
+        try:
+            start = time.perf_counter()
+            with pytest.raises(MingliError, match='не ответил'):
+                await client.post_form({'n': 1})
+            assert time.perf_counter() - start < 1
+            assert client.get_stats()['deadline_exceeded'] == 1
+
+            # Дедлайн вызова важнее общего
+            with pytest.raises(MingliError):
+                await client.post_form({'n': 2}, timeout=0.05)
+            assert client.get_stats()['deadline_exceeded'] == 2
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_breaker_opens_and_half_opens():
+    """После failure_threshold ошибок запросы не отправляются; после паузы проходит одна проба"""
+    async def scenario():
+        stub = StubMingli(status=503)
+        server = await _start(stub)
+        client = MingliClient(base_url=str(server.make_url('/')), failure_threshold=3, reset_timeout=0.2)
+        try:
+            for _ in range(3):
+                with pytest.raises(MingliError):
+                    await client.post_form({})
+            assert client.breaker.state == 'open'
+            with pytest.raises(CircuitOpenError):
+                await client.post_form({})
+            assert stub.requests == 3
+
+            # Пауза прошла: одна проба уходит на сайт, параллельные вызовы отклоняются
+            await asyncio.sleep(0.25)
+            assert client.breaker.state == 'half-open'
+            stub.status, stub.delay = 200, 0.05
+            results = await asyncio.gather(*(client.post_form({}) for _ in range(3)), return_exceptions=True)
+            assert results[0] == '<html>ok</html>'
+            assert all(isinstance(result, CircuitOpenError) for result in results[1:])
+            assert stub.requests == 4
+            assert client.breaker.state == 'closed'
+
+            # Проба с ошибкой сразу открывает автомат снова
+            stub.status = 500
+            for _ in range(3):
+                with pytest.raises(MingliError):
+                    await client.post_form({})
+            await asyncio.sleep(0.25)
+            with pytest.raises(MingliError):
+                await client.post_form({})
+            assert client.breaker.state == 'open'
+            assert client.get_stats()['opens'] == 3
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_unexpected_error_in_probe_releases_breaker():
+    """Неожиданное исключение в пробном запросе снова открывает автомат, а не блокирует его навсегда"""
+    async def scenario():
+        # Ответ объявлен как UTF-8, но не декодируется — response.text() падает с UnicodeDecodeError
+        stub = StubMingli(body=b'\xff\xfe')
+        server = await _start(stub)
+        client = MingliClient(base_url=str(server.make_url('/')), failure_threshold=1, reset_timeout=0.05)
+        try:
+            with pytest.raises(UnicodeDecodeError):
+                await client.post_form({})
+            assert client.breaker.state == 'open'
+            with pytest.raises(CircuitOpenError):
+                await client.post_form({})
+
+            # Проба после reset_timeout падает с той же ошибкой
+            await asyncio.sleep(0.06)
+            with pytest.raises(UnicodeDecodeError):
+                await client.post_form({})
+            assert client.breaker.state == 'open'
+
+            # Следующая проба пропускается, успех закрывает автомат
+            stub.body = '<html>ok</html>'.encode('utf-8')
+            await asyncio.sleep(0.06)
+            assert await client.post_form({}) == '<html>ok</html>'
+            assert client.breaker.state == 'closed'
+            assert stub.requests == 3
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(scenario())
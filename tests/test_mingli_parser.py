@@ -0,0 +1,93 @@
+"""Разбор страницы калькулятора mingli.ru (mingli_bazi_calculator.py)"""
+import os
+
+import pytest
+
+from mingli_bazi_calculator import MingliBaziCalculator, parse_pillars
+from simple_bazi_calculator import SimpleBaziCalculator
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mingli_result.html')
+
+# Шапка таблицы столпов, как на странице
+HEADER = '<tr><th>ЧАС</th><th>ДЕНЬ</th><th>МЕСЯЦ</th><th>ГОД</th></tr>'
+
+
+@pytest.fixture(scope='module')
+def page():
+    """Страница результата для 10.09.1981 12:00, Москва (без имени)"""
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_result_page(page):
+    """Столпы берутся из таблицы карты, а не из виджета дня, меню или тактов удачи"""
+    assert parse_pillars(page) == {
+        'hour': ('甲', '午'),
+        'day': ('辛', '卯'),
+        'month': ('丁', '酉'),
+        'year': ('辛', '酉'),
+    }
+
+
+def test_result_page_matches_local_calculation(page):
+    """Год, месяц и день со страницы совпадают с локальным расчетом по часам (без поправки на долготу)"""
+    local = SimpleBaziCalculator().calculate_pillars('10.09.1981', '12:00', timezone_name='Europe/Moscow')
+    pillars = parse_pillars(page)
+    for name in ('year', 'month', 'day', 'hour'):
+        assert pillars[name] == tuple(getattr(local, name))
+
+
+def test_chart_from_result_page(page):
+    """Карта: элемент — ствол дня, животное — ветвь года"""
+    chart = MingliBaziCalculator()._parse_response(page, '10.09.1981', '12:00', 'Москва')
+    assert chart['day_stem_char'] == '辛'
+    assert chart['element'] == 'Металл'
+    assert chart['year_animal'] == 'Петух'
+
+
+def test_page_without_tables_is_scanned_whole():
+    """Без разметки таблиц (упрощенная версия страницы) разбирается весь текст"""
+    text = 'ЧАС ДЕНЬ МЕСЯЦ ГОД\n壬 癸 甲 乙\n子 丑 寅 卯'
+    assert parse_pillars(text)['day'] == ('癸', '丑')
+
+
+def test_tables_without_pillars():
+    """Таблицы есть, но ни в одной нет шапки столпов — None, текст вне таблиц не разбирается"""
+    page = '<table><tr><td>甲</td><td>子</td></tr></table><p>ЧАС ДЕНЬ МЕСЯЦ ГОД 甲 乙 丙 丁</p>'
+    assert parse_pillars(page) is None
+
+
+def test_table_without_stems():
+    """Шапка есть, а стволов нет (верстка сломалась) — None, и карта не строится"""
+    page = f'<table>{HEADER}<tr><td></td><td></td><td></td><td></td></tr></table>'
+    assert parse_pillars(page) is None
+    with pytest.raises(ValueError):
+        MingliBaziCalculator()._parse_response(page, '10.09.1981', '12:00', 'Москва')
+
+
+def test_truncated_table():
+    """Оборванная таблица: найденные клетки на своих местах, недостающие — None"""
+    page = f'<table>{HEADER}<tr><td>甲</td><td>辛</td></tr><tr><td>午</td></table>'
+    assert parse_pillars(page) == {
+        'hour': ('甲', '午'),
+        'day': ('辛', None),
+        'month': (None, None),
+        'year': (None, None),
+    }
+    # Ствол дня есть, ветви года нет — животное по году рождения
+    chart = MingliBaziCalculator()._parse_response(page, '10.09.1981', '12:00', 'Москва')
+    assert chart['day_stem_char'] == '辛'
+    assert chart['year_animal'] == 'Петух'
+
+
+def test_caption_before_header():
+    """Заголовок в подписи над шапкой (повтор или нет) не сбивает порядок колонок"""
+    rows = '<tr><td>甲</td><td>辛</td><td>丁</td><td>庚</td></tr><tr><td>午</td><td>卯</td><td>酉</td><td>申</td></tr>'
+    for caption in ('ГОД рождения', 'Господин ДЕНЬ'):
+        page = f'<table><tr><td>{caption}</td></tr>{HEADER}{rows}</table>'
+        assert parse_pillars(page) == {
+            'hour': ('甲', '午'),
+            'day': ('辛', '卯'),
+            'month': ('丁', '酉'),
+            'year': ('庚', '申'),
+        }
@@ -0,0 +1,144 @@
+"""Хранилище состояний FSM поверх user_sessions (pg_storage.py)"""
+import asyncio
+
+import psycopg2
+import pytest
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from pg_storage import PostgresStorage
+
+
+class Form(StatesGroup):
+    birth_date = State()
+
+
+class StubDatabase:
+    """load_sessions и save_sessions_batch как у AsyncDatabase, строки в словаре"""
+
+    def __init__(self, rows=None, down=False):
+        self.rows = dict(rows or {})
+        self.down = down
+        self.loaded = []
+        self.batches = []
+
+    async def load_sessions(self, keys):
+        self.loaded.append(list(keys))
+        return {key: self.rows[key] for key in keys if key in self.rows}
+
+    async def save_sessions_batch(self, sessions):
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.batches.append(dict(sessions))
+        for key, (user_id, step, data) in sessions.items():
+            self.rows[key] = {'step': step, 'data': data}
+
+
+def _key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+def test_set_and_get_state_and_data():
+    """Состояние и данные читаются обратно; get_data отдает копию"""
+    async def scenario():
+        storage = PostgresStorage(StubDatabase(), flush_interval=60)
+        key = _key(1)
+        await storage.set_state(key, Form.birth_date)
+        await storage.set_data(key, {'birth_date': '15.03.1990'})
+
+        assert await storage.get_state(key) == Form.birth_date.state
+        data = await storage.get_data(key)
+        assert data == {'birth_date': '15.03.1990'}
+        data['birth_date'] = 'изменено'
+        assert await storage.get_data(key) == {'birth_date': '15.03.1990'}
+
+    asyncio.run(scenario())
+
+
+def test_cold_key_is_loaded_once():
+    """Ключ читается из базы при первом обращении, дальше — из горячего слоя; одновременные чтения — одна загрузка"""
+    async def scenario():
+        name = PostgresStorage._key(_key(1))
+        db = StubDatabase({name: {'step': Form.birth_date.state, 'data': {'city': 'Москва'}}})
+        storage = PostgresStorage(db, flush_interval=60)
+
+        states = await asyncio.gather(*(storage.get_state(_key(1)) for _ in range(5)))
+        assert states == [Form.birth_date.state] * 5
+        assert await storage.get_data(_key(1)) == {'city': 'Москва'}
+        assert db.loaded == [[name]]
+
+        # Ключа нет в базе — пустое состояние, без повторной загрузки
+        assert await storage.get_state(_key(2)) is None
+        assert await storage.get_data(_key(2)) == {}
+        assert len(db.loaded) == 2
+        assert storage.get_stats()['loads'] == 2
+
+    asyncio.run(scenario())
+
+
+def test_changes_are_flushed_in_one_batch():
+    """Изменения разных ключей уходят одной пачкой, повторные изменения ключа — одной строкой"""
+    async def scenario():
+        db = StubDatabase()
+        storage = PostgresStorage(db, flush_interval=60)
+        for user_id in (1, 2, 3):
+            await storage.set_state(_key(user_id), Form.birth_date)
+        await storage.set_data(_key(1), {'city': 'Москва'})
+        assert db.batches == []
+
+        await storage.flush()
+        assert len(db.batches) == 1
+        assert db.batches[0][PostgresStorage._key(_key(1))] == (1, Form.birth_date.state, {'city': 'Москва'})
+        assert len(db.batches[0]) == 3
+
+        # Нечего писать — база не трогается
+        await storage.flush()
+        assert len(db.batches) == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_changes():
+    """Ошибка записи не теряет изменения: они уходят следующей пачкой"""
+    async def scenario():
+        db = StubDatabase(down=True)
+        storage = PostgresStorage(db, flush_interval=60)
+        await storage.set_data(_key(1), {'city': 'Москва'})
+        with pytest.raises(psycopg2.OperationalError):
+            await storage.flush()
+        assert storage.get_stats()['dirty'] == 1
+
+        db.down = False
+        await storage.flush()
+        assert db.rows[PostgresStorage._key(_key(1))] == {'step': None, 'data': {'city': 'Москва'}}
+
+    asyncio.run(scenario())
+
+
+def test_close_flushes_pending_changes():
+    """close() останавливает фоновый сброс и дописывает то, что еще не ушло в базу"""
+    async def scenario():
+        db = StubDatabase()
+        storage = PostgresStorage(db, flush_interval=60)
+        storage.start()
+        await storage.set_state(_key(1), Form.birth_date)
+        await storage.close()
+
+        assert db.rows == {PostgresStorage._key(_key(1)): {'step': Form.birth_date.state, 'data': {}}}
+        assert storage._task is None
+        # Повторный close (диспетчер и main) ничего не пишет
+        await storage.close()
+        assert len(db.batches) == 1
+
+    asyncio.run(scenario())
+
+
+def test_zero_flush_interval_writes_immediately():
+    """flush_interval=0 — каждое изменение пишется сразу"""
+    async def scenario():
+        db = StubDatabase()
+        storage = PostgresStorage(db, flush_interval=0)
+        await storage.set_state(_key(1), Form.birth_date)
+        assert len(db.batches) == 1
+
+    asyncio.run(scenario())
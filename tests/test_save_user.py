@@ -0,0 +1,65 @@
+"""Запись профиля одним INSERT ... ON CONFLICT (database.py)"""
+import psycopg2
+import pytest
+
+from database import USER_COLUMNS
+
+# Диапазон user_id, который не пересекается с реальными пользователями Telegram
+USER_ID = -7_000_101
+
+
+def _cleanup(database_url):
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        cursor.execute('DELETE FROM users WHERE user_id = %s', (USER_ID,))
+
+
+def _row(database_url) -> dict:
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        cursor.execute('SELECT username, first_name, birth_city, contact_email FROM users WHERE user_id = %s',
+                       (USER_ID,))
+        columns = [column.name for column in cursor.description]
+        return dict(zip(columns, cursor.fetchone()))
+
+
+def test_save_user_updates_only_passed_columns(database, database_url):
+    """Повторный save_user меняет переданные колонки и не трогает остальные"""
+    _cleanup(database_url)
+    try:
+        database.save_user(USER_ID, username='upsert_test', first_name='Иван', birth_city='Москва')
+        database.save_user(USER_ID, birth_city='Казань', contact_email='ivan@example.com')
+
+        assert _row(database_url) == {
+            'username': 'upsert_test',
+            'first_name': 'Иван',
+            'birth_city': 'Казань',
+            'contact_email': 'ivan@example.com',
+        }
+        # Кэш профиля сброшен, get_user видит новую запись
+        assert database.get_user(USER_ID)['birth_city'] == 'Казань'
+    finally:
+        _cleanup(database_url)
+
+
+def test_save_user_without_fields_keeps_existing_row(database, database_url):
+    """save_user без полей только создает строку, существующую не меняет"""
+    _cleanup(database_url)
+    try:
+        database.save_user(USER_ID, username='upsert_test')
+        database.save_user(USER_ID)
+        assert _row(database_url)['username'] == 'upsert_test'
+    finally:
+        _cleanup(database_url)
+
+
+def test_save_user_rejects_unknown_columns(database, database_url):
+    """Ключи вне USER_COLUMNS отклоняются до обращения к базе"""
+    _cleanup(database_url)
+    assert 'bazi_chart' not in USER_COLUMNS
+    with pytest.raises(ValueError) as error:
+        database.save_user(USER_ID, username='upsert_test', is_admin=True, **{'user_id = 0; --': 1})
+    assert 'is_admin' in str(error.value)
+    assert 'user_id = 0; --' in str(error.value)
+
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM users WHERE user_id = %s', (USER_ID,))
+        assert cursor.fetchone()[0] == 0
@@ -0,0 +1,136 @@
+"""Экраны бота и кэш экранов с кнопками пользователя (screens.py)"""
+import pytest
+
+from callbacks import CALLBACKS, pack_callback
+from screens import BOOKING_URL, SCREENS, Button, ScreenRegistry
+
+USER_ID = 123456789
+
+
+def _rows(screen):
+    """Клавиатура экрана как [(текст, действие, аргументы или url)]"""
+    rows = []
+    for row in screen.reply_markup.inline_keyboard:
+        for button in row:
+            if button.url:
+                rows.append((button.text, button.url))
+            else:
+                rows.append((button.text, *CALLBACKS.unpack(button.callback_data)))
+    return rows
+
+
+def test_static_screen_is_shared():
+    """Экран без кнопок пользователя — один объект на всех, user_id не нужен"""
+    registry = ScreenRegistry()
+    registry.add('menu', "Меню", [[Button("Назад", "menu_main")]])
+    assert registry.get('menu') is registry.get('menu', USER_ID)
+    assert registry.get('menu').reply_markup.inline_keyboard[0][0].callback_data == pack_callback('menu_main')
+    assert registry.get_stats()['static'] == 1
+
+
+def test_template_render():
+    """Кнопки пользователя получают его user_id, общие кнопки — одни объекты для всех пользователей"""
+    registry = ScreenRegistry()
+    registry.add('info', "*Текст*", [
+        [Button("Записаться", url=BOOKING_URL)],
+        [Button("Подробнее", "learn_more_", per_user=True)],
+        [Button("Меню", "menu_main")],
+    ])
+    first = registry.get('info', USER_ID)
+    second = registry.get('info', USER_ID + 1)
+
+    assert (first.text, first.parse_mode) == ("*Текст*", 'Markdown')
+    assert _rows(first) == [
+        ("Записаться", BOOKING_URL),
+        ("Подробнее", 'learn_more_', (USER_ID,)),
+        ("Меню", 'menu_main', ()),
+    ]
+    assert _rows(second)[1] == ("Подробнее", 'learn_more_', (USER_ID + 1,))
+    for shared in (0, 2):
+        assert first.reply_markup.inline_keyboard[shared][0] is second.reply_markup.inline_keyboard[shared][0]
+    with pytest.raises(ValueError):
+        registry.get('info')
+
+
+def test_lru():
+    """Отрисованные экраны запоминаются по (экран, user_id); самый старый вытесняется"""
+    registry = ScreenRegistry(max_size=2)
+    registry.add('a', "A", [[Button("A", "learn_more_", per_user=True)]])
+    registry.add('b', "B", [[Button("B", "video_anna_", per_user=True)]])
+
+    a1 = registry.get('a', 1)
+    registry.get('b', 1)
+    assert registry.get('a', 1) is a1  # попадание обновляет порядок: старейший теперь ('b', 1)
+    registry.get('a', 2)
+    assert registry.get('a', 1) is a1
+    stats = registry.get_stats()
+    assert (stats['rendered'], stats['hits'], stats['misses']) == (2, 2, 3)
+
+    registry.get('b', 1)  # вытеснен — отрисовывается заново
+    assert registry.get_stats()['misses'] == 4
+
+
+def test_lru_disabled():
+    registry = ScreenRegistry(max_size=0)
+    registry.add('a', "A", [[Button("A", "learn_more_", per_user=True)]])
+    assert registry.get('a', 1) is not registry.get('a', 1)
+    assert registry.get_stats()['rendered'] == 0
+
+
+def test_add_errors():
+    """Повторное имя и действие не из схемы — ошибка при регистрации, а не при нажатии"""
+    registry = ScreenRegistry()
+    registry.add('a', "A")
+    with pytest.raises(ValueError):
+        registry.add('a', "A")
+    with pytest.raises(KeyError):
+        registry.add('b', "B", [[Button("B", "no_such_action_", per_user=True)]])
+    with pytest.raises(KeyError):
+        registry.add('c', "C", [[Button("C", "no_such_action")]])
+
+
+@pytest.mark.parametrize('name', [
+    'consultation_types', 'consultation_what', 'consultation_needs', 'consultation_help', 'consultation_usage',
+    'learn_more', 'video_anna', 'video_trump', 'video_bezos', 'video_bazi',
+    'video_anna_next', 'video_trump_next', 'video_bezos_next', 'final_options',
+])
+def test_per_user_screens_are_templates(name):
+    """Экраны, которые обработчики раньше собирали на каждое нажатие, — шаблоны с user_id в кнопках"""
+    screen = SCREENS.get(name, USER_ID)
+    assert screen is SCREENS.get(name, USER_ID)
+    per_user = [row for row in _rows(screen) if len(row) == 3 and row[2]]
+    assert per_user and all(row[2] == (USER_ID,) for row in per_user)
+    with pytest.raises(ValueError):
+        SCREENS.get(name)
+
+
+def test_after_video_screens():
+    """После каждого видео — следующий пример, после последнего — «больше ничего нет»"""
+    cosmos = ("🚀 Зарегистрироваться в Космический 2026", "https://www.yuliyaskiba.com/yourcosmos2026")
+    common = [
+        cosmos,
+        ("🔘 Разобрать подробно мои энергии — хочу консультацию с мастером", 'personal_analysis_', (USER_ID,)),
+        ("🔘 Поделиться Ботом — пусть друзья тоже узнают информацию о себе!", 'share_bot', ()),
+    ]
+    assert _rows(SCREENS.get('video_anna_next', USER_ID)) == [
+        cosmos, ("🔘 Что еще возможно?", 'video_trump_', (USER_ID,)),
+    ]
+    assert _rows(SCREENS.get('video_trump_next', USER_ID)) == [
+        *common, ("🔘 Посмотреть еще что-то", 'video_bezos_', (USER_ID,)),
+    ]
+    assert _rows(SCREENS.get('video_bezos_next', USER_ID)) == [
+        *common, ("🔘 Посмотреть еще что-то", 'video_bazi_', (USER_ID,)),
+    ]
+    assert _rows(SCREENS.get('final_options', USER_ID)) == [
+        *common, ("🔘 Посмотреть еще что-то", 'no_more_content', ()),
+    ]
+    assert SCREENS.get('final_options', USER_ID).parse_mode is None
+
+
+def test_consultation_types_shares_text_with_menu():
+    """Варианты консультаций из разбора и из меню — один текст, разная кнопка «Назад»"""
+    from_analysis = SCREENS.get('consultation_types', USER_ID)
+    from_menu = SCREENS.get('menu_consultations', USER_ID)
+    assert from_analysis.text is from_menu.text
+    assert _rows(from_analysis)[-1] == ("🔙 Назад", 'personal_analysis_', (USER_ID,))
+    assert _rows(from_menu)[-1] == ("🔙 Главное меню", 'menu_main', ())
@@ -0,0 +1,12 @@
+"""Таблица сезонных узлов solar_terms.bin (solar_terms.py)"""
+import os
+
+from solar_terms import TABLE_PATH, _HEADER, load_table
+
+
+def test_table_layout_matches_documented_format():
+    """Заголовок 10 байт, затем по 4 байта на узел — как описано в докстринге модуля"""
+    assert _HEADER.size == 10
+    first, minutes = load_table()
+    assert 0 <= first < 24
+    assert os.path.getsize(TABLE_PATH) == _HEADER.size + len(minutes) * 4
@@ -0,0 +1,47 @@
+"""Карта при неизвестном времени рождения (simple_bazi_calculator.py, chart_memo.py)"""
+import pytest
+
+from chart_memo import ChartMemo
+from simple_bazi_calculator import DEFAULT_BIRTH_TIME, SimpleBaziCalculator, normalize_birth_time
+
+
+@pytest.mark.parametrize('birth_time, expected', [
+    ('14:30', '14:30'),
+    (' 9:05 ', '09:05'),
+    ('не знаю', DEFAULT_BIRTH_TIME),
+    ('', DEFAULT_BIRTH_TIME),
+    (None, DEFAULT_BIRTH_TIME),
+    ('25:00', DEFAULT_BIRTH_TIME),
+    ('14.30', DEFAULT_BIRTH_TIME),
+])
+def test_normalize_birth_time(birth_time, expected):
+    assert normalize_birth_time(birth_time) == expected
+
+
+@pytest.mark.parametrize('birth_time', ['не знаю', '', None])
+def test_unknown_time_uses_lichun_year(birth_time):
+    """Январь до Личунь — животное прошлого года, как при расчете на 12:00, а не по григорианскому году"""
+    calculator = SimpleBaziCalculator()
+    chart = calculator.calculate_bazi('15.01.1990', birth_time, 'Москва')
+    noon = calculator.calculate_bazi('15.01.1990', '12:00', 'Москва')
+
+    assert chart['year_animal'] == 'Змея'
+    assert chart['birth_time'] == DEFAULT_BIRTH_TIME
+    assert chart['pillars'] == noon['pillars']
+    assert chart['day_stem_char'] == noon['day_stem_char']
+
+
+def test_invalid_date_still_falls_back():
+    """Неверная дата по-прежнему не роняет расчет"""
+    chart = SimpleBaziCalculator().calculate_bazi('31.02.1990', 'не знаю', 'Москва')
+    assert chart['birth_date'] == '31.02.1990'
+    assert chart['element']
+
+
+def test_memo_shares_entry_with_default_time():
+    """«Не знаю» попадает в ту же запись кэша, что и 12:00 (прогрев кэша считает на 12:00)"""
+    memo = ChartMemo()
+    first = memo.calculate_bazi('15.01.1990', '12:00', None)
+    second = memo.calculate_bazi('15.01.1990', 'не знаю', None)
+    assert second is first
+    assert memo.get_stats()['hits'] == 1
@@ -0,0 +1,76 @@
+"""Отложенная пакетная запись профилей (write_behind.py)"""
+import asyncio
+
+import psycopg2
+import pytest
+
+from write_behind import WriteBehindQueue
+
+
+class StubDatabase:
+    """save_users_batch как у AsyncDatabase; отклоняет пачку, если в ней есть пользователь из rejected"""
+
+    def __init__(self, rejected=(), down=False):
+        self.rejected = set(rejected)
+        self.down = down
+        self.rows = {}
+        self.calls = 0
+
+    async def save_users_batch(self, users):
+        self.calls += 1
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        if self.rejected & set(users):
+            raise psycopg2.DataError("value too long for type character varying(255)")
+        for user_id, fields in users.items():
+            self.rows.setdefault(user_id, {}).update(fields)
+
+
+def test_unknown_column_is_rejected_when_queued():
+    """Опечатка в имени колонки — ошибка у вызывающего, а не при сбросе"""
+    queue = WriteBehindQueue(StubDatabase())
+    with pytest.raises(ValueError, match='usrname'):
+        queue.save_user(1, usrname='alice')
+    assert queue.pending(1) is None
+
+
+def test_rejected_entry_does_not_block_other_users():
+    """Отклоненная базой запись отделяется от пачки и отбрасывается после max_attempts"""
+    async def scenario():
+        db = StubDatabase(rejected={2})
+        queue = WriteBehindQueue(db, max_attempts=3)
+        for user_id in (1, 2, 3):
+            queue.save_user(user_id, username=f'user{user_id}')
+        await queue.flush()
+        assert db.rows == {1: {'username': 'user1'}, 3: {'username': 'user3'}}
+        assert queue.pending(2) == {'username': 'user2'}
+
+        # Новые изменения других пользователей записываются, отклоненная запись доживает до max_attempts
+        queue.save_user(4, username='user4')
+        await queue.flush()
+        await queue.flush()
+        assert 4 in db.rows
+        assert queue.pending(2) is None
+        assert queue.get_stats()['dropped'] == 1
+        assert queue.get_stats()['pending'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_transient_error_keeps_batch_queued():
+    """Недоступная база — пачка целиком остается в очереди, ничего не отбрасывается"""
+    async def scenario():
+        db = StubDatabase(down=True)
+        queue = WriteBehindQueue(db, max_attempts=1)
+        queue.save_user(1, username='alice')
+        for _ in range(3):
+            with pytest.raises(psycopg2.OperationalError):
+                await queue.flush()
+        assert queue.pending(1) == {'username': 'alice'}
+        assert queue.get_stats()['dropped'] == 0
+
+        db.down = False
+        await queue.flush()
+        assert db.rows == {1: {'username': 'alice'}}
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+"""
+Кэш профилей пользователей в памяти процесса
+Ограниченный по размеру (LRU) и по времени жизни (TTL), хранит строку users и уже декодированную карту
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+
+class UserCache:
+    """Потокобезопасный LRU-кэш с TTL, ключ — user_id"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (истекает_в, профиль, карта)
+        self._lock = threading.Lock()
+        # Счетчик инвалидаций: загрузка, начатая до записи, не должна положить в кэш старые данные
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        """Текущее поколение — запоминается перед чтением из базы"""
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id: int) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Вернуть (профиль, карта) или None, если записи нет или она устарела"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, profile, chart = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return profile, chart
+
+    def put(self, user_id: int, profile: Dict[str, Any], chart: Optional[Dict[str, Any]], generation: int):
+        """Положить запись, если с момента начала чтения не было записей в базу"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, profile, chart)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        """Сбросить запись пользователя после изменения в базе"""
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика попаданий и вытеснений"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
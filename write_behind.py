@@ -0,0 +1,178 @@
+"""
+Отложенная пакетная запись профилей (write-behind)
+Изменения копятся в памяти, склеиваются по user_id и сбрасываются в базу одной пачкой
+"""
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+import psycopg2
+
+from database import USER_COLUMNS
+from db_pool import PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, после которых та же пачка может записаться: база недоступна или перегружена
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolTimeoutError)
+
+
+class WriteBehindQueue:
+    """Очередь записей в users со сбросом по размеру или по времени"""
+
+    def __init__(self, db, max_batch: int = 200, flush_interval: float = 1.0, max_attempts: int = 3):
+        # db — AsyncDatabase, пишем через save_users_batch
+        self.db = db
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        # Сколько раз пробовать записать изменения пользователя, которые база отклоняет
+        self.max_attempts = max_attempts
+
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._inflight: Dict[int, Dict[str, Any]] = {}
+        self._attempts: Dict[int, int] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed_rows = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def start(self):
+        """Запустить фоновый сброс (вызывать внутри работающего цикла событий)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def save_user(self, user_id: int, **fields):
+        """Поставить изменение профиля в очередь; неизвестные колонки — ошибка сразу, как в Database.save_user"""
+        unknown = set(fields) - USER_COLUMNS
+        if unknown:
+            raise ValueError(f"Неизвестные колонки users: {', '.join(sorted(unknown))}")
+        self._merge(user_id, fields)
+
+    def save_bazi_data(self, user_id: int, bazi_data: Dict[str, Any]):
+        """Поставить сохранение карты БаЦзы в очередь"""
+        self._merge(user_id, {'bazi_chart': bazi_data})
+
+    def _merge(self, user_id: int, fields: Dict[str, Any]):
+        if self._closing:
+            raise RuntimeError("Очередь записи уже закрыта")
+        self.enqueued += 1
+        entry = self._pending.get(user_id)
+        if entry is None:
+            self._pending[user_id] = dict(fields)
+        else:
+            self.coalesced += 1
+            entry.update(fields)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def pending(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Еще не записанные изменения пользователя (для чтения своих записей)"""
+        inflight = self._inflight.get(user_id)
+        pending = self._pending.get(user_id)
+        if inflight is None:
+            return pending
+        if pending is None:
+            return inflight
+        return {**inflight, **pending}
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Уже залогировано, изменения вернулись в очередь до следующей попытки
+                pass
+
+    async def flush(self):
+        """Записать все накопленные изменения"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._inflight, self._pending = self._pending, {}
+            try:
+                await self.db.save_users_batch(self._inflight)
+            except TRANSIENT_ERRORS as e:
+                self.failures += 1
+                logger.error("Ошибка пакетной записи %d пользователей: %s", len(self._inflight), e)
+                self._requeue(self._inflight)
+                raise
+            except Exception as e:
+                # База отклонила пачку (например, слишком длинное значение) — ищем, чья это запись
+                self.failures += 1
+                logger.error("Пачка из %d пользователей отклонена, записываем по одному: %s", len(self._inflight), e)
+                await self._flush_one_by_one(self._inflight)
+            else:
+                self.batches += 1
+                self.flushed_rows += len(self._inflight)
+                for user_id in self._inflight:
+                    self._attempts.pop(user_id, None)
+            finally:
+                self._inflight = {}
+
+    async def _flush_one_by_one(self, entries: Dict[int, Dict[str, Any]]):
+        """Записать пачку по одному пользователю; отклоненные — в очередь, после max_attempts — отбросить"""
+        user_ids = list(entries)
+        for index, user_id in enumerate(user_ids):
+            fields = entries[user_id]
+            try:
+                await self.db.save_users_batch({user_id: fields})
+            except TRANSIENT_ERRORS:
+                # База пропала посреди разбора: остаток ждет следующего сброса
+                self._requeue({other: entries[other] for other in user_ids[index:]})
+                raise
+            except Exception as e:
+                attempts = self._attempts.get(user_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(user_id, None)
+                    self.dropped += 1
+                    logger.error("Изменения пользователя %s (%s) отброшены после %d попыток: %s",
+                                 user_id, ', '.join(sorted(fields)), attempts, e)
+                else:
+                    self._attempts[user_id] = attempts
+                    self._requeue({user_id: fields})
+            else:
+                self.batches += 1
+                self.flushed_rows += 1
+                self._attempts.pop(user_id, None)
+
+    def _requeue(self, entries: Dict[int, Dict[str, Any]]):
+        # Возвращаем в очередь, более новые изменения важнее
+        for user_id, fields in entries.items():
+            self._pending[user_id] = {**fields, **self._pending.get(user_id, {})}
+
+    async def close(self):
+        """Остановить фоновый сброс и дописать остаток"""
+        self._closing = True
+        if self._task is not None:
+            # Не прерываем пачку на середине: ждем окончания текущего сброса
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._pending),
+            'enqueued': self.enqueued,
+            'coalesced': self.coalesced,
+            'flushed_rows': self.flushed_rows,
+            'batches': self.batches,
+            'failures': self.failures,
+            'dropped': self.dropped,
+        }